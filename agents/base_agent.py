@@ -2,14 +2,35 @@
 
 from abc import ABC, abstractmethod
 import datetime
+from node.instrumentation import DEFAULT_INSTRUMENTATION
 
 class BaseVerificationAgent(ABC):
+    # Claim fields the agent's verdict depends on. Results are only cached when this is set,
+    # so subclasses that are deterministic functions of these fields should declare them.
+    CACHE_FIELDS = None
+    # Seconds a cached result stays valid, for agents that are not pure. None means no expiry.
+    CACHE_TTL = None
+    # Whether the agent inspects the claim's content. Nodes only fetch content from their
+    # blob store for agents that set this, and pass None to the others.
+    NEEDS_CONTENT = False
+    # Claim fields determined by the content itself. An agent whose CACHE_FIELDS are all
+    # among them gives the same verdict for every claim of the same content.
+    CONTENT_FIELDS = ("content_hash",)
+
     def __init__(self, agent_id, agent_version, supported_content_types=None):
         self.agent_id = agent_id
         self.agent_version = agent_version
         # List of content types this agent can process, e.g., ["text/plain", "image/jpeg"]
         # If None, it's assumed it can attempt to process any type (with potential failure).
         self.supported_content_types = supported_content_types if supported_content_types else []
+        # Event/metrics surface; nodes attach their own when the agent is registered.
+        self.instrumentation = DEFAULT_INSTRUMENTATION
+
+    def attach_instrumentation(self, instrumentation):
+        """
+        Routes this agent's events to the given Instrumentation instance.
+        """
+        self.instrumentation = instrumentation
 
     @abstractmethod
     def verify_claim_data(self, claim_data, claim_content=None):
@@ -19,8 +40,10 @@ class BaseVerificationAgent(ABC):
 
         Args:
             claim_data (dict): The metadata and information about the claim.
-            claim_content (bytes, optional): The actual content being verified. 
-                                             May not always be available or needed by every agent.
+            claim_content (memoryview, optional): The actual content being verified, as a
+                                                  read-only view over the node's blob store.
+                                                  Only passed to agents with NEEDS_CONTENT set,
+                                                  and None when the node does not hold it.
 
         Returns:
             dict: A verification result dictionary containing at least:
@@ -33,6 +56,74 @@ class BaseVerificationAgent(ABC):
         """
         pass
 
+    def verify_claim_data_cached(self, claim_data, claim_content=None, cache=None):
+        """
+        Runs verify_claim_data() behind a VerificationResultCache.
+        Agents that do not declare CACHE_FIELDS are always run.
+
+        Args:
+            claim_data (dict): The metadata and information about the claim.
+            claim_content (memoryview, optional): The actual content being verified.
+            cache (VerificationResultCache, optional): The cache to consult and fill.
+
+        Returns:
+            dict: A verification result dictionary, see verify_claim_data().
+        """
+        if cache is None or self.CACHE_FIELDS is None:
+            return self.verify_claim_data(claim_data, claim_content)
+        result = cache.get(self, claim_data)
+        if result is None:
+            result = self.verify_claim_data(claim_data, claim_content)
+            cache.put(self, claim_data, result)
+        return result
+
+    def verify_claims_batch(self, claims, contents=None):
+        """
+        Verifies several claims in one call. The default loops over verify_claim_data();
+        agents with per-call setup costs (models, connections) should override it to
+        process the whole batch at once. Results must match what verify_claim_data()
+        would return for each claim.
+
+        Args:
+            claims (list): The claims' metadata dictionaries.
+            contents (list, optional): The claims' content, aligned with 'claims'.
+
+        Returns:
+            list: One verification result per claim, in input order.
+        """
+        if contents is None:
+            return [self.verify_claim_data(claim_data) for claim_data in claims]
+        return [self.verify_claim_data(claim_data, claim_content) for claim_data, claim_content in zip(claims, contents)]
+
+    def verify_claims_batch_cached(self, claims, contents=None, cache=None):
+        """
+        Runs verify_claims_batch() behind a VerificationResultCache: cached claims are
+        answered from the cache and only the misses are sent to the agent, as one batch.
+
+        Returns:
+            list: One verification result per claim, in input order.
+        """
+        if cache is None or self.CACHE_FIELDS is None:
+            return self.verify_claims_batch(claims, contents)
+        results = [cache.get(self, claim_data) for claim_data in claims]
+        missing = [position for position, result in enumerate(results) if result is None]
+        if missing:
+            batch_contents = [contents[position] for position in missing] if contents is not None else None
+            fresh = self.verify_claims_batch([claims[position] for position in missing], batch_contents)
+            for position, result in zip(missing, fresh):
+                cache.put(self, claims[position], result)
+                results[position] = result
+        return results
+
+    def is_content_derived(self):
+        """
+        Checks if the agent's verdict depends only on the claim's content, so that a result
+        for one claim of some content holds for every other claim of it. Agents whose
+        results expire (CACHE_TTL) are never considered content-derived.
+        """
+        return (self.CACHE_FIELDS is not None and self.CACHE_TTL is None
+                and all(field in self.CONTENT_FIELDS for field in self.CACHE_FIELDS))
+
     def generate_verification_event(self, verdict, details, confidence_score=None):
         """
         Helper method to create a standardized verification event structure.
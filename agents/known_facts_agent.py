@@ -1,117 +1,126 @@
 # agents/known_facts_agent.py
 
 from .base_agent import BaseVerificationAgent # Relative import
+from .reputation_store import ReputationStore
+from .rule_engine import TRIGGERED_VERDICTS, load_rule_set
 import datetime
+import os
+
+DEFAULT_RULES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "known_facts_rules.json")
+REPUTATION_RELOAD_INTERVAL = 30.0 # Seconds between checks for a replaced reputation store file
 
 class KnownFactsAgent(BaseVerificationAgent):
     """
     An agent that "verifies" claims against a predefined set of "known facts"
     or rules related to the claim's metadata.
     For MVP1, this is a very simplistic rule-based check.
+    The known submitters and per-content-type rules are loaded from a rule file
+    (known_facts_rules.json by default) and compiled once when the agent is created.
+    Large submitter lists are served from a memory-mapped ReputationStore; submitters
+    in the rule file take precedence over the store.
     """
 
-    # Example "known facts":
-    # A real system might load these from a config file or a database.
-    KNOWN_SUBMITTERS = {
-        "official_press_agency_001": {"reputation": 0.9, "category": "news_outlet"},
-        "research_institute_alpha": {"reputation": 0.85, "category": "science"},
-        "known_disinfo_source_xyz": {"reputation": 0.1, "category": "disinformation_actor"}
-    }
-    
-    # Example rules based on content_type or metadata fields
-    RULES_FOR_CONTENT_TYPE = {
-        "application/pdf": {
-            "metadata_must_contain": ["author", "creation_date"],
-            "author_must_not_be": ["anonymous_unverified"]
-        },
-        "image/jpeg": {
-            "metadata_should_contain": ["camera_model", "gps_location"],
-            "metadata_flag_if_missing_all": ["camera_model", "gps_location", "creation_software"]
-        }
-    }
-
-    def __init__(self, agent_id="known_facts_v1", agent_version="0.1.0"):
+    # The verdict depends only on these claim fields (and the agent's rule file).
+    # Bump agent_version when the rule file changes so cached results are invalidated.
+    CACHE_FIELDS = ("submitter_id", "content_type", "metadata")
+
+    def __init__(self, agent_id="known_facts_v1", agent_version="0.1.0", rules_path=None, reputation_store=None):
+        """
+        Args:
+            agent_id (str): Identifier of the agent.
+            agent_version (str): Version of the agent.
+            rules_path (str, optional): Rule file to load; defaults to DEFAULT_RULES_PATH.
+            reputation_store (ReputationStore or str, optional): Reputation store, or the path of a
+                                                                 store file to open with hot reload.
+        """
         super().__init__(agent_id, agent_version, supported_content_types=None) # Can attempt any
+        if isinstance(reputation_store, str):
+            reputation_store = ReputationStore(reputation_store, reload_interval=REPUTATION_RELOAD_INTERVAL)
+        self.reputation_store = reputation_store
+        if reputation_store is not None and reputation_store.reload_interval is not None and self.CACHE_TTL is None:
+            # The store can change underneath cached results; let them expire with its reload cadence.
+            self.CACHE_TTL = reputation_store.reload_interval
+        self.rules_path = rules_path or DEFAULT_RULES_PATH
+        self.rules = load_rule_set(self.rules_path, reputation_store)
 
     def verify_claim_data(self, claim_data, claim_content=None):
-        print(f"Agent '{self.agent_id}' processing claim_id: {claim_data.get('claim_id')}")
-        
-        verdicts = []
-        details_log = []
-        confidence_scores = []
+        if self.instrumentation.emitting:
+            self.instrumentation.event("agent_processing", "Agent '{agent_id}' processing claim_id: {claim_id}", level="debug",
+                                       agent_id=self.agent_id, claim_id=claim_data.get("claim_id"))
 
         submitter_id = claim_data.get("submitter_id")
         content_type = claim_data.get("content_type")
-        metadata = claim_data.get("metadata", {})
-
-        # 1. Check submitter reputation
-        if submitter_id in self.KNOWN_SUBMITTERS:
-            submitter_info = self.KNOWN_SUBMITTERS[submitter_id]
-            details_log.append(f"Submitter '{submitter_id}' found in known list. Reputation: {submitter_info['reputation']}.")
-            confidence_scores.append(submitter_info['reputation'])
-            if submitter_info["reputation"] < 0.3: # Arbitrary threshold
-                verdicts.append("suspicious_source")
-        else:
-            details_log.append(f"Submitter '{submitter_id}' not in known list. Considered neutral/unknown for this check.")
-            confidence_scores.append(0.5) # Neutral confidence for unknown submitter
-
-        # 2. Check rules for content_type
-        if content_type in self.RULES_FOR_CONTENT_TYPE:
-            rules = self.RULES_FOR_CONTENT_TYPE[content_type]
-            
-            # Check for mandatory metadata
-            if "metadata_must_contain" in rules:
-                missing_mandatory = [key for key in rules["metadata_must_contain"] if key not in metadata]
-                if missing_mandatory:
-                    details_log.append(f"For {content_type}, missing mandatory metadata: {missing_mandatory}.")
-                    verdicts.append("metadata_incomplete")
-                    confidence_scores.append(0.3)
-                else:
-                    details_log.append(f"All mandatory metadata for {content_type} present.")
-            
-            # Check for forbidden authors (example)
-            if "author_must_not_be" in rules and "author" in metadata:
-                if metadata["author"] in rules["author_must_not_be"]:
-                    details_log.append(f"Author '{metadata['author']}' is on a forbidden list for {content_type}.")
-                    verdicts.append("problematic_author")
-                    confidence_scores.append(0.2)
-
-            # Check for "should contain" (example for image/jpeg)
-            if "metadata_should_contain" in rules:
-                missing_should = [key for key in rules["metadata_should_contain"] if key not in metadata]
-                if missing_should:
-                     details_log.append(f"For {content_type}, recommended metadata missing: {missing_should}.")
-                     # This might lower confidence but not necessarily lead to "unverified"
-            
-            if "metadata_flag_if_missing_all" in rules:
-                all_missing = True
-                for key in rules["metadata_flag_if_missing_all"]:
-                    if key in metadata:
-                        all_missing = False
-                        break
-                if all_missing:
-                    details_log.append(f"For {content_type}, all key metadata fields ({rules['metadata_flag_if_missing_all']}) are missing.")
-                    verdicts.append("significant_metadata_missing")
-                    confidence_scores.append(0.25)
-
-
-        # Determine overall verdict (simplified logic)
-        final_verdict = "neutral_no_strong_signal" # Default if no strong signals
-        if "suspicious_source" in verdicts or "problematic_author" in verdicts or "metadata_incomplete" in verdicts or "significant_metadata_missing" in verdicts:
-            final_verdict = "caution_advised"
-        elif confidence_scores and all(cs > 0.7 for cs in confidence_scores) and not verdicts: # Example for positive
-            final_verdict = "appears_consistent_with_known_facts"
-
-        # Calculate an average confidence (very naive for now)
-        avg_confidence = sum(confidence_scores) / len(confidence_scores) if confidence_scores else 0.5
-        
+        metadata = claim_data.get("metadata") or {}
+        flags, final_verdict, confidence = self.rules.evaluate(submitter_id, content_type, metadata)
+
         return self.generate_verification_event(
             verdict=final_verdict,
-            details={"log": details_log, "triggered_verdicts": verdicts},
-            confidence_score=round(avg_confidence, 2)
+            details={"log": self.rules.explain(submitter_id, content_type, metadata),
+                     "triggered_verdicts": list(TRIGGERED_VERDICTS[flags])},
+            confidence_score=confidence
         )
 
+    def verify_claims_batch(self, claims, contents=None, include_log=True):
+        """
+        Evaluates many claims in one call with the compiled rules; all results share one
+        timestamp. With include_log=False the detailed log is skipped (it can be produced
+        later for individual claims with explain()), which is several times faster.
+
+        Args:
+            claims (list): The claims to verify.
+            contents (list, optional): Unused; this agent only reads claim metadata.
+            include_log (bool): Add the "log" entry to each result's details, matching
+                                verify_claim_data() exactly.
+
+        Returns:
+            list: One verification event per claim, in input order.
+        """
+        if self.instrumentation.emitting:
+            self.instrumentation.event("agent_processing_batch", "Agent '{agent_id}' processing a batch of {count} claims", level="debug",
+                                       agent_id=self.agent_id, count=len(claims))
+        timestamp = str(datetime.datetime.utcnow().isoformat())
+        evaluate = self.rules.evaluate
+        explain = self.rules.explain
+        agent_id = self.agent_id
+        agent_version = self.agent_version
+        results = []
+        for claim_data in claims:
+            submitter_id = claim_data.get("submitter_id")
+            content_type = claim_data.get("content_type")
+            metadata = claim_data.get("metadata") or {}
+            flags, verdict, confidence = evaluate(submitter_id, content_type, metadata)
+            if include_log:
+                details = {"log": explain(submitter_id, content_type, metadata), "triggered_verdicts": list(TRIGGERED_VERDICTS[flags])}
+            else:
+                details = {"triggered_verdicts": list(TRIGGERED_VERDICTS[flags])}
+            results.append({
+                "agent_id": agent_id,
+                "agent_version": agent_version,
+                "timestamp": timestamp,
+                "verdict": verdict,
+                "details": details,
+                "confidence_score": confidence
+            })
+        return results
+
+    def explain(self, claim_data):
+        """
+        Returns:
+            list: The detailed findings log for one claim.
+        """
+        return self.rules.explain(claim_data.get("submitter_id"), claim_data.get("content_type"), claim_data.get("metadata") or {})
+
+    def get_info(self):
+        info = super().get_info()
+        info["rules_path"] = self.rules_path
+        info["rules_version"] = self.rules.rules_version
+        if self.reputation_store is not None:
+            info["reputation_store"] = self.reputation_store.stats()
+        return info
+
 if __name__ == '__main__':
+    from node.instrumentation import ConsoleSink, DEFAULT_INSTRUMENTATION
+    DEFAULT_INSTRUMENTATION.add_sink(ConsoleSink())
     agent = KnownFactsAgent()
     print(f"\n--- Testing Agent: {agent.get_info()['agent_id']} ---")
     import json
@@ -150,4 +159,9 @@ if __name__ == '__main__':
         "metadata": {"author": "anonymous_unverified", "creation_date": "2023-03-15"} # Problematic author
     }
     result4 = agent.verify_claim_data(claim4)
-    print(f"\nResult for claim4:\n{json.dumps(result4, indent=2)}")
\ No newline at end of file
+    print(f"\nResult for claim4:\n{json.dumps(result4, indent=2)}")
+
+    claims = [claim1, claim2, claim3, claim4] * 2500
+    batch_results = agent.verify_claims_batch(claims, include_log=False)
+    print(f"\nBatch of {len(batch_results)} claims, verdicts: {sorted({result['verdict'] for result in batch_results})}")
+    print(f"Explained on request for claim2: {agent.explain(claim2)}")
@@ -0,0 +1,238 @@
+# agents/registry.py
+
+import importlib
+import json
+import os
+import threading
+
+REGISTRY_FORMAT_VERSION = 1
+DEFAULT_CONFIG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "agents.json")
+# Installed packages can contribute agents under this entry point group, e.g. in pyproject.toml:
+#   [project.entry-points."helios_protocol.agents"]
+#   my_agent_v1 = "my_package.agents:MyAgent"
+ENTRY_POINT_GROUP = "helios_protocol.agents"
+
+
+class AgentRegistryError(ValueError):
+    """Raised when an agent registry file is malformed or an agent cannot be loaded."""
+
+
+class AgentSpec:
+    """
+    Describes an agent without importing it: its ID, version, the content types it
+    handles and a "module:attribute" factory that builds it. Nodes select agents by their
+    specs and only import and instantiate one the first time a claim it handles arrives.
+    """
+    def __init__(self, agent_id, factory, agent_version=None, supported_content_types=None, options=None,
+                 timeout=None, weight=1.0, source="config"):
+        """
+        Args:
+            agent_id (str): ID the agent is registered under; the built agent must report it.
+            factory (str): "module:attribute" of a class or function returning the agent.
+            agent_version (str, optional): Version the built agent must report; None skips the check.
+            supported_content_types (list, optional): Content types the agent handles; empty or
+                                                      None means any, as in BaseVerificationAgent.
+            options (dict, optional): Keyword arguments passed to the factory.
+            timeout (float, optional): Per-agent timeout overriding the node default.
+            weight (float): Weight of the agent's confidence scores in claim summaries.
+            source (str): Where the spec came from ("config", "entry_point" or "code").
+        """
+        if not isinstance(factory, str) or ":" not in factory:
+            raise AgentRegistryError(f"Agent '{agent_id}' needs a factory of the form 'module:attribute', got {factory!r}.")
+        self.agent_id = agent_id
+        self.factory = factory
+        self.agent_version = agent_version
+        self.supported_content_types = list(supported_content_types or [])
+        self.options = dict(options or {})
+        self.timeout = timeout
+        self.weight = weight
+        self.source = source
+
+    @classmethod
+    def from_dict(cls, entry, source="config"):
+        if not isinstance(entry, dict) or not entry.get("agent_id") or not entry.get("factory"):
+            raise AgentRegistryError(f"Agent entries need an 'agent_id' and a 'factory': {entry!r}")
+        return cls(entry["agent_id"], entry["factory"], entry.get("agent_version"), entry.get("supported_content_types"),
+                   entry.get("options"), entry.get("timeout"), entry.get("weight", 1.0), source)
+
+    def can_verify(self, content_type):
+        """
+        Checks if the agent handles the given content type, without loading it.
+        """
+        return not self.supported_content_types or content_type in self.supported_content_types
+
+    def load(self):
+        """
+        Imports the factory's module and builds the agent.
+
+        Returns:
+            BaseVerificationAgent: The new agent.
+
+        Raises:
+            AgentRegistryError: If the factory cannot be imported, or the agent it builds does
+                                not match the spec's ID or version.
+        """
+        module_name, _, attribute = self.factory.partition(":")
+        try:
+            factory = importlib.import_module(module_name)
+            for name in attribute.split("."):
+                factory = getattr(factory, name)
+        except (ImportError, AttributeError) as e:
+            raise AgentRegistryError(f"Cannot import agent '{self.agent_id}' from '{self.factory}': {e}") from e
+        agent = factory(**self.options)
+        if agent.agent_id != self.agent_id:
+            raise AgentRegistryError(f"'{self.factory}' built agent '{agent.agent_id}', expected '{self.agent_id}'.")
+        if self.agent_version is not None and agent.agent_version != self.agent_version:
+            raise AgentRegistryError(f"Agent '{self.agent_id}' is version {agent.agent_version}, "
+                                     f"but the registry describes version {self.agent_version}.")
+        return agent
+
+    def to_dict(self):
+        return {"agent_id": self.agent_id, "agent_version": self.agent_version, "factory": self.factory,
+                "supported_content_types": self.supported_content_types, "source": self.source}
+
+
+class AgentRegistry:
+    """
+    An ordered collection of AgentSpecs, read from a JSON config file and/or from the
+    entry points of installed packages. Building a registry never imports an agent, and
+    entry points (whose discovery scans every installed package) are only collected the
+    first time the registry is queried.
+    """
+    def __init__(self, specs=(), entry_point_group=None):
+        """
+        Args:
+            specs (iterable): AgentSpecs, in registration order.
+            entry_point_group (str, optional): Also add the agents of this entry point group,
+                                               after 'specs' and without replacing any of them.
+        """
+        self._specs = {} # agent_id -> AgentSpec, in registration order
+        for spec in specs:
+            self.add(spec)
+        self._entry_point_group = entry_point_group
+        self._lock = threading.Lock()
+
+    def _resolved(self):
+        if self._entry_point_group is not None:
+            with self._lock:
+                if self._entry_point_group is not None:
+                    for spec in self.from_entry_points(self._entry_point_group):
+                        self._specs.setdefault(spec.agent_id, spec)
+                    self._entry_point_group = None
+        return self._specs
+
+    def add(self, spec):
+        """
+        Adds a spec, replacing any spec with the same agent_id.
+        """
+        self._specs[spec.agent_id] = spec
+
+    def remove(self, agent_id):
+        return self._resolved().pop(agent_id, None)
+
+    def get(self, agent_id):
+        return self._resolved().get(agent_id)
+
+    def __contains__(self, agent_id):
+        return agent_id in self._resolved()
+
+    def __iter__(self):
+        return iter(list(self._resolved().values()))
+
+    def __len__(self):
+        return len(self._resolved())
+
+    def matching(self, content_type):
+        """
+        Returns:
+            list: The specs of the agents that handle 'content_type', in registration order.
+        """
+        return [spec for spec in self._resolved().values() if spec.can_verify(content_type)]
+
+    @classmethod
+    def from_config(cls, path=DEFAULT_CONFIG_PATH):
+        """
+        Reads a registry file: {"format_version": 1, "agents": [{"agent_id", "factory",
+        "agent_version", "supported_content_types", "options", "timeout", "weight",
+        "enabled"}, ...]}. Entries with "enabled": false are skipped.
+
+        Raises:
+            AgentRegistryError: If the file cannot be read or is malformed.
+        """
+        try:
+            with open(path, "r", encoding="utf-8") as config_file:
+                config = json.load(config_file)
+        except (OSError, ValueError) as e:
+            raise AgentRegistryError(f"Cannot read agent registry '{path}': {e}") from e
+        if not isinstance(config, dict) or config.get("format_version") != REGISTRY_FORMAT_VERSION:
+            raise AgentRegistryError(f"Agent registry '{path}' must be an object with format_version {REGISTRY_FORMAT_VERSION}.")
+        return cls(AgentSpec.from_dict(entry) for entry in config.get("agents", ()) if entry.get("enabled", True))
+
+    @classmethod
+    def from_entry_points(cls, group=ENTRY_POINT_GROUP):
+        """
+        Collects the agents installed packages declare in the entry point 'group'. The entry
+        point's name is the agent_id and its value the factory; such agents declare no
+        version or content types, so they are loaded for the first claim of any type.
+        """
+        from importlib.metadata import entry_points
+        discovered = entry_points()
+        selected = discovered.select(group=group) if hasattr(discovered, "select") else discovered.get(group, ())
+        return cls(AgentSpec(entry_point.name, entry_point.value, source="entry_point") for entry_point in selected)
+
+    @classmethod
+    def default(cls):
+        """
+        Returns the registry nodes use unless given one: the agents in DEFAULT_CONFIG_PATH
+        followed by those of installed entry points (the config file wins on a shared ID).
+        It is built once per process and shared; treat it as read-only.
+        """
+        global _default_registry
+        with _default_lock:
+            if _default_registry is None:
+                _default_registry = cls(cls.from_config(), entry_point_group=ENTRY_POINT_GROUP)
+            return _default_registry
+
+
+_default_registry = None
+_default_lock = threading.Lock()
+
+
+if __name__ == '__main__':
+    # Test reading the default registry without importing any agent, then loading one.
+    import sys
+    import tempfile
+    import time
+
+    print("--- Agent Registry Self-Test ---")
+    started = time.perf_counter()
+    registry = AgentRegistry.default()
+    built = time.perf_counter() - started
+    started = time.perf_counter()
+    specs = list(registry)
+    resolved = time.perf_counter() - started
+    print(f"Default registry: {[spec.to_dict() for spec in specs]}")
+    print(f"Built in {built * 1000:.2f} ms, entry points collected on first query in {resolved * 1000:.2f} ms; "
+          f"agent modules imported: {[name for name in sys.modules if name in ('agents.simple_verifier_agent', 'agents.known_facts_agent')]}")
+    agent = registry.get("simple_verifier_v1").load()
+    print(f"Loaded {agent.agent_id} v{agent.agent_version}; handles image/png: {registry.get('simple_verifier_v1').can_verify('image/png')}")
+
+    with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False) as config_file:
+        json.dump({"format_version": 1, "agents": [
+            {"agent_id": "pdf_only", "factory": "agents.simple_verifier_agent:SimpleVerifierAgent",
+             "supported_content_types": ["application/pdf"], "options": {"agent_id": "pdf_only"}},
+            {"agent_id": "stale", "agent_version": "9.9", "factory": "agents.simple_verifier_agent:SimpleVerifierAgent",
+             "options": {"agent_id": "stale"}},
+            {"agent_id": "disabled", "factory": "missing.module:Agent", "enabled": False}
+        ]}, config_file)
+    try:
+        custom = AgentRegistry.from_config(config_file.name)
+        print(f"Custom registry: {[spec.agent_id for spec in custom]}; matching image/jpeg: "
+              f"{[spec.agent_id for spec in custom.matching('image/jpeg')]}")
+        try:
+            custom.get("stale").load()
+        except AgentRegistryError as e:
+            print(f"Version mismatch rejected: {e}")
+    finally:
+        os.unlink(config_file.name)
+    print("--- End of Agent Registry Self-Test ---")
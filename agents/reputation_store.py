@@ -0,0 +1,347 @@
+# agents/reputation_store.py
+
+import csv
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+import threading
+import time
+from array import array
+from bisect import bisect_left
+
+MAGIC = b"HREP"
+FORMAT_VERSION = 1
+# magic, version, byte order ("<" or ">"), bucket bits, entry count, Bloom filter words,
+# reserved, category table length (bytes)
+_HEADER = struct.Struct("<4sHcBQQII")
+# A submitter's 128-bit digest: its sorted 64-bit key, the Bloom filter word hash and
+# four bytes selecting the bits it sets in that word.
+_DIGEST_FIELDS = struct.Struct("<QIBBBB")
+_BIT = tuple(1 << (byte & 63) for byte in range(256))
+_ALIGNMENT = 8
+SCORE_SCALE = 10000 # Reputations are stored as integer basis points (4 decimal places)
+DEFAULT_BITS_PER_KEY = 12 # ~1% false positives for the blocked Bloom filter below
+DEFAULT_CACHE_SIZE = 65536
+_ENTRIES_PER_BUCKET = 8
+_MISSING = object()
+
+
+class ReputationStoreError(ValueError):
+    """Raised when a reputation store file is malformed or cannot be built."""
+
+
+def _digest(submitter_id):
+    """
+    Returns (key, word_hash, bit_a, bit_b, bit_c, bit_d): the 64-bit key a submitter is
+    filed under and the independent hashes that place it in the Bloom filter.
+    """
+    return _DIGEST_FIELDS.unpack(hashlib.blake2b(submitter_id.encode(), digest_size=16).digest())
+
+
+def _aligned(offset):
+    return (offset + _ALIGNMENT - 1) // _ALIGNMENT * _ALIGNMENT
+
+
+def build_reputation_store(path, entries, bits_per_key=DEFAULT_BITS_PER_KEY):
+    """
+    Writes a reputation store file. The file is written to a temporary name and moved into
+    place atomically, so running stores can hot-reload it safely.
+    Building is an offline step: all entries are held in memory while they are sorted.
+
+    Args:
+        path (str): Destination file.
+        entries (iterable): (submitter_id, reputation, category) tuples; reputation in [0, 1],
+                            category a string or None.
+        bits_per_key (int): Bloom filter size per entry.
+
+    Returns:
+        int: Number of entries written.
+
+    Raises:
+        ReputationStoreError: On out-of-range reputations, too many categories, or
+                              two submitter IDs hashing to the same key.
+    """
+    categories = [None]
+    category_codes = {None: 0}
+    packed = [] # (key << 32) | (score << 16) | category code, sorted by key
+    bloom_hashes = []
+    for submitter_id, reputation, category in entries:
+        if not 0.0 <= reputation <= 1.0:
+            raise ReputationStoreError(f"Reputation {reputation} of '{submitter_id}' is outside [0, 1].")
+        code = category_codes.get(category)
+        if code is None:
+            code = category_codes[category] = len(categories)
+            categories.append(category)
+            if code > 0xFFFF:
+                raise ReputationStoreError("A reputation store supports at most 65535 categories.")
+        key, word_hash, bit_a, bit_b, bit_c, bit_d = _digest(submitter_id)
+        packed.append((key << 32) | (round(reputation * SCORE_SCALE) << 16) | code)
+        bloom_hashes.append((word_hash, _BIT[bit_a] | _BIT[bit_b] | _BIT[bit_c] | _BIT[bit_d]))
+    packed.sort()
+
+    count = len(packed)
+    bucket_bits = max(1, (max(count, 1) // _ENTRIES_PER_BUCKET).bit_length())
+    bloom_words = max(1, count * bits_per_key // 64)
+    bloom = array("Q", [0]) * bloom_words
+    # Blocked Bloom filter: each submitter sets four bits inside a single 64-bit word,
+    # so a membership test is one word read and one mask comparison.
+    for word_hash, mask in bloom_hashes:
+        bloom[word_hash % bloom_words] |= mask
+    del bloom_hashes
+
+    keys = array("Q")
+    scores = array("H")
+    codes = array("H")
+    buckets = array("Q", [0]) * ((1 << bucket_bits) + 1)
+    shift = 64 - bucket_bits
+    previous_key = None
+    for position, entry in enumerate(packed):
+        key = entry >> 32
+        if key == previous_key:
+            raise ReputationStoreError("Two submitter IDs hash to the same key; the store cannot hold both.")
+        previous_key = key
+        keys.append(key)
+        scores.append((entry >> 16) & 0xFFFF)
+        codes.append(entry & 0xFFFF)
+        buckets[(key >> shift) + 1] = position + 1
+    # Turn "end of bucket" marks into a monotonic offsets table: bucket b spans [buckets[b], buckets[b + 1]).
+    for bucket in range(1, len(buckets)):
+        if buckets[bucket] < buckets[bucket - 1]:
+            buckets[bucket] = buckets[bucket - 1]
+    del packed
+
+    category_table = json.dumps(categories).encode()
+    header = _HEADER.pack(MAGIC, FORMAT_VERSION, b"<" if sys.byteorder == "little" else b">",
+                          bucket_bits, count, bloom_words, 0, len(category_table))
+    temp_path = path + ".tmp"
+    with open(temp_path, "wb") as store_file:
+        for section in (header, category_table, bloom.tobytes(), buckets.tobytes(), keys.tobytes(),
+                        scores.tobytes(), codes.tobytes()):
+            store_file.write(section)
+            store_file.write(b"\0" * (_aligned(store_file.tell()) - store_file.tell()))
+        store_file.flush()
+        os.fsync(store_file.fileno())
+    os.replace(temp_path, path)
+    return count
+
+
+def read_reputation_csv(path):
+    """
+    Reads build_reputation_store() input from a CSV file with a header row naming the
+    columns submitter_id, reputation and (optionally) category.
+
+    Yields:
+        tuple: (submitter_id, reputation, category)
+    """
+    with open(path, "r", newline="") as csv_file:
+        for row in csv.DictReader(csv_file):
+            yield row["submitter_id"], float(row["reputation"]), row.get("category") or None
+
+
+class _MappedTable:
+    """
+    One memory-mapped generation of a reputation store file.
+    """
+    def __init__(self, path):
+        with open(path, "rb") as store_file:
+            self.stat = os.fstat(store_file.fileno())
+            self._mmap = mmap.mmap(store_file.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(self._mmap)
+        if len(view) < _HEADER.size:
+            raise ReputationStoreError(f"Reputation store '{path}' is truncated.")
+        magic, version, byte_order, bucket_bits, count, bloom_words, _, category_length = _HEADER.unpack_from(view, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ReputationStoreError(f"'{path}' is not a version {FORMAT_VERSION} reputation store.")
+        if byte_order != (b"<" if sys.byteorder == "little" else b">"):
+            raise ReputationStoreError(f"Reputation store '{path}' was built on a machine with a different byte order.")
+
+        offset = _aligned(_HEADER.size)
+        self.categories = json.loads(bytes(view[offset:offset + category_length]))
+        offset = _aligned(offset + category_length)
+        sections = []
+        for item_size, type_code, length in ((8, "Q", bloom_words), (8, "Q", (1 << bucket_bits) + 1),
+                                             (8, "Q", count), (2, "H", count), (2, "H", count)):
+            end = offset + item_size * length
+            if end > len(view):
+                raise ReputationStoreError(f"Reputation store '{path}' is truncated.")
+            sections.append(view[offset:end].cast(type_code))
+            offset = _aligned(end)
+        self.bloom, self.buckets, self.keys, self.scores, self.codes = sections
+        self.count = count
+        self.shift = 64 - bucket_bits
+        self.bloom_words = bloom_words
+
+    def find(self, submitter_id):
+        """
+        Returns:
+            int or None: The entry's position, or None if the submitter is not stored.
+                         Most unknown submitters are ruled out by the Bloom filter alone.
+        """
+        key, word_hash, bit_a, bit_b, bit_c, bit_d = _digest(submitter_id)
+        mask = _BIT[bit_a] | _BIT[bit_b] | _BIT[bit_c] | _BIT[bit_d]
+        if self.bloom[word_hash % self.bloom_words] & mask != mask:
+            return None
+        buckets = self.buckets
+        bucket = key >> self.shift
+        hi = buckets[bucket + 1]
+        position = bisect_left(self.keys, key, buckets[bucket], hi)
+        if position < hi and self.keys[position] == key:
+            return position
+        return None
+
+
+class ReputationStore:
+    """
+    Read-only, memory-mapped submitter reputation lookups, built by build_reputation_store().
+    The file holds sorted 64-bit submitter key hashes with parallel arrays of reputation
+    scores and category codes, a bucket table that narrows each binary search to a handful
+    of entries, and a Bloom filter that answers most "unknown submitter" lookups without
+    touching the key array. Pages are shared through the OS page cache, so every process
+    mapping the same file shares one copy and resident memory does not grow with the list.
+
+    Recent results are kept in a small bounded dict, so the heavy submitters that make
+    up most traffic skip hashing altogether.
+
+    The store is hot-reloadable: when reload_interval is set, lookups notice (at most once
+    per interval) that the file was replaced and switch to the new generation.
+    """
+    def __init__(self, path, reload_interval=None, cache_size=DEFAULT_CACHE_SIZE):
+        """
+        Args:
+            path (str): The reputation store file.
+            reload_interval (float, optional): Seconds between checks for a replaced file.
+                                               None disables automatic reloading; reload()
+                                               can still be called explicitly.
+            cache_size (int): Maximum number of cached lookup results; 0 disables the cache.
+        """
+        self.path = path
+        self.reload_interval = reload_interval
+        self.cache_size = cache_size
+        self._table = _MappedTable(path)
+        self._cache = {}
+        self._reload_lock = threading.Lock()
+        self._next_check = time.monotonic() + reload_interval if reload_interval is not None else None
+        self.generation = 1
+
+    def __len__(self):
+        return self._table.count
+
+    def reload(self):
+        """
+        Maps the file again if it was replaced since it was last loaded.
+
+        Returns:
+            bool: True if a new generation was loaded.
+        """
+        with self._reload_lock:
+            try:
+                stat = os.stat(self.path)
+            except OSError:
+                return False # Keep serving the current generation while the file is missing
+            current = self._table.stat
+            if (stat.st_ino, stat.st_mtime_ns, stat.st_size) == (current.st_ino, current.st_mtime_ns, current.st_size):
+                return False
+            self._table = _MappedTable(self.path) # Readers holding the old table finish on it
+            self._cache = {}
+            self.generation += 1
+            return True
+
+    def _maybe_reload(self):
+        now = time.monotonic()
+        if now >= self._next_check:
+            self._next_check = now + self.reload_interval
+            self.reload()
+
+    def lookup(self, submitter_id):
+        """
+        Looks up a submitter.
+
+        Args:
+            submitter_id (str): The submitter.
+
+        Returns:
+            tuple or None: (reputation, category) or None if the submitter is not stored.
+        """
+        if self._next_check is not None:
+            self._maybe_reload()
+        if not isinstance(submitter_id, str):
+            return None
+        cache = self._cache
+        entry = cache.get(submitter_id, _MISSING)
+        if entry is not _MISSING:
+            return entry
+        table = self._table
+        position = table.find(submitter_id)
+        if position is not None:
+            entry = (table.scores[position] / SCORE_SCALE, table.categories[table.codes[position]])
+        else:
+            entry = None
+        if self.cache_size:
+            if len(cache) >= self.cache_size:
+                cache.clear() # Cheaper than LRU bookkeeping; hot submitters return immediately
+            cache[submitter_id] = entry
+        return entry
+
+    def get_reputation(self, submitter_id):
+        """
+        Returns:
+            float or None: The submitter's reputation, or None if the submitter is not stored.
+        """
+        entry = self.lookup(submitter_id)
+        return entry[0] if entry is not None else None
+
+    def stats(self):
+        """
+        Returns:
+            dict: Entry count, generation, file size and Bloom filter size.
+        """
+        table = self._table
+        return {
+            "path": self.path,
+            "entries": table.count,
+            "generation": self.generation,
+            "file_bytes": table.stat.st_size,
+            "bloom_bytes": table.bloom_words * 8
+        }
+
+
+if __name__ == '__main__':
+    # Test building, lookups, the Bloom front and hot reload.
+    import tempfile
+
+    print("--- Reputation Store Self-Test ---")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        store_path = os.path.join(temp_dir, "reputation.bin")
+        entry_count = 1000000
+        started = time.perf_counter()
+        build_reputation_store(store_path, (
+            (f"submitter_{i}", (i % 101) / 100, ("news_outlet", "science", "blog")[i % 3]) for i in range(entry_count)))
+        print(f"Built {entry_count} entries in {time.perf_counter() - started:.2f}s, {os.path.getsize(store_path)} bytes")
+
+        store = ReputationStore(store_path, cache_size=0) # Measure uncached lookups
+        print(f"submitter_42: {store.lookup('submitter_42')}")
+        print(f"unknown_person: {store.lookup('unknown_person')}")
+
+        probes = [f"submitter_{i * 7919 % entry_count}" for i in range(100000)]
+        started = time.perf_counter()
+        found = sum(1 for probe in probes if store.lookup(probe) is not None)
+        print(f"Known lookups: {found}/{len(probes)}, {(time.perf_counter() - started) / len(probes) * 1e6:.2f} us each")
+        misses = [f"stranger_{i}" for i in range(100000)]
+        started = time.perf_counter()
+        false_hits = sum(1 for probe in misses if store.lookup(probe) is not None)
+        print(f"Unknown lookups: {false_hits} false hits, {(time.perf_counter() - started) / len(misses) * 1e6:.2f} us each")
+
+        cached_store = ReputationStore(store_path)
+        hot = [f"submitter_{i % 1000}" for i in range(100000)]
+        started = time.perf_counter()
+        for probe in hot:
+            cached_store.lookup(probe)
+        print(f"Cached lookups of 1000 hot submitters: {(time.perf_counter() - started) / len(hot) * 1e6:.2f} us each")
+
+        build_reputation_store(store_path, [("unknown_person", 0.77, "science")])
+        print(f"Reloaded: {store.reload()}")
+        print(f"After hot reload: unknown_person -> {store.lookup('unknown_person')}, stats: {store.stats()}")
+    print("--- End of Reputation Store Self-Test ---")
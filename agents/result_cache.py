@@ -0,0 +1,171 @@
+# agents/result_cache.py
+
+import datetime
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+
+
+def claim_fingerprint(claim_data, fields):
+    """
+    Computes a canonical fingerprint of the claim fields an agent reads.
+
+    Args:
+        claim_data (dict): The claim.
+        fields (tuple): Names of the fields the agent declares it reads.
+
+    Returns:
+        bytes: A 32-byte SHA256 digest of the selected fields.
+    """
+    selected = {field: claim_data.get(field) for field in fields}
+    encoded = json.dumps(selected, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(encoded.encode()).digest()
+
+
+class VerificationResultCache:
+    """
+    A thread-safe LRU cache of agent verification results.
+    Entries are keyed by (agent_id, agent_version, fingerprint of the agent's CACHE_FIELDS),
+    so duplicate or re-submitted content becomes a dictionary hit instead of a full agent run.
+    When an agent is seen with a new version, all entries of its previous version are dropped.
+    Agents that are not pure functions of their inputs can set CACHE_TTL so results expire.
+    """
+    def __init__(self, max_entries=100000, default_ttl=None):
+        """
+        Args:
+            max_entries (int): Maximum number of cached results; least recently used entries are evicted.
+            default_ttl (float, optional): Expiry in seconds for agents that do not set CACHE_TTL.
+                                           None keeps results until evicted.
+        """
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self._entries = OrderedDict() # key -> (expires_at or None, result)
+        self._agent_versions = {} # agent_id -> version whose entries are currently cached
+        self._keys_by_agent = {} # agent_id -> set of keys, for invalidation on version change
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def _key(self, agent, claim_data):
+        return agent.agent_id, agent.agent_version, claim_fingerprint(claim_data, agent.CACHE_FIELDS)
+
+    def _check_version(self, agent):
+        # Must be called with the lock held.
+        cached_version = self._agent_versions.get(agent.agent_id)
+        if cached_version == agent.agent_version:
+            return
+        if cached_version is not None:
+            stale_keys = self._keys_by_agent.pop(agent.agent_id, set())
+            for key in stale_keys:
+                self._entries.pop(key, None)
+            self.invalidations += len(stale_keys)
+        self._agent_versions[agent.agent_id] = agent.agent_version
+
+    def _drop(self, key):
+        # Must be called with the lock held.
+        self._entries.pop(key, None)
+        agent_keys = self._keys_by_agent.get(key[0])
+        if agent_keys is not None:
+            agent_keys.discard(key)
+
+    def get(self, agent, claim_data):
+        """
+        Looks up a cached result for this agent and claim.
+
+        Returns:
+            dict or None: A copy of the cached verification event with a fresh timestamp
+                          and "from_cache": True, or None on a miss.
+        """
+        key = self._key(agent, claim_data)
+        with self._lock:
+            self._check_version(agent)
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, result = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                self._drop(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        cached = dict(result)
+        cached["timestamp"] = str(datetime.datetime.utcnow().isoformat())
+        cached["from_cache"] = True
+        return cached
+
+    def put(self, agent, claim_data, result):
+        """
+        Stores an agent's result for this claim.
+        """
+        key = self._key(agent, claim_data)
+        ttl = agent.CACHE_TTL if agent.CACHE_TTL is not None else self.default_ttl
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        with self._lock:
+            self._check_version(agent)
+            self._entries[key] = (expires_at, result)
+            self._entries.move_to_end(key)
+            self._keys_by_agent.setdefault(agent.agent_id, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                evicted_key, _ = self._entries.popitem(last=False)
+                self._keys_by_agent[evicted_key[0]].discard(evicted_key)
+                self.evictions += 1
+
+    def clear(self):
+        """
+        Removes every cached result. Counters are kept.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_agent.clear()
+            self._agent_versions.clear()
+
+    def stats(self):
+        """
+        Returns:
+            dict: Entry count and hit/miss/eviction/expiration/invalidation counters.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations
+            }
+
+
+if __name__ == '__main__':
+    # Test the cache in front of the bundled agents.
+    from .simple_verifier_agent import SimpleVerifierAgent
+    from .known_facts_agent import KnownFactsAgent
+
+    cache = VerificationResultCache(max_entries=3)
+    simple_agent = SimpleVerifierAgent()
+    facts_agent = KnownFactsAgent()
+    claim = {"claim_id": "cache_001", "content_hash": "abcdef1234567890", "submitter_id": "user_alpha",
+             "content_type": "text/plain", "metadata": {}}
+    duplicate = dict(claim, claim_id="cache_002") # Same content, different claim_id
+
+    print("--- Verification Result Cache Self-Test ---")
+    for agent in (simple_agent, facts_agent):
+        agent.verify_claim_data_cached(claim, cache=cache)
+        result = agent.verify_claim_data_cached(duplicate, cache=cache)
+        print(f"{agent.agent_id}: duplicate served from cache: {result.get('from_cache', False)}")
+    print(f"Stats: {cache.stats()}")
+
+    simple_agent.agent_version = "0.2.0" # New version invalidates the old entries
+    simple_agent.verify_claim_data_cached(duplicate, cache=cache)
+    print(f"Stats after version bump: {cache.stats()}")
+    print("--- End of Verification Result Cache Self-Test ---")
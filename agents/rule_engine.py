@@ -0,0 +1,246 @@
+# agents/rule_engine.py
+
+import json
+
+RULE_FILE_FORMAT_VERSION = 1
+
+# Outcome flags of a rule evaluation, in the order their verdicts are reported.
+FLAG_SUSPICIOUS_SOURCE = 1
+FLAG_METADATA_INCOMPLETE = 2
+FLAG_PROBLEMATIC_AUTHOR = 4
+FLAG_SIGNIFICANT_METADATA_MISSING = 8
+
+_FLAG_VERDICTS = (
+    (FLAG_SUSPICIOUS_SOURCE, "suspicious_source"),
+    (FLAG_METADATA_INCOMPLETE, "metadata_incomplete"),
+    (FLAG_PROBLEMATIC_AUTHOR, "problematic_author"),
+    (FLAG_SIGNIFICANT_METADATA_MISSING, "significant_metadata_missing")
+)
+
+# Triggered verdict names for every combination of flags, indexed by the flags value.
+TRIGGERED_VERDICTS = tuple(
+    tuple(name for flag, name in _FLAG_VERDICTS if flags & flag) for flags in range(1 << len(_FLAG_VERDICTS)))
+
+# Confidence entries a failed content-type check contributes to the claim's average.
+_INCOMPLETE_CONFIDENCE = 0.3
+_PROBLEMATIC_AUTHOR_CONFIDENCE = 0.2
+_MISSING_ALL_CONFIDENCE = 0.25
+_UNKNOWN_SUBMITTER_CONFIDENCE = 0.5
+_CONSISTENT_ABOVE = 0.7
+
+
+class RuleFileError(ValueError):
+    """Raised when a rule file cannot be parsed or has an unsupported format."""
+
+
+class ContentTypeRules:
+    """
+    The compiled checks for one content type.
+    Each rule list becomes a precomputed frozenset, so "must contain", "flag if missing all"
+    and the forbidden-author check are single set operations against the metadata's key
+    view, and the outcome is reported as a bitmask of FLAG_* values.
+    """
+    def __init__(self, content_type, rules):
+        """
+        Args:
+            content_type (str): The content type these rules apply to.
+            rules (dict): The content type's entry from the rule file.
+        """
+        self.content_type = content_type
+        # Rule lists keep their file order for the log; None means the rule is absent.
+        self.must_contain = self._rule_list(rules, "metadata_must_contain")
+        self.should_contain = self._rule_list(rules, "metadata_should_contain")
+        self.missing_all = self._rule_list(rules, "metadata_flag_if_missing_all")
+        self.required_keys = frozenset(self.must_contain) if self.must_contain is not None else frozenset()
+        self.missing_all_keys = frozenset(self.missing_all) if self.missing_all is not None else None
+        self.forbidden_authors = frozenset(rules.get("author_must_not_be", ()))
+
+    @staticmethod
+    def _rule_list(rules, name):
+        return tuple(rules[name]) if name in rules else None
+
+    def _author_is_forbidden(self, metadata):
+        if not self.forbidden_authors or "author" not in metadata:
+            return False
+        try:
+            return metadata["author"] in self.forbidden_authors
+        except TypeError: # Unhashable author values cannot be on the list
+            return False
+
+    def evaluate(self, metadata):
+        """
+        Returns:
+            int: The FLAG_* bits raised by this content type's rules.
+        """
+        keys = metadata.keys()
+        flags = 0
+        if not keys >= self.required_keys:
+            flags |= FLAG_METADATA_INCOMPLETE
+        if self.forbidden_authors and self._author_is_forbidden(metadata):
+            flags |= FLAG_PROBLEMATIC_AUTHOR
+        if self.missing_all_keys is not None and keys.isdisjoint(self.missing_all_keys):
+            flags |= FLAG_SIGNIFICANT_METADATA_MISSING
+        return flags
+
+    def explain(self, metadata, log):
+        """
+        Appends the human-readable findings for 'metadata' to 'log'.
+        """
+        content_type = self.content_type
+        if self.must_contain is not None:
+            missing_mandatory = [key for key in self.must_contain if key not in metadata]
+            if missing_mandatory:
+                log.append(f"For {content_type}, missing mandatory metadata: {missing_mandatory}.")
+            else:
+                log.append(f"All mandatory metadata for {content_type} present.")
+        if self._author_is_forbidden(metadata):
+            log.append(f"Author '{metadata['author']}' is on a forbidden list for {content_type}.")
+        if self.should_contain is not None:
+            missing_should = [key for key in self.should_contain if key not in metadata]
+            if missing_should:
+                log.append(f"For {content_type}, recommended metadata missing: {missing_should}.")
+        if self.missing_all is not None and metadata.keys().isdisjoint(self.missing_all_keys):
+            log.append(f"For {content_type}, all key metadata fields ({list(self.missing_all)}) are missing.")
+
+
+def _outcome_table(base_confidence, base_flags):
+    """
+    Precomputes (flags, verdict, confidence_score) for every combination of content-type
+    flags, given the submitter's contribution.
+    """
+    table = []
+    for rule_flags in range(len(TRIGGERED_VERDICTS)):
+        rule_flags &= ~FLAG_SUSPICIOUS_SOURCE
+        flags = base_flags | rule_flags
+        total = base_confidence
+        count = 1
+        # Accumulate in report order so the average matches the uncompiled agent exactly.
+        for flag, confidence in ((FLAG_METADATA_INCOMPLETE, _INCOMPLETE_CONFIDENCE),
+                                 (FLAG_PROBLEMATIC_AUTHOR, _PROBLEMATIC_AUTHOR_CONFIDENCE),
+                                 (FLAG_SIGNIFICANT_METADATA_MISSING, _MISSING_ALL_CONFIDENCE)):
+            if rule_flags & flag:
+                total += confidence
+                count += 1
+        if flags:
+            verdict = "caution_advised"
+        elif total > _CONSISTENT_ABOVE: # Only the submitter's reputation contributed
+            verdict = "appears_consistent_with_known_facts"
+        else:
+            verdict = "neutral_no_strong_signal"
+        table.append((flags, verdict, round(total / count, 2)))
+    return tuple(table)
+
+
+class CompiledRuleSet:
+    """
+    Known submitters and per-content-type metadata rules, compiled once for fast evaluation.
+    Every submitter carries a precomputed table of outcomes indexed by the content-type
+    flags, so evaluating a claim is a few dictionary lookups and set operations.
+    evaluate() returns only the compact outcome (flags, verdict, confidence); the detailed
+    log is built separately by explain() when someone actually needs it.
+    Submitters missing from the rule file are looked up in an optional ReputationStore.
+    """
+    def __init__(self, rules, reputation_store=None):
+        """
+        Args:
+            rules (dict): Parsed rule file, see known_facts_rules.json.
+            reputation_store (ReputationStore, optional): Large submitter list consulted for
+                                                          submitters not in the rule file.
+
+        Raises:
+            RuleFileError: If the rule file format is not supported.
+        """
+        format_version = rules.get("format_version", RULE_FILE_FORMAT_VERSION)
+        if format_version != RULE_FILE_FORMAT_VERSION:
+            raise RuleFileError(f"Unsupported rule file format version {format_version}.")
+        self.rules_version = str(rules.get("rules_version", ""))
+        self.suspicious_below = rules.get("suspicious_reputation_below", 0.3)
+        self.reputation_store = reputation_store
+        self.reputations = {} # submitter_id -> reputation
+        self._submitter_outcomes = {} # submitter_id -> outcome table
+        self._reputation_outcomes = {} # reputation -> outcome table, for store lookups
+        for submitter_id, info in rules.get("known_submitters", {}).items():
+            self.reputations[submitter_id] = info["reputation"]
+            self._submitter_outcomes[submitter_id] = self._outcomes_for(info["reputation"])
+        self._unknown_outcomes = _outcome_table(_UNKNOWN_SUBMITTER_CONFIDENCE, 0)
+        self.content_types = {
+            content_type: ContentTypeRules(content_type, content_rules)
+            for content_type, content_rules in rules.get("content_types", {}).items()
+        }
+
+    def _outcomes_for(self, reputation):
+        outcomes = self._reputation_outcomes.get(reputation)
+        if outcomes is None:
+            outcomes = self._reputation_outcomes[reputation] = _outcome_table(
+                reputation, FLAG_SUSPICIOUS_SOURCE if reputation < self.suspicious_below else 0)
+        return outcomes
+
+    def reputation_of(self, submitter_id):
+        """
+        Returns:
+            float or None: The submitter's reputation from the rule file or the reputation
+                           store, or None if the submitter is unknown.
+        """
+        reputation = self.reputations.get(submitter_id)
+        if reputation is None and self.reputation_store is not None:
+            reputation = self.reputation_store.get_reputation(submitter_id)
+        return reputation
+
+    def evaluate(self, submitter_id, content_type, metadata):
+        """
+        Evaluates one claim.
+
+        Returns:
+            tuple: (flags, verdict, confidence_score)
+        """
+        outcomes = self._submitter_outcomes.get(submitter_id)
+        if outcomes is None:
+            outcomes = self._unknown_outcomes
+            if self.reputation_store is not None:
+                reputation = self.reputation_store.get_reputation(submitter_id)
+                if reputation is not None:
+                    outcomes = self._outcomes_for(reputation)
+        checker = self.content_types.get(content_type)
+        if checker is None:
+            return outcomes[0]
+        return outcomes[checker.evaluate(metadata)]
+
+    def explain(self, submitter_id, content_type, metadata):
+        """
+        Builds the detailed log for one claim.
+
+        Returns:
+            list: Human-readable findings, in evaluation order.
+        """
+        log = []
+        reputation = self.reputation_of(submitter_id)
+        if reputation is None:
+            log.append(f"Submitter '{submitter_id}' not in known list. Considered neutral/unknown for this check.")
+        else:
+            log.append(f"Submitter '{submitter_id}' found in known list. Reputation: {reputation}.")
+        checker = self.content_types.get(content_type)
+        if checker is not None:
+            checker.explain(metadata, log)
+        return log
+
+
+def load_rule_set(path, reputation_store=None):
+    """
+    Loads and compiles a rule file.
+
+    Args:
+        path (str): Path to a JSON rule file.
+        reputation_store (ReputationStore, optional): See CompiledRuleSet.
+
+    Returns:
+        CompiledRuleSet: The compiled rules.
+
+    Raises:
+        RuleFileError: If the file is not valid JSON or has an unsupported format.
+    """
+    try:
+        with open(path, "r") as rule_file:
+            rules = json.load(rule_file)
+    except json.JSONDecodeError as e:
+        raise RuleFileError(f"Rule file '{path}' is not valid JSON: {e}") from e
+    return CompiledRuleSet(rules, reputation_store)
@@ -1,6 +1,7 @@
 # agents/simple_verifier_agent.py
 
 from .base_agent import BaseVerificationAgent # Relative import
+import datetime
 
 class SimpleVerifierAgent(BaseVerificationAgent):
     """
@@ -9,6 +10,7 @@ class SimpleVerifierAgent(BaseVerificationAgent):
     It does not look at actual content for MVP1.
     """
     MIN_HASH_LENGTH = 10 # Arbitrary minimum length for a hash to be "plausible"
+    CACHE_FIELDS = ("content_hash",) # The verdict depends on nothing else
 
     def __init__(self, agent_id="simple_verifier_v1", agent_version="0.1.0"):
         # This agent can attempt to verify any content type as it only looks at metadata.
@@ -18,13 +20,17 @@ class SimpleVerifierAgent(BaseVerificationAgent):
         """
         Verifies the claim based on the presence and length of 'content_hash'.
         """
-        print(f"Agent '{self.agent_id}' processing claim_id: {claim_data.get('claim_id')}")
+        instrumentation = self.instrumentation
+        if instrumentation.emitting:
+            instrumentation.event("agent_processing", "Agent '{agent_id}' processing claim_id: {claim_id}", level="debug",
+                                  agent_id=self.agent_id, claim_id=claim_data.get("claim_id"))
 
         content_hash = claim_data.get("content_hash")
         
         if not content_hash:
             details = "Claim is missing 'content_hash' in its data."
-            print(f"Verification failed: {details}")
+            if instrumentation.emitting:
+                instrumentation.event("agent_check_failed", "Verification failed: {details}", level="debug", details=details)
             return self.generate_verification_event(
                 verdict="unverified", 
                 details=details,
@@ -33,7 +39,8 @@ class SimpleVerifierAgent(BaseVerificationAgent):
 
         if isinstance(content_hash, str) and len(content_hash) >= self.MIN_HASH_LENGTH:
             details = f"Content hash found with sufficient length ({len(content_hash)} >= {self.MIN_HASH_LENGTH})."
-            print(f"Verification preliminary pass: {details}")
+            if instrumentation.emitting:
+                instrumentation.event("agent_check_passed", "Verification preliminary pass: {details}", level="debug", details=details)
             return self.generate_verification_event(
                 verdict="verified_preliminary", # Custom status for MVP
                 details=details,
@@ -41,15 +48,66 @@ class SimpleVerifierAgent(BaseVerificationAgent):
             )
         else:
             details = f"Content hash is too short or not a string. Length: {len(content_hash) if isinstance(content_hash, str) else 'N/A'}. Min required: {self.MIN_HASH_LENGTH}."
-            print(f"Verification failed: {details}")
+            if instrumentation.emitting:
+                instrumentation.event("agent_check_failed", "Verification failed: {details}", level="debug", details=details)
             return self.generate_verification_event(
                 verdict="unverified",
                 details=details,
                 confidence_score=0.2
             )
 
+    def _outcome(self, hash_length):
+        """
+        Returns (verdict, details, confidence_score) for a content hash of the given length;
+        None stands for a missing hash and -1 for a hash that is not a string.
+        """
+        if hash_length is None:
+            return "unverified", "Claim is missing 'content_hash' in its data.", 0.1
+        if hash_length >= self.MIN_HASH_LENGTH:
+            return ("verified_preliminary",
+                    f"Content hash found with sufficient length ({hash_length} >= {self.MIN_HASH_LENGTH}).", 0.6)
+        shown_length = hash_length if hash_length >= 0 else "N/A"
+        return ("unverified",
+                f"Content hash is too short or not a string. Length: {shown_length}. Min required: {self.MIN_HASH_LENGTH}.", 0.2)
+
+    def verify_claims_batch(self, claims, contents=None):
+        """
+        Vectorized verification: every claim is reduced to its hash length, outcomes are
+        computed once per distinct length, and all results share one timestamp.
+        Produces the same results as verify_claim_data() for each claim.
+        """
+        if self.instrumentation.emitting:
+            self.instrumentation.event("agent_processing_batch", "Agent '{agent_id}' processing a batch of {count} claims", level="debug",
+                                       agent_id=self.agent_id, count=len(claims))
+        lengths = []
+        for claim_data in claims:
+            content_hash = claim_data.get("content_hash")
+            if not content_hash:
+                lengths.append(None)
+            else:
+                lengths.append(len(content_hash) if isinstance(content_hash, str) else -1)
+        outcomes = {length: self._outcome(length) for length in set(lengths)}
+
+        timestamp = str(datetime.datetime.utcnow().isoformat())
+        agent_id = self.agent_id
+        agent_version = self.agent_version
+        results = []
+        for length in lengths:
+            verdict, details, confidence = outcomes[length]
+            results.append({
+                "agent_id": agent_id,
+                "agent_version": agent_version,
+                "timestamp": timestamp,
+                "verdict": verdict,
+                "details": details,
+                "confidence_score": confidence
+            })
+        return results
+
 if __name__ == '__main__':
     # Test the SimpleVerifierAgent
+    from node.instrumentation import ConsoleSink, DEFAULT_INSTRUMENTATION
+    DEFAULT_INSTRUMENTATION.add_sink(ConsoleSink())
     agent = SimpleVerifierAgent()
     print(f"\n--- Testing Agent: {agent.get_info()['agent_id']} ---")
 
@@ -83,4 +141,8 @@ if __name__ == '__main__':
 
     print(f"\nAgent Info: {json.dumps(agent.get_info(), indent=2)}")
     print(f"Can agent verify 'text/plain'? {agent.can_verify('text/plain')}")
-    print(f"Can agent verify 'video/mp4'? {agent.can_verify('video/mp4')}")
\ No newline at end of file
+    print(f"Can agent verify 'video/mp4'? {agent.can_verify('video/mp4')}")
+
+    batch = [test_claim_valid, test_claim_short_hash, test_claim_no_hash] * 1000
+    batch_results = agent.verify_claims_batch(batch)
+    print(f"\nBatch of {len(batch_results)} claims, verdicts: {sorted({result['verdict'] for result in batch_results})}")
@@ -0,0 +1,165 @@
+# benchmarks/claim_generator.py
+
+import datetime
+import hashlib
+import random
+
+# Default content-type mix: content type -> relative weight.
+DEFAULT_CONTENT_TYPE_MIX = {
+    "text/plain": 0.5,
+    "image/jpeg": 0.3,
+    "application/pdf": 0.15,
+    "video/mp4": 0.05
+}
+
+# Submitters KnownFactsAgent has opinions about, mixed into the synthetic population
+# so reputation checks take both the known and the unknown branch.
+KNOWN_SUBMITTERS = ("official_press_agency_001", "research_institute_alpha", "known_disinfo_source_xyz")
+
+# Metadata keys the bundled agents inspect for some content types.
+_RULE_METADATA_KEYS = ("author", "creation_date", "camera_model", "gps_location", "creation_software")
+
+# Fixed start time for generated claim timestamps, so generated claims are identical across runs.
+_EPOCH = datetime.datetime(2025, 1, 1)
+
+
+def claim_id_for(sequence, prefix="bench_claim"):
+    """
+    Returns the claim ID ClaimGenerator.claims() assigns to the claim at 'sequence',
+    so benchmarks can look claims up without keeping every ID in memory.
+    """
+    return f"{prefix}_{sequence:09d}"
+
+
+class ClaimGenerator:
+    """
+    Deterministic generator of synthetic claims for benchmarks.
+    The same seed and settings always produce the same sequence of claims, so results
+    from different versions of the code are measured against identical input.
+    """
+    def __init__(self, seed=42, content_type_mix=None, submitter_count=1000, submitter_skew=1.1,
+                 known_submitter_fraction=0.05, metadata_fields=4, metadata_value_size=32, duplicate_fraction=0.0):
+        """
+        Args:
+            seed (int): Random seed.
+            content_type_mix (dict, optional): content type -> relative weight. Defaults to DEFAULT_CONTENT_TYPE_MIX.
+            submitter_count (int): Number of distinct synthetic submitters.
+            submitter_skew (float): Zipf exponent of the submitter distribution; 0 is uniform,
+                                    larger values concentrate claims on a few heavy submitters.
+            known_submitter_fraction (float): Share of claims submitted by KNOWN_SUBMITTERS.
+            metadata_fields (int): Number of metadata entries per claim.
+            metadata_value_size (int): Length in characters of each metadata value.
+            duplicate_fraction (float): Share of claims that reuse an earlier claim's content_hash.
+        """
+        self.seed = seed
+        self.content_type_mix = dict(content_type_mix or DEFAULT_CONTENT_TYPE_MIX)
+        self.submitter_count = submitter_count
+        self.submitter_skew = submitter_skew
+        self.known_submitter_fraction = known_submitter_fraction
+        self.metadata_fields = metadata_fields
+        self.metadata_value_size = metadata_value_size
+        self.duplicate_fraction = duplicate_fraction
+
+        self._content_types = list(self.content_type_mix)
+        self._content_type_cum_weights = self._cumulative(self.content_type_mix.values())
+        self._submitters = [f"bench_submitter_{rank:06d}" for rank in range(submitter_count)]
+        self._submitter_cum_weights = self._cumulative(1.0 / (rank + 1) ** submitter_skew for rank in range(submitter_count))
+
+    @staticmethod
+    def _cumulative(weights):
+        cumulative = []
+        total = 0.0
+        for weight in weights:
+            total += weight
+            cumulative.append(total)
+        return cumulative
+
+    def settings(self):
+        """
+        Returns:
+            dict: The generator's parameters, for recording next to benchmark results.
+        """
+        return {
+            "seed": self.seed,
+            "content_type_mix": self.content_type_mix,
+            "submitter_count": self.submitter_count,
+            "submitter_skew": self.submitter_skew,
+            "known_submitter_fraction": self.known_submitter_fraction,
+            "metadata_fields": self.metadata_fields,
+            "metadata_value_size": self.metadata_value_size,
+            "duplicate_fraction": self.duplicate_fraction
+        }
+
+    def submissions(self, count):
+        """
+        Generates claim submissions in the shape HeliosCoreNode.submit_new_claim() accepts.
+
+        Args:
+            count (int): Number of submissions.
+
+        Yields:
+            dict: {"content_hash", "content_type", "submitter_id", "metadata"}.
+        """
+        rng = random.Random(self.seed)
+        issued_hashes = []
+        for sequence in range(count):
+            if issued_hashes and rng.random() < self.duplicate_fraction:
+                content_hash = issued_hashes[rng.randrange(len(issued_hashes))]
+            else:
+                content_hash = hashlib.sha256(f"{self.seed}:{sequence}".encode()).hexdigest()
+                if self.duplicate_fraction:
+                    issued_hashes.append(content_hash)
+            content_type = rng.choices(self._content_types, cum_weights=self._content_type_cum_weights)[0]
+            if rng.random() < self.known_submitter_fraction:
+                submitter_id = KNOWN_SUBMITTERS[rng.randrange(len(KNOWN_SUBMITTERS))]
+            else:
+                submitter_id = rng.choices(self._submitters, cum_weights=self._submitter_cum_weights)[0]
+            metadata = {}
+            for field in range(self.metadata_fields):
+                # Fill the agent-relevant keys first so rule checks see realistic metadata.
+                key = _RULE_METADATA_KEYS[field] if field < len(_RULE_METADATA_KEYS) and rng.random() < 0.5 else f"field_{field}"
+                metadata[key] = "".join(rng.choices("abcdefghijklmnopqrstuvwxyz0123456789", k=self.metadata_value_size))
+            yield {
+                "content_hash": content_hash,
+                "content_type": content_type,
+                "submitter_id": submitter_id,
+                "metadata": metadata
+            }
+
+    def claims(self, count, claim_id_prefix="bench_claim"):
+        """
+        Generates complete claim records in the shape InMemoryLedger.add_claim() stores,
+        with deterministic claim IDs and timestamps.
+
+        Args:
+            count (int): Number of claims.
+            claim_id_prefix (str): Prefix of the generated claim IDs.
+
+        Yields:
+            dict: A claim with "pending_verification" status and an empty verification history.
+        """
+        for sequence, submission in enumerate(self.submissions(count)):
+            claim_data = {
+                "claim_id": claim_id_for(sequence, claim_id_prefix),
+                "timestamp": (_EPOCH + datetime.timedelta(seconds=sequence)).isoformat()
+            }
+            claim_data.update(submission)
+            claim_data["verification_history"] = []
+            claim_data["status"] = "pending_verification"
+            yield claim_data
+
+
+if __name__ == '__main__':
+    # Test that generation is deterministic and follows the configured mix.
+    from collections import Counter
+
+    print("--- Claim Generator Self-Test ---")
+    generator = ClaimGenerator(seed=7, duplicate_fraction=0.1)
+    first_run = list(generator.claims(10000))
+    second_run = list(ClaimGenerator(seed=7, duplicate_fraction=0.1).claims(10000))
+    print(f"Deterministic: {first_run == second_run}")
+    print(f"Content types: {dict(Counter(claim['content_type'] for claim in first_run))}")
+    print(f"Distinct submitters: {len({claim['submitter_id'] for claim in first_run})}")
+    print(f"Distinct content hashes: {len({claim['content_hash'] for claim in first_run})}")
+    print(f"Sample claim: {first_run[0]}")
+    print("--- End of Claim Generator Self-Test ---")
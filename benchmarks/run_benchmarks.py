@@ -0,0 +1,478 @@
+# benchmarks/run_benchmarks.py
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+# Allow running as a script (python benchmarks/run_benchmarks.py) as well as a module.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agents.known_facts_agent import KnownFactsAgent
+from agents.simple_verifier_agent import SimpleVerifierAgent
+from benchmarks.claim_generator import ClaimGenerator, claim_id_for
+from node.core_node import HeliosCoreNode
+from node.ledger import InMemoryLedger
+from node.segmented_ledger import SegmentedLedger
+from node.sharded_ledger import ShardedLedger
+
+RESULTS_FORMAT_VERSION = 1
+DEFAULT_LEDGER_SIZES = (10000, 100000, 1000000)
+QUICK_LEDGER_SIZES = (1000, 10000)
+QUERY_PAGE_SIZE = 100
+QUERY_PAGES = 20 # Pages walked per query filter at each ledger size
+INGEST_CHUNK = 5000 # Claims per add_claims() call in the sharded ingest benchmark
+# Relative change beyond which compare_results() reports a regression.
+DEFAULT_REGRESSION_TOLERANCE = 0.10
+
+
+def peak_rss_bytes():
+    """
+    Returns:
+        int or None: The process's peak resident set size in bytes, or None where the
+                     resource module is unavailable (Windows).
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024 # Linux reports kilobytes
+
+
+def _git_commit():
+    try:
+        output = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, timeout=5,
+                                cwd=os.path.dirname(os.path.abspath(__file__)))
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return output.stdout.strip() or None
+
+
+def _latency_report(samples):
+    """
+    Summarizes latency samples (seconds) in microseconds. Percentiles are exact
+    (nearest rank) rather than histogram buckets, so small shifts between runs show up.
+    """
+    if not samples:
+        return {"count": 0}
+    ordered = sorted(samples)
+    count = len(ordered)
+
+    def percentile(fraction):
+        return ordered[min(count - 1, int(fraction * count))]
+
+    report = {"count": count}
+    for key, seconds in (("mean", sum(ordered) / count), ("min", ordered[0]), ("max", ordered[-1]),
+                         ("p50", percentile(0.50)), ("p90", percentile(0.90)), ("p99", percentile(0.99))):
+        report[f"{key}_us"] = round(seconds * 1e6, 3)
+    return report
+
+
+def _open_ledger(backend, data_dir):
+    if backend == "segmented":
+        return SegmentedLedger(data_dir)
+    if backend == "sharded":
+        return ShardedLedger(commit_interval=None)
+    return InMemoryLedger()
+
+
+def bench_ledger(generator, sizes, lookup_samples, backend="memory", data_dir=None):
+    """
+    Grows one ledger through each size in 'sizes' (chain length, genesis included) and,
+    at every size, measures add_claim throughput for the blocks appended to reach it,
+    get_claim_by_id latency for randomly chosen existing claims, and the latency of
+    indexed query pages (pending claims, one submitter's claims, a status and content
+    type combined) walked through with their cursors.
+
+    Args:
+        generator (ClaimGenerator): Source of the appended claims.
+        sizes (iterable): Chain lengths to measure at.
+        lookup_samples (int): Lookups timed at each size.
+        backend (str): "memory", "segmented" or "sharded".
+        data_dir (str, optional): Directory for the segmented backend.
+
+    Returns:
+        list: One report dict per size.
+    """
+    sizes = sorted(sizes)
+    ledger = _open_ledger(backend, data_dir)
+    claims = generator.claims(sizes[-1])
+    rng = random.Random(generator.seed)
+    reports = []
+    claim_count = 0 # Generated claims appended so far; a sharded ledger's chain holds only its commits
+    try:
+        for size in sizes:
+            to_add = max(size - 1 - claim_count, 0)
+            started = time.perf_counter()
+            for _ in range(to_add):
+                ledger.add_claim(next(claims))
+            append_elapsed = time.perf_counter() - started
+
+            claim_count += to_add
+            sample_ids = [claim_id_for(rng.randrange(claim_count)) for _ in range(lookup_samples)]
+            latencies = []
+            clock = time.perf_counter
+            for claim_id in sample_ids:
+                lookup_started = clock()
+                ledger.get_claim_by_id(claim_id)
+                latencies.append(clock() - lookup_started)
+            # Untimed loop for throughput, so per-call clock reads do not skew it.
+            started = time.perf_counter()
+            for claim_id in sample_ids:
+                ledger.get_claim_by_id(claim_id)
+            lookup_elapsed = time.perf_counter() - started
+
+            query_latencies = []
+            for filters in ({"status": "pending_verification"}, {"submitter_id": "bench_submitter_000001"},
+                            {"status": "pending_verification", "content_type": "image/jpeg"}):
+                cursor = None
+                for _ in range(QUERY_PAGES):
+                    query_started = clock()
+                    page = ledger.query_page(cursor=cursor, limit=QUERY_PAGE_SIZE, **filters)
+                    query_latencies.append(clock() - query_started)
+                    cursor = page["next_cursor"]
+                    if cursor is None:
+                        break
+
+            reports.append({
+                "chain_length": claim_count + 1, # Genesis included
+                "add_claim": {
+                    "blocks_appended": to_add,
+                    "elapsed_seconds": round(append_elapsed, 6),
+                    "claims_per_second": round(to_add / append_elapsed, 1) if append_elapsed > 0 else None
+                },
+                "get_claim_by_id": dict(_latency_report(latencies),
+                                        lookups_per_second=round(lookup_samples / lookup_elapsed, 1) if lookup_elapsed > 0 else None),
+                "query_page": dict(_latency_report(query_latencies), page_size=QUERY_PAGE_SIZE),
+                "peak_rss_bytes": peak_rss_bytes()
+            })
+    finally:
+        ledger.close()
+    return reports
+
+
+def bench_sharded_ingest(generator, claim_count, shard_counts):
+    """
+    Measures bulk ingest (ShardedLedger.add_claims in chunks of INGEST_CHUNK) into sharded
+    ledgers with each of 'shard_counts' shards, to show how ingest scales with cores.
+
+    Returns:
+        list: One report dict per shard count.
+    """
+    claims = list(generator.claims(claim_count))
+    reports = []
+    for shard_count in shard_counts:
+        ledger = ShardedLedger(shards=shard_count, commit_interval=None)
+        try:
+            started = time.perf_counter()
+            for position in range(0, claim_count, INGEST_CHUNK):
+                ledger.add_claims(claims[position:position + INGEST_CHUNK])
+            elapsed = time.perf_counter() - started
+        finally:
+            ledger.close()
+        reports.append({
+            "shards": shard_count,
+            "claims": claim_count,
+            "elapsed_seconds": round(elapsed, 6),
+            "claims_per_second": round(claim_count / elapsed, 1) if elapsed > 0 else None
+        })
+    return reports
+
+
+def bench_trigger_verification(generator, claim_count, backend="memory", data_dir=None, result_cache_size=100000):
+    """
+    Submits claims to a HeliosCoreNode and measures submit_new_claim and end-to-end
+    trigger_verification latency with the node's default agents.
+
+    Returns:
+        dict: Submit and verification latency reports plus result cache statistics.
+    """
+    ledger_options = {"data_dir": data_dir} if backend == "segmented" else None
+    node = HeliosCoreNode(node_id="bench_node", ledger_backend=backend, ledger_options=ledger_options,
+                          result_cache_size=result_cache_size)
+    try:
+        submit_latencies = []
+        claim_ids = []
+        for submission in generator.submissions(claim_count):
+            started = time.perf_counter()
+            claim_data = node.submit_new_claim(**submission)
+            submit_latencies.append(time.perf_counter() - started)
+            claim_ids.append(claim_data["claim_id"])
+
+        verify_latencies = []
+        statuses = {}
+        started = time.perf_counter()
+        for claim_id in claim_ids:
+            verify_started = time.perf_counter()
+            status = node.trigger_verification(claim_id)
+            verify_latencies.append(time.perf_counter() - verify_started)
+            statuses[status] = statuses.get(status, 0) + 1
+        elapsed = time.perf_counter() - started
+    finally:
+        node.close()
+    return {
+        "claims": claim_count,
+        "agents": sorted(agent["agent_id"] for agent in node.list_agents()),
+        "submit_new_claim": _latency_report(submit_latencies),
+        "trigger_verification": dict(_latency_report(verify_latencies),
+                                     claims_per_second=round(claim_count / elapsed, 1) if elapsed > 0 else None),
+        "statuses": statuses,
+        "result_cache": node.result_cache.stats() if node.result_cache is not None else None,
+        "peak_rss_bytes": peak_rss_bytes()
+    }
+
+
+def bench_agents(generator, claim_count, agents=None):
+    """
+    Measures verify_claim_data throughput of each agent on the same generated claims,
+    and verify_claims_batch throughput on the whole claim list as a single batch.
+
+    Args:
+        generator (ClaimGenerator): Source of the claims.
+        claim_count (int): Claims verified per agent.
+        agents (list, optional): Agent instances. Defaults to the bundled agents.
+
+    Returns:
+        dict: agent_id -> throughput report.
+    """
+    if agents is None:
+        agents = [SimpleVerifierAgent(), KnownFactsAgent()]
+    claims = list(generator.claims(claim_count))
+    reports = {}
+    for agent in agents:
+        started = time.perf_counter()
+        for claim_data in claims:
+            agent.verify_claim_data(claim_data)
+        elapsed = time.perf_counter() - started
+        report = {
+            "agent_version": agent.agent_version,
+            "claims": claim_count,
+            "elapsed_seconds": round(elapsed, 6),
+            "claims_per_second": round(claim_count / elapsed, 1) if elapsed > 0 else None,
+            "mean_us": round(elapsed / claim_count * 1e6, 3) if claim_count else None
+        }
+        started = time.perf_counter()
+        agent.verify_claims_batch(claims)
+        elapsed = time.perf_counter() - started
+        report["batch_claims_per_second"] = round(claim_count / elapsed, 1) if elapsed > 0 else None
+        reports[agent.agent_id] = report
+    return reports
+
+
+def bench_claim_memory(generator, claim_count, agents=None):
+    """
+    Measures the memory an InMemoryLedger holds per claim (blocks, claims and indexes),
+    first as submitted and again after every agent's verification event is recorded.
+    Allocations are counted with tracemalloc, so the figures exclude interpreter overhead.
+
+    Returns:
+        dict: Bytes per claim before and after verification.
+    """
+    if agents is None:
+        agents = [SimpleVerifierAgent(), KnownFactsAgent()]
+    tracemalloc.start()
+    try:
+        baseline = tracemalloc.get_traced_memory()[0]
+        ledger = InMemoryLedger()
+        for claim_data in generator.claims(claim_count):
+            ledger.add_claim(claim_data)
+        stored = tracemalloc.get_traced_memory()[0] - baseline
+        for sequence in range(claim_count):
+            claim_id = claim_id_for(sequence)
+            claim_data = ledger.get_claim_by_id(claim_id, with_events=False)
+            ledger.record_verification(claim_id, [agent.verify_claim_data(claim_data) for agent in agents])
+        verified = tracemalloc.get_traced_memory()[0] - baseline
+    finally:
+        tracemalloc.stop()
+    return {
+        "claims": claim_count,
+        "submitted_bytes_per_claim": round(stored / claim_count, 1) if claim_count else None,
+        "verified_bytes_per_claim": round(verified / claim_count, 1) if claim_count else None
+    }
+
+
+def run_suite(generator, ledger_sizes=DEFAULT_LEDGER_SIZES, lookup_samples=100000, verification_claims=2000,
+              agent_claims=50000, backend="memory", memory_claims=20000):
+    """
+    Runs every benchmark and returns the machine-readable results.
+    The small benchmarks run first so their peak RSS readings are not dominated by the
+    large ledgers built afterwards.
+
+    Returns:
+        dict: {"format_version", "meta", "config", "results"}.
+    """
+    data_dir = tempfile.mkdtemp(prefix="helios_bench_") if backend == "segmented" else None
+    try:
+        results = {
+            "agents": bench_agents(generator, agent_claims),
+            "memory": bench_claim_memory(generator, memory_claims),
+            "verification": bench_trigger_verification(
+                generator, verification_claims, backend,
+                os.path.join(data_dir, "verification") if data_dir else None),
+            "ledger": bench_ledger(generator, ledger_sizes, lookup_samples, backend,
+                                   os.path.join(data_dir, "ledger") if data_dir else None)
+        }
+        if backend == "sharded":
+            cores = os.cpu_count() or 1
+            results["sharded_ingest"] = bench_sharded_ingest(generator, max(ledger_sizes),
+                                                             sorted({1, max(cores // 2, 1), cores}))
+    finally:
+        if data_dir:
+            shutil.rmtree(data_dir, ignore_errors=True)
+    results["peak_rss_bytes"] = peak_rss_bytes()
+    return {
+        "format_version": RESULTS_FORMAT_VERSION,
+        "meta": {
+            "started_at": datetime.datetime.utcnow().isoformat(),
+            "git_commit": _git_commit(),
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count()
+        },
+        "config": {
+            "backend": backend,
+            "ledger_sizes": list(ledger_sizes),
+            "lookup_samples": lookup_samples,
+            "verification_claims": verification_claims,
+            "agent_claims": agent_claims,
+            "memory_claims": memory_claims,
+            "generator": generator.settings()
+        },
+        "results": results
+    }
+
+
+_LATENCY_METRICS = ("mean_us", "p50_us", "p90_us", "p99_us")
+
+
+def _flatten(value, prefix=""):
+    """
+    Flattens nested results into {"path.to.metric": number}. Ledger reports are keyed by
+    chain length, sharded ingest reports by shard count.
+    """
+    flat = {}
+    if isinstance(value, dict):
+        for key, item in value.items():
+            flat.update(_flatten(item, f"{prefix}{key}."))
+    elif isinstance(value, list):
+        for item in value:
+            label = item.get("chain_length", item.get("shards")) if isinstance(item, dict) else None
+            if label is not None:
+                flat.update(_flatten(item, f"{prefix}{label}."))
+    elif isinstance(value, (int, float)) and not isinstance(value, bool):
+        flat[prefix[:-1]] = value
+    return flat
+
+
+def compare_results(baseline, current, tolerance=DEFAULT_REGRESSION_TOLERANCE):
+    """
+    Compares two result documents metric by metric. Throughput metrics ("_per_second")
+    regress when they drop; mean/percentile latency, peak RSS and per-claim memory
+    metrics when they grow.
+    Single-sample extremes (min/max latency) are too noisy to compare and are skipped.
+
+    Returns:
+        list: (metric, baseline value, current value, relative change, regressed) tuples.
+    """
+    baseline_metrics = _flatten(baseline["results"])
+    current_metrics = _flatten(current["results"])
+    comparison = []
+    for metric in sorted(baseline_metrics.keys() & current_metrics.keys()):
+        higher_is_better = metric.endswith("_per_second")
+        lower_is_better = metric.endswith(_LATENCY_METRICS) or metric.endswith(("peak_rss_bytes", "bytes_per_claim"))
+        if not (higher_is_better or lower_is_better):
+            continue
+        before, after = baseline_metrics[metric], current_metrics[metric]
+        if not before:
+            continue
+        change = (after - before) / before
+        regressed = change < -tolerance if higher_is_better else change > tolerance
+        comparison.append((metric, before, after, round(change, 4), regressed))
+    return comparison
+
+
+def _parse_mix(text):
+    mix = {}
+    for part in text.split(","):
+        content_type, _, weight = part.partition("=")
+        mix[content_type.strip()] = float(weight) if weight else 1.0
+    return mix
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Helios Protocol benchmark suite.")
+    parser.add_argument("--output", default="benchmark_results.json", help="JSON results file ('-' for stdout).")
+    parser.add_argument("--compare", help="Baseline results file to compare against; exits 1 on regressions.")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_REGRESSION_TOLERANCE)
+    parser.add_argument("--quick", action="store_true", help="Small sizes for a fast smoke run.")
+    parser.add_argument("--backend", choices=sorted(HeliosCoreNode.LEDGER_BACKENDS), default="memory")
+    parser.add_argument("--sizes", help="Comma-separated chain lengths for the ledger benchmark.")
+    parser.add_argument("--lookup-samples", type=int)
+    parser.add_argument("--verification-claims", type=int)
+    parser.add_argument("--agent-claims", type=int)
+    parser.add_argument("--memory-claims", type=int)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--content-types", help="Content-type mix, e.g. 'text/plain=0.6,image/jpeg=0.4'.")
+    parser.add_argument("--submitters", type=int, default=1000)
+    parser.add_argument("--submitter-skew", type=float, default=1.1)
+    parser.add_argument("--metadata-fields", type=int, default=4)
+    parser.add_argument("--metadata-value-size", type=int, default=32)
+    parser.add_argument("--duplicate-fraction", type=float, default=0.0)
+    args = parser.parse_args(argv)
+
+    if args.sizes:
+        sizes = [int(size) for size in args.sizes.split(",")]
+    else:
+        sizes = QUICK_LEDGER_SIZES if args.quick else DEFAULT_LEDGER_SIZES
+    generator = ClaimGenerator(
+        seed=args.seed,
+        content_type_mix=_parse_mix(args.content_types) if args.content_types else None,
+        submitter_count=args.submitters,
+        submitter_skew=args.submitter_skew,
+        metadata_fields=args.metadata_fields,
+        metadata_value_size=args.metadata_value_size,
+        duplicate_fraction=args.duplicate_fraction)
+
+    document = run_suite(
+        generator,
+        ledger_sizes=sizes,
+        lookup_samples=args.lookup_samples or (10000 if args.quick else 100000),
+        verification_claims=args.verification_claims or (200 if args.quick else 2000),
+        agent_claims=args.agent_claims or (5000 if args.quick else 50000),
+        backend=args.backend,
+        memory_claims=args.memory_claims or (2000 if args.quick else 20000))
+
+    encoded = json.dumps(document, indent=2)
+    if args.output == "-":
+        print(encoded)
+    else:
+        with open(args.output, "w") as output_file:
+            output_file.write(encoded + "\n")
+        print(f"Benchmark results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare, "r") as baseline_file:
+            baseline = json.load(baseline_file)
+        if baseline.get("config") != document["config"]:
+            print("Warning: baseline was produced with a different configuration.", file=sys.stderr)
+        comparison = compare_results(baseline, document, args.tolerance)
+        for metric, before, after, change, regressed in comparison:
+            marker = "REGRESSION" if regressed else ""
+            print(f"{metric:70s} {before:>14} -> {after:>14} ({change:+.1%}) {marker}", file=sys.stderr)
+        if any(regressed for *_, regressed in comparison):
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,6 +1,7 @@
 # main.py
 
 from node.core_node import HeliosCoreNode # Use an absolute import from the project root
+from node.instrumentation import Instrumentation, ConsoleSink
 import time # For a slight delay in demo
 
 def run_helios_node_demo():
@@ -9,22 +10,23 @@ def run_helios_node_demo():
     print("**********************************************")
     print("\nInitializing a demo Helios Core Node...")
     
-    node_instance = HeliosCoreNode(node_id="mvp1_demo_node")
+    # Route node, ledger and agent events to the console so the demo stays verbose.
+    node_instance = HeliosCoreNode(node_id="mvp1_demo_node", instrumentation=Instrumentation(sinks=[ConsoleSink()]))
     
     print("\n--- Demo Node Initialized ---")
     print(f"Node ID: {node_instance.node_id}")
-    print("Registered AI Agents:")
-    for agent_id, agent_instance in node_instance.ai_agents.items():
-        print(f"  - {agent_id} (Version: {agent_instance.agent_version})")
+    print("Available AI Agents (loaded when the first claim they handle arrives):")
+    for agent in node_instance.list_agents():
+        print(f"  - {agent['agent_id']} (Version: {agent['agent_version']})")
     print("The ledger already contains the Genesis Block.")
     
     # --- Claim Set 1: Simple Text Claim ---
     print("\n\n--- Simulating Claim 1: Simple Text ---")
     claim1_content = "This is a basic statement for initial verification."
-    claim1_hash = "text_sha256_placeholder_" + hex(hash(claim1_content))[2:]
     
-    submitted_claim1_data = node_instance.submit_new_claim(
-        content_hash=claim1_hash,
+    # submit_content() computes the SHA-256 content_hash (from bytes, a stream or a file path).
+    submitted_claim1_data = node_instance.submit_content(
+        claim1_content.encode(),
         content_type="text/plain",
         submitter_id="user_alice_generic", # Generic submitter
         metadata={"description": "A plain text document."}
@@ -35,14 +37,14 @@ def run_helios_node_demo():
         print(f"Successfully submitted Claim ID: {claim_id_1}")
         time.sleep(0.1) # Small delay for readability of output
         node_instance.trigger_verification(claim_id_1)
+        node_instance.view_claim(claim_id_1)
 
     # --- Claim Set 2: Image Claim from a "Known Good" Submitter ---
     print("\n\n--- Simulating Claim 2: Image from Known Good Submitter ---")
-    claim2_content = "Raw image data bytes would go here..."
-    claim2_hash = "image_sha256_placeholder_" + hex(hash(claim2_content) + 1)[2:] # Ensure different hash
+    claim2_content = b"Raw image data bytes would go here..."
     
-    submitted_claim2_data = node_instance.submit_new_claim(
-        content_hash=claim2_hash,
+    submitted_claim2_data = node_instance.submit_content(
+        claim2_content,
         content_type="image/jpeg",
         submitter_id="official_press_agency_001", # Known good submitter in KnownFactsAgent
         metadata={
@@ -58,14 +60,14 @@ def run_helios_node_demo():
         print(f"Successfully submitted Claim ID: {claim_id_2}")
         time.sleep(0.1)
         node_instance.trigger_verification(claim_id_2)
+        node_instance.view_claim(claim_id_2)
 
     # --- Claim Set 3: PDF Claim from a "Known Disinfo" Submitter ---
     print("\n\n--- Simulating Claim 3: PDF from Known Disinfo Submitter ---")
-    claim3_content = "Content of a suspicious PDF document..."
-    claim3_hash = "pdf_sha256_placeholder_" + hex(hash(claim3_content) + 2)[2:]
+    claim3_content = b"Content of a suspicious PDF document..."
     
-    submitted_claim3_data = node_instance.submit_new_claim(
-        content_hash=claim3_hash,
+    submitted_claim3_data = node_instance.submit_content(
+        claim3_content,
         content_type="application/pdf", # KnownFactsAgent has rules for PDF
         submitter_id="known_disinfo_source_xyz", # Known bad submitter
         metadata={
@@ -79,6 +81,7 @@ def run_helios_node_demo():
         print(f"Successfully submitted Claim ID: {claim_id_3}")
         time.sleep(0.1)
         node_instance.trigger_verification(claim_id_3)
+        node_instance.view_claim(claim_id_3)
         
     # --- Claim Set 4: Text claim with very short hash ---
     print("\n\n--- Simulating Claim 4: Text with short hash ---")
@@ -97,6 +100,7 @@ def run_helios_node_demo():
         print(f"Successfully submitted Claim ID: {claim_id_4}")
         time.sleep(0.1)
         node_instance.trigger_verification(claim_id_4)
+        node_instance.view_claim(claim_id_4)
 
 
     # Display the final state of the ledger on this node
@@ -0,0 +1,143 @@
+# node/agent_batcher.py
+
+import threading
+import time
+from concurrent.futures import Future
+
+
+class AgentMicroBatcher:
+    """
+    Collects claims bound for one agent into micro-batches.
+    Callers submit claims one at a time and get a concurrent.futures.Future back; a
+    collector thread flushes the pending claims as one batch when max_batch_size claims
+    are waiting or max_wait seconds have passed since the oldest one arrived, whichever
+    comes first. Each batch runs on the given executor through
+    run_batch(agent, claims, contents), which must return one result per claim; 'contents'
+    is None when no claim in the batch was submitted with content. Claims whose futures were cancelled while
+    waiting (e.g. after a timeout) are dropped from the batch.
+    """
+    def __init__(self, agent, run_batch, executor, max_batch_size=32, max_wait=0.005):
+        """
+        Args:
+            agent (BaseVerificationAgent): The agent every batch is sent to.
+            run_batch (callable): run_batch(agent, claims, contents) -> list of results.
+            executor (Executor): Where batches run.
+            max_batch_size (int): Largest batch handed to the agent.
+            max_wait (float): Longest time in seconds a claim waits for its batch to fill.
+        """
+        self.agent = agent
+        self.run_batch = run_batch
+        self.executor = executor
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait
+        self._pending = [] # (claim_data, claim_content, future)
+        self._oldest = None # monotonic time the oldest pending claim arrived
+        self._condition = threading.Condition()
+        self._closed = False
+        self._collector = threading.Thread(target=self._collect, name=f"{agent.agent_id}-batcher", daemon=True)
+        self._collector.start()
+
+    def submit(self, claim_data, claim_content=None):
+        """
+        Queues a claim, and optionally its content, for the agent's next batch.
+
+        Returns:
+            Future: Resolves to the agent's verification result for the claim.
+
+        Raises:
+            RuntimeError: If the batcher has been closed.
+        """
+        future = Future()
+        with self._condition:
+            if self._closed:
+                raise RuntimeError(f"Micro-batcher for agent '{self.agent.agent_id}' is closed.")
+            if not self._pending:
+                self._oldest = time.monotonic()
+            self._pending.append((claim_data, claim_content, future))
+            if len(self._pending) == 1 or len(self._pending) >= self.max_batch_size:
+                self._condition.notify()
+        return future
+
+    def _take_batch(self):
+        batch = self._pending[:self.max_batch_size]
+        del self._pending[:self.max_batch_size]
+        self._oldest = time.monotonic() if self._pending else None
+        return batch
+
+    def _collect(self):
+        while True:
+            with self._condition:
+                while True:
+                    if self._pending and (len(self._pending) >= self.max_batch_size or self._closed):
+                        break
+                    if self._pending:
+                        remaining = self._oldest + self.max_wait - time.monotonic()
+                        if remaining <= 0:
+                            break
+                        self._condition.wait(remaining)
+                    elif self._closed:
+                        return
+                    else:
+                        self._condition.wait()
+                batch = self._take_batch()
+            try:
+                self.executor.submit(self._run, batch)
+            except RuntimeError as e: # Executor already shut down
+                self._fail(batch, e)
+
+    def _run(self, batch):
+        batch = [entry for entry in batch if entry[2].set_running_or_notify_cancel()]
+        if not batch:
+            return
+        contents = [claim_content for _, claim_content, _ in batch]
+        try:
+            results = self.run_batch(self.agent, [claim_data for claim_data, _, _ in batch],
+                                     contents if any(claim_content is not None for claim_content in contents) else None)
+            if len(results) != len(batch):
+                raise RuntimeError(f"Agent '{self.agent.agent_id}' returned {len(results)} results for a batch of {len(batch)} claims.")
+        except Exception as e:
+            for _, _, future in batch:
+                future.set_exception(e)
+            return
+        for (_, _, future), result in zip(batch, results):
+            future.set_result(result)
+
+    @staticmethod
+    def _fail(batch, error):
+        for _, _, future in batch:
+            if future.set_running_or_notify_cancel():
+                future.set_exception(error)
+
+    def close(self):
+        """
+        Stops accepting claims, flushes whatever is pending and stops the collector thread.
+        """
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        self._collector.join()
+
+
+if __name__ == '__main__':
+    # Test batching by size and by wait time.
+    from concurrent.futures import ThreadPoolExecutor
+    from agents.simple_verifier_agent import SimpleVerifierAgent
+
+    print("--- Agent Micro-Batcher Self-Test ---")
+    batch_sizes = []
+
+    def run_batch(agent, claims, contents):
+        batch_sizes.append(len(claims))
+        return agent.verify_claims_batch(claims, contents)
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        batcher = AgentMicroBatcher(SimpleVerifierAgent(), run_batch, executor, max_batch_size=8, max_wait=0.05)
+        futures = [batcher.submit({"claim_id": f"c{i}", "content_hash": "h" * i}) for i in range(20)]
+        verdicts = [future.result(timeout=5)["verdict"] for future in futures]
+        print(f"Batch sizes: {batch_sizes}")
+        print(f"Verdicts: {verdicts.count('verified_preliminary')} verified_preliminary, {verdicts.count('unverified')} unverified")
+
+        cancelled = batcher.submit({"claim_id": "cancelled", "content_hash": "0123456789abcdef"})
+        print(f"Cancelled before its batch ran: {cancelled.cancel()}")
+        batcher.close()
+    print("--- End of Agent Micro-Batcher Self-Test ---")
@@ -0,0 +1,819 @@
+# node/api_server.py
+
+import asyncio
+import hashlib
+import json
+import time
+from urllib.parse import parse_qsl, unquote
+
+MAX_HEADER_BYTES = 64 * 1024
+DEFAULT_MAX_BODY_BYTES = 16 * 1024 * 1024
+MAX_REPORTED_ERRORS = 100 # Per-line errors listed in a bulk ingest response
+REQUIRED_CLAIM_FIELDS = ("content_hash", "content_type", "submitter_id")
+QUERY_FILTERS = ("status", "submitter_id", "content_type", "since", "until")
+_READ_BUFFER_LIMIT = 1024 * 1024 # Reading pauses while this much received data is unprocessed
+_STREAM_CHUNK = 64 * 1024
+
+_REASONS = {200: "OK", 201: "Created", 202: "Accepted", 400: "Bad Request", 404: "Not Found",
+            405: "Method Not Allowed", 411: "Length Required", 413: "Payload Too Large",
+            431: "Request Header Fields Too Large", 500: "Internal Server Error", 501: "Not Implemented",
+            503: "Service Unavailable"}
+
+_encode_json = json.JSONEncoder(separators=(',', ':'), default=str).encode
+
+
+class ApiError(Exception):
+    """An error answered with an HTTP status and a JSON {"error": message} body."""
+    def __init__(self, status, message, close=False):
+        super().__init__(message)
+        self.status = status
+        self.close = close # Whether the connection can no longer be used after this error
+
+
+class Overloaded(ApiError):
+    """The server or the verification queue is at capacity; answered with 503 and Retry-After."""
+    def __init__(self, message):
+        super().__init__(503, message)
+
+
+def _http_response(status, payload, keep_alive=True, retry_after=None):
+    body = _encode_json(payload).encode()
+    head = f"HTTP/1.1 {status} {_REASONS.get(status, 'Unknown')}\r\nContent-Type: application/json\r\nContent-Length: {len(body)}\r\n"
+    if retry_after is not None:
+        head += f"Retry-After: {retry_after}\r\n"
+    if not keep_alive:
+        head += "Connection: close\r\n"
+    return head.encode("latin-1") + b"\r\n" + body
+
+
+class _Request:
+    __slots__ = ("method", "path", "query", "headers", "keep_alive", "body", "body_stream")
+
+    def __init__(self, method, path, query, headers, keep_alive):
+        self.method = method
+        self.path = path
+        self.query = query
+        self.headers = headers
+        self.keep_alive = keep_alive
+        self.body = b""
+        self.body_stream = None # Async iterator of body chunks, for streaming routes
+
+
+class _HttpConnection(asyncio.Protocol):
+    """
+    One client connection. Received bytes go into a buffer that the connection's serving
+    coroutine parses requests from; responses are collected and written in one go once
+    every request already received has been answered, so pipelined requests cost one
+    write between them rather than one each.
+    """
+    def __init__(self, server):
+        self.server = server
+        self.transport = None
+        self.buffer = bytearray()
+        self.output = []
+        self.eof = False
+        self.idle_since = None # Set while waiting for the next request, for the keep-alive timeout
+        self._waiter = None
+        self._drain_waiter = None
+        self._reading_paused = False
+        self._writing_paused = False
+        self._task = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+        self._task = asyncio.get_running_loop().create_task(self.server._serve(self))
+
+    def data_received(self, data):
+        self.buffer += data
+        if len(self.buffer) > _READ_BUFFER_LIMIT and not self._reading_paused:
+            self.transport.pause_reading()
+            self._reading_paused = True
+        self._wake()
+
+    def eof_received(self):
+        self.eof = True
+        self._wake()
+        return True # Keep the transport open to send the remaining responses
+
+    def connection_lost(self, exc):
+        self.eof = True
+        self._wake()
+        if self._drain_waiter is not None and not self._drain_waiter.done():
+            self._drain_waiter.set_result(None)
+
+    def pause_writing(self):
+        self._writing_paused = True
+
+    def resume_writing(self):
+        self._writing_paused = False
+        if self._drain_waiter is not None and not self._drain_waiter.done():
+            self._drain_waiter.set_result(None)
+
+    def _wake(self):
+        if self._waiter is not None and not self._waiter.done():
+            self._waiter.set_result(None)
+
+    async def flush(self):
+        if self.output:
+            self.transport.write(b"".join(self.output))
+            self.output.clear()
+        if self._writing_paused and not self.transport.is_closing():
+            self._drain_waiter = asyncio.get_running_loop().create_future()
+            await self._drain_waiter
+
+    async def _wait_for_data(self):
+        await self.flush() # Everything received so far is answered; send it before blocking
+        if self._reading_paused:
+            self.transport.resume_reading()
+            self._reading_paused = False
+        self._waiter = asyncio.get_running_loop().create_future()
+        await self._waiter
+
+    async def read_until(self, delimiter, limit):
+        start = 0
+        while True:
+            position = self.buffer.find(delimiter, start)
+            if position >= 0:
+                end = position + len(delimiter)
+                data = bytes(self.buffer[:end])
+                del self.buffer[:end]
+                return data
+            if len(self.buffer) > limit:
+                raise ApiError(431, "Request head too large.", close=True)
+            if self.eof:
+                raise EOFError
+            start = max(len(self.buffer) - len(delimiter) + 1, 0)
+            await self._wait_for_data()
+
+    async def read_exactly(self, size):
+        while len(self.buffer) < size:
+            if self.eof:
+                raise EOFError
+            await self._wait_for_data()
+        data = bytes(self.buffer[:size])
+        del self.buffer[:size]
+        return data
+
+    async def read_some(self, size):
+        while not self.buffer:
+            if self.eof:
+                raise EOFError
+            await self._wait_for_data()
+        data = bytes(self.buffer[:size])
+        del self.buffer[:size]
+        return data
+
+
+class HeliosApiServer:
+    """
+    An asyncio HTTP/1.1 JSON API in front of a HeliosCoreNode.
+
+    Endpoints:
+        GET  /health                       Liveness and basic node information.
+        GET  /metrics                      Server counters and the node's instrumentation metrics.
+        POST /claims                       Submit one claim: {"content_hash", "content_type", "submitter_id", "metadata"}.
+        POST /claims/batch                 Submit {"claims": [...]} as one ledger block.
+        POST /claims/ingest                Stream claims as JSON lines; they are submitted in
+                                           blocks of 'ingest_batch_size' while the body arrives.
+        POST /content                      Stream raw content; it is hashed (SHA-256) as it arrives
+                                           and a claim is submitted for it. Query parameters:
+                                           submitter_id, content_type (else the Content-Type
+                                           header) and filename.
+        GET  /claims                       Query page: status, submitter_id, content_type, since,
+                                           until, cursor, limit and events query parameters.
+        GET  /claims/count                 Count matching claims (same filters).
+        GET  /claims/{claim_id}            One claim; ?events=0 leaves out its verification history.
+        GET  /claims/{claim_id}/summary    The claim's aggregate verification summary.
+        POST /claims/{claim_id}/verify     Queue the claim on the verification pipeline and wait for
+                                           the outcome; ?wait=0 answers 202 once it is queued and
+                                           ?urgency=urgent|high|normal|low overrides its priority.
+
+    Connections are kept alive (HTTP/1.1) and requests may be pipelined: they are answered
+    in order, and responses to requests that arrived together are written together.
+    Ledger calls run on the event loop thread, as the verification pipeline's commits do,
+    so they never race each other. Requests that wait (verification, bulk ingest) are
+    bounded by 'max_concurrency' and connections by 'max_connections'; beyond either, or
+    when the verification queue is full, the server answers 503 with a Retry-After header
+    instead of queueing more work.
+    """
+    def __init__(self, node, host="127.0.0.1", port=8080, max_connections=1024, max_concurrency=256,
+                 max_body_bytes=DEFAULT_MAX_BODY_BYTES, ingest_batch_size=1000, keep_alive_timeout=15.0,
+                 verification_workers=4, verification_queue_size=1024, retry_after=1):
+        """
+        Args:
+            node (HeliosCoreNode): The node to serve.
+            host (str): Interface to listen on.
+            port (int): Port to listen on; 0 picks a free one.
+            max_connections (int): Open connections beyond which new ones are refused with 503.
+            max_concurrency (int): Requests waiting on verification or streaming a bulk ingest
+                                   at once, beyond which further ones are refused with 503.
+            max_body_bytes (int): Largest body accepted by non-streaming endpoints.
+            ingest_batch_size (int): Claims per ledger block during bulk ingest.
+            keep_alive_timeout (float): Seconds an idle keep-alive connection stays open.
+            verification_workers (int): Workers of the node's verification pipeline.
+            verification_queue_size (int): Claims the pipeline queues before refusing more.
+            retry_after (int): Seconds suggested to clients in overload responses.
+        """
+        self.node = node
+        self.host = host
+        self.port = port
+        self.max_connections = max_connections
+        self.max_concurrency = max_concurrency
+        self.max_body_bytes = max_body_bytes
+        self.ingest_batch_size = ingest_batch_size
+        self.keep_alive_timeout = keep_alive_timeout
+        self.verification_workers = verification_workers
+        self.verification_queue_size = verification_queue_size
+        self.retry_after = retry_after
+        self.address = None
+        self.connections = set()
+        self.active = 0 # Requests currently waiting on verification or streaming a body
+        self.stats = {"connections_accepted": 0, "requests": 0, "overloaded": 0, "errors": 0}
+        self._server = None
+        self._sweeper = None
+
+    async def start(self):
+        """
+        Starts the verification pipeline and begins listening.
+
+        Returns:
+            tuple: The (host, port) the server listens on.
+        """
+        await self.node.start_verification_pipeline(workers=self.verification_workers,
+                                                     queue_size=self.verification_queue_size)
+        loop = asyncio.get_running_loop()
+        self._server = await loop.create_server(lambda: _HttpConnection(self), self.host, self.port, backlog=1024)
+        self.address = self._server.sockets[0].getsockname()[:2]
+        self._sweeper = loop.create_task(self._close_idle_connections())
+        self.node.instrumentation.event("api_server_started", "Node '{node_id}' serving the HTTP API on {host}:{port}.",
+                                        node_id=self.node.node_id, host=self.address[0], port=self.address[1])
+        return self.address
+
+    async def serve_forever(self):
+        await self._server.serve_forever()
+
+    async def stop(self):
+        """
+        Stops listening, closes every connection and drains the verification pipeline.
+        """
+        if self._server is None:
+            return
+        self._server.close()
+        self._sweeper.cancel()
+        for connection in list(self.connections):
+            connection.transport.close()
+        await self._server.wait_closed()
+        self._server = None
+        await self.node.stop_verification_pipeline()
+        self.node.instrumentation.event("api_server_stopped", "Node '{node_id}' stopped serving the HTTP API.",
+                                        node_id=self.node.node_id)
+
+    async def _close_idle_connections(self):
+        while True:
+            await asyncio.sleep(min(1.0, self.keep_alive_timeout))
+            deadline = time.monotonic() - self.keep_alive_timeout
+            for connection in list(self.connections):
+                if connection.idle_since is not None and connection.idle_since < deadline:
+                    connection.transport.close()
+
+    # --- Connection handling ---
+
+    async def _serve(self, connection):
+        self.stats["connections_accepted"] += 1
+        if len(self.connections) >= self.max_connections:
+            self.stats["overloaded"] += 1
+            connection.transport.write(_http_response(503, {"error": "Too many connections."}, keep_alive=False,
+                                                      retry_after=self.retry_after))
+            connection.transport.close()
+            return
+        self.connections.add(connection)
+        try:
+            while True:
+                connection.idle_since = time.monotonic() if not connection.buffer else None
+                request = None
+                try:
+                    head = await connection.read_until(b"\r\n\r\n", MAX_HEADER_BYTES)
+                    connection.idle_since = None
+                    request = self._parse_head(head)
+                    response = await self._handle(connection, request)
+                    keep_alive = request.keep_alive
+                except ApiError as e:
+                    keep_alive = request is not None and request.keep_alive and not e.close
+                    response = self._error_response(e, keep_alive)
+                except EOFError: # The client closed the connection
+                    break
+                except Exception as e:
+                    self.stats["errors"] += 1
+                    self.node.instrumentation.event("api_error", "Error handling API request: {error}", level="error", error=e)
+                    keep_alive = False
+                    response = _http_response(500, {"error": "Internal server error."}, keep_alive=False)
+                connection.output.append(response)
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            self.connections.discard(connection)
+            if not connection.transport.is_closing():
+                try:
+                    await connection.flush()
+                except ConnectionError:
+                    pass
+                connection.transport.close()
+
+    def _error_response(self, error, keep_alive):
+        if isinstance(error, Overloaded):
+            self.stats["overloaded"] += 1
+            return _http_response(503, {"error": str(error)}, keep_alive, retry_after=self.retry_after)
+        return _http_response(error.status, {"error": str(error)}, keep_alive)
+
+    @staticmethod
+    def _parse_head(head):
+        """
+        Parses a request line and headers.
+
+        Raises:
+            ApiError: 400 for a malformed head.
+        """
+        try:
+            lines = head[:-4].decode("latin-1").split("\r\n")
+            method, target, version = lines[0].split(" ")
+        except ValueError:
+            raise ApiError(400, "Malformed request line.", close=True) from None
+        if not version.startswith("HTTP/1."):
+            raise ApiError(400, f"Unsupported protocol version {version}.", close=True)
+        headers = {}
+        for line in lines[1:]:
+            name, separator, value = line.partition(":")
+            if not separator:
+                raise ApiError(400, "Malformed header line.", close=True)
+            headers[name.strip().lower()] = value.strip()
+        connection = headers.get("connection", "").lower()
+        keep_alive = connection != "close" if version == "HTTP/1.1" else connection == "keep-alive"
+        path, _, query = target.partition("?")
+        return _Request(method, path, dict(parse_qsl(query)) if query else {}, headers, keep_alive)
+
+    async def _body_chunks(self, connection, request):
+        """
+        Yields the request body as it arrives, for Content-Length and chunked bodies alike.
+        """
+        self._expect_continue(connection, request)
+        encoding = request.headers.get("transfer-encoding")
+        if encoding is not None:
+            if encoding.lower() != "chunked":
+                raise ApiError(501, f"Unsupported transfer encoding '{encoding}'.", close=True)
+            while True:
+                size_line = await connection.read_until(b"\r\n", 1024)
+                try:
+                    size = int(size_line.split(b";", 1)[0], 16)
+                except ValueError:
+                    raise ApiError(400, "Malformed chunk size.", close=True) from None
+                if size == 0:
+                    while await connection.read_until(b"\r\n", MAX_HEADER_BYTES) != b"\r\n": # Trailers
+                        pass
+                    return
+                while size:
+                    data = await connection.read_some(min(size, _STREAM_CHUNK))
+                    size -= len(data)
+                    yield data
+                await connection.read_exactly(2)
+        remaining = self._content_length(request)
+        while remaining:
+            data = await connection.read_some(min(remaining, _STREAM_CHUNK))
+            remaining -= len(data)
+            yield data
+
+    @staticmethod
+    def _content_length(request):
+        length = request.headers.get("content-length")
+        if length is None:
+            return 0
+        try:
+            length = int(length)
+        except ValueError:
+            length = -1
+        if length < 0:
+            raise ApiError(400, "Invalid Content-Length.", close=True)
+        return length
+
+    @staticmethod
+    def _expect_continue(connection, request):
+        if request.headers.get("expect", "").lower() == "100-continue":
+            connection.output.append(b"HTTP/1.1 100 Continue\r\n\r\n") # Sent once the client waits for it
+            del request.headers["expect"]
+
+    async def _read_body(self, connection, request):
+        self._expect_continue(connection, request)
+        if "transfer-encoding" not in request.headers:
+            length = self._content_length(request)
+            if length > self.max_body_bytes:
+                raise ApiError(413, f"Body exceeds {self.max_body_bytes} bytes.", close=True)
+            return await connection.read_exactly(length) if length else b""
+        parts, size = [], 0
+        async for data in self._body_chunks(connection, request):
+            size += len(data)
+            if size > self.max_body_bytes:
+                raise ApiError(413, f"Body exceeds {self.max_body_bytes} bytes.", close=True)
+            parts.append(data)
+        return b"".join(parts)
+
+    # --- Routing ---
+
+    def _route(self, method, path):
+        """
+        Returns:
+            tuple: (handler, list of path arguments).
+
+        Raises:
+            ApiError: 404 for an unknown path, 405 for a known path and another method.
+        """
+        parts = [unquote(part) for part in path.strip("/").split("/")]
+        arguments = []
+        if parts == ["health"]:
+            routes = {"GET": self._health}
+        elif parts == ["metrics"]:
+            routes = {"GET": self._metrics}
+        elif parts == ["claims"]:
+            routes = {"GET": self._query, "POST": self._submit}
+        elif parts == ["claims", "count"]:
+            routes = {"GET": self._count}
+        elif parts == ["claims", "batch"]:
+            routes = {"POST": self._submit_batch}
+        elif parts == ["claims", "ingest"]:
+            routes = {"POST": self._ingest}
+        elif parts == ["content"]:
+            routes = {"POST": self._submit_content}
+        elif len(parts) == 2 and parts[0] == "claims" and parts[1]:
+            routes, arguments = {"GET": self._get_claim}, parts[1:]
+        elif len(parts) == 3 and parts[0] == "claims" and parts[2] == "summary":
+            routes, arguments = {"GET": self._get_summary}, parts[1:2]
+        elif len(parts) == 3 and parts[0] == "claims" and parts[2] == "verify":
+            routes, arguments = {"POST": self._verify}, parts[1:2]
+        else:
+            raise ApiError(404, f"No endpoint at {path}.")
+        handler = routes.get(method)
+        if handler is None:
+            raise ApiError(405, f"{method} is not allowed on {path}; use {', '.join(routes)}.")
+        return handler, arguments
+
+    async def _handle(self, connection, request):
+        started = time.perf_counter()
+        self.stats["requests"] += 1
+        try:
+            handler, arguments = self._route(request.method, request.path)
+        except ApiError:
+            await self._read_body(connection, request) # Keep the connection in step with the next request
+            raise
+        streaming = handler in (self._ingest, self._submit_content)
+        if streaming or handler == self._verify:
+            if self.active >= self.max_concurrency:
+                if streaming: # A streamed body is not read just to refuse it
+                    request.keep_alive = False
+                else:
+                    await self._read_body(connection, request)
+                raise Overloaded(f"Server is at its limit of {self.max_concurrency} concurrent requests.")
+            if streaming:
+                request.body_stream = self._body_chunks(connection, request)
+            else:
+                request.body = await self._read_body(connection, request)
+            self.active += 1
+            try:
+                status, payload = await handler(request, *arguments)
+            except ApiError as e:
+                e.close = e.close or streaming # The rest of the body may not have been read
+                raise
+            finally:
+                self.active -= 1
+        else:
+            request.body = await self._read_body(connection, request)
+            status, payload = handler(request, *arguments)
+        instrumentation = self.node.instrumentation
+        if instrumentation.metrics:
+            instrumentation.observe("api.request", time.perf_counter() - started)
+            instrumentation.increment("api.requests")
+        return _http_response(status, payload, request.keep_alive)
+
+    # --- Handlers: each returns (status, JSON payload) ---
+
+    @staticmethod
+    def _json_body(request):
+        if not request.body:
+            raise ApiError(400, "Request body must be JSON.")
+        try:
+            return json.loads(request.body)
+        except ValueError as e:
+            raise ApiError(400, f"Invalid JSON: {e}") from None
+
+    def _check_claim_fields(self, entry):
+        if not isinstance(entry, dict):
+            return "claim must be a JSON object"
+        missing = [field for field in REQUIRED_CLAIM_FIELDS if not entry.get(field)]
+        if missing:
+            return f"missing {', '.join(missing)}"
+        if entry.get("metadata") is not None and not isinstance(entry["metadata"], dict):
+            return "metadata must be a JSON object"
+        problem = self.node.ledger.claim_problem(entry) # e.g. a content_hash too long for the segmented key table
+        return problem.rstrip(".") if problem else None
+
+    def _health(self, request):
+        return 200, {"status": "ok", "node_id": self.node.node_id, "agents": sorted(agent["agent_id"] for agent in self.node.list_agents()),
+                     "verification_queue": self.node.verification_pipeline.pending_count()
+                     if self.node.verification_pipeline is not None else 0}
+
+    def _metrics(self, request):
+        return 200, {"server": dict(self.stats, open_connections=len(self.connections), active_requests=self.active),
+                     "node": self.node.instrumentation.metrics_snapshot()}
+
+    def _submit(self, request):
+        entry = self._json_body(request)
+        problem = self._check_claim_fields(entry)
+        if problem is not None:
+            raise ApiError(400, f"Invalid claim: {problem}.")
+        claim_data = self.node.submit_new_claim(entry["content_hash"], entry["content_type"], entry["submitter_id"],
+                                                entry.get("metadata"))
+        if claim_data is None:
+            raise ApiError(500, "The ledger rejected the claim.")
+        return 201, claim_data
+
+    def _submit_batch(self, request):
+        body = self._json_body(request)
+        claims = body.get("claims") if isinstance(body, dict) else None
+        if not isinstance(claims, list) or not claims:
+            raise ApiError(400, 'Body must be {"claims": [...]} with at least one claim.')
+        for position, entry in enumerate(claims):
+            problem = self._check_claim_fields(entry)
+            if problem is not None:
+                raise ApiError(400, f"Invalid claim at position {position}: {problem}.")
+        created = self.node.submit_claims_batch(claims)
+        if created is None:
+            raise ApiError(500, "The ledger rejected the batch.")
+        return 201, {"claims": created}
+
+    async def _ingest(self, request):
+        """
+        Submits a JSON-lines body, one claim object per line, in blocks of ingest_batch_size
+        as lines arrive. Invalid lines are skipped and reported with their line numbers.
+        """
+        accepted, rejected, errors, claim_ids = 0, 0, [], []
+        batch = []
+
+        def submit():
+            nonlocal accepted
+            created = self.node.submit_claims_batch(batch)
+            if created is None:
+                raise ApiError(500, "The ledger rejected a batch.")
+            accepted += len(created)
+            claim_ids.extend(claim["claim_id"] for claim in created)
+            batch.clear()
+
+        line_number = 0
+        pending = b""
+        async for data in request.body_stream:
+            lines = (pending + data).split(b"\n")
+            pending = lines.pop()
+            for line in lines:
+                line_number += 1
+                if not line.strip():
+                    continue
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    problem = "invalid JSON"
+                else:
+                    problem = self._check_claim_fields(entry)
+                if problem is not None:
+                    rejected += 1
+                    if len(errors) < MAX_REPORTED_ERRORS:
+                        errors.append({"line": line_number, "error": problem})
+                    continue
+                batch.append(entry)
+                if len(batch) >= self.ingest_batch_size:
+                    submit()
+            if len(pending) > self.max_body_bytes:
+                raise ApiError(413, f"A line exceeds {self.max_body_bytes} bytes.", close=True)
+            await asyncio.sleep(0) # Let other connections run between chunks of a long upload
+        if pending.strip():
+            line_number += 1
+            try:
+                entry = json.loads(pending)
+            except ValueError:
+                entry = None
+            problem = self._check_claim_fields(entry) if entry is not None else "invalid JSON"
+            if problem is None:
+                batch.append(entry)
+            else:
+                rejected += 1
+                if len(errors) < MAX_REPORTED_ERRORS:
+                    errors.append({"line": line_number, "error": problem})
+        if batch:
+            submit()
+        return 200, {"accepted": accepted, "rejected": rejected, "errors": errors, "claim_ids": claim_ids}
+
+    async def _submit_content(self, request):
+        """
+        Hashes a raw body chunk by chunk as it arrives and submits a claim for it. On a node
+        with a blob store, the body is written to the store as it is hashed.
+        """
+        submitter_id = request.query.get("submitter_id")
+        if not submitter_id:
+            raise ApiError(400, "submitter_id query parameter is required.")
+        content_type = request.query.get("content_type") or request.headers.get("content-type") or "application/octet-stream"
+        if self.node.blob_store is not None:
+            writer = self.node.blob_store.writer()
+            try:
+                async for data in request.body_stream:
+                    writer.write(data)
+            except BaseException:
+                writer.abort()
+                raise
+            content_hash, size_bytes = writer.commit()
+        else:
+            digest = hashlib.sha256()
+            size_bytes = 0
+            async for data in request.body_stream:
+                digest.update(data)
+                size_bytes += len(data)
+            content_hash = digest.hexdigest()
+        metadata = {"size_bytes": size_bytes}
+        if request.query.get("filename"):
+            metadata["filename"] = request.query["filename"]
+        claim_data = self.node.submit_new_claim(content_hash, content_type, submitter_id, metadata)
+        if claim_data is None:
+            raise ApiError(500, "The ledger rejected the claim.")
+        return 201, claim_data
+
+    def _filters(self, request):
+        return {name: request.query[name] for name in QUERY_FILTERS if request.query.get(name)}
+
+    def _query(self, request):
+        cursor = request.query.get("cursor") or None
+        if cursor is not None and cursor.lstrip("-").isdigit():
+            cursor = int(cursor) # Single-chain ledgers use integer cursors, the sharded ledger strings
+        try:
+            limit = int(request.query.get("limit", 100))
+        except ValueError:
+            raise ApiError(400, "limit must be an integer.") from None
+        if not 1 <= limit <= 1000:
+            raise ApiError(400, "limit must be between 1 and 1000.")
+        try:
+            return 200, self.node.ledger.query_page(cursor=cursor, limit=limit, with_events=request.query.get("events") == "1",
+                                                    **self._filters(request))
+        except (TypeError, ValueError) as e: # Bad timestamp bounds or cursor
+            raise ApiError(400, str(e)) from None
+
+    def _count(self, request):
+        try:
+            return 200, {"count": self.node.ledger.count_claims(**self._filters(request))}
+        except (TypeError, ValueError) as e:
+            raise ApiError(400, str(e)) from None
+
+    def _get_claim(self, request, claim_id):
+        claim_data = self.node.ledger.get_claim_by_id(claim_id, with_events=request.query.get("events") != "0")
+        if claim_data is None:
+            raise ApiError(404, f"Claim '{claim_id}' not found.")
+        return 200, claim_data
+
+    def _get_summary(self, request, claim_id):
+        summary = self.node.ledger.get_claim_summary(claim_id)
+        if summary is None:
+            raise ApiError(404, f"Claim '{claim_id}' not found.")
+        return 200, summary
+
+    async def _verify(self, request, claim_id):
+        ledger = self.node.ledger
+        if ledger.get_claim_status(claim_id) is None:
+            raise ApiError(404, f"Claim '{claim_id}' not found.")
+        try:
+            future = self.node.verification_pipeline.enqueue_nowait(claim_id, urgency=request.query.get("urgency"))
+        except ValueError as e: # Unknown urgency level
+            raise ApiError(400, str(e)) from None
+        if future is None:
+            raise Overloaded("Verification queue is full.")
+        if request.query.get("wait") == "0":
+            return 202, {"claim_id": claim_id, "queued": True}
+        outcome = await future
+        if outcome is None: # No agent had anything to run
+            return 200, {"claim_id": claim_id, "status": ledger.get_claim_status(claim_id), "verification_results": []}
+        return 200, outcome
+
+
+if __name__ == '__main__':
+    # Test the API over real sockets: keep-alive, pipelining, bulk ingest, queries and overload.
+    import shutil
+    import socket
+    import tempfile
+    import threading
+    from .blob_store import BlobStore
+    from .core_node import HeliosCoreNode
+
+    def read_response(sock, pending):
+        while b"\r\n\r\n" not in pending:
+            pending += sock.recv(65536)
+        head, _, rest = pending.partition(b"\r\n\r\n")
+        lines = head.decode("latin-1").split("\r\n")
+        headers = {name.lower(): value.strip() for name, _, value in (line.partition(":") for line in lines[1:])}
+        length = int(headers["content-length"])
+        while len(rest) < length:
+            rest += sock.recv(65536)
+        return int(lines[0].split(" ")[1]), headers, json.loads(rest[:length]), rest[length:]
+
+    def request_bytes(method, path, body=None):
+        data = b"" if body is None else (body if isinstance(body, bytes) else json.dumps(body).encode())
+        return f"{method} {path} HTTP/1.1\r\nHost: localhost\r\nContent-Length: {len(data)}\r\n\r\n".encode() + data
+
+    def exchange(address, method, path, body=None):
+        with socket.create_connection(address) as sock:
+            sock.sendall(request_bytes(method, path, body))
+            status, headers, payload, _ = read_response(sock, b"")
+        return status, headers, payload
+
+    def client_checks(address, node):
+        status, _, claim = exchange(address, "POST", "/claims", {"content_hash": "api_hash_0001", "content_type": "text/plain",
+                                                                  "submitter_id": "api_user"})
+        print(f"Submit: {status} {claim['claim_id'][:32]}...")
+        status, _, outcome = exchange(address, "POST", f"/claims/{claim['claim_id']}/verify")
+        print(f"Verify: {status} {outcome['status']}")
+        content = b"raw media bytes " * 100000
+        status, _, claim = exchange(address, "POST", "/content?submitter_id=api_user&filename=clip.mp4&content_type=video/mp4", content)
+        print(f"Raw content: {status}, hashed as it arrived: {claim['content_hash'] == hashlib.sha256(content).hexdigest()}, "
+              f"metadata: {claim['metadata']}, stored: {node.blob_store.get(claim['content_hash']) == content}")
+        print(f"Unknown claim: {exchange(address, 'GET', '/claims/nope')[0]}, wrong method: {exchange(address, 'DELETE', '/claims')[0]}")
+
+        # Chunked JSON-lines ingest, sent in pieces that split lines.
+        lines = b"".join(json.dumps({"content_hash": f"ingest_{i:08d}", "content_type": "text/plain",
+                                     "submitter_id": f"ingest_user_{i % 10}"}).encode() + b"\n" for i in range(5000))
+        lines += b"not json\n" + b'{"content_type": "text/plain"}\n'
+        with socket.create_connection(address) as sock:
+            sock.sendall(b"POST /claims/ingest HTTP/1.1\r\nHost: localhost\r\nTransfer-Encoding: chunked\r\n\r\n")
+            for position in range(0, len(lines), 7000):
+                piece = lines[position:position + 7000]
+                sock.sendall(f"{len(piece):x}\r\n".encode() + piece + b"\r\n")
+            sock.sendall(b"0\r\n\r\n")
+            status, _, report, _ = read_response(sock, b"")
+        print(f"Ingest: {status} accepted={report['accepted']} rejected={report['rejected']} errors={report['errors']}")
+
+        with socket.create_connection(address) as sock: # Keep-alive: paging through one submitter's claims
+            cursor, collected, pending = None, 0, b""
+            while True:
+                sock.sendall(request_bytes("GET", "/claims?submitter_id=ingest_user_3&limit=100" +
+                                           (f"&cursor={cursor}" if cursor is not None else "")))
+                status, _, page, pending = read_response(sock, pending)
+                collected += len(page["claims"])
+                cursor = page["next_cursor"]
+                if cursor is None:
+                    break
+            sock.sendall(request_bytes("GET", "/claims/count?submitter_id=ingest_user_3"))
+            _, _, count, pending = read_response(sock, pending)
+        print(f"Paged {collected} claims of ingest_user_3 over one connection; count endpoint: {count['count']}")
+
+        # Pipelining: many requests written back to back, answered in order.
+        claim_ids = report["claim_ids"]
+        requests_count = 20000
+        payload = b"".join(request_bytes("GET", f"/claims/{claim_ids[i % len(claim_ids)]}?events=0")
+                           for i in range(requests_count))
+        with socket.create_connection(address) as sock:
+            started = time.perf_counter()
+            sender = threading.Thread(target=sock.sendall, args=(payload,))
+            sender.start()
+            pending, in_order = b"", True
+            for i in range(requests_count):
+                status, _, claim, pending = read_response(sock, pending)
+                in_order = in_order and status == 200 and claim["claim_id"] == claim_ids[i % len(claim_ids)]
+            elapsed = time.perf_counter() - started
+            sender.join()
+        print(f"Pipelined {requests_count} lookups on one connection: {requests_count / elapsed:.0f} requests/s, in order: {in_order}")
+
+        # Overload: a burst of queued verifications against a small verification queue.
+        burst = b"".join(request_bytes("POST", f"/claims/{claim_id}/verify?wait=0") for claim_id in claim_ids[:200])
+        with socket.create_connection(address) as sock:
+            sock.sendall(burst)
+            pending, statuses, retry_after = b"", {}, None
+            for _ in range(200):
+                status, headers, _, pending = read_response(sock, pending)
+                statuses[status] = statuses.get(status, 0) + 1
+                retry_after = headers.get("retry-after", retry_after)
+        print(f"Verification burst: {dict(sorted(statuses.items()))}, Retry-After: {retry_after}")
+        status = 503
+        while status == 503: # Until the burst's claims have left the verification queue
+            status, _, outcome = exchange(address, "POST", f"/claims/{claim_ids[-1]}/verify?urgency=urgent")
+        print(f"Urgent verification: {status} {outcome['status']}; "
+              f"unknown urgency: {exchange(address, 'POST', f'/claims/{claim_ids[-2]}/verify?urgency=asap')[0]}")
+
+    async def _self_test(blob_dir):
+        node = HeliosCoreNode(node_id="api_test_node", blob_store=BlobStore(blob_dir))
+        server = HeliosApiServer(node, port=0, verification_queue_size=16)
+        address = await server.start()
+        try:
+            await asyncio.get_running_loop().run_in_executor(None, client_checks, address, node)
+        finally:
+            await server.stop()
+            node.close()
+        print(f"Server stats: {server.stats}")
+
+    print("--- API Server Self-Test ---")
+    blob_dir = tempfile.mkdtemp(prefix="helios_api_blobs_")
+    try:
+        asyncio.run(_self_test(blob_dir))
+    finally:
+        shutil.rmtree(blob_dir, ignore_errors=True)
+    print("--- End of API Server Self-Test ---")
@@ -0,0 +1,275 @@
+# node/blob_store.py
+
+import hashlib
+import mmap
+import os
+import re
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
+
+from .content_hashing import CHUNK_SIZE, hash_buffer, hash_file
+from .instrumentation import DEFAULT_INSTRUMENTATION
+
+_BLOB_NAME = re.compile(r"[0-9a-f]{8,128}") # Content hashes that can name a blob (never a path)
+_EMPTY = memoryview(b"")
+
+
+class BlobWriter:
+    """
+    Writes one blob incrementally, hashing it as it is written, e.g. while a request body
+    streams in. commit() moves it to its content address (dropping it if the store already
+    holds that content); abort() discards it.
+    """
+    def __init__(self, store):
+        self._store = store
+        self._digest = hashlib.sha256()
+        self.size_bytes = 0
+        descriptor, self._temp_path = tempfile.mkstemp(dir=store.temp_dir)
+        self._file = os.fdopen(descriptor, "wb")
+
+    def write(self, data):
+        self._digest.update(data)
+        self._file.write(data)
+        self.size_bytes += len(data)
+
+    def commit(self):
+        """
+        Returns:
+            tuple: (hex SHA-256, size in bytes) of the blob written.
+        """
+        self._file.close()
+        content_hash = self._digest.hexdigest()
+        self._store._install(self._temp_path, content_hash)
+        return content_hash, self.size_bytes
+
+    def abort(self):
+        self._file.close()
+        try:
+            os.unlink(self._temp_path)
+        except OSError:
+            pass
+
+
+class BlobStore:
+    """
+    A local, content-addressed store for claim content.
+    Each blob is a file named by its SHA-256 under two levels of fan-out directories
+    (root/ab/cd/abcd...), so no directory grows past a few thousand entries. Writes are
+    deduplicated: content the store already holds is hashed but never written again, and
+    new blobs are written under a temporary name and renamed into place, so readers never
+    see a partial blob.
+
+    Reads hand out read-only memoryviews over memory-mapped blobs instead of bytes copies,
+    and the most recently used mappings are kept open in an LRU. A view stays valid after
+    its mapping is evicted; the mapping is unmapped once the last view is released.
+    """
+    def __init__(self, root, max_open_maps=256, fsync=False, instrumentation=None):
+        """
+        Args:
+            root (str): Directory holding the blobs; created if missing.
+            max_open_maps (int): Mappings kept open for reuse.
+            fsync (bool): fsync every new blob before it is renamed into place.
+            instrumentation (Instrumentation, optional): Metrics surface for hits, misses and writes.
+        """
+        self.root = root
+        self.temp_dir = os.path.join(root, "tmp")
+        os.makedirs(self.temp_dir, exist_ok=True)
+        self.max_open_maps = max_open_maps
+        self.fsync = fsync
+        self.instrumentation = instrumentation or DEFAULT_INSTRUMENTATION
+        self._maps = OrderedDict() # content_hash -> mmap, least recently used first
+        self._lock = threading.Lock()
+
+    def path_for(self, content_hash):
+        """
+        Returns:
+            str: Where the blob for 'content_hash' lives (whether or not it exists).
+
+        Raises:
+            ValueError: If 'content_hash' is not a lowercase hex digest.
+        """
+        if not isinstance(content_hash, str) or not _BLOB_NAME.fullmatch(content_hash):
+            raise ValueError(f"Not a content hash: {content_hash!r}")
+        return os.path.join(self.root, content_hash[:2], content_hash[2:4], content_hash)
+
+    def contains(self, content_hash):
+        try:
+            return os.path.exists(self.path_for(content_hash))
+        except ValueError:
+            return False
+
+    def _install(self, temp_path, content_hash):
+        """
+        Moves a fully written temporary file to its content address, or drops it when the
+        store already holds the content.
+        """
+        path = self.path_for(content_hash)
+        if os.path.exists(path):
+            os.unlink(temp_path)
+            self.instrumentation.increment("blob_store.deduplicated")
+            return
+        if self.fsync:
+            with open(temp_path, "rb") as temp_file:
+                os.fsync(temp_file.fileno())
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        os.replace(temp_path, path) # Racing writers of the same content write identical bytes
+        self.instrumentation.increment("blob_store.writes")
+
+    def writer(self):
+        """
+        Returns:
+            BlobWriter: A writer for one blob of not yet known content.
+        """
+        return BlobWriter(self)
+
+    def put(self, content, chunk_size=CHUNK_SIZE):
+        """
+        Stores content under its SHA-256. Paths and buffers are hashed first and only
+        copied in when the store does not already hold them; streams are hashed while
+        they are written, since they can only be read once.
+
+        Args:
+            content: A file path, a bytes-like buffer or a binary stream (read to its end).
+
+        Returns:
+            tuple: (hex SHA-256, size in bytes), like content_hashing.hash_content().
+
+        Raises:
+            TypeError: For any other kind of content.
+        """
+        if isinstance(content, (str, os.PathLike)):
+            content_hash, size_bytes = hash_file(content, chunk_size)
+            if self.contains(content_hash):
+                self.instrumentation.increment("blob_store.deduplicated")
+            else:
+                descriptor, temp_path = tempfile.mkstemp(dir=self.temp_dir)
+                os.close(descriptor)
+                shutil.copyfile(content, temp_path) # Uses the kernel's copy path where available
+                self._install(temp_path, content_hash)
+            return content_hash, size_bytes
+        if isinstance(content, (bytes, bytearray, memoryview, mmap.mmap)):
+            content_hash, size_bytes = hash_buffer(content, chunk_size)
+            if self.contains(content_hash):
+                self.instrumentation.increment("blob_store.deduplicated")
+            else:
+                writer = BlobWriter(self)
+                with memoryview(content) as view:
+                    writer._file.write(view)
+                writer._file.close()
+                self._install(writer._temp_path, content_hash)
+            return content_hash, size_bytes
+        if hasattr(content, "read"):
+            writer = BlobWriter(self)
+            try:
+                while True:
+                    chunk = content.read(chunk_size)
+                    if not chunk:
+                        break
+                    writer.write(chunk)
+            except BaseException:
+                writer.abort()
+                raise
+            return writer.commit()
+        raise TypeError(f"Cannot store content of type {type(content).__name__}; pass a path, a buffer or a binary stream.")
+
+    def get(self, content_hash):
+        """
+        Returns a blob's content without copying it.
+
+        Returns:
+            memoryview or None: A read-only view over the memory-mapped blob, or None if the
+                                store does not hold 'content_hash'.
+        """
+        with self._lock:
+            mapping = self._maps.get(content_hash)
+            if mapping is not None:
+                self._maps.move_to_end(content_hash)
+                self.instrumentation.increment("blob_store.map_hits")
+                return memoryview(mapping)
+        try:
+            path = self.path_for(content_hash)
+            with open(path, "rb") as blob_file:
+                if os.fstat(blob_file.fileno()).st_size == 0:
+                    return _EMPTY # Empty files cannot be mapped
+                mapping = mmap.mmap(blob_file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            self.instrumentation.increment("blob_store.missing")
+            return None
+        self.instrumentation.increment("blob_store.map_misses")
+        with self._lock:
+            existing = self._maps.get(content_hash)
+            if existing is not None: # Mapped concurrently by another reader
+                mapping.close()
+                mapping = existing
+            else:
+                self._maps[content_hash] = mapping
+                while len(self._maps) > self.max_open_maps:
+                    self._release(self._maps.popitem(last=False)[1])
+            return memoryview(mapping)
+
+    @staticmethod
+    def _release(mapping):
+        try:
+            mapping.close()
+        except BufferError:
+            pass # Views are still exported; the mapping is unmapped when the last one goes
+
+    def close(self):
+        """
+        Drops every cached mapping.
+        """
+        with self._lock:
+            mappings = list(self._maps.values())
+            self._maps.clear()
+        for mapping in mappings:
+            self._release(mapping)
+
+
+if __name__ == '__main__':
+    # Test deduplicated writes from every kind of content, zero-copy reads and the mapping LRU.
+    import io
+    import time
+    from .instrumentation import Instrumentation
+
+    print("--- Blob Store Self-Test ---")
+    work_dir = tempfile.mkdtemp(prefix="helios_blobs_")
+    try:
+        store = BlobStore(os.path.join(work_dir, "blobs"), max_open_maps=4, instrumentation=Instrumentation(metrics=True))
+        payload = os.urandom(8 << 20)
+        source_path = os.path.join(work_dir, "payload.bin")
+        with open(source_path, "wb") as source_file:
+            source_file.write(payload)
+
+        from_path = store.put(source_path)
+        from_bytes = store.put(payload)
+        from_stream = store.put(io.BytesIO(payload))
+        writer = store.writer()
+        for offset in range(0, len(payload), 65536):
+            writer.write(payload[offset:offset + 65536])
+        from_writer = writer.commit()
+        print(f"Same content from path, bytes, stream and writer: {len({from_path, from_bytes, from_stream, from_writer}) == 1}; "
+              f"hash matches hashlib: {from_path[0] == hashlib.sha256(payload).hexdigest()}")
+        print(f"Blob stored at: {os.path.relpath(store.path_for(from_path[0]), work_dir)}")
+        print(f"Leftover temporary files: {len(os.listdir(store.temp_dir))}")
+
+        view = store.get(from_path[0])
+        print(f"View is read-only: {view.readonly}, {view.nbytes} bytes, content matches: {view == payload}")
+        started = time.perf_counter()
+        for _ in range(10000):
+            store.get(from_path[0]).release()
+        print(f"Cached view lookup: {(time.perf_counter() - started) / 10000 * 1e6:.2f} us")
+        small_hashes = [store.put(f"blob {n}".encode())[0] for n in range(6)]
+        for content_hash in small_hashes:
+            store.get(content_hash).release()
+        print(f"Open mappings after 7 blobs with max_open_maps=4: {len(store._maps)}; "
+              f"evicted view still readable: {bytes(view[:4]) == payload[:4]}")
+        view.release()
+        print(f"Empty blob: {store.get(store.put(b'')[0]).nbytes} bytes; unknown hash: {store.get('0' * 64)}; "
+              f"path-like hash rejected: {store.get('../../etc/passwd')}")
+        print(f"Counters: {store.instrumentation.metrics_snapshot()['counters']}")
+        store.close()
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    print("--- End of Blob Store Self-Test ---")
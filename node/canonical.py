@@ -0,0 +1,204 @@
+# node/canonical.py
+
+import hashlib
+import json
+from json.encoder import encode_basestring_ascii
+from operator import itemgetter
+
+from .merkle import CLAIM_MUTABLE_FIELDS, canonical_claim_bytes, leaf_digest
+
+# Blocks name the encoding their hash was computed with in an "encoding" field.
+# Blocks without one predate the field and use LEGACY_ENCODING.
+LEGACY_ENCODING = "json-v1"
+DEFAULT_ENCODING = "compact-v1"
+
+# Built once: json.dumps() constructs a new encoder on every call that passes options.
+_sorted_json = json.JSONEncoder(sort_keys=True, separators=(',', ':')).encode
+_compact_json = json.JSONEncoder(separators=(',', ':')).encode
+
+# Fields of a batch block that are hashed; the claims themselves are covered by "merkle_root".
+BATCH_HEADER_FIELDS = ("index", "timestamp", "claim_count", "merkle_root", "previous_hash")
+
+
+class JsonEncodingV1:
+    """
+    The original encoding: a single-claim block is hashed as key-sorted compact JSON of the
+    whole block (its claim's verification history and status included), a batch block as
+    key-sorted JSON of its header, and claims as key-sorted JSON of their immutable fields.
+    """
+    name = "json-v1"
+    hashes_claim_digest = False # Single-claim block hashes cover the claim itself
+
+    def claim_bytes(self, claim_data):
+        """
+        Returns:
+            bytes: The canonical encoding of the claim's immutable fields.
+        """
+        return canonical_claim_bytes(claim_data)
+
+    def claim_digest(self, claim_data):
+        """
+        Returns:
+            bytes: The claim's 32-byte Merkle leaf hash.
+        """
+        return leaf_digest(self.claim_bytes(claim_data))
+
+    def block_hash(self, block, claim_digest=None):
+        """
+        Computes a block's hash from its contents, ignoring its stored "hash" field.
+
+        Args:
+            block (dict): The block, or just the header of a batch block.
+            claim_digest (bytes, optional): Unused; the whole claim is part of the encoding.
+
+        Returns:
+            str: Hex SHA256 block hash.
+        """
+        if "claims" in block:
+            hashed = {key: block[key] for key in BATCH_HEADER_FIELDS}
+        else:
+            hashed = {key: value for key, value in block.items() if key != "hash"}
+        return hashlib.sha256(_sorted_json(hashed).encode()).hexdigest()
+
+
+class CompactEncodingV1:
+    """
+    Positional encoding that hashes every immutable part once.
+    A claim is encoded as a JSON array: a bitmask of the standard fields it carries, their
+    values in a fixed order (nested values with sorted keys), then any other immutable
+    fields as key-sorted [key, value] pairs. A block's hash covers a positional header and,
+    for single-claim blocks, the claim's 32-byte digest rather than the claim itself, so
+    verification results and status updates never change a block's hash and the claim is
+    encoded only once per append.
+    """
+    name = "compact-v1"
+    hashes_claim_digest = True # Single-claim block hashes cover the claim's digest
+    CLAIM_FIELDS = ("claim_id", "timestamp", "submitter_id", "content_hash", "content_type", "metadata")
+
+    def claim_bytes(self, claim_data):
+        """
+        Returns:
+            bytes: The canonical encoding of the claim's immutable fields.
+        """
+        if claim_data.keys() == _COMPACT_KNOWN_FIELDS: # Every standard field and nothing else
+            return _sorted_json((_ALL_FIELDS_MASK,) + _claim_fields(claim_data)).encode()
+        encoded = [0]
+        mask = 0
+        bit = 1
+        for field in self.CLAIM_FIELDS:
+            if field in claim_data:
+                mask |= bit
+                encoded.append(claim_data[field])
+            bit <<= 1
+        encoded[0] = mask
+        extras = [[key, claim_data[key]] for key in claim_data.keys() if key not in _COMPACT_KNOWN_FIELDS]
+        if extras:
+            encoded.append(sorted(extras))
+        return _sorted_json(encoded).encode()
+
+    def claim_digest(self, claim_data):
+        """
+        Returns:
+            bytes: The claim's 32-byte Merkle leaf hash.
+        """
+        return leaf_digest(self.claim_bytes(claim_data))
+
+    def block_hash(self, block, claim_digest=None):
+        """
+        Computes a block's hash from its header and its claim's digest.
+
+        Args:
+            block (dict): The block, or just the header of a batch block.
+            claim_digest (bytes, optional): The single claim's digest, if already known.
+
+        Returns:
+            str: Hex SHA256 block hash.
+        """
+        if "merkle_root" in block:
+            header = (self.name, block["index"], block["timestamp"], block["claim_count"],
+                      block["merkle_root"], block["previous_hash"])
+            return hashlib.sha256(_compact_json(header).encode()).hexdigest()
+        if claim_digest is None:
+            claim_digest = self.claim_digest(block["claim_data"])
+        index, timestamp, previous_hash = block["index"], block["timestamp"], block["previous_hash"]
+        if type(index) is int and type(timestamp) is str and type(previous_hash) is str:
+            # Same bytes _compact_json() produces for these types, without building an encoder.
+            header = (f'["{self.name}",{index},{encode_basestring_ascii(timestamp)},'
+                      f'{encode_basestring_ascii(previous_hash)},"{claim_digest.hex()}"]')
+        else:
+            header = _compact_json((self.name, index, timestamp, previous_hash, claim_digest.hex()))
+        return hashlib.sha256(header.encode()).hexdigest()
+
+
+_COMPACT_KNOWN_FIELDS = frozenset(CompactEncodingV1.CLAIM_FIELDS) | frozenset(CLAIM_MUTABLE_FIELDS)
+_ALL_FIELDS_MASK = (1 << len(CompactEncodingV1.CLAIM_FIELDS)) - 1
+_claim_fields = itemgetter(*CompactEncodingV1.CLAIM_FIELDS)
+
+ENCODINGS = {encoding.name: encoding for encoding in (JsonEncodingV1(), CompactEncodingV1())}
+
+
+def get_encoding(name=None):
+    """
+    Args:
+        name (str, optional): Encoding name; defaults to DEFAULT_ENCODING.
+
+    Returns:
+        The encoding object.
+
+    Raises:
+        ValueError: If the encoding is unknown.
+    """
+    name = name or DEFAULT_ENCODING
+    if name not in ENCODINGS:
+        raise ValueError(f"Unknown block encoding '{name}'. Available: {sorted(ENCODINGS)}")
+    return ENCODINGS[name]
+
+
+def encoding_of_block(block):
+    """
+    Returns:
+        The encoding a block (or batch block header) was hashed with.
+    """
+    return get_encoding(block.get("encoding", LEGACY_ENCODING))
+
+
+if __name__ == '__main__':
+    # Compare the cost of hashing a block with each encoding.
+    import sys
+    import timeit
+
+    print("--- Canonical Encoding Self-Test ---")
+    claim = {
+        "claim_id": "canonical_test_001",
+        "timestamp": "2025-01-01T00:00:00.123456",
+        "submitter_id": "user_alpha",
+        "content_hash": hashlib.sha256(b"canonical").hexdigest(),
+        "content_type": "image/jpeg",
+        "metadata": {"camera_model": "Pixel 8 Pro", "gps_location": "51.5,-0.12", "notes": "x" * 32},
+        "verification_history": [{"agent_id": "simple_verifier_v1", "verdict": "verified_preliminary",
+                                  "details": "Content hash found with sufficient length (64 >= 10)."}] * 4,
+        "status": "verified_preliminary"
+    }
+    block = {"index": 7, "timestamp": "2025-01-01T00:00:01.000001", "claim_data": claim, "previous_hash": "0" * 64}
+    compact = get_encoding("compact-v1")
+    reordered = dict(reversed(list(claim.items())))
+    print(f"Key order independent: {compact.claim_bytes(claim) == compact.claim_bytes(reordered)}")
+    changed = dict(claim, status="unverified", verification_history=[])
+    print(f"Status changes keep the compact block hash: "
+          f"{compact.block_hash(block) == compact.block_hash(dict(block, claim_data=changed))}")
+    print(f"Extra fields are committed: {compact.claim_bytes(claim) != compact.claim_bytes(dict(claim, origin='x'))}")
+    immutable_only = {key: claim[key] for key in compact.CLAIM_FIELDS}
+    print(f"All-fields fast path matches the general path: {compact.claim_bytes(claim) == compact.claim_bytes(immutable_only)}")
+    header = _compact_json((compact.name, 7, block["timestamp"], block["previous_hash"], compact.claim_digest(claim).hex()))
+    print(f"Header fast path matches JSON: {compact.block_hash(block) == hashlib.sha256(header.encode()).hexdigest()}")
+
+    legacy = get_encoding(LEGACY_ENCODING)
+    rounds = 20000
+    json_dumps_seconds = timeit.timeit(
+        lambda: hashlib.sha256(json.dumps(block, sort_keys=True, separators=(',', ':')).encode()).hexdigest(), number=rounds)
+    for encoding in (legacy, compact):
+        seconds = timeit.timeit(lambda: encoding.block_hash(block), number=rounds)
+        print(f"{encoding.name}: {seconds / rounds * 1e6:.2f} us per block hash "
+              f"(json.dumps per call: {json_dumps_seconds / rounds * 1e6:.2f} us)")
+    print("--- End of Canonical Encoding Self-Test ---")
+    sys.exit(0)
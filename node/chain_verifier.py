@@ -0,0 +1,253 @@
+# node/chain_verifier.py
+
+import hashlib
+import hmac
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from .canonical import encoding_of_block
+from .instrumentation import DEFAULT_INSTRUMENTATION
+from .merkle import merkle_root
+
+GENESIS_PREVIOUS_HASH = "0" * 64
+DEFAULT_RANGE_SIZE = 5000 # Blocks per worker task
+
+
+class ChainCheckpointStore:
+    """
+    Keeps signed checkpoints of chain positions that have been fully verified.
+    Each checkpoint records a block index and that block's hash, signed with HMAC-SHA256
+    under the store's secret key, so verify_chain() can trust every block up to the latest
+    checkpoint and only re-hash what was appended after it.
+    Checkpoints can optionally be persisted to a JSON file; entries whose signature does not
+    match the key are discarded on load.
+    """
+    def __init__(self, secret_key=None, path=None):
+        """
+        Args:
+            secret_key (bytes, optional): HMAC key. A random per-process key is generated if omitted,
+                                          which means checkpoints are only trusted within this process.
+            path (str, optional): JSON file to load checkpoints from and persist them to.
+                                  Requires an explicit secret_key.
+        """
+        if path is not None and secret_key is None:
+            raise ValueError("A persistent checkpoint store needs an explicit secret_key.")
+        self._secret_key = secret_key if secret_key is not None else os.urandom(32)
+        self.path = path
+        self.checkpoints = []
+        if path is not None and os.path.exists(path):
+            self._load()
+
+    def _sign(self, block_index, block_hash):
+        message = f"{block_index}:{block_hash}".encode()
+        return hmac.new(self._secret_key, message, hashlib.sha256).hexdigest()
+
+    def _load(self):
+        with open(self.path, "r") as checkpoint_file:
+            stored = json.load(checkpoint_file)
+        for checkpoint in stored:
+            expected = self._sign(checkpoint["block_index"], checkpoint["block_hash"])
+            if hmac.compare_digest(expected, checkpoint.get("signature", "")):
+                self.checkpoints.append(checkpoint)
+            else:
+                DEFAULT_INSTRUMENTATION.event("checkpoint_discarded", "Warning: Discarding checkpoint at block {index} with an invalid signature.",
+                                              level="warning", index=checkpoint.get("block_index"))
+
+    def _save(self):
+        temp_path = self.path + ".tmp"
+        with open(temp_path, "w") as checkpoint_file:
+            json.dump(self.checkpoints, checkpoint_file, indent=2)
+            checkpoint_file.flush()
+            os.fsync(checkpoint_file.fileno())
+        os.replace(temp_path, self.path)
+
+    def record(self, block_index, block_hash):
+        """
+        Signs and stores a checkpoint for a verified block.
+
+        Returns:
+            dict: The new checkpoint.
+        """
+        checkpoint = {
+            "block_index": block_index,
+            "block_hash": block_hash,
+            "verified_at": time.time(),
+            "signature": self._sign(block_index, block_hash)
+        }
+        self.checkpoints.append(checkpoint)
+        if self.path is not None:
+            self._save()
+        return checkpoint
+
+    def latest_trusted(self, ledger):
+        """
+        Returns the newest checkpoint that still matches the ledger, i.e. whose signature is
+        valid and whose block still carries the checkpointed hash.
+
+        Returns:
+            dict or None: The checkpoint, or None if no checkpoint applies.
+        """
+        for checkpoint in reversed(self.checkpoints):
+            block_index = checkpoint["block_index"]
+            if block_index >= len(ledger.chain):
+                continue
+            if not hmac.compare_digest(self._sign(block_index, checkpoint["block_hash"]), checkpoint["signature"]):
+                continue
+            if ledger.chain[block_index]["hash"] == checkpoint["block_hash"]:
+                return checkpoint
+        return None
+
+
+def check_block(block, expected_index):
+    """
+    Checks one block's internal consistency: position, stored hash and, for batch blocks,
+    the Merkle root and claim count.
+
+    Returns:
+        str or None: A description of the problem, or None if the block is intact.
+    """
+    if block.get("index") != expected_index:
+        return f"index field is {block.get('index')}, expected {expected_index}"
+    try:
+        encoding = encoding_of_block(block)
+    except ValueError as e:
+        return str(e)
+    if "claims" in block:
+        if block.get("claim_count") != len(block["claims"]):
+            return "claim_count does not match the number of claims"
+        claim_digest = encoding.claim_digest
+        if merkle_root([claim_digest(claim_data).hex() for claim_data in block["claims"]]) != block.get("merkle_root"):
+            return "merkle_root does not match the block's claims"
+    if encoding.block_hash(block) != block.get("hash"):
+        return "stored hash does not match block contents"
+    return None
+
+
+def verify_range(start_index, encoded_blocks):
+    """
+    Worker task: re-hashes a contiguous range of blocks and checks the links inside it.
+    Blocks arrive either as dicts or as their raw JSON encoding (bytes).
+
+    Returns:
+        tuple: (start_index, first_bad_index or None, reason or None,
+                first block's previous_hash, last block's hash)
+    """
+    previous_hash = None
+    first_previous_hash = None
+    for offset, encoded in enumerate(encoded_blocks):
+        block = json.loads(encoded) if isinstance(encoded, (bytes, bytearray)) else encoded
+        block_index = start_index + offset
+        if offset == 0:
+            first_previous_hash = block.get("previous_hash")
+        elif block.get("previous_hash") != previous_hash:
+            return start_index, block_index, "previous_hash does not link to the preceding block", first_previous_hash, None
+        problem = check_block(block, block_index)
+        if problem:
+            return start_index, block_index, problem, first_previous_hash, None
+        previous_hash = block.get("hash")
+    return start_index, None, None, first_previous_hash, previous_hash
+
+
+def verify_chain(ledger, workers=None, range_size=DEFAULT_RANGE_SIZE, checkpoint_store=None, full=False):
+    """
+    Verifies that every block's hash matches its contents and that previous_hash links are intact.
+    The chain is split into ranges that are re-hashed in parallel on a process pool, then the
+    range boundaries are linked up in this process. Blocks up to the latest trusted checkpoint
+    in 'checkpoint_store' are skipped unless 'full' is set; a successful run records a new
+    checkpoint at the chain tip.
+
+    Args:
+        ledger (InMemoryLedger): The ledger (or any backend with the same interface) to verify.
+        workers (int, optional): Worker processes. None uses os.cpu_count(); 0 or 1 verifies serially.
+        range_size (int): Blocks per worker task.
+        checkpoint_store (ChainCheckpointStore, optional): Where checkpoints are read and recorded.
+        full (bool): Ignore checkpoints and verify from the genesis block.
+
+    Returns:
+        dict: Report with "valid", "first_corrupted_index", "reason", "start_index", "end_index",
+              "blocks_verified", "elapsed_seconds", "blocks_per_second" and "checkpoint".
+    """
+    started = time.perf_counter()
+    chain_length = len(ledger.chain)
+    start_index = 0
+    expected_previous_hash = GENESIS_PREVIOUS_HASH
+    if checkpoint_store is not None and not full:
+        checkpoint = checkpoint_store.latest_trusted(ledger)
+        if checkpoint is not None:
+            start_index = checkpoint["block_index"] + 1
+            expected_previous_hash = checkpoint["block_hash"]
+
+    ranges = [(range_start, min(range_start + range_size, chain_length))
+              for range_start in range(start_index, chain_length, range_size)]
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = min(workers, len(ranges))
+
+    results = []
+    if workers <= 1:
+        for range_start, range_end in ranges:
+            results.append(verify_range(range_start, ledger._export_block_range(range_start, range_end)))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            # Keep a bounded number of ranges in flight so a long chain is never exported at once.
+            pending = []
+            for range_start, range_end in ranges:
+                pending.append(executor.submit(verify_range, range_start, ledger._export_block_range(range_start, range_end)))
+                if len(pending) >= workers * 2:
+                    results.append(pending.pop(0).result())
+            results.extend(future.result() for future in pending)
+
+    first_bad_index = None
+    reason = None
+    for range_start, bad_index, problem, first_previous_hash, last_hash in results:
+        if first_previous_hash != expected_previous_hash:
+            bad_index, problem = range_start, "previous_hash does not link to the preceding block"
+        if bad_index is not None:
+            first_bad_index, reason = bad_index, problem
+            break
+        expected_previous_hash = last_hash
+
+    elapsed = time.perf_counter() - started
+    blocks_verified = (first_bad_index if first_bad_index is not None else chain_length) - start_index
+    new_checkpoint = None
+    if first_bad_index is None and checkpoint_store is not None and chain_length > start_index:
+        new_checkpoint = checkpoint_store.record(chain_length - 1, expected_previous_hash)
+
+    return {
+        "valid": first_bad_index is None,
+        "first_corrupted_index": first_bad_index,
+        "reason": reason,
+        "start_index": start_index,
+        "end_index": chain_length,
+        "blocks_verified": blocks_verified,
+        "elapsed_seconds": round(elapsed, 6),
+        "blocks_per_second": round(blocks_verified / elapsed, 1) if elapsed > 0 else None,
+        "checkpoint": new_checkpoint
+    }
+
+
+if __name__ == '__main__':
+    # Test chain verification, checkpoints and drift detection.
+    from .ledger import InMemoryLedger
+
+    print("--- Chain Verifier Self-Test ---")
+    ledger = InMemoryLedger()
+    for i in range(20000):
+        ledger.add_claim({"claim_id": f"verify_{i}", "content_hash": f"hash_{i:012d}", "status": "pending_verification"})
+    store = ChainCheckpointStore()
+    report = verify_chain(ledger, workers=4, checkpoint_store=store)
+    print(f"Full run: valid={report['valid']}, verified={report['blocks_verified']}, {report['blocks_per_second']} blocks/s")
+
+    for i in range(10):
+        ledger.add_claim({"claim_id": f"tail_{i}", "content_hash": f"tail_hash_{i:08d}", "status": "pending_verification"})
+    report = verify_chain(ledger, workers=4, checkpoint_store=store)
+    print(f"Incremental run: valid={report['valid']}, start={report['start_index']}, verified={report['blocks_verified']}")
+
+    ledger.chain[15005].claim_data.content_hash = "tampered" # In-place drift inside the checkpointed range
+    report = verify_chain(ledger, workers=4, checkpoint_store=store)
+    print(f"Checkpointed run after drift: valid={report['valid']}, verified={report['blocks_verified']}")
+    report = verify_chain(ledger, workers=4, checkpoint_store=store, full=True)
+    print(f"Full run after drift: valid={report['valid']}, first corrupted={report['first_corrupted_index']} ({report['reason']})")
+    print("--- End of Chain Verifier Self-Test ---")
@@ -0,0 +1,291 @@
+# node/claim_index.py
+
+import datetime
+from array import array
+from bisect import bisect_left, bisect_right, insort
+
+_EPOCH = datetime.datetime(1970, 1, 1)
+_MICROSECOND = datetime.timedelta(microseconds=1)
+_NO_TIMESTAMP = -(1 << 63) # Stored for claims whose timestamp is not a plain ISO-8601 string
+
+# Claims of a status posting list that moved to another status are dropped lazily; the
+# list is rebuilt once this many of them (and more than a quarter of the list) are stale.
+_MIN_STALE_COMPACTION = 1024
+
+
+def timestamp_key(value):
+    """
+    Converts a query bound to the integer microseconds since the epoch the index sorts by.
+
+    Args:
+        value (str, datetime or int): An ISO-8601 timestamp, a datetime (aware ones are
+                                      converted to UTC) or microseconds since the epoch.
+
+    Returns:
+        int: Microseconds since the Unix epoch.
+
+    Raises:
+        ValueError: If a string is not a valid ISO-8601 timestamp.
+        TypeError: For any other type.
+    """
+    if type(value) is int:
+        return value
+    if isinstance(value, str):
+        value = datetime.datetime.fromisoformat(value)
+    if isinstance(value, datetime.datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+        return (value - _EPOCH) // _MICROSECOND
+    raise TypeError(f"Unsupported timestamp bound: {value!r}")
+
+
+class ClaimQueryIndex:
+    """
+    Secondary indexes over a ledger's claims, for filtered and paginated queries.
+    Claims are identified by their packed location in the chain, which only grows as
+    claims are appended, so every posting list is an array('q') already sorted in ledger
+    order and can be bisected. There is one posting list per status, submitter_id and
+    content_type value, plus every claim's timestamp kept both in ledger order and in a
+    sorted (timestamp, location) pair of arrays for time windows.
+    A query walks the shortest matching posting list (or the time window) from the cursor
+    and checks each location against the other filters by bisection, so its cost depends
+    on the page size and the selectivity of the filters, not on the number of claims.
+    Status changes are applied with update_status(): the claim is inserted into its new
+    status list and marked stale in the old one until that list is compacted.
+    """
+    FIELDS = ("status", "submitter_id", "content_type")
+
+    def __init__(self):
+        self._postings = {field: {} for field in self.FIELDS} # field -> value -> array of locations
+        self._stale = {} # status -> locations still in that status list that have moved on
+        self._locations = array("q") # Every indexed claim, in ledger order
+        self._timestamps = array("q") # Each claim's timestamp, parallel to _locations
+        self._time_keys = array("q") # Timestamps in sorted order ...
+        self._time_locations = array("q") # ... and the claim at each of them
+        self._time_in_ledger_order = True # No claim so far was older than the one before it
+
+    def __len__(self):
+        return len(self._locations)
+
+    def add(self, location, status, submitter_id, content_type, timestamp):
+        """
+        Indexes a newly appended claim. Locations must be added in increasing order.
+
+        Args:
+            location (int): The claim's packed location in the chain.
+            status (str): The claim's current status.
+            submitter_id (str): The claim's submitter.
+            content_type (str): The claim's content type.
+            timestamp (int or None): The claim's timestamp in microseconds since the epoch,
+                                     or None if it has none the index can sort by.
+        """
+        for field, value in (("status", status), ("submitter_id", submitter_id), ("content_type", content_type)):
+            if type(value) is str:
+                postings = self._postings[field].get(value)
+                if postings is None:
+                    postings = self._postings[field][value] = array("q")
+                postings.append(location)
+        self._locations.append(location)
+        if timestamp is None:
+            self._timestamps.append(_NO_TIMESTAMP)
+            return
+        self._timestamps.append(timestamp)
+        time_keys = self._time_keys
+        if not time_keys or timestamp >= time_keys[-1]:
+            time_keys.append(timestamp)
+            self._time_locations.append(location)
+        else:
+            self._time_in_ledger_order = False
+            position = bisect_right(time_keys, timestamp)
+            time_keys.insert(position, timestamp)
+            self._time_locations.insert(position, location)
+
+    def update_status(self, location, old_status, new_status):
+        """
+        Moves a claim from one status list to another.
+
+        Args:
+            location (int): The claim's packed location.
+            old_status (str or None): The status it was indexed under.
+            new_status (str): Its new status.
+        """
+        if old_status == new_status:
+            return
+        postings = self._postings["status"]
+        if type(old_status) is str and old_status in postings:
+            stale = self._stale.setdefault(old_status, set())
+            stale.add(location)
+            old_postings = postings[old_status]
+            if len(stale) >= _MIN_STALE_COMPACTION and len(stale) * 4 > len(old_postings):
+                postings[old_status] = array("q", (entry for entry in old_postings if entry not in stale))
+                stale.clear()
+        if type(new_status) is not str:
+            return
+        stale = self._stale.get(new_status)
+        if stale and location in stale:
+            stale.discard(location) # Still in the list from before it moved away
+            return
+        new_postings = postings.get(new_status)
+        if new_postings is None:
+            new_postings = postings[new_status] = array("q")
+        if not new_postings or location > new_postings[-1]:
+            new_postings.append(location)
+        else:
+            insort(new_postings, location)
+
+    def _matches(self, field, value, location):
+        postings = self._postings[field].get(value)
+        if postings is None:
+            return False
+        position = bisect_left(postings, location)
+        if position == len(postings) or postings[position] != location:
+            return False
+        return field != "status" or location not in self._stale.get(value, ())
+
+    def _timestamp_of(self, location):
+        return self._timestamps[bisect_left(self._locations, location)]
+
+    def _time_window(self, since, until):
+        start = bisect_left(self._time_keys, since) if since is not None else 0
+        end = bisect_left(self._time_keys, until) if until is not None else len(self._time_keys)
+        return start, max(start, end)
+
+    def count(self, **filters):
+        """
+        Counts the claims matching the filters of select(). A single equality filter or a
+        time window alone is answered from the index sizes without walking it.
+
+        Returns:
+            int: The number of matching claims.
+        """
+        given = {field: value for field, value in filters.items() if value is not None}
+        if not given:
+            return len(self._locations)
+        if len(given) == 1 and next(iter(given)) in self.FIELDS:
+            (field, value), = given.items()
+            postings = self._postings[field].get(value)
+            if postings is None:
+                return 0
+            return len(postings) - len(self._stale.get(value, ())) if field == "status" else len(postings)
+        if given.keys() <= {"since", "until"}:
+            start, end = self._time_window(timestamp_key(given["since"]) if "since" in given else None,
+                                           timestamp_key(given["until"]) if "until" in given else None)
+            return end - start
+        return sum(1 for _ in self.select(**filters))
+
+    def select(self, status=None, submitter_id=None, content_type=None, since=None, until=None, after=None):
+        """
+        Yields the locations of the claims matching every given filter, in ledger order.
+
+        Args:
+            status (str, optional): Current status of the claim.
+            submitter_id (str, optional): Submitter of the claim.
+            content_type (str, optional): Content type of the claim.
+            since (str, datetime or int, optional): Earliest claim timestamp, inclusive.
+            until (str, datetime or int, optional): Latest claim timestamp, exclusive.
+            after (int, optional): Cursor; only locations after this one are yielded.
+
+        Yields:
+            int: Packed claim locations.
+        """
+        equality = [(field, value) for field, value in
+                    (("status", status), ("submitter_id", submitter_id), ("content_type", content_type))
+                    if value is not None]
+        timed = since is not None or until is not None
+        since = timestamp_key(since) if since is not None else None
+        until = timestamp_key(until) if until is not None else None
+
+        # Pick the smallest candidate list to walk; every other filter is checked per candidate.
+        driver = None
+        candidates = self._locations
+        for field, value in equality:
+            postings = self._postings[field].get(value)
+            if postings is None:
+                return
+            if len(postings) < len(candidates):
+                driver, candidates = (field, value), postings
+        if timed:
+            start, end = self._time_window(since, until)
+            if end - start < len(candidates):
+                driver = ("time", None)
+                if self._time_in_ledger_order:
+                    candidates = self._time_locations[start:end] # Already in ledger order
+                else:
+                    candidates = array("q", sorted(self._time_locations[start:end]))
+
+        checks = [(field, value) for field, value in equality if (field, value) != driver]
+        if driver is not None and driver[0] == "status":
+            checks.append(driver) # Stale entries of the walked status list are skipped here
+        check_time = timed and driver != ("time", None)
+        lowest = since if since is not None else _NO_TIMESTAMP + 1
+        matches = self._matches
+        position = bisect_right(candidates, after) if after is not None else 0
+        while position < len(candidates):
+            location = candidates[position]
+            position += 1
+            if checks and not all(matches(field, value, location) for field, value in checks):
+                continue
+            if check_time:
+                timestamp = self._timestamp_of(location)
+                if timestamp < lowest or (until is not None and timestamp >= until):
+                    continue
+            yield location
+            if driver is not None and driver[0] != "time":
+                # The caller may have added claims or changed statuses while suspended here,
+                # shifting or (after a compaction) replacing the list being walked.
+                candidates = self._postings[driver[0]].get(driver[1]) or candidates
+            position = bisect_right(candidates, location)
+
+if __name__ == '__main__':
+    # Test the index against a brute-force scan.
+    import random
+
+    print("--- Claim Query Index Self-Test ---")
+    rng = random.Random(11)
+    statuses = ["pending_verification", "unverified", "verified_preliminary"]
+    index = ClaimQueryIndex()
+    claims = {}
+    base = timestamp_key("2025-01-01T00:00:00")
+    for n in range(20000):
+        location = (n // 4 << 20) | (n % 4)
+        claim = {"status": "pending_verification", "submitter_id": f"user_{rng.randrange(50)}",
+                 "content_type": rng.choice(["text/plain", "image/jpeg", "video/mp4"]),
+                 "timestamp": base + n * 1000000 + rng.randrange(-5000000, 5000000)}
+        claims[location] = claim
+        index.add(location, claim["status"], claim["submitter_id"], claim["content_type"], claim["timestamp"])
+    for location in rng.sample(sorted(claims), 8000):
+        for _ in range(rng.randrange(1, 3)):
+            new_status = rng.choice(statuses)
+            index.update_status(location, claims[location]["status"], new_status)
+            claims[location]["status"] = new_status
+
+    def scan(status=None, submitter_id=None, content_type=None, since=None, until=None):
+        return [location for location, claim in sorted(claims.items())
+                if (status is None or claim["status"] == status)
+                and (submitter_id is None or claim["submitter_id"] == submitter_id)
+                and (content_type is None or claim["content_type"] == content_type)
+                and (since is None or claim["timestamp"] >= since) and (until is None or claim["timestamp"] < until)]
+
+    queries = [{"status": "pending_verification"}, {"submitter_id": "user_7"},
+               {"status": "verified_preliminary", "content_type": "image/jpeg"},
+               {"since": base + 5000 * 1000000, "until": base + 5600 * 1000000},
+               {"submitter_id": "user_3", "since": base + 1000 * 1000000, "status": "unverified"}, {}]
+    mismatches = sum(list(index.select(**query)) != scan(**query) for query in queries)
+    print(f"Out-of-order timestamps handled: {not index._time_in_ledger_order}")
+    print(f"Query mismatches against a full scan: {mismatches} of {len(queries)}")
+    print(f"Count of pending claims matches: {index.count(status='pending_verification') == len(scan(status='pending_verification'))}")
+
+    pages, cursor, collected = 0, None, []
+    while True:
+        page = []
+        for location in index.select(submitter_id="user_7", after=cursor):
+            page.append(location)
+            if len(page) == 25:
+                break
+        if not page:
+            break
+        pages += 1
+        collected.extend(page)
+        cursor = page[-1]
+    print(f"Paginated {len(collected)} claims of user_7 in {pages} pages, complete: {collected == scan(submitter_id='user_7')}")
+    print("--- End of Claim Query Index Self-Test ---")
@@ -0,0 +1,157 @@
+# node/claim_status.py
+
+# Aggregate status of a claim, maintained incrementally from its verification events.
+# Verdicts are ranked; a claim's status is the highest-ranked verdict any event reported,
+# or DEFAULT_STATUS while no ranked verdict has arrived. This is the MVP1 rule: any
+# "verified_preliminary" settles the claim, otherwise any "unverified" marks it unverified.
+DEFAULT_STATUS = "pending_verification"
+VERDICT_RANKS = {"unverified": 1, "verified_preliminary": 2}
+
+
+class ClaimStatus:
+    """
+    The running aggregate of one claim's verification events: best verdict, confidence
+    averaged over the events that report one (weighted per event), event count, and the
+    latest event of each agent. apply() folds in one event in O(1) (a claim sees a handful
+    of agents), so the status of a claim never has to be recomputed from its history.
+    One instance is kept per verified claim, so the per-agent results are a small tuple
+    rather than a dict.
+    """
+    __slots__ = ("best_verdict", "best_rank", "confidence_total", "confidence_weight", "event_count", "latest",
+                 "last_position")
+
+    def __init__(self):
+        self.best_verdict = None
+        self.best_rank = 0
+        self.confidence_total = 0.0
+        self.confidence_weight = 0.0
+        self.event_count = 0
+        self.latest = () # Each agent's latest event (dict or VerificationEvent), in first-seen order
+        self.last_position = None # Where the owning ledger logged the latest event, if it tracks that
+
+    @classmethod
+    def from_history(cls, verification_history):
+        """
+        Builds the aggregate of an existing list of events, e.g. a claim's submitted history.
+        """
+        status = cls()
+        for event in verification_history:
+            status.apply(event)
+        return status
+
+    @classmethod
+    def from_dict(cls, summary):
+        """
+        Restores an aggregate saved with to_dict().
+        """
+        status = cls()
+        status.best_verdict = summary.get("best_verdict")
+        status.best_rank = VERDICT_RANKS.get(status.best_verdict, 0)
+        status.confidence_total = summary.get("confidence_total", 0.0)
+        status.confidence_weight = summary.get("confidence_weight", 0.0)
+        status.event_count = summary.get("event_count", 0)
+        status.latest = tuple(dict(result, agent_id=agent_id)
+                              for agent_id, result in summary.get("latest_by_agent", {}).items())
+        return status
+
+    @property
+    def status(self):
+        return self.best_verdict if self.best_verdict is not None else DEFAULT_STATUS
+
+    @property
+    def confidence(self):
+        """
+        Returns:
+            float or None: Weighted mean confidence score, or None if no event reported one.
+        """
+        if not self.confidence_weight:
+            return None
+        return round(self.confidence_total / self.confidence_weight, 4)
+
+    def apply(self, event, weight=1.0):
+        """
+        Folds one verification event into the aggregate.
+
+        Args:
+            event (dict or VerificationEvent): The event.
+            weight (float): Weight of the event's confidence score in the mean.
+
+        Returns:
+            str: The claim's status after the event.
+        """
+        verdict = event.get("verdict")
+        rank = VERDICT_RANKS.get(verdict, 0) if type(verdict) is str else 0
+        if rank > self.best_rank:
+            self.best_rank = rank
+            self.best_verdict = verdict
+        confidence = event.get("confidence_score")
+        if type(confidence) in (int, float) and weight:
+            self.confidence_total += confidence * weight
+            self.confidence_weight += weight
+        self.event_count += 1
+        agent_id = event.get("agent_id")
+        if agent_id is not None:
+            latest = self.latest
+            for position, previous in enumerate(latest):
+                if previous.get("agent_id") == agent_id:
+                    self.latest = latest[:position] + (event,) + latest[position + 1:]
+                    break
+            else:
+                self.latest = latest + (event,)
+        return self.status
+
+    def to_dict(self):
+        """
+        Returns:
+            dict: The aggregate, with each agent's latest verdict, confidence and timestamp.
+        """
+        return {
+            "status": self.status,
+            "best_verdict": self.best_verdict,
+            "confidence": self.confidence,
+            "confidence_total": self.confidence_total,
+            "confidence_weight": self.confidence_weight,
+            "event_count": self.event_count,
+            "latest_by_agent": {
+                event.get("agent_id"): {"verdict": event.get("verdict"), "confidence_score": event.get("confidence_score"),
+                                        "timestamp": event.get("timestamp")}
+                for event in self.latest
+            }
+        }
+
+
+if __name__ == '__main__':
+    # Test that incremental aggregation matches the original full-history scan.
+    import random
+
+    print("--- Claim Status Self-Test ---")
+
+    def scan_status(verification_history):
+        final_verdict = DEFAULT_STATUS
+        for res in verification_history:
+            if res.get("verdict") == "verified_preliminary":
+                return "verified_preliminary"
+            elif res.get("verdict") == "unverified":
+                final_verdict = "unverified"
+        return final_verdict
+
+    rng = random.Random(7)
+    verdicts = ["verified_preliminary", "unverified", "caution_advised", "error_agent_timeout", None]
+    mismatches = 0
+    for _ in range(1000):
+        history = [{"agent_id": f"agent_{rng.randrange(3)}", "verdict": rng.choice(verdicts),
+                    "confidence_score": rng.random()} for _ in range(rng.randrange(6))]
+        status = ClaimStatus()
+        for event in history:
+            status.apply(event)
+        mismatches += status.status != scan_status(history)
+    print(f"Mismatches against full scan over 1000 random histories: {mismatches}")
+
+    status = ClaimStatus.from_history([
+        {"agent_id": "simple_verifier_v1", "verdict": "unverified", "confidence_score": 0.2},
+        {"agent_id": "known_facts_v1", "verdict": "caution_advised", "confidence_score": 0.5}
+    ])
+    status.apply({"agent_id": "simple_verifier_v1", "verdict": "verified_preliminary", "confidence_score": 0.8}, weight=2.0)
+    print(f"Summary: {status.to_dict()}")
+    print(f"Restored from summary: {ClaimStatus.from_dict(status.to_dict()).to_dict() == status.to_dict()}")
+    print("--- End of Claim Status Self-Test ---")
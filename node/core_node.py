@@ -1,40 +1,130 @@
 # node/core_node.py
 
-from .ledger import InMemoryLedger # Use a relative import
+from .instrumentation import DEFAULT_INSTRUMENTATION
 import datetime
-from agents.simple_verifier_agent import SimpleVerifierAgent # New import
-from agents.known_facts_agent import KnownFactsAgent # New import
+import importlib
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from agents.registry import AgentRegistry
+from agents.result_cache import VerificationResultCache
 
 class HeliosCoreNode:
-    def __init__(self, node_id="helios_node_001"):
-        self.node_id = node_id
-        self.ledger = InMemoryLedger() # Each node instance will have its own ledger for MVP1
-        self.ai_agents = {} 
-        self._register_default_agents() # New method call
-        print(f"HeliosCoreNode '{self.node_id}' initialized.")
-        self.ledger.display_ledger() # Display initial ledger state (genesis block)
-    
-    def _register_default_agents(self):
+    # Ledger backends selectable by name in the constructor, as "module:Class" relative to
+    # this package. Only the selected backend is imported, so a memory-backed node never
+    # loads the on-disk or multiprocessing machinery.
+    LEDGER_BACKENDS = {
+        "memory": ".ledger:InMemoryLedger",
+        "segmented": ".segmented_ledger:SegmentedLedger",
+        "sharded": ".sharded_ledger:ShardedLedger"
+    }
+
+    # Verdicts that settle a claim's aggregate status no matter what other agents return.
+    DECISIVE_VERDICTS = ("verified_preliminary",)
+
+    # What to do when a claim is submitted for content the ledger already holds:
+    # "off" does not look; "link" records the first claim of the content in the new claim's
+    # metadata as "duplicate_of"; "reuse" also reuses that claim's results from
+    # content-derived agents, so verifying a duplicate only runs the other agents.
+    DUPLICATE_POLICIES = ("off", "link", "reuse")
+
+    def __init__(self, node_id="helios_node_001", ledger_backend="memory", ledger_options=None,
+                 agent_workers=8, agent_timeout=10.0, result_cache_size=100000, instrumentation=None,
+                 agent_batch_size=1, agent_batch_wait=0.005, blob_store=None, duplicate_policy="reuse", agent_registry=None,
+                 scheduler_options=None):
         """
-        Registers default AI agents available to this node.
+        Args:
+            node_id (str): Identifier of this node.
+            ledger_backend (str): Name of the ledger backend, a key of LEDGER_BACKENDS.
+            ledger_options (dict, optional): Keyword arguments for the backend's constructor,
+                                             e.g. {"data_dir": "..."} for "segmented" or
+                                             {"shards": 8} for "sharded".
+            agent_workers (int): Size of the thread pool that runs agents concurrently.
+            agent_timeout (float or None): Default per-agent timeout in seconds; None waits forever.
+                                           Individual agents can override it in register_ai_agent().
+            result_cache_size (int): Capacity of the agent result cache; 0 disables caching.
+            instrumentation (Instrumentation, optional): Event/metrics surface shared with the
+                                                         ledger and registered agents. Defaults to
+                                                         the shared, initially disabled instance;
+                                                         add a ConsoleSink for the classic output.
+            agent_batch_size (int): Largest micro-batch of claims handed to one agent at a time.
+                                    Claims verified concurrently (e.g. by the verification
+                                    pipeline) are grouped per agent and sent through the agent's
+                                    verify_claims_batch(). 1 disables micro-batching.
+            agent_batch_wait (float): Longest time in seconds a claim waits for its agent's
+                                      micro-batch to fill before the batch is sent anyway.
+            blob_store (BlobStore, optional): Local content store. Content submitted through
+                                              submit_content() and submit_contents() is kept in
+                                              it, and agents with NEEDS_CONTENT receive a claim's
+                                              content from it as a read-only memoryview.
+            duplicate_policy (str): One of DUPLICATE_POLICIES.
+            agent_registry (AgentRegistry, optional): The agents this node may run, described
+                                                      without importing them. Each is imported
+                                                      and instantiated the first time a claim it
+                                                      handles is verified. Defaults to
+                                                      AgentRegistry.default() (agents/agents.json
+                                                      plus installed entry points).
+            scheduler_options (dict, optional): Keyword arguments for the VerificationScheduler
+                                                that orders pending claims, e.g.
+                                                {"rate_limit": 50, "aging_interval": 30}.
+                                                The default policy ranks submitters by their
+                                                reputation in KnownFactsAgent's rule file.
+
+        Constructing a node writes nothing to the console; route its events to a
+        ConsoleSink for verbose output, and call view_entire_ledger() to print the ledger.
         """
-        simple_agent = SimpleVerifierAgent()
-        self.register_ai_agent(simple_agent.agent_id, simple_agent)
-        
-        known_facts_agent = KnownFactsAgent() # Instantiate new agent
-        self.register_ai_agent(known_facts_agent.agent_id, known_facts_agent) # Register it
+        if ledger_backend not in self.LEDGER_BACKENDS:
+            raise ValueError(f"Unknown ledger backend '{ledger_backend}'. Available: {sorted(self.LEDGER_BACKENDS)}")
+        if duplicate_policy not in self.DUPLICATE_POLICIES:
+            raise ValueError(f"Unknown duplicate policy '{duplicate_policy}'. Available: {list(self.DUPLICATE_POLICIES)}")
+        self.node_id = node_id
+        self.instrumentation = instrumentation or DEFAULT_INSTRUMENTATION
+        ledger_options = dict(ledger_options or {})
+        ledger_options.setdefault("instrumentation", self.instrumentation)
+        self.ledger = self.ledger_backend_class(ledger_backend)(**ledger_options) # Each node instance will have its own ledger for MVP1
+        self.ai_agents = {} # agent_id -> agent instance, for registered and loaded agents
+        self.agent_registry = agent_registry if agent_registry is not None else AgentRegistry.default()
+        self._agent_load_lock = threading.Lock()
+        self._failed_agent_loads = set() # agent_ids whose factory failed; not retried
+        self.agent_timeout = agent_timeout
+        self.agent_timeouts = {} # agent_id -> timeout overriding agent_timeout
+        self.agent_weights = {} # agent_id -> weight of its confidence scores in claim summaries
+        self._agent_executor = ThreadPoolExecutor(max_workers=agent_workers, thread_name_prefix=f"{node_id}-agent")
+        self.agent_batch_size = agent_batch_size
+        self.agent_batch_wait = agent_batch_wait
+        self._agent_batchers = {} # agent_id -> AgentMicroBatcher, created on first use
+        self._agent_batchers_lock = threading.Lock()
+        self.verification_pipeline = None # Set by start_verification_pipeline()
+        self._scheduler_options = dict(scheduler_options or {})
+        self._verification_scheduler = None # Created on first use
+        self._verification_scheduler_lock = threading.Lock()
+        self.replication_server = None # Set by start_replication_server()
+        self._content_hasher = None # Created by the first submit_contents() call
+        self._content_hasher_lock = threading.Lock()
+        self.blob_store = blob_store
+        self.duplicate_policy = duplicate_policy
+        self.duplicate_detector = None
+        if duplicate_policy != "off":
+            from .duplicate_detector import DuplicateDetector
+            self.duplicate_detector = DuplicateDetector(self.ledger, instrumentation=self.instrumentation)
+        self.result_cache = VerificationResultCache(max_entries=result_cache_size) if result_cache_size else None
+        self.instrumentation.event("node_initialized", "HeliosCoreNode '{node_id}' initialized.", node_id=self.node_id)
 
-    def submit_new_claim(self, content_hash, content_type, submitter_id, metadata=None):
+    @classmethod
+    def ledger_backend_class(cls, ledger_backend):
         """
-        Allows submission of a new claim to this node's ledger.
+        Imports and returns the class of a ledger backend named in LEDGER_BACKENDS.
         """
-        if not all([content_hash, content_type, submitter_id]):
-            print("Error: content_hash, content_type, and submitter_id are required.")
-            return None
+        module_name, _, class_name = cls.LEDGER_BACKENDS[ledger_backend].partition(":")
+        return getattr(importlib.import_module(module_name, __package__), class_name)
 
-        claim_id = f"claim_{self.node_id}_{len(self.ledger.chain)}_{datetime.datetime.utcnow().strftime('%Y%m%d%H%M%S%f')}"
-        
-        new_claim_data = {
+    def _build_claim_data(self, claim_id, content_hash, content_type, submitter_id, metadata=None):
+        """
+        Builds the initial claim dictionary stored in the ledger.
+        """
+        return {
             "claim_id": claim_id,
             "timestamp": str(datetime.datetime.utcnow().isoformat()),
             "submitter_id": submitter_id,
@@ -44,17 +134,369 @@ class HeliosCoreNode:
             "verification_history": [], # Will be populated by AI agents later
             "status": "pending_verification" # Initial status
         }
+
+    def submit_new_claim(self, content_hash, content_type, submitter_id, metadata=None):
+        """
+        Allows submission of a new claim to this node's ledger.
+        While the verification pipeline is running, the claim is also queued for verification
+        (call from the pipeline's event loop; use submit_claim_for_verification() to wait for
+        queue space and get the claim's future).
+        """
+        new_claim_data = self._add_new_claim(content_hash, content_type, submitter_id, metadata)
+        if new_claim_data and self.verification_pipeline is not None and self.verification_pipeline.running:
+            if self.verification_pipeline.enqueue_nowait(new_claim_data["claim_id"], new_claim_data) is None:
+                self.instrumentation.event("verification_queue_full", "Warning: Verification queue full; claim '{claim_id}' left pending.",
+                                           level="warning", claim_id=new_claim_data["claim_id"])
+        return new_claim_data
+
+    def _add_new_claim(self, content_hash, content_type, submitter_id, metadata=None):
+        """
+        Builds a claim and appends it to the ledger.
+        """
+        if not all([content_hash, content_type, submitter_id]):
+            self.instrumentation.event("claim_rejected", "Error: content_hash, content_type, and submitter_id are required.", level="error")
+            return None
+
+        instrumentation = self.instrumentation
+        if instrumentation.metrics:
+            started = time.perf_counter()
+        claim_id = f"claim_{self.node_id}_{len(self.ledger.chain)}_{datetime.datetime.utcnow().strftime('%Y%m%d%H%M%S%f')}"
+        canonical_id = self.duplicate_detector.find_canonical(content_hash) if self.duplicate_detector is not None else None
+        metadata = self._link_duplicate(metadata, canonical_id)
+        
+        new_claim_data = self._build_claim_data(claim_id, content_hash, content_type, submitter_id, metadata)
         
         block = self.ledger.add_claim(new_claim_data)
         if block:
-            print(f"Node '{self.node_id}' successfully submitted claim '{claim_id}' to its ledger.")
+            if self.duplicate_detector is not None and canonical_id is None:
+                self.duplicate_detector.add(content_hash)
+            if instrumentation.metrics:
+                instrumentation.observe("node.submit", time.perf_counter() - started)
+                instrumentation.increment("node.claims_submitted")
+            if instrumentation.emitting:
+                instrumentation.event("claim_submitted", "Node '{node_id}' successfully submitted claim '{claim_id}' to its ledger.",
+                                      node_id=self.node_id, claim_id=claim_id)
             # In a real system, this claim would be broadcast to the network.
             # For MVP1, it's just local to this node's ledger.
             return new_claim_data
         else:
-            print(f"Node '{self.node_id}' failed to submit claim to its ledger.")
+            instrumentation.event("claim_submit_failed", "Node '{node_id}' failed to submit claim to its ledger.",
+                                  level="error", node_id=self.node_id)
+            return None
+
+    @staticmethod
+    def _link_duplicate(metadata, canonical_id):
+        """
+        Returns the claim's metadata with "duplicate_of" set to the node's own finding: a
+        submitter-supplied link is dropped, since reuse trusts it to pick whose results to copy.
+        """
+        if isinstance(metadata, dict) and "duplicate_of" in metadata:
+            metadata = {key: value for key, value in metadata.items() if key != "duplicate_of"}
+        if canonical_id is not None:
+            metadata = dict(metadata or {}, duplicate_of=canonical_id)
+        return metadata
+
+    def submit_claims_batch(self, claims):
+        """
+        Submits several claims at once, packed into a single ledger block whose header
+        carries a Merkle root over the claims.
+
+        Args:
+            claims (list): Dictionaries with the same fields as submit_new_claim's arguments:
+                           "content_hash", "content_type", "submitter_id" and optional "metadata".
+
+        Returns:
+            list or None: The created claim dictionaries in submission order, or None if the
+                          batch was rejected. Invalid entries are skipped with an error message.
+        """
+        instrumentation = self.instrumentation
+        if instrumentation.metrics:
+            started = time.perf_counter()
+        block_index = len(self.ledger.chain)
+        batch_timestamp = datetime.datetime.utcnow().strftime('%Y%m%d%H%M%S%f')
+        new_claims = []
+        detector = self.duplicate_detector
+        batch_canonicals = {} # content_hash -> first claim of it in this batch, for content new to the ledger
+        for position, claim in enumerate(claims):
+            content_hash = claim.get("content_hash")
+            content_type = claim.get("content_type")
+            submitter_id = claim.get("submitter_id")
+            if not all([content_hash, content_type, submitter_id]):
+                instrumentation.event("claim_rejected", "Error: Batch entry {position} is missing content_hash, content_type or submitter_id; skipped.",
+                                      level="error", position=position)
+                continue
+            claim_id = f"claim_{self.node_id}_{block_index}_{len(new_claims)}_{batch_timestamp}"
+            canonical_id = None
+            if detector is not None:
+                canonical_id = batch_canonicals.get(content_hash) or detector.find_canonical(content_hash)
+                if canonical_id is None:
+                    batch_canonicals[content_hash] = claim_id
+            metadata = self._link_duplicate(claim.get("metadata"), canonical_id)
+            new_claims.append(self._build_claim_data(claim_id, content_hash, content_type, submitter_id, metadata))
+
+        if not new_claims:
+            instrumentation.event("batch_rejected", "Node '{node_id}' received an empty claim batch.", level="error", node_id=self.node_id)
             return None
 
+        block = self.ledger.add_claims_batch(new_claims)
+        if block:
+            for content_hash in batch_canonicals:
+                detector.add(content_hash)
+            if instrumentation.metrics:
+                instrumentation.observe("node.submit_batch", time.perf_counter() - started)
+                instrumentation.increment("node.claims_submitted", len(new_claims))
+            if instrumentation.emitting:
+                instrumentation.event("claim_batch_submitted", "Node '{node_id}' successfully submitted a batch of {claims} claims to its ledger.",
+                                      node_id=self.node_id, claims=len(new_claims))
+            return new_claims
+        else:
+            instrumentation.event("batch_submit_failed", "Node '{node_id}' failed to submit claim batch to its ledger.",
+                                  level="error", node_id=self.node_id)
+            return None
+
+    @staticmethod
+    def _content_metadata(metadata, source, size_bytes):
+        """
+        Adds the content's size, and its file name when it came from a file, to the claim metadata.
+        """
+        metadata = dict(metadata or {})
+        metadata.setdefault("size_bytes", size_bytes)
+        if source is not None:
+            metadata.setdefault("filename", os.path.basename(source))
+        return metadata
+
+    def submit_content(self, content, submitter_id, content_type=None, metadata=None):
+        """
+        Hashes content with SHA-256 and submits a claim for it.
+        Files are hashed in fixed-size chunks (large ones through mmap) and streams chunk by
+        chunk, so the content is never loaded whole. See node.content_hashing. With a blob
+        store, the content is also stored under its hash (once, however often it is submitted).
+
+        Args:
+            content: A file path, a bytes-like buffer or a binary stream (read to its end).
+            submitter_id (str): The submitter of the claim.
+            content_type (str, optional): MIME type; guessed from the file name for paths.
+            metadata (dict, optional): Claim metadata; "size_bytes" (and "filename" for paths)
+                                       are added unless already present.
+
+        Returns:
+            dict or None: The created claim, or None if the content could not be read or the
+                          claim was rejected.
+        """
+        from .content_hashing import DEFAULT_CONTENT_TYPE, guess_content_type, hash_content
+        try:
+            if self.blob_store is not None:
+                content_hash, size_bytes = self.blob_store.put(content)
+            else:
+                content_hash, size_bytes = hash_content(content)
+        except (OSError, TypeError, ValueError) as e:
+            self.instrumentation.event("content_rejected", "Error: Could not hash content: {error}", level="error", error=str(e))
+            return None
+        source = os.fspath(content) if isinstance(content, (str, os.PathLike)) else None
+        if content_type is None:
+            content_type = guess_content_type(source) if source is not None else DEFAULT_CONTENT_TYPE
+        return self.submit_new_claim(content_hash, content_type, submitter_id,
+                                     self._content_metadata(metadata, source, size_bytes))
+
+    def submit_contents(self, contents, submitter_id, content_type=None, metadata=None, batch_size=1000):
+        """
+        Hashes many contents in parallel and submits their claims in batch blocks.
+        Directories are expanded into the files below them. Hashing runs on a thread pool
+        with a bounded number of contents in flight, and claims are submitted every
+        'batch_size' contents, so memory stays bounded however many files are given.
+        With a blob store, each content is stored as it is hashed.
+
+        Args:
+            contents (iterable): File or directory paths, bytes-like buffers and binary streams.
+            submitter_id (str): The submitter of every claim.
+            content_type (str, optional): MIME type of every claim; guessed per file otherwise.
+            metadata (dict, optional): Metadata shared by every claim (see submit_content()).
+            batch_size (int): Claims per ledger block.
+
+        Returns:
+            list: The created claims, in content order. Contents that could not be read are
+                  skipped with an error message.
+        """
+        from .content_hashing import DEFAULT_CONTENT_TYPE, ContentHasher, guess_content_type
+        with self._content_hasher_lock:
+            if self._content_hasher is None:
+                self._content_hasher = ContentHasher(blob_store=self.blob_store)
+        created = []
+        batch = []
+        for result in self._content_hasher.hash_all(contents):
+            if "error" in result:
+                self.instrumentation.event("content_rejected", "Error: Could not hash '{source}': {error}", level="error",
+                                           source=result["source"], error=result["error"])
+                continue
+            source = result["source"]
+            batch.append({
+                "content_hash": result["content_hash"],
+                "content_type": content_type or (guess_content_type(source) if source is not None else DEFAULT_CONTENT_TYPE),
+                "submitter_id": submitter_id,
+                "metadata": self._content_metadata(metadata, source, result["size_bytes"])
+            })
+            if len(batch) >= batch_size:
+                created.extend(self.submit_claims_batch(batch) or ())
+                batch = []
+        if batch:
+            created.extend(self.submit_claims_batch(batch) or ())
+        return created
+
+    async def start_verification_pipeline(self, workers=4, queue_size=1024, stop_when_settled=False):
+        """
+        Starts the asyncio verification pipeline on the running event loop.
+        See node.verification_pipeline.VerificationPipeline for the parameters.
+
+        Returns:
+            VerificationPipeline: The running pipeline.
+        """
+        if self.verification_pipeline is None or not self.verification_pipeline.running:
+            from .verification_pipeline import VerificationPipeline # asyncio is only imported by nodes that use it
+            self.verification_pipeline = VerificationPipeline(self, workers, queue_size, stop_when_settled)
+            await self.verification_pipeline.start()
+        return self.verification_pipeline
+
+    async def stop_verification_pipeline(self, drain=True):
+        """
+        Stops the verification pipeline, by default after verifying every queued claim.
+        """
+        if self.verification_pipeline is not None:
+            await self.verification_pipeline.stop(drain=drain)
+
+    async def submit_claim_for_verification(self, content_hash, content_type, submitter_id, metadata=None, urgency=None):
+        """
+        Submits a claim and queues it on the running verification pipeline, waiting while
+        the queue is full. 'urgency' is a priority level overriding the scheduler's policy
+        (see node.verification_scheduler.PRIORITY_LEVELS).
+
+        Returns:
+            tuple or None: (claim_data, future) where the future resolves to the verification
+                           outcome, or None if the claim was rejected.
+        """
+        if self.verification_pipeline is None or not self.verification_pipeline.running:
+            raise RuntimeError(f"Verification pipeline is not running on Node '{self.node_id}'.")
+        new_claim_data = self._add_new_claim(content_hash, content_type, submitter_id, metadata)
+        if not new_claim_data:
+            return None
+        future = await self.verification_pipeline.enqueue(new_claim_data["claim_id"], new_claim_data, urgency)
+        return new_claim_data, future
+
+    @property
+    def verification_scheduler(self):
+        """
+        The VerificationScheduler ordering this node's pending claims, created on first use
+        from 'scheduler_options'. The verification pipeline takes its claims from it.
+        """
+        if self._verification_scheduler is None:
+            with self._verification_scheduler_lock:
+                if self._verification_scheduler is None:
+                    from .verification_scheduler import PriorityPolicy, VerificationScheduler
+                    options = dict(self._scheduler_options)
+                    options.setdefault("instrumentation", self.instrumentation)
+                    if options.get("policy") is None:
+                        options["policy"] = PriorityPolicy.from_rules()
+                    self._verification_scheduler = VerificationScheduler(**options)
+        return self._verification_scheduler
+
+    def schedule_verification(self, claim_id, urgency=None):
+        """
+        Schedules a pending claim for verification in priority order rather than verifying
+        it now. While the verification pipeline is running the claim is queued on it (call
+        from its event loop); otherwise verify_scheduled() verifies scheduled claims.
+
+        Args:
+            claim_id (str): The claim to verify.
+            urgency (str, optional): Priority level overriding the scheduler's policy.
+
+        Returns:
+            bool: False if the claim does not exist or the scheduler is full.
+
+        Raises:
+            ValueError: If 'urgency' is not a priority level.
+        """
+        claim_data = self.ledger.get_claim_by_id(claim_id, with_events=False)
+        if claim_data is None:
+            return False
+        if self.verification_pipeline is not None and self.verification_pipeline.running:
+            return self.verification_pipeline.enqueue_nowait(claim_id, claim_data, urgency) is not None
+        return self.verification_scheduler.push(claim_data, urgency)
+
+    def verify_scheduled(self, max_claims=None, stop_when_settled=False):
+        """
+        Verifies scheduled claims one at a time in the scheduler's order, until none is
+        ready (claims held back by a rate limit stay scheduled) or 'max_claims' are done.
+
+        Returns:
+            list: (claim_id, status) per claim, in verification order; status is None if
+                  nothing was verified.
+        """
+        if self.verification_pipeline is not None and self.verification_pipeline.running:
+            raise RuntimeError(f"The verification pipeline on Node '{self.node_id}' is verifying scheduled claims.")
+        scheduler = self.verification_scheduler
+        verified = []
+        while max_claims is None or len(verified) < max_claims:
+            popped = scheduler.pop()
+            if popped is None:
+                break
+            claim_id = popped[0]
+            verified.append((claim_id, self.trigger_verification(claim_id, stop_when_settled=stop_when_settled)))
+        return verified
+
+    def start_replication_server(self, host="127.0.0.1", port=0):
+        """
+        Serves this node's ledger to other nodes syncing over TCP.
+
+        Args:
+            host (str): Interface to listen on.
+            port (int): Port to listen on; 0 picks a free one.
+
+        Returns:
+            tuple: The (host, port) the server listens on.
+
+        Raises:
+            ValueError: If the ledger backend does not support replication ("sharded").
+        """
+        if self.replication_server is None:
+            from .replication import ReplicationServer
+            self.replication_server = ReplicationServer(self.ledger, host, port)
+            self.replication_server.start()
+            self.instrumentation.event("replication_serving", "Node '{node_id}' serving replication on {host}:{port}.",
+                                       node_id=self.node_id, host=self.replication_server.address[0],
+                                       port=self.replication_server.address[1])
+        return self.replication_server.address
+
+    def sync_from_peer(self, peer, batch_size=2000):
+        """
+        Catches this node's ledger up with a peer's longer chain. See node.replication.LedgerReplicator.
+
+        Args:
+            peer: Another HeliosCoreNode in this process, a (host, port) tuple of a node
+                  running start_replication_server(), or a LocalPeer/RemotePeer.
+            batch_size (int): Blocks fetched per request.
+
+        Returns:
+            dict: The sync report.
+
+        Raises:
+            ValueError: If either ledger does not support replication ("sharded"), or the
+                        peer's blocks fail verification.
+        """
+        from .replication import LedgerReplicator, LocalPeer, RemotePeer
+        close_peer = False
+        if isinstance(peer, HeliosCoreNode):
+            peer = LocalPeer(peer.ledger)
+        elif isinstance(peer, tuple):
+            peer = RemotePeer(*peer)
+            close_peer = True
+        try:
+            report = LedgerReplicator(self.ledger, batch_size=batch_size, instrumentation=self.instrumentation).sync_from(peer)
+            if self.duplicate_detector is not None and report.get("blocks_fetched"):
+                self.duplicate_detector.reset() # Claims arrived without passing through submit
+            return report
+        finally:
+            if close_peer:
+                peer.close()
+
     def view_claim(self, claim_id):
         """
         Retrieves and displays a specific claim from the ledger.
@@ -77,109 +519,498 @@ class HeliosCoreNode:
         print(f"\n--- Full Ledger View for Node '{self.node_id}' ---")
         self.ledger.display_ledger()
 
+    def close(self):
+        """
+        Shuts the node down, flushing and closing its ledger.
+        Agents that are still running (e.g. after a timeout) are not waited for.
+        """
+        with self._agent_batchers_lock:
+            batchers = list(self._agent_batchers.values())
+            self._agent_batchers.clear()
+        for batcher in batchers:
+            batcher.close()
+        self._agent_executor.shutdown(wait=False)
+        if self.replication_server is not None:
+            self.replication_server.stop()
+            self.replication_server = None
+        if self._content_hasher is not None:
+            self._content_hasher.close()
+            self._content_hasher = None
+        if self.blob_store is not None:
+            self.blob_store.close()
+        self.ledger.close()
+
     # Placeholder for AI agent interaction
-    def register_ai_agent(self, agent_id, agent_instance):
+    def register_ai_agent(self, agent_id, agent_instance, timeout=None, weight=1.0):
+        """
+        Registers an agent with this node.
+
+        Args:
+            agent_id (str): ID under which the agent is registered.
+            agent_instance (BaseVerificationAgent): The agent.
+            timeout (float, optional): Per-agent timeout in seconds, overriding the node default.
+            weight (float): Weight of the agent's confidence scores in a claim's weighted confidence.
+        """
         self.ai_agents[agent_id] = agent_instance
-        print(f"AI Agent '{agent_id}' registered with Node '{self.node_id}'.")
+        with self._agent_batchers_lock:
+            replaced_batcher = self._agent_batchers.pop(agent_id, None)
+        if replaced_batcher is not None:
+            replaced_batcher.close()
+        agent_instance.attach_instrumentation(self.instrumentation)
+        if timeout is not None:
+            self.agent_timeouts[agent_id] = timeout
+        else:
+            self.agent_timeouts.pop(agent_id, None)
+        if weight != 1.0:
+            self.agent_weights[agent_id] = weight
+        else:
+            self.agent_weights.pop(agent_id, None)
+        self.instrumentation.event("agent_registered", "AI Agent '{agent_id}' registered with Node '{node_id}'.",
+                                   agent_id=agent_id, node_id=self.node_id)
 
-    def trigger_verification(self, claim_id, agent_id=None):
+    def _load_agent(self, spec):
         """
-        Triggers registered AI agents to verify a claim.
-        If agent_id is specified, only that agent is used.
-        Otherwise, all agents that support the claim's content type are triggered.
+        Imports, instantiates and registers an agent from its registry spec, once. An agent
+        whose factory fails is reported and not tried again.
+
+        Returns:
+            BaseVerificationAgent or None: The agent, or None if it could not be loaded.
         """
-        claim_data = self.ledger.get_claim_by_id(claim_id)
+        with self._agent_load_lock:
+            agent = self.ai_agents.get(spec.agent_id)
+            if agent is not None or spec.agent_id in self._failed_agent_loads:
+                return agent
+            instrumentation = self.instrumentation
+            started = time.perf_counter()
+            try:
+                agent = spec.load()
+            except Exception as e:
+                self._failed_agent_loads.add(spec.agent_id)
+                instrumentation.event("agent_load_failed", "Error: Could not load agent '{agent_id}': {error}", level="error",
+                                      agent_id=spec.agent_id, error=e)
+                return None
+            self.register_ai_agent(spec.agent_id, agent, timeout=spec.timeout, weight=spec.weight)
+            elapsed = time.perf_counter() - started
+            if instrumentation.metrics:
+                instrumentation.observe("node.agent_load", elapsed)
+                instrumentation.increment("agent.loads")
+            instrumentation.event("agent_loaded", "Loaded agent '{agent_id}' v{agent_version} in {seconds:.3f}s.", level="debug",
+                                  agent_id=spec.agent_id, agent_version=agent.agent_version, seconds=elapsed)
+            return agent
+
+    def _agents_for(self, content_type):
+        """
+        Returns the agents that handle a content type, first loading those the registry
+        describes as handling it that have not been loaded yet.
+        """
+        for spec in self.agent_registry.matching(content_type):
+            if spec.agent_id not in self.ai_agents:
+                self._load_agent(spec)
+        return [agent for agent in list(self.ai_agents.values()) if agent.can_verify(content_type)]
+
+    def list_agents(self):
+        """
+        Describes every agent this node can run, without loading any.
+
+        Returns:
+            list: {"agent_id", "agent_version", "supported_content_types", "loaded"} per agent:
+                  registry agents in registry order, then agents registered directly.
+        """
+        described = []
+        for spec in self.agent_registry:
+            agent = self.ai_agents.get(spec.agent_id)
+            described.append({"agent_id": spec.agent_id,
+                              "agent_version": agent.agent_version if agent is not None else spec.agent_version,
+                              "supported_content_types": agent.supported_content_types if agent is not None else spec.supported_content_types,
+                              "loaded": agent is not None})
+        for agent_id, agent in list(self.ai_agents.items()):
+            if agent_id not in self.agent_registry:
+                described.append({"agent_id": agent_id, "agent_version": agent.agent_version,
+                                  "supported_content_types": agent.supported_content_types, "loaded": True})
+        return described
+
+    def _agent_error_event(self, agent, verdict, details):
+        """
+        Builds the verification event recorded when an agent fails or times out.
+        """
+        return {
+            "agent_id": agent.agent_id,
+            "agent_version": agent.agent_version,
+            "timestamp": str(datetime.datetime.utcnow().isoformat()),
+            "verdict": verdict,
+            "details": details
+        }
+
+    def _fetch_content(self, claim_data, agents):
+        """
+        Looks up a claim's content in the blob store, but only if one of the agents needs it.
+
+        Returns:
+            memoryview or None: A read-only view of the content, or None if no agent needs it
+                                or the node does not hold it.
+        """
+        if self.blob_store is None or not any(agent.NEEDS_CONTENT for agent in agents):
+            return None
+        instrumentation = self.instrumentation
+        if instrumentation.metrics:
+            started = time.perf_counter()
+        claim_content = self.blob_store.get(claim_data.get("content_hash"))
+        if instrumentation.metrics:
+            instrumentation.observe("node.content_fetch", time.perf_counter() - started)
+        return claim_content
+
+    def _run_agent(self, agent, claim_data, claim_content=None):
+        instrumentation = self.instrumentation
+        if instrumentation.emitting:
+            instrumentation.event("agent_started", "--- Running Agent: {agent_id} v{agent_version} ---", level="debug",
+                                  agent_id=agent.agent_id, agent_version=agent.agent_version)
+        if not instrumentation.metrics:
+            return agent.verify_claim_data_cached(claim_data, claim_content, cache=self.result_cache)
+        started = time.perf_counter()
+        try:
+            return agent.verify_claim_data_cached(claim_data, claim_content, cache=self.result_cache)
+        finally:
+            instrumentation.observe(f"agent.verify.{agent.agent_id}", time.perf_counter() - started)
+            instrumentation.increment("agent.runs")
+
+    def _run_agent_batch(self, agent, claims, contents=None):
+        """
+        Runs one agent on a batch of claims through its verify_claims_batch(), serving
+        cached results from the result cache.
+        """
+        instrumentation = self.instrumentation
+        if instrumentation.emitting:
+            instrumentation.event("agent_batch_started", "--- Running Agent: {agent_id} v{agent_version} on {count} claims ---", level="debug",
+                                  agent_id=agent.agent_id, agent_version=agent.agent_version, count=len(claims))
+        if not instrumentation.metrics:
+            return agent.verify_claims_batch_cached(claims, contents, cache=self.result_cache)
+        started = time.perf_counter()
+        try:
+            return agent.verify_claims_batch_cached(claims, contents, cache=self.result_cache)
+        finally:
+            instrumentation.observe(f"agent.verify_batch.{agent.agent_id}", time.perf_counter() - started)
+            instrumentation.increment("agent.runs", len(claims))
+            instrumentation.increment("agent.batches")
+
+    def _batcher_for(self, agent):
+        """
+        Returns the agent's micro-batcher, creating it on first use.
+        """
+        batcher = self._agent_batchers.get(agent.agent_id)
+        if batcher is None:
+            with self._agent_batchers_lock:
+                batcher = self._agent_batchers.get(agent.agent_id)
+                if batcher is None:
+                    from .agent_batcher import AgentMicroBatcher
+                    batcher = self._agent_batchers[agent.agent_id] = AgentMicroBatcher(
+                        agent, self._run_agent_batch, self._agent_executor, self.agent_batch_size, self.agent_batch_wait)
+        return batcher
+
+    def _reused_results(self, claim_data, agents):
+        """
+        Under the "reuse" duplicate policy, returns the results a duplicate claim's canonical
+        claim already has from content-derived agents among 'agents' (same agent version,
+        no error verdicts), re-stamped and marked with the claim they were reused from.
+
+        Returns:
+            dict: agent_id -> verification event; empty when nothing can be reused.
+        """
+        if self.duplicate_policy != "reuse":
+            return {}
+        canonical_id = (claim_data.get("metadata") or {}).get("duplicate_of")
+        if canonical_id is None:
+            return {}
+        versions = {agent.agent_id: agent.agent_version for agent in agents if agent.is_content_derived()}
+        if not versions:
+            return {}
+        canonical_data = self.ledger.get_claim_by_id(canonical_id)
+        if canonical_data is None or canonical_data.get("content_hash") != claim_data.get("content_hash"):
+            return {} # Only results for the very same content carry over
+        reused = {}
+        timestamp = str(datetime.datetime.utcnow().isoformat())
+        for event in canonical_data.get("verification_history") or ():
+            agent_id = event.get("agent_id")
+            if versions.get(agent_id) == event.get("agent_version") and not str(event.get("verdict")).startswith("error"):
+                reused[agent_id] = dict(event, timestamp=timestamp, reused_from=canonical_id) # Latest event wins
+        if reused:
+            self.instrumentation.increment("dedup.results_reused", len(reused))
+        return reused
+
+    def _run_agents(self, claim_data, agents_to_run, stop_when_settled=False):
+        """
+        Runs agents on a claim, first taking whatever results a duplicate claim can reuse
+        from its canonical claim (see DUPLICATE_POLICIES); the agents those came from are
+        not run, and none are when a reused verdict is decisive and stop_when_settled is set.
+
+        Returns:
+            list: Verification events: reused ones first, then those of the agents that ran,
+                  in the order of 'agents_to_run'.
+        """
+        reused = self._reused_results(claim_data, agents_to_run)
+        if not reused:
+            return self._dispatch_agents(claim_data, agents_to_run, stop_when_settled)
+        remaining = [agent for agent in agents_to_run if agent.agent_id not in reused]
+        if stop_when_settled and any(event.get("verdict") in self.DECISIVE_VERDICTS for event in reused.values()):
+            remaining = []
+        return list(reused.values()) + (self._dispatch_agents(claim_data, remaining, stop_when_settled) if remaining else [])
+
+    def _dispatch_agents(self, claim_data, agents_to_run, stop_when_settled=False):
+        """
+        Runs agents concurrently on the node's thread pool, each bounded by its own timeout.
+        An agent that raises is recorded as "error_agent_execution"; one that exceeds its
+        timeout is recorded as "error_agent_timeout" and left to finish in the background.
+        With agent_batch_size > 1 the claim joins each agent's next micro-batch instead of
+        running on its own; the agent's timeout then includes the time spent waiting for it.
+
+        Args:
+            claim_data (dict): The claim to verify.
+            agents_to_run (list): The agents to run.
+            stop_when_settled (bool): Return as soon as a decisive verdict arrives, without
+                                      waiting for (or recording) the remaining agents.
+
+        Returns:
+            list: Verification events, in the order of 'agents_to_run'.
+        """
+        started = time.monotonic()
+        futures = {}
+        deadlines = {}
+        batching = self.agent_batch_size > 1
+        claim_content = self._fetch_content(claim_data, agents_to_run)
+        for agent in agents_to_run:
+            agent_content = claim_content if agent.NEEDS_CONTENT else None
+            if batching:
+                future = self._batcher_for(agent).submit(claim_data, agent_content)
+            else:
+                future = self._agent_executor.submit(self._run_agent, agent, claim_data, agent_content)
+            futures[future] = agent
+            timeout = self.agent_timeouts.get(agent.agent_id, self.agent_timeout)
+            deadlines[future] = started + timeout if timeout is not None else None
+
+        instrumentation = self.instrumentation
+        results = {}
+        pending = set(futures)
+        while pending:
+            open_deadlines = [deadlines[future] for future in pending if deadlines[future] is not None]
+            wait_for = max(0.0, min(open_deadlines) - time.monotonic()) if open_deadlines else None
+            done, pending = wait(pending, timeout=wait_for, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                agent = futures[future]
+                try:
+                    verification_result = future.result()
+                    if instrumentation.emitting:
+                        instrumentation.event("agent_completed", "Agent '{agent_id}' completed. Verdict: {verdict}",
+                                              agent_id=agent.agent_id, verdict=verification_result.get("verdict"))
+                except Exception as e:
+                    instrumentation.event("agent_error", "Error running agent '{agent_id}': {error}", level="error",
+                                          agent_id=agent.agent_id, error=e)
+                    instrumentation.increment("agent.errors")
+                    verification_result = self._agent_error_event(agent, "error_agent_execution", str(e))
+                results[future] = verification_result
+
+            now = time.monotonic()
+            for future in [f for f in pending if deadlines[f] is not None and deadlines[f] <= now]:
+                agent = futures[future]
+                future.cancel() # Only succeeds if the agent never started
+                timeout = self.agent_timeouts.get(agent.agent_id, self.agent_timeout)
+                instrumentation.event("agent_timeout", "Error: Agent '{agent_id}' timed out after {timeout}s.", level="error",
+                                      agent_id=agent.agent_id, timeout=timeout)
+                instrumentation.increment("agent.timeouts")
+                results[future] = self._agent_error_event(agent, "error_agent_timeout", f"Agent did not finish within {timeout}s.")
+                pending.discard(future)
+
+            if stop_when_settled and pending and any(
+                    result.get("verdict") in self.DECISIVE_VERDICTS for result in results.values()):
+                for future in pending:
+                    future.cancel()
+                instrumentation.event("verdict_settled", "Verdict settled; not waiting for {remaining} remaining agent(s).",
+                                      level="debug", remaining=len(pending))
+                break
+
+        return [results[future] for future in futures if future in results]
+
+    def _prepare_verification(self, claim_id, agent_id=None):
+        """
+        Looks up a claim and selects the agents that should verify it.
+
+        Returns:
+            tuple or None: (claim_data, agents_to_run), or None if there is nothing to run.
+        """
+        claim_data = self.ledger.get_claim_by_id(claim_id, with_events=False) # Agents never read the history
         if not claim_data:
-            print(f"Error: Claim '{claim_id}' not found for verification on Node '{self.node_id}'.")
-            return
+            self.instrumentation.event("claim_not_found", "Error: Claim '{claim_id}' not found for verification on Node '{node_id}'.",
+                                       level="error", claim_id=claim_id, node_id=self.node_id)
+            return None
 
         if claim_data["status"] != "pending_verification" and claim_data["status"] != "reverification_needed":
-            print(f"Claim '{claim_id}' is not pending_verification or reverification_needed. Current status: {claim_data['status']}")
+            self.instrumentation.event("claim_already_verified",
+                                       "Claim '{claim_id}' is not pending_verification or reverification_needed. Current status: {status}",
+                                       level="debug", claim_id=claim_id, status=claim_data["status"])
             # Optionally, allow re-verification if needed
             # return 
 
-        print(f"Node '{self.node_id}' initiating verification for claim '{claim_id}'...")
+        if self.instrumentation.emitting:
+            self.instrumentation.event("verification_started", "Node '{node_id}' initiating verification for claim '{claim_id}'...",
+                                       node_id=self.node_id, claim_id=claim_id)
         
-        verification_results_for_claim = []
         agents_to_run = []
 
         if agent_id:
-            if agent_id in self.ai_agents:
-                agents_to_run.append(self.ai_agents[agent_id])
+            agent = self.ai_agents.get(agent_id)
+            if agent is None and agent_id in self.agent_registry:
+                agent = self._load_agent(self.agent_registry.get(agent_id))
+            if agent is not None:
+                agents_to_run.append(agent)
             else:
-                print(f"Warning: Specified agent_id '{agent_id}' not found on node '{self.node_id}'.")
-        else: # Run all applicable agents
-            for ag_id, agent_instance in self.ai_agents.items():
-                if agent_instance.can_verify(claim_data.get("content_type")):
-                    agents_to_run.append(agent_instance)
+                self.instrumentation.event("agent_not_found", "Warning: Specified agent_id '{agent_id}' not found on node '{node_id}'.",
+                                           level="warning", agent_id=agent_id, node_id=self.node_id)
+        else: # Run all applicable agents, loading any the registry has not loaded yet
+            agents_to_run.extend(self._agents_for(claim_data.get("content_type")))
         
         if not agents_to_run:
-            print(f"No suitable AI agents found or specified to verify claim '{claim_id}' (content_type: {claim_data.get('content_type')}).")
+            self.instrumentation.event("no_agents", "No suitable AI agents found or specified to verify claim '{claim_id}' (content_type: {content_type}).",
+                                       level="warning", claim_id=claim_id, content_type=claim_data.get("content_type"))
             # Potentially mark as "unable_to_verify_no_agent"
-            return
+            return None
 
-        for agent in agents_to_run:
-            print(f"--- Running Agent: {agent.agent_id} v{agent.agent_version} ---")
+        return claim_data, agents_to_run
+
+    def _commit_verification(self, claim_id, verification_results_for_claim):
+        """
+        Records new verification events for a claim in the ledger, which folds them into the
+        claim's aggregate status without touching its block or re-reading its history.
+
+        Returns:
+            str or None: The claim's new status, or None if the claim could not be updated.
+        """
+        instrumentation = self.instrumentation
+        if instrumentation.metrics:
+            started = time.perf_counter()
+        # If any agent gives a "verified_preliminary", the claim's status becomes that;
+        # otherwise any "unverified" marks it unverified (see node.claim_status).
+        final_verdict = self.ledger.record_verification(claim_id, verification_results_for_claim, self.agent_weights)
+        if final_verdict is None:
+            instrumentation.event("claim_update_failed", "Error: Could not find claim '{claim_id}' in ledger to update status after verification attempt.",
+                                  level="error", claim_id=claim_id)
+            return None
+        if instrumentation.metrics:
+            instrumentation.observe("node.aggregate_status", time.perf_counter() - started)
+            instrumentation.increment("node.verifications_committed")
+        if instrumentation.emitting:
+            instrumentation.event("claim_status_updated", "Claim '{claim_id}' status updated to: {status} after agent processing.",
+                                  claim_id=claim_id, status=final_verdict)
+        return final_verdict
+
+    def trigger_verification(self, claim_id, agent_id=None, stop_when_settled=False):
+        """
+        Triggers registered AI agents to verify a claim.
+        If agent_id is specified, only that agent is used.
+        Otherwise, all agents that support the claim's content type are triggered.
+        Agents run concurrently, so the claim's latency is roughly that of the slowest agent
+        (bounded by its timeout). With stop_when_settled=True, verification returns as soon
+        as the aggregate verdict can no longer change. Under the "reuse" duplicate policy, a
+        duplicate claim takes its canonical claim's results from content-derived agents and
+        only runs the others (e.g. submitter- and metadata-dependent ones).
+
+        Returns:
+            str or None: The claim's new status, or None if nothing was verified.
+        """
+        prepared = self._prepare_verification(claim_id, agent_id)
+        if prepared is None:
+            return None
+        claim_data, agents_to_run = prepared
+
+        verification_results_for_claim = self._run_agents(claim_data, agents_to_run, stop_when_settled)
+
+        return self._commit_verification(claim_id, verification_results_for_claim)
+
+    def trigger_verification_batch(self, claim_ids, agent_id=None):
+        """
+        Verifies several claims, handing each agent its share of the claims in batches of
+        at most agent_batch_size (all of them at once when micro-batching is disabled).
+        Agents run concurrently; a batch that fails or exceeds the agent's timeout is
+        recorded as an error event on each of its claims. Duplicate claims reuse their
+        canonical claim's content-derived results, as in trigger_verification().
+
+        Args:
+            claim_ids (list): The claims to verify.
+            agent_id (str, optional): Run only this agent.
+
+        Returns:
+            dict: claim_id -> the claim's new status, for the claims that were verified.
+        """
+        prepared = {}
+        for claim_id in claim_ids:
+            if claim_id not in prepared:
+                entry = self._prepare_verification(claim_id, agent_id)
+                if entry is not None:
+                    prepared[claim_id] = entry
+
+        reused = {claim_id: self._reused_results(claim_data, agents_to_run)
+                  for claim_id, (claim_data, agents_to_run) in prepared.items()} # Empty unless the claim is a duplicate
+        claims_per_agent = {} # agent_id -> (agent, [claim_id, ...])
+        contents = {}
+        for claim_id, (claim_data, agents_to_run) in prepared.items():
+            remaining = [agent for agent in agents_to_run if agent.agent_id not in reused[claim_id]]
+            for agent in remaining:
+                claims_per_agent.setdefault(agent.agent_id, (agent, []))[1].append(claim_id)
+            contents[claim_id] = self._fetch_content(claim_data, remaining) # Skipped unless an agent needs it
+
+        started = time.monotonic()
+        batch_futures = [] # (agent, claim IDs, future, deadline)
+        for agent, agent_claim_ids in claims_per_agent.values():
+            batch_size = self.agent_batch_size if self.agent_batch_size > 1 else len(agent_claim_ids)
+            timeout = self.agent_timeouts.get(agent.agent_id, self.agent_timeout)
+            for offset in range(0, len(agent_claim_ids), batch_size):
+                chunk = agent_claim_ids[offset:offset + batch_size]
+                chunk_contents = [contents[claim_id] for claim_id in chunk] if agent.NEEDS_CONTENT else None
+                future = self._agent_executor.submit(self._run_agent_batch, agent, [prepared[claim_id][0] for claim_id in chunk],
+                                                     chunk_contents)
+                batch_futures.append((agent, chunk, future, started + timeout if timeout is not None else None))
+
+        instrumentation = self.instrumentation
+        results = {} # (claim_id, agent_id) -> verification event
+        for agent, chunk, future, deadline in batch_futures:
             try:
-                # For MVP1, we're not passing actual claim_content yet.
-                # This will be important when agents need to analyze the content itself.
-                verification_result = agent.verify_claim_data(claim_data, claim_content=None)
-                verification_results_for_claim.append(verification_result)
-                print(f"Agent '{agent.agent_id}' completed. Verdict: {verification_result.get('verdict')}")
+                batch_results = future.result(timeout=max(0.0, deadline - time.monotonic()) if deadline is not None else None)
+                if len(batch_results) != len(chunk):
+                    raise RuntimeError(f"Agent returned {len(batch_results)} results for a batch of {len(chunk)} claims.")
+            except FutureTimeoutError:
+                future.cancel()
+                timeout = self.agent_timeouts.get(agent.agent_id, self.agent_timeout)
+                instrumentation.event("agent_timeout", "Error: Agent '{agent_id}' timed out after {timeout}s.", level="error",
+                                      agent_id=agent.agent_id, timeout=timeout)
+                instrumentation.increment("agent.timeouts")
+                batch_results = [self._agent_error_event(agent, "error_agent_timeout", f"Agent did not finish within {timeout}s.")
+                                 for _ in chunk]
             except Exception as e:
-                print(f"Error running agent '{agent.agent_id}': {e}")
-                error_result = {
-                    "agent_id": agent.agent_id,
-                    "agent_version": agent.agent_version,
-                    "timestamp": str(datetime.datetime.utcnow().isoformat()),
-                    "verdict": "error_agent_execution",
-                    "details": str(e)
-                }
-                verification_results_for_claim.append(error_result)
-
-        # Update the claim in the ledger with the verification history
-        # This is a simplified update for MVP1. A real DLT would handle this differently.
-        updated_in_ledger = False
-        for block_idx, block in enumerate(self.ledger.chain):
-            if block["claim_data"].get("claim_id") == claim_id:
-                # Append new verification events, don't overwrite existing ones
-                if "verification_history" not in self.ledger.chain[block_idx]["claim_data"]:
-                    self.ledger.chain[block_idx]["claim_data"]["verification_history"] = []
-                
-                for res in verification_results_for_claim:
-                     self.ledger.chain[block_idx]["claim_data"]["verification_history"].append(res)
-                
-                # Determine overall status based on results (simplified logic for MVP1)
-                # If any agent gives a "verified_preliminary", we'll use that.
-                # More complex consensus logic will be needed later.
-                final_verdict = "pending_verification" # Default if no conclusive results
-                highest_confidence = 0.0
-                
-                for res in self.ledger.chain[block_idx]["claim_data"]["verification_history"]:
-                    if res.get("verdict") == "verified_preliminary":
-                        final_verdict = "verified_preliminary"
-                        # confidence = res.get("confidence_score", 0)
-                        # if confidence > highest_confidence: # Example of using confidence
-                        #    highest_confidence = confidence
-                        break # For MVP, first "verified_preliminary" is enough
-                    elif res.get("verdict") == "unverified":
-                        final_verdict = "unverified" 
-                        # Could also break here or collect all verdicts
-
-                self.ledger.chain[block_idx]["claim_data"]["status"] = final_verdict
-                updated_in_ledger = True
-                print(f"Claim '{claim_id}' status updated to: {final_verdict} after agent processing.")
-                self.view_claim(claim_id) # Show the updated claim
-                break
-        
-        if not updated_in_ledger:
-             print(f"Error: Could not find claim '{claim_id}' in ledger to update status after verification attempt.")
+                instrumentation.event("agent_error", "Error running agent '{agent_id}': {error}", level="error",
+                                      agent_id=agent.agent_id, error=e)
+                instrumentation.increment("agent.errors")
+                batch_results = [self._agent_error_event(agent, "error_agent_execution", str(e)) for _ in chunk]
+            for claim_id, verification_result in zip(chunk, batch_results):
+                results[(claim_id, agent.agent_id)] = verification_result
 
+        statuses = {}
+        for claim_id, (_, agents_to_run) in prepared.items():
+            verification_results_for_claim = list(reused[claim_id].values()) + [
+                results[(claim_id, agent.agent_id)] for agent in agents_to_run if agent.agent_id not in reused[claim_id]]
+            statuses[claim_id] = self._commit_verification(claim_id, verification_results_for_claim)
+        return statuses
 
 if __name__ == '__main__':
     # Test the HeliosCoreNode
+    from .instrumentation import ConsoleSink, Instrumentation
     print("--- Starting HeliosCoreNode Test ---")
-    my_node = HeliosCoreNode(node_id="test_node_alpha")
+    my_node = HeliosCoreNode(node_id="test_node_alpha", instrumentation=Instrumentation(sinks=[ConsoleSink()], metrics=True))
+    print(f"Agents before the first claim: {[(agent['agent_id'], agent['loaded']) for agent in my_node.list_agents()]}")
+
+    print("\n--- Constructing nodes quietly ---")
+    started = time.perf_counter()
+    spare_nodes = [HeliosCoreNode(node_id=f"test_node_spare_{n}") for n in range(20)]
+    print(f"Constructed {len(spare_nodes)} nodes in {(time.perf_counter() - started) * 1000:.2f} ms without console output")
+    for spare_node in spare_nodes:
+        spare_node.close()
     
     print("\n--- Submitting a new claim ---")
     claim1_data = my_node.submit_new_claim(
@@ -196,6 +1027,8 @@ if __name__ == '__main__':
         print(f"\n--- Triggering verification for claim: {claim1_data['claim_id']} ---")
         my_node.trigger_verification(claim1_data["claim_id"])
     
+    print(f"Agents after the first claim: {[(agent['agent_id'], agent['loaded']) for agent in my_node.list_agents()]}")
+
     print("\n--- Submitting another new claim (short hash for different verification outcome) ---")
     claim2_data = my_node.submit_new_claim(
         content_hash="xyz", # short hash
@@ -208,6 +1041,23 @@ if __name__ == '__main__':
         print(f"\n--- Triggering verification for claim: {claim2_data['claim_id']} ---")
         my_node.trigger_verification(claim2_data["claim_id"])
 
+    print("\n--- Submitting a batch of claims ---")
+    batch_claims = my_node.submit_claims_batch([
+        {"content_hash": "batchhash0000000001", "content_type": "text/plain", "submitter_id": "user_delta"},
+        {"content_hash": "batchhash0000000002", "content_type": "application/pdf", "submitter_id": "research_institute_alpha",
+         "metadata": {"author": "Dr. A", "creation_date": "2025-01-01"}}
+    ])
+    if batch_claims:
+        my_node.trigger_verification(batch_claims[1]["claim_id"])
+        print(f"Merkle proof for batch claim: {my_node.ledger.get_merkle_proof(batch_claims[1]['claim_id'])}")
+
+    print("\n--- Verifying a batch of claims ---")
+    more_claims = my_node.submit_claims_batch([
+        {"content_hash": f"morehash{i:012d}", "content_type": "text/plain", "submitter_id": "user_epsilon"} for i in range(5)
+    ])
+    if more_claims:
+        print(f"Statuses: {my_node.trigger_verification_batch([claim['claim_id'] for claim in more_claims])}")
+
     print("\n--- Displaying full ledger for the node ---")
     my_node.view_entire_ledger()
     
@@ -217,4 +1067,104 @@ if __name__ == '__main__':
     print("\n--- Test Viewing Non-Existent Claim ---")
     my_node.view_claim("claim_does_not_exist_123")
 
+    print("\n--- Submitting content by path, stream and buffer ---")
+    import hashlib
+    import io
+    import shutil
+    import tempfile
+    content_dir = tempfile.mkdtemp(prefix="helios_content_")
+    try:
+        for n in range(5):
+            with open(os.path.join(content_dir, f"photo_{n}.jpg"), "wb") as content_file:
+                content_file.write(bytes([n]) * 100000)
+        content_claims = my_node.submit_contents([content_dir, io.BytesIO(b"streamed report"), b"inline note"],
+                                                 submitter_id="user_gamma")
+        print(f"Submitted {len(content_claims)} content claims: "
+              f"{[(claim['content_type'], claim['metadata'].get('filename')) for claim in content_claims]}")
+        single = my_node.submit_content(os.path.join(content_dir, "photo_0.jpg"), submitter_id="user_gamma")
+        print(f"Same file hashed again gives the same content_hash: {single['content_hash'] == content_claims[0]['content_hash']}")
+    finally:
+        shutil.rmtree(content_dir, ignore_errors=True)
+
+    print("\n--- Handing stored content to agents ---")
+    from agents.base_agent import BaseVerificationAgent
+    from .blob_store import BlobStore
+
+    class ContentDigestAgent(BaseVerificationAgent):
+        """Checks that the stored content hashes to the claim's content_hash."""
+        NEEDS_CONTENT = True
+
+        def __init__(self):
+            super().__init__("content_digest_v1", "0.1.0")
+            self.content_kinds = []
+
+        def verify_claim_data(self, claim_data, claim_content=None):
+            self.content_kinds.append(type(claim_content).__name__)
+            if claim_content is None:
+                return self.generate_verification_event("unable_to_verify", "Content is not stored on this node.")
+            matches = hashlib.sha256(claim_content).hexdigest() == claim_data["content_hash"]
+            return self.generate_verification_event("verified_preliminary" if matches else "unverified",
+                                                    f"Digest of {claim_content.nbytes} stored bytes matches: {matches}", 0.9)
+
+    blob_dir = tempfile.mkdtemp(prefix="helios_node_blobs_")
+    try:
+        content_node = HeliosCoreNode(node_id="test_node_content", blob_store=BlobStore(blob_dir), agent_batch_size=4)
+        digest_agent = ContentDigestAgent()
+        content_node.register_ai_agent(digest_agent.agent_id, digest_agent)
+        stored = content_node.submit_content(b"a photo's bytes" * 1000, submitter_id="user_gamma", content_type="image/jpeg")
+        repeated = content_node.submit_contents([b"a photo's bytes" * 1000, io.BytesIO(b"streamed clip")], submitter_id="user_gamma")
+        unstored = content_node.submit_new_claim("f" * 64, "image/jpeg", "user_gamma")
+        print(f"Status with stored content: {content_node.trigger_verification(stored['claim_id'], agent_id=digest_agent.agent_id)}")
+        print(f"Batch statuses: {content_node.trigger_verification_batch([claim['claim_id'] for claim in repeated + [unstored]], agent_id=digest_agent.agent_id)}")
+        print(f"Content handed to the agent as: {digest_agent.content_kinds}")
+        print(f"Blobs stored for 3 submissions of 2 distinct contents: "
+              f"{sum(len(files) for _, _, files in os.walk(blob_dir)) - len(os.listdir(os.path.join(blob_dir, 'tmp')))}")
+        content_node.close()
+    finally:
+        shutil.rmtree(blob_dir, ignore_errors=True)
+
+    print("\n--- Resubmitting known content ---")
+    viral_hash = hashlib.sha256(b"viral clip").hexdigest()
+    original = my_node.submit_new_claim(viral_hash, "video/mp4", "user_beta")
+    my_node.trigger_verification(original["claim_id"])
+    reposts = my_node.submit_claims_batch([{"content_hash": viral_hash, "content_type": "video/mp4", "submitter_id": f"reposter_{n}"}
+                                           for n in range(3)])
+    print(f"Reposts linked to the original: {all(claim['metadata']['duplicate_of'] == original['claim_id'] for claim in reposts)}")
+    my_node.trigger_verification(reposts[0]["claim_id"])
+    my_node.trigger_verification_batch([claim["claim_id"] for claim in reposts[1:]])
+    repost_events = my_node.ledger.get_claim_by_id(reposts[0]["claim_id"])["verification_history"]
+    print(f"Repost results: {[(event['agent_id'], event.get('reused_from') is not None) for event in repost_events]}")
+    print(f"Batch repost statuses: {[my_node.ledger.get_claim_by_id(claim['claim_id'])['status'] for claim in reposts[1:]]}")
+    spoofed = my_node.submit_new_claim(hashlib.sha256(b"forged clip").hexdigest(), "video/mp4", "user_mallory",
+                                       {"duplicate_of": original["claim_id"]})
+    print(f"Submitter-supplied link dropped: {'duplicate_of' not in spoofed['metadata']}")
+    print(f"Duplicate detector: {my_node.duplicate_detector.stats()}")
+
+    print("\n--- Scheduling verification by priority ---")
+    scheduled_node = HeliosCoreNode(node_id="test_node_scheduled", scheduler_options={"rate_limit": 100.0, "burst": 3})
+    backlog = scheduled_node.submit_claims_batch([{"content_hash": f"bulk_{n:012d}", "content_type": "text/plain",
+                                                   "submitter_id": "bulk_uploader"} for n in range(6)])
+    for claim in backlog:
+        scheduled_node.schedule_verification(claim["claim_id"])
+    for submitter_id, urgency in (("reader_1", None), ("official_press_agency_001", None), ("user_gamma", "urgent")):
+        claim = scheduled_node.submit_new_claim(f"{submitter_id}_hash_0001", "text/plain", submitter_id)
+        scheduled_node.schedule_verification(claim["claim_id"], urgency)
+    print(f"Scheduler: {scheduled_node.verification_scheduler.stats()}")
+    order = [scheduled_node.ledger.get_claim_by_id(claim_id, with_events=False)["submitter_id"]
+             for claim_id, _ in scheduled_node.verify_scheduled()]
+    print(f"Verification order: {order}; bulk_uploader claims still held back by its rate limit: "
+          f"{len(scheduled_node.verification_scheduler)}")
+    scheduled_node.close()
+
+    print("\n--- Syncing a second node over TCP ---")
+    follower = HeliosCoreNode(node_id="helios_node_follower_002")
+    sync_report = follower.sync_from_peer(my_node.start_replication_server())
+    print(f"Fetched {sync_report['blocks_fetched']} blocks in {sync_report['round_trips']} round trips; "
+          f"tips match: {follower.ledger.get_last_block_hash() == my_node.ledger.get_last_block_hash()}")
+    follower.close()
+
+    print("\n--- Node Metrics ---")
+    import json
+    print(json.dumps(my_node.instrumentation.metrics_snapshot(), indent=2))
+
     print("\n--- End of HeliosCoreNode Test ---")
\ No newline at end of file
@@ -0,0 +1,182 @@
+# node/duplicate_detector.py
+
+import hashlib
+import struct
+import threading
+from array import array
+
+from .instrumentation import DEFAULT_INSTRUMENTATION
+
+# A content hash's 64-bit Bloom filter word hash and four bytes selecting the bits it sets
+# in that word (the same blocked layout as agents/reputation_store.py).
+_DIGEST_FIELDS = struct.Struct("<QBBBB")
+_BIT = tuple(1 << (byte & 63) for byte in range(256))
+DEFAULT_BITS_PER_KEY = 12 # ~1% false positives per filter
+DEFAULT_CAPACITY = 1 << 16
+
+
+def _digest(content_hash):
+    """
+    Returns (word_hash, mask): the Bloom filter word a content hash lives in and the bits
+    it sets there.
+    """
+    word_hash, bit_a, bit_b, bit_c, bit_d = _DIGEST_FIELDS.unpack(
+        hashlib.blake2b(content_hash.encode(), digest_size=_DIGEST_FIELDS.size).digest())
+    return word_hash, _BIT[bit_a] | _BIT[bit_b] | _BIT[bit_c] | _BIT[bit_d]
+
+
+class ContentBloomFilter:
+    """
+    A growable blocked Bloom filter of content hashes. Each hash sets four bits inside a
+    single 64-bit word, so a membership test is one word read and one mask comparison per
+    filter. When the newest filter reaches its capacity a new one with twice the capacity
+    is added, so the filter never has to be rebuilt as the ledger grows; each new filter
+    also spends more bits per hash, so the false-positive rate summed over all filters
+    stays close to that of the first.
+    """
+    def __init__(self, capacity=DEFAULT_CAPACITY, bits_per_key=DEFAULT_BITS_PER_KEY):
+        """
+        Args:
+            capacity (int): Hashes the first filter holds at its target false-positive rate.
+            bits_per_key (int): Filter size per hash.
+        """
+        self.bits_per_key = bits_per_key
+        self.count = 0
+        self._filters = [] # [words, capacity]
+        self._add_filter(max(64, capacity), bits_per_key)
+
+    def _add_filter(self, capacity, bits_per_key):
+        self._filters.append([array("Q", [0]) * max(1, capacity * bits_per_key // 64), capacity])
+        self._remaining = capacity
+
+    def add(self, content_hash):
+        if self._remaining <= 0:
+            self._add_filter(self._filters[-1][1] * 2, self.bits_per_key + 4 * len(self._filters))
+        words = self._filters[-1][0]
+        word_hash, mask = _digest(content_hash)
+        words[word_hash % len(words)] |= mask
+        self._remaining -= 1
+        self.count += 1
+
+    def __contains__(self, content_hash):
+        word_hash, mask = _digest(content_hash)
+        for words, _ in self._filters:
+            if words[word_hash % len(words)] & mask == mask:
+                return True
+        return False
+
+    def size_bytes(self):
+        return sum(len(words) * 8 for words, _ in self._filters)
+
+
+class DuplicateDetector:
+    """
+    Finds the canonical claim of content a ledger already holds. A Bloom filter of every
+    content hash in the ledger answers "never seen" for novel content without touching the
+    ledger; only hashes that pass the filter are looked up in the ledger's exact
+    content-hash index. The canonical claim is the first claim of the content.
+
+    The filter is seeded from the ledger with one pass over its claims the first time it
+    is needed, and again after reset() (e.g. once blocks arrived from a peer). Until a
+    claim is added through add(), the detector may miss it; a miss only costs a duplicate
+    that is verified from scratch.
+    """
+    def __init__(self, ledger, capacity=DEFAULT_CAPACITY, bits_per_key=DEFAULT_BITS_PER_KEY, instrumentation=None):
+        """
+        Args:
+            ledger: Any ledger backend; only query_claims() and get_claim_ids_by_content_hash() are used.
+            capacity (int): Hashes the filter is sized for before it first grows.
+            bits_per_key (int): Filter size per hash.
+            instrumentation (Instrumentation, optional): Metrics surface for filter and index outcomes.
+        """
+        self.ledger = ledger
+        self.capacity = capacity
+        self.bits_per_key = bits_per_key
+        self.instrumentation = instrumentation or DEFAULT_INSTRUMENTATION
+        self._bloom = None # Built on first use
+        self._lock = threading.Lock()
+
+    def _filter(self):
+        bloom = self._bloom
+        if bloom is None:
+            with self._lock:
+                bloom = self._bloom
+                if bloom is None:
+                    bloom = ContentBloomFilter(self.capacity, self.bits_per_key)
+                    for _, claim_data in self.ledger.query_claims():
+                        content_hash = claim_data.get("content_hash")
+                        if content_hash:
+                            bloom.add(content_hash)
+                    self._bloom = bloom
+        return bloom
+
+    def find_canonical(self, content_hash):
+        """
+        Returns:
+            str or None: The ID of the first claim of 'content_hash', or None if the ledger
+                         holds no claim of it.
+        """
+        instrumentation = self.instrumentation
+        if content_hash not in self._filter():
+            instrumentation.increment("dedup.filter_negatives")
+            return None
+        claim_ids = self.ledger.get_claim_ids_by_content_hash(content_hash)
+        if not claim_ids:
+            instrumentation.increment("dedup.filter_false_positives")
+            return None
+        instrumentation.increment("dedup.duplicates")
+        return claim_ids[0]
+
+    def add(self, content_hash):
+        """
+        Records that the ledger now holds a claim of 'content_hash'.
+        """
+        bloom = self._filter()
+        with self._lock:
+            bloom.add(content_hash)
+
+    def reset(self):
+        """
+        Drops the filter; it is re-seeded from the ledger on next use.
+        """
+        with self._lock:
+            self._bloom = None
+
+    def stats(self):
+        """
+        Returns:
+            dict: Hashes in the filter, its size in bytes and whether it has been seeded.
+        """
+        bloom = self._bloom
+        return {"hashes": bloom.count if bloom is not None else 0,
+                "filter_bytes": bloom.size_bytes() if bloom is not None else 0,
+                "seeded": bloom is not None}
+
+
+if __name__ == '__main__':
+    # Test the false-positive rate, growth, and lookups against a real ledger.
+    import time
+    from .instrumentation import Instrumentation
+    from .ledger import InMemoryLedger
+
+    print("--- Duplicate Detector Self-Test ---")
+    bloom = ContentBloomFilter(capacity=10000)
+    for n in range(100000):
+        bloom.add(hashlib.sha256(f"seen {n}".encode()).hexdigest())
+    missing = sum(hashlib.sha256(f"seen {n}".encode()).hexdigest() not in bloom for n in range(100000))
+    probes = [hashlib.sha256(f"novel {n}".encode()).hexdigest() for n in range(100000)]
+    started = time.perf_counter()
+    false_positives = sum(probe in bloom for probe in probes)
+    elapsed = time.perf_counter() - started
+    print(f"100k hashes in {len(bloom._filters)} filters ({bloom.size_bytes() // 1024} KiB): false negatives {missing}, "
+          f"false positives {false_positives / len(probes):.2%}, {elapsed / len(probes) * 1e6:.2f} us per novel hash")
+
+    ledger = InMemoryLedger()
+    ledger.add_claims_batch([{"claim_id": f"claim_{n}", "content_hash": hashlib.sha256(str(n % 500).encode()).hexdigest(),
+                              "content_type": "image/jpeg", "submitter_id": "user"} for n in range(1000)])
+    detector = DuplicateDetector(ledger, instrumentation=Instrumentation(metrics=True))
+    print(f"Canonical claim of content 7: {detector.find_canonical(hashlib.sha256(b'7').hexdigest())}")
+    print(f"Novel content: {detector.find_canonical(hashlib.sha256(b'novel').hexdigest())}")
+    detector.add(hashlib.sha256(b"novel").hexdigest())
+    print(f"Stats: {detector.stats()}; counters: {detector.instrumentation.metrics_snapshot()['counters']}")
+    print("--- End of Duplicate Detector Self-Test ---")
@@ -0,0 +1,222 @@
+# node/instrumentation.py
+
+import json
+import sys
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+
+# Event severity levels, lowest first.
+LEVELS = {"debug": 10, "info": 20, "warning": 30, "error": 40}
+
+# Histogram bucket upper bounds in seconds: 1us, 2us, 4us, ... ~36 minutes, then overflow.
+_BUCKET_BOUNDS = [1e-6 * (2 ** exponent) for exponent in range(32)]
+
+
+class LatencyHistogram:
+    """
+    A fixed-bucket (power-of-two microseconds) latency histogram.
+    Observing a value is O(log buckets) and uses constant memory.
+    """
+    def __init__(self):
+        self.counts = [0] * (len(_BUCKET_BOUNDS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def observe(self, seconds):
+        self.counts[bisect_left(_BUCKET_BOUNDS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if self.min is None or seconds < self.min:
+            self.min = seconds
+        if self.max is None or seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, fraction):
+        """
+        Returns the upper bound of the bucket holding the given fraction of observations.
+
+        Args:
+            fraction (float): e.g. 0.99 for p99.
+
+        Returns:
+            float or None: Latency in seconds (capped at the observed max), or None if empty.
+        """
+        if not self.count:
+            return None
+        rank = fraction * self.count
+        seen = 0
+        for bucket, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= rank and bucket_count:
+                bound = _BUCKET_BOUNDS[bucket] if bucket < len(_BUCKET_BOUNDS) else self.max
+                return min(bound, self.max)
+        return self.max
+
+    def snapshot(self):
+        """
+        Returns:
+            dict: count, mean, min, max, p50, p90 and p99 in seconds.
+        """
+        return {
+            "count": self.count,
+            "mean": self.total / self.count if self.count else None,
+            "min": self.min,
+            "max": self.max,
+            "p50": self.percentile(0.50),
+            "p90": self.percentile(0.90),
+            "p99": self.percentile(0.99)
+        }
+
+
+class ConsoleSink:
+    """
+    Prints events to the console, reproducing the node's original human-readable output.
+    """
+    def __init__(self, min_level="debug", stream=None):
+        self.min_level = LEVELS[min_level]
+        self.stream = stream
+
+    def emit(self, name, level, message, fields):
+        if LEVELS[level] < self.min_level:
+            return
+        text = message.format(**fields) if message else f"{name} {fields}"
+        print(text, file=self.stream if self.stream is not None else sys.stdout)
+
+
+class JsonLinesSink:
+    """
+    Writes one JSON object per event to a text stream, for log shippers and offline analysis.
+    """
+    def __init__(self, stream, min_level="debug"):
+        self.stream = stream
+        self.min_level = LEVELS[min_level]
+        self._lock = threading.Lock()
+
+    def emit(self, name, level, message, fields):
+        if LEVELS[level] < self.min_level:
+            return
+        record = {"time": time.time(), "event": name, "level": level}
+        record.update(fields)
+        line = json.dumps(record, default=str)
+        with self._lock:
+            self.stream.write(line + "\n")
+
+
+class MemorySink:
+    """
+    Keeps the most recent events in memory as (name, level, fields) tuples.
+    """
+    def __init__(self, max_events=10000):
+        self.events = deque(maxlen=max_events)
+
+    def emit(self, name, level, message, fields):
+        self.events.append((name, level, fields))
+
+
+class Instrumentation:
+    """
+    Structured events and metrics for the ledger, node and agents.
+    Events go to pluggable sinks (any object with emit(name, level, message, fields));
+    metrics are per-stage latency histograms and named counters.
+
+    When there are no sinks and metrics are off, every entry point returns immediately.
+    Hot paths additionally check the 'emitting' and 'metrics' flags before building
+    event fields or reading the clock, so a disabled instance costs one attribute check.
+    """
+    def __init__(self, sinks=None, metrics=False):
+        """
+        Args:
+            sinks (list, optional): Initial event sinks.
+            metrics (bool): Collect latency histograms and counters.
+        """
+        self.sinks = list(sinks) if sinks else []
+        self.emitting = bool(self.sinks)
+        self.metrics = metrics
+        self._histograms = {}
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def add_sink(self, sink):
+        self.sinks.append(sink)
+        self.emitting = True
+
+    def remove_sink(self, sink):
+        self.sinks.remove(sink)
+        self.emitting = bool(self.sinks)
+
+    def event(self, name, message=None, level="info", **fields):
+        """
+        Sends an event to every sink. 'message' is a str.format template over 'fields' and
+        is only formatted by sinks that render text.
+        """
+        if not self.emitting:
+            return
+        for sink in self.sinks:
+            sink.emit(name, level, message, fields)
+
+    def observe(self, stage, seconds):
+        """
+        Records one latency sample for a stage.
+        """
+        if not self.metrics:
+            return
+        with self._lock:
+            histogram = self._histograms.get(stage)
+            if histogram is None:
+                histogram = self._histograms[stage] = LatencyHistogram()
+            histogram.observe(seconds)
+
+    def increment(self, counter, amount=1):
+        """
+        Adds to a named counter.
+        """
+        if not self.metrics:
+            return
+        with self._lock:
+            self._counters[counter] = self._counters.get(counter, 0) + amount
+
+    def metrics_snapshot(self):
+        """
+        Returns:
+            dict: {"counters": {...}, "latency": {stage: histogram snapshot}}.
+        """
+        with self._lock:
+            return {
+                "counters": dict(self._counters),
+                "latency": {stage: histogram.snapshot() for stage, histogram in self._histograms.items()}
+            }
+
+    def reset_metrics(self):
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+
+# Shared instance used by components that were not given their own.
+# Disabled until a sink is added or metrics are switched on.
+DEFAULT_INSTRUMENTATION = Instrumentation()
+
+
+if __name__ == '__main__':
+    # Test the histogram and sinks.
+    print("--- Instrumentation Self-Test ---")
+    memory_sink = MemorySink()
+    instrumentation = Instrumentation(sinks=[ConsoleSink(), memory_sink], metrics=True)
+    for sample in (0.000003, 0.00001, 0.00002, 0.0005, 0.002):
+        instrumentation.observe("demo_stage", sample)
+    instrumentation.increment("demo_counter", 3)
+    instrumentation.event("demo_event", "Demo event with value {value}", value=42)
+    print(f"Captured events: {list(memory_sink.events)}")
+    print(f"Metrics: {json.dumps(instrumentation.metrics_snapshot(), indent=2)}")
+
+    disabled = Instrumentation()
+    started = time.perf_counter()
+    for _ in range(1000000):
+        if disabled.emitting:
+            disabled.event("never", "never {x}", x=1)
+    print(f"Disabled guard cost: {(time.perf_counter() - started) * 1000:.1f} ns per call")
+    print("--- End of Instrumentation Self-Test ---")
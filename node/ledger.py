@@ -3,6 +3,36 @@
 import datetime
 import json
 import hashlib # Added for a more realistic placeholder hash
+import time
+from array import array
+
+from .canonical import BATCH_HEADER_FIELDS, DEFAULT_ENCODING, LEGACY_ENCODING, encoding_of_block, get_encoding
+from .claim_index import ClaimQueryIndex
+from .claim_status import ClaimStatus
+from .instrumentation import DEFAULT_INSTRUMENTATION
+from .merkle import merkle_path, merkle_root
+from .records import VerificationEvent, as_dict, block_record_from_dict, hash_key
+
+# Claim locations are packed as (block_index << _LEAF_BITS) | leaf_index in the claim_id index.
+_LEAF_BITS = 20
+_LEAF_MASK = (1 << _LEAF_BITS) - 1
+
+
+def compute_block_hash(block, claim_digest=None):
+    """
+    Recomputes a block's hash from its contents, ignoring its stored "hash" field, with the
+    encoding named by the block's "encoding" field (see node.canonical).
+    Batch blocks hash only their header; the claims are covered by "merkle_root".
+
+    Args:
+        block (dict): The block to hash.
+        claim_digest (bytes, optional): The single claim's leaf hash, if already computed.
+
+    Returns:
+        str: The hexadecimal SHA256 hash the block should carry.
+    """
+    return encoding_of_block(block).block_hash(block, claim_digest)
+
 
 class InMemoryLedger:
     """
@@ -10,26 +40,52 @@ class InMemoryLedger:
     This implementation does NOT use robust blockchain principles like distributed consensus
     or cryptographically secure chaining for MVP1, but serves as a structural placeholder.
     Claims are stored in a simple list acting as the 'chain'.
+    A block holds either a single claim ("claim_data", see add_claim) or a batch of
+    claims committed through a Merkle root ("claims", see add_claims_batch).
+    The chain holds compact records (see node.records) rather than dictionaries; methods
+    that hand blocks or claims to callers return fresh dictionary views of them.
+    Blocks are hashed with a selectable canonical encoding (see node.canonical). Each claim
+    is encoded once when it is appended and its leaf hash is kept on its record, so block
+    hashes and Merkle proofs never re-serialize it.
+    Blocks are never modified after they are hashed. Verification results are appended to
+    a separate verification log that references claims by ID (see record_verification), and
+    each verified claim's aggregate status is kept in a side table updated per event; a
+    claim's events are linked through the log, so only its latest position is kept.
     """
-    def __init__(self):
+    MAX_CLAIMS_PER_BLOCK = 1 << _LEAF_BITS
+
+    def __init__(self, instrumentation=None, encoding=DEFAULT_ENCODING):
         """
         Initializes the ledger and creates the genesis block.
+
+        Args:
+            instrumentation (Instrumentation, optional): Event/metrics surface; defaults to the
+                                                         shared, initially disabled instance.
+            encoding (str): Canonical encoding new blocks are hashed with, a key of
+                            node.canonical.ENCODINGS. "json-v1" reproduces the original hashes.
+
+        Raises:
+            ValueError: If the encoding is unknown.
         """
+        self.instrumentation = instrumentation or DEFAULT_INSTRUMENTATION
+        self.encoding = get_encoding(encoding)
         self.chain = []
+        # The verification log: one entry per recorded event, as parallel columns.
+        self._log_events = [] # VerificationEvent records
+        self._log_claim_ids = [] # claim_id each event refers to
+        self._log_previous = array("q") # position of the same claim's previous event, or -1
+        self.checkpoint_store = None # Created on first verify_chain() call
+        self._init_indexes()
         self.create_genesis_block()
 
-    def _calculate_pseudo_hash(self, block_data_string):
+    def _init_indexes(self):
         """
-        Calculates a SHA256 hash for a given block's string representation.
-        This is a more realistic placeholder than just string length.
-        In a full implementation, the exact content and method of hashing
-        would be critical for security and consensus.
-        Args:
-            block_data_string (str): The string representation of the block data.
-        Returns:
-            str: The hexadecimal SHA256 hash of the block data.
+        Creates the lookup indexes, which are maintained on every append so reads never scan the chain.
         """
-        return hashlib.sha256(block_data_string.encode()).hexdigest()
+        self._claim_index = {} # claim_id -> packed (block index, leaf index) location
+        self._content_hash_index = {} # packed content_hash -> claim_id, or list of claim_ids sharing that content
+        self._claim_status = {} # claim_id -> ClaimStatus, for claims with recorded verification events
+        self._query_index = ClaimQueryIndex() # status/submitter/content type/time indexes for query_claims()
 
     def create_genesis_block(self):
         """
@@ -56,11 +112,11 @@ class InMemoryLedger:
         
         # Calculate hash for the genesis block
         # The exact content included in the hash is critical for a real blockchain.
-        block_string_for_hash = json.dumps(block, sort_keys=True, separators=(',', ':')) # Compact representation
-        block["hash"] = self._calculate_pseudo_hash(block_string_for_hash)
+        claim_digests = self._hash_single_claim_block(block)
 
-        self.chain.append(block)
-        print(f"Genesis block created and added to ledger. Index: {block['index']}, Hash: {block['hash']}")
+        self._append_block(block, claim_digests)
+        self.instrumentation.event("genesis_created", "Genesis block created and added to ledger. Index: {index}, Hash: {hash}",
+                                   index=block["index"], hash=block["hash"])
 
 
     def add_claim(self, claim_data):
@@ -77,11 +133,18 @@ class InMemoryLedger:
             dict or None: The created block if successful, None otherwise.
         """
         if not isinstance(claim_data, dict):
-            print("Error: Claim data must be a dictionary.")
+            self.instrumentation.event("claim_rejected", "Error: Claim data must be a dictionary.", level="error")
+            return None
+        problem = self.claim_problem(claim_data)
+        if problem:
+            self.instrumentation.event("claim_rejected", "Error: {problem}", level="error", problem=problem)
             return None
 
-        last_block = self.get_last_block()
-        previous_hash_value = last_block["hash"] if last_block else "0" * 64 # Should match genesis 'previous_hash' if chain is empty after init
+        instrumentation = self.instrumentation
+        metrics = instrumentation.metrics
+        if metrics:
+            started = time.perf_counter()
+        previous_hash_value = self.get_last_block_hash() # "0"*64 matches genesis 'previous_hash' if chain is empty after init
 
         block = {
             "index": len(self.chain),
@@ -91,22 +154,259 @@ class InMemoryLedger:
         }
         
         # Calculate a pseudo-hash for the current block
-        # Important: The exact data included in this hash string and the sorting order
+        # Important: The exact data included in this hash and the encoding used
         # are critical for consistency in a real distributed system.
-        block_string_for_hash = json.dumps(block, sort_keys=True, separators=(',', ':'))
-        block["hash"] = self._calculate_pseudo_hash(block_string_for_hash)
+        claim_digests = self._hash_single_claim_block(block)
+
+        if metrics:
+            hashed = time.perf_counter()
+            instrumentation.observe("ledger.hash", hashed - started)
+        self._append_block(block, claim_digests)
+        if metrics:
+            instrumentation.observe("ledger.append", time.perf_counter() - hashed)
+            instrumentation.increment("ledger.blocks_added")
+            instrumentation.increment("ledger.claims_added")
+        if instrumentation.emitting:
+            instrumentation.event("claim_added", "Claim added to ledger. Index: {index}, Hash: {hash}",
+                                  index=block["index"], hash=block["hash"])
+        return block
+
+    def add_claims_batch(self, claims_data):
+        """
+        Adds several claims to the ledger in a single block.
+        The block header commits to the claims through a Merkle root over their canonical
+        hashes, so the block is hashed once regardless of batch size, and individual claims
+        can later be proven with get_merkle_proof().
+
+        Args:
+            claims_data (list): The claim dictionaries to add, in leaf order.
+
+        Returns:
+            dict or None: The created block if successful, None otherwise.
+        """
+        if not claims_data or not all(isinstance(claim_data, dict) for claim_data in claims_data):
+            self.instrumentation.event("batch_rejected", "Error: Claim batch must be a non-empty list of dictionaries.", level="error")
+            return None
+        if len(claims_data) > self.MAX_CLAIMS_PER_BLOCK:
+            self.instrumentation.event("batch_rejected", "Error: Claim batch of {size} exceeds the limit of {limit} claims per block.",
+                                       level="error", size=len(claims_data), limit=self.MAX_CLAIMS_PER_BLOCK)
+            return None
+        for claim_data in claims_data:
+            problem = self.claim_problem(claim_data)
+            if problem:
+                self.instrumentation.event("batch_rejected", "Error: {problem}", level="error", problem=problem)
+                return None
 
-        self.chain.append(block)
-        print(f"Claim added to ledger. Index: {block['index']}, Hash: {block['hash']}")
+        instrumentation = self.instrumentation
+        metrics = instrumentation.metrics
+        if metrics:
+            started = time.perf_counter()
+        claim_digest = self.encoding.claim_digest
+        claim_digests = [claim_digest(claim_data) for claim_data in claims_data]
+        block = {
+            "index": len(self.chain),
+            "timestamp": str(datetime.datetime.utcnow().isoformat()),
+            "claim_count": len(claims_data),
+            "merkle_root": merkle_root([digest.hex() for digest in claim_digests]),
+            "previous_hash": self.get_last_block_hash()
+        }
+        self._stamp_encoding(block)
+        block["claims"] = list(claims_data)
+        # Only the header is hashed; the claims are covered by the Merkle root.
+        block["hash"] = compute_block_hash(block)
+
+        if metrics:
+            hashed = time.perf_counter()
+            instrumentation.observe("ledger.hash", hashed - started)
+        self._append_block(block, claim_digests)
+        if metrics:
+            instrumentation.observe("ledger.append", time.perf_counter() - hashed)
+            instrumentation.increment("ledger.blocks_added")
+            instrumentation.increment("ledger.claims_added", len(claims_data))
+        if instrumentation.emitting:
+            instrumentation.event("claim_batch_added", "Claim batch added to ledger. Index: {index}, Claims: {claims}, Hash: {hash}",
+                                  index=block["index"], claims=len(claims_data), hash=block["hash"])
         return block
 
+    @staticmethod
+    def _claims_in_block(block):
+        """
+        Returns the claims held by a block dictionary, in leaf order, for both block layouts.
+        """
+        return block["claims"] if "claims" in block else [block["claim_data"]]
+
+    def _stamp_encoding(self, block):
+        """
+        Names the ledger's encoding in a block being built, unless it is the legacy encoding,
+        whose blocks carry no "encoding" field.
+
+        Returns:
+            The ledger's encoding.
+        """
+        if self.encoding.name != LEGACY_ENCODING:
+            block["encoding"] = self.encoding.name
+        return self.encoding
+
+    def _hash_single_claim_block(self, block):
+        """
+        Stamps the ledger's encoding on a single-claim block being built and sets its "hash".
+        The claim is encoded at most once, and only if the block hash covers its digest;
+        otherwise the digest is left to be computed on first use.
+
+        Returns:
+            list or None: [claim digest] to keep on the claim record, or None.
+        """
+        encoding = self._stamp_encoding(block)
+        claim_digest = encoding.claim_digest(block["claim_data"]) if encoding.hashes_claim_digest else None
+        block["hash"] = encoding.block_hash(block, claim_digest)
+        return [claim_digest] if claim_digest is not None else None
+
+    def _append_block(self, block, claim_digests=None):
+        """
+        Stores a fully built (hashed) block and indexes it.
+        Storage backends override this to persist the block elsewhere.
+
+        Args:
+            block (dict): The block to append. It is stored as a compact record, so later
+                          changes to the dictionary do not reach the ledger.
+            claim_digests (list, optional): The claims' leaf hashes (bytes) under the block's
+                                            encoding, kept on the claim records.
+        """
+        previous_hash = self.chain[-1].hash if self.chain else None
+        record = block_record_from_dict(block, previous_hash, claim_digests)
+        self.chain.append(record)
+        self._index_block(record)
+
+    def _index_block(self, record):
+        """
+        Records a freshly appended block in the claim_id, content_hash and query indexes.
+
+        Args:
+            record (BlockRecord or BatchBlockRecord): The block that was just appended to self.chain.
+        """
+        add_to_query_index = self._query_index.add
+        for leaf_index, claim in enumerate(record.claims):
+            # Index the packed hash held by the record so both share one bytes object.
+            content_hash = claim.content_hash if claim.content_hash is not None else claim.get("content_hash")
+            self._index_claim(claim.get("claim_id"), content_hash, record.index, leaf_index)
+            timestamp = claim.timestamp # Packed microseconds, or None if the claim's timestamp is not ISO-8601
+            status = self._claim_status.get(claim.claim_id) if self._claim_status else None
+            add_to_query_index((record.index << _LEAF_BITS) | leaf_index,
+                               status.status if status is not None else claim.get("status"), claim.get("submitter_id"),
+                               claim.get("content_type"), timestamp if type(timestamp) is int else None)
+
+    def _index_claim(self, claim_id, content_hash, block_index, leaf_index=0):
+        """
+        Adds one claim to the lookup indexes.
+        If a claim_id is somehow reused, the first block holding it stays authoritative,
+        matching the original first-match scan behaviour.
+
+        Args:
+            claim_id (str): The claim's ID.
+            content_hash (str, bytes or None): The claim's content hash, hex or packed.
+            block_index (int): Position of the block holding the claim.
+            leaf_index (int): Position of the claim within that block.
+        """
+        if claim_id is None or claim_id in self._claim_index:
+            return
+        self._claim_index[claim_id] = (block_index << _LEAF_BITS) | leaf_index
+        if content_hash is not None:
+            key = hash_key(content_hash)
+            existing = self._content_hash_index.get(key)
+            if existing is None:
+                self._content_hash_index[key] = claim_id # Most content is claimed once; no list needed
+            elif type(existing) is list:
+                existing.append(claim_id)
+            else:
+                self._content_hash_index[key] = [existing, claim_id]
+
+    def claim_problem(self, claim_data):
+        """
+        Returns:
+            str or None: Why this backend cannot store the claim, or None if it can. Every
+                         claim is accepted in memory; backends with storage limits override it.
+        """
+        return None
+
+    def append_blocks(self, blocks, verify=True):
+        """
+        Appends blocks built by another ledger, e.g. fetched from a peer, keeping their
+        hashes. Every block must carry the next index and link to the block before it.
+        Nothing is appended unless the whole batch is valid.
+
+        Args:
+            blocks (list): Block dictionaries in chain order.
+            verify (bool): Re-hash each block (and check batch Merkle roots) before appending.
+                           Pass False only for blocks the caller has already verified.
+
+        Returns:
+            int: The number of blocks appended.
+
+        Raises:
+            ValueError: If a block is out of sequence, does not link or fails verification.
+        """
+        from .chain_verifier import check_block
+        previous_hash = self.get_last_block_hash()
+        for offset, block in enumerate(blocks):
+            block_index = len(self.chain) + offset
+            if block.get("index") != block_index:
+                raise ValueError(f"Block {block.get('index')} is out of sequence; expected {block_index}.")
+            if block.get("previous_hash") != previous_hash:
+                raise ValueError(f"Block {block_index} does not link to the preceding block.")
+            if verify:
+                problem = check_block(block, block_index)
+                if problem:
+                    raise ValueError(f"Block {block_index} failed verification: {problem}.")
+            for claim_data in self._claims_in_block(block):
+                problem = self.claim_problem(claim_data)
+                if problem:
+                    raise ValueError(f"Block {block_index} cannot be stored: {problem}")
+            previous_hash = block.get("hash")
+        for block in blocks:
+            self._append_block(block)
+        if blocks and self.instrumentation.metrics:
+            self.instrumentation.increment("ledger.blocks_added", len(blocks))
+        return len(blocks)
+
+    def truncate(self, length):
+        """
+        Drops every block from index 'length' on, e.g. to abandon a fork before adopting a
+        peer's chain, and rebuilds the indexes from the blocks that remain. Recorded
+        verification events stay in the log, keyed by claim_id, but are only reported for
+        claims still in the chain; they apply again if a claim with the same claim_id is
+        appended later.
+
+        Args:
+            length (int): Number of blocks to keep (0 drops the genesis block too).
+        """
+        if length >= len(self.chain):
+            return
+        kept = self.chain[:max(length, 0)]
+        claim_status = self._claim_status
+        self._init_indexes()
+        self._claim_status = claim_status
+        self.chain = []
+        for record in kept:
+            self.chain.append(record)
+            self._index_block(record)
+        self.instrumentation.event("ledger_truncated", "Ledger truncated to {length} blocks.", length=len(self.chain))
+
+    def get_block_hash(self, block_index):
+        """
+        Returns:
+            str or None: The hash of the block at 'block_index', or None if it is out of range.
+        """
+        if not 0 <= block_index < len(self.chain):
+            return None
+        return self.chain[block_index]["hash"]
+
     def get_last_block(self):
         """
         Returns the last block in the chain.
         Returns:
             dict or None: The last block dictionary, or None if the chain is empty.
         """
-        return self.chain[-1] if self.chain else None
+        return as_dict(self.chain[-1]) if self.chain else None
 
     def get_last_block_hash(self):
         """
@@ -115,24 +415,371 @@ class InMemoryLedger:
         Returns:
             str or None: The hash of the last block, or "0"*64 if chain is empty.
         """
-        last_block = self.get_last_block()
-        return last_block["hash"] if last_block else "0" * 64 # Should align with genesis's previous_hash
+        return self.chain[-1]["hash"] if self.chain else "0" * 64 # Should align with genesis's previous_hash
 
-    def get_claim_by_id(self, claim_id):
+    def get_claim_by_id(self, claim_id, with_events=True):
         """
         Retrieves a specific claim by its unique 'claim_id'.
-        Searches through all blocks in the chain.
+        Uses the claim_id index, so the cost does not depend on the chain length.
+        The claim's "status" is its current aggregate status.
 
         Args:
             claim_id (str): The ID of the claim to retrieve.
+            with_events (bool): Append the claim's recorded verification events to its
+                                "verification_history". False skips reading the history.
         
         Returns:
             dict or None: The claim_data dictionary if found, otherwise None.
         """
-        for block in self.chain:
-            if block["claim_data"].get("claim_id") == claim_id:
-                return block["claim_data"]
-        return None
+        location = self.get_claim_location(claim_id)
+        if location is None:
+            return None
+        return self.get_claim_by_location(*location, with_events=with_events)
+
+    def get_claim_location(self, claim_id):
+        """
+        Returns where 'claim_id' is stored in the chain.
+
+        Args:
+            claim_id (str): The ID of the claim to locate.
+
+        Returns:
+            tuple or None: (block_index, leaf_index) if the claim is known, otherwise None.
+                           leaf_index is 0 for single-claim blocks.
+        """
+        location = self._claim_index.get(claim_id)
+        if location is None:
+            return None
+        return location >> _LEAF_BITS, location & _LEAF_MASK
+
+    def get_block_index(self, claim_id):
+        """
+        Returns the position in the chain of the block holding 'claim_id'.
+
+        Args:
+            claim_id (str): The ID of the claim to locate.
+
+        Returns:
+            int or None: The block index if the claim is known, otherwise None.
+        """
+        location = self._claim_index.get(claim_id)
+        return location >> _LEAF_BITS if location is not None else None
+
+    def get_claim_by_location(self, block_index, leaf_index=0, with_events=True):
+        """
+        Retrieves a claim by its position in the chain.
+
+        Args:
+            block_index (int): Index of the block holding the claim.
+            leaf_index (int): Position of the claim within the block (0 for single-claim blocks).
+            with_events (bool): See get_claim_by_id().
+
+        Returns:
+            dict or None: The claim_data dictionary if the position exists, otherwise None.
+        """
+        if not 0 <= block_index < len(self.chain):
+            return None
+        claims = self.chain[block_index].claims
+        if not 0 <= leaf_index < len(claims):
+            return None
+        return self._apply_verification_state(claims[leaf_index].to_dict(), with_events)
+
+    def _apply_verification_state(self, claim_data, with_events=True):
+        """
+        Overlays a claim dictionary, as stored in its block, with its aggregate status and,
+        if requested, its recorded verification events.
+
+        Returns:
+            dict: 'claim_data', updated in place.
+        """
+        claim_id = claim_data.get("claim_id")
+        status = self._claim_status.get(claim_id) if claim_id is not None else None
+        if status is not None:
+            claim_data["status"] = status.status
+            if with_events:
+                claim_data["verification_history"] = (
+                    list(claim_data.get("verification_history") or []) + self.get_verification_events(claim_id))
+        return claim_data
+
+    def get_block(self, block_index):
+        """
+        Returns a block with the current verification state of its claims applied.
+
+        Args:
+            block_index (int): Index of the block.
+
+        Returns:
+            dict or None: The block dictionary, or None if the index is out of range.
+        """
+        if not 0 <= block_index < len(self.chain):
+            return None
+        block = self.chain[block_index].to_dict()
+        for claim_data in self._claims_in_block(block):
+            self._apply_verification_state(claim_data)
+        return block
+
+    def _stored_claim(self, claim_id):
+        """
+        Returns the claim as stored in its block, without recorded verification state, or None.
+        """
+        location = self.get_claim_location(claim_id)
+        if location is None:
+            return None
+        return self.chain[location[0]].claims[location[1]]
+
+    def record_verification(self, claim_id, verification_events, weights=None):
+        """
+        Records new verification events for a claim.
+        The events are appended to the verification log and folded into the claim's
+        aggregate status in O(1) each; the block holding the claim is left untouched, so
+        its hash stays valid however long the claim's history grows.
+
+        Args:
+            claim_id (str): The ID of the verified claim.
+            verification_events (list): The new events, in the order they were produced.
+            weights (dict, optional): agent_id -> weight of that agent's confidence score in
+                                      the claim's weighted confidence (default 1.0).
+
+        Returns:
+            str or None: The claim's new status, or None if the claim is unknown.
+        """
+        status = self._claim_status.get(claim_id)
+        if status is None:
+            stored_claim = self._stored_claim(claim_id)
+            if stored_claim is None:
+                return None
+            previous_status = stored_claim.get("status")
+            # Events submitted with the claim count towards its status, as they always have.
+            status = self._claim_status[claim_id] = ClaimStatus.from_history(
+                stored_claim.get("verification_history") or ())
+        else:
+            previous_status = status.status
+        for event in verification_events:
+            if isinstance(event, dict):
+                event = VerificationEvent.from_dict(event)
+            self._log_previous.append(status.last_position if status.last_position is not None else -1)
+            status.last_position = len(self._log_events)
+            self._log_events.append(event)
+            self._log_claim_ids.append(claim_id)
+            status.apply(event, weights.get(event.get("agent_id"), 1.0) if weights else 1.0)
+        if status.status != previous_status:
+            self._query_index.update_status(self._claim_index[claim_id], previous_status, status.status)
+        return status.status
+
+    def get_claim_status(self, claim_id):
+        """
+        Returns a claim's current status without reading its verification history.
+
+        Returns:
+            str or None: The aggregate status, the status the claim was submitted with if it
+                         has no recorded events, or None if the claim is unknown.
+        """
+        if claim_id not in self._claim_index: # Also hides the events of claims dropped by truncate()
+            return None
+        status = self._claim_status.get(claim_id)
+        if status is not None:
+            return status.status
+        stored_claim = self._stored_claim(claim_id)
+        return stored_claim.get("status") if stored_claim is not None else None
+
+    def get_claim_summary(self, claim_id):
+        """
+        Returns the aggregate of a claim's recorded verification events: status, best
+        verdict, weighted confidence, event count and each agent's latest result.
+
+        Returns:
+            dict or None: The summary, or None if the claim is unknown or no events were
+                          recorded for it.
+        """
+        status = self._claim_status.get(claim_id)
+        return status.to_dict() if status is not None and claim_id in self._claim_index else None
+
+    def get_verification_events(self, claim_id):
+        """
+        Returns:
+            list: The verification events recorded for a claim, oldest first, as dictionaries.
+        """
+        status = self._claim_status.get(claim_id)
+        events = []
+        position = status.last_position if status is not None else None
+        while position is not None and position >= 0:
+            events.append(self._log_events[position].to_dict())
+            position = self._log_previous[position]
+        events.reverse()
+        return events
+
+    def iter_verification_log(self, start=0):
+        """
+        Yields the verification log in the order events were recorded.
+
+        Args:
+            start (int): Log position to start from.
+
+        Yields:
+            tuple: (position, claim_id, event dictionary)
+        """
+        for position in range(start, len(self._log_events)):
+            yield position, self._log_claim_ids[position], self._log_events[position].to_dict()
+
+    def _claim_query_index(self):
+        """
+        Returns the ClaimQueryIndex behind query_claims(). Backends may build it on first use.
+        """
+        return self._query_index
+
+    def query_claims(self, status=None, submitter_id=None, content_type=None, since=None, until=None,
+                     cursor=None, with_events=False):
+        """
+        Lazily yields the claims matching every given filter, in ledger order.
+        The filters are answered from maintained secondary indexes, so only matching claims
+        are read; stop iterating at any point and resume later by passing the cursor of the
+        last claim consumed. Claims added or re-verified meanwhile are picked up on resume.
+
+        Args:
+            status (str, optional): Current (aggregate) status of the claim.
+            submitter_id (str, optional): Submitter of the claim.
+            content_type (str, optional): Content type of the claim.
+            since (str, datetime or int, optional): Earliest claim timestamp, inclusive: an
+                                                    ISO-8601 string, a datetime or
+                                                    microseconds since the epoch.
+            until (str, datetime or int, optional): Latest claim timestamp, exclusive.
+            cursor (int, optional): Opaque cursor returned with an earlier result.
+            with_events (bool): See get_claim_by_id().
+
+        Yields:
+            tuple: (cursor, claim_data)
+        """
+        index = self._claim_query_index()
+        for location in index.select(status, submitter_id, content_type, since, until, after=cursor):
+            claim_data = self.get_claim_by_location(location >> _LEAF_BITS, location & _LEAF_MASK, with_events)
+            if claim_data is not None:
+                yield location, claim_data
+
+    def query_page(self, status=None, submitter_id=None, content_type=None, since=None, until=None,
+                   cursor=None, limit=100, with_events=False):
+        """
+        Returns one page of query_claims() results.
+
+        Args:
+            limit (int): Largest number of claims in the page.
+            Others: See query_claims().
+
+        Returns:
+            dict: {"claims": [claim_data, ...], "next_cursor": cursor of the next page, or
+                  None if this page holds the last matching claim}
+        """
+        claims = []
+        last = cursor
+        for location in self._claim_query_index().select(status, submitter_id, content_type, since, until, after=cursor):
+            if len(claims) >= limit: # A further match exists; it is not read until the next page
+                return {"claims": claims, "next_cursor": last}
+            claim_data = self.get_claim_by_location(location >> _LEAF_BITS, location & _LEAF_MASK, with_events)
+            if claim_data is not None:
+                claims.append(claim_data)
+                last = location
+        return {"claims": claims, "next_cursor": None}
+
+    def count_claims(self, status=None, submitter_id=None, content_type=None, since=None, until=None):
+        """
+        Counts the claims matching the filters of query_claims() without reading them.
+
+        Returns:
+            int: The number of matching claims.
+        """
+        return self._claim_query_index().count(status=status, submitter_id=submitter_id, content_type=content_type,
+                                               since=since, until=until)
+
+    def _leaf_hashes(self, block_index):
+        """
+        Returns the hex Merkle leaf hashes of a batch block, from the digests cached on its claims.
+        """
+        block = self.chain[block_index]
+        encoding = encoding_of_block(block)
+        return [claim.claim_digest(encoding).hex() for claim in block.claims]
+
+    def get_merkle_proof(self, claim_id):
+        """
+        Produces a Merkle inclusion proof for a claim stored in a batch block.
+        A client can check it with node.merkle.verify_inclusion_proof() using only the claim,
+        without fetching or re-hashing the rest of the block.
+
+        Args:
+            claim_id (str): The ID of the claim to prove.
+
+        Returns:
+            dict or None: The proof, or None if the claim is unknown or not in a batch block.
+        """
+        location = self.get_claim_location(claim_id)
+        if location is None:
+            return None
+        block_index, leaf_index = location
+        block = self.chain[block_index]
+        if "merkle_root" not in block:
+            return None
+
+        leaf_hashes = self._leaf_hashes(block_index)
+        header_fields = BATCH_HEADER_FIELDS + ("encoding",) if "encoding" in block else BATCH_HEADER_FIELDS
+        return {
+            "claim_id": claim_id,
+            "block_index": block_index,
+            "leaf_index": leaf_index,
+            "leaf_hash": leaf_hashes[leaf_index],
+            "path": merkle_path(leaf_hashes, leaf_index),
+            "block_header": {key: block[key] for key in header_fields},
+            "block_hash": block["hash"]
+        }
+
+    def get_claim_ids_by_content_hash(self, content_hash):
+        """
+        Returns the IDs of every claim submitted for the given content hash,
+        in the order they were added to the ledger.
+
+        Args:
+            content_hash (str): The content hash to look up.
+
+        Returns:
+            list: A (possibly empty) list of claim_id strings.
+        """
+        claim_ids = self._content_hash_index.get(hash_key(content_hash))
+        if claim_ids is None:
+            return []
+        return list(claim_ids) if type(claim_ids) is list else [claim_ids]
+
+    def _export_block_range(self, start, end):
+        """
+        Returns blocks [start, end) in a form that can be shipped to verification workers.
+        """
+        return [block.to_dict() for block in self.chain[start:end]]
+
+    def verify_chain(self, workers=None, range_size=None, full=False, checkpoint_store=None):
+        """
+        Re-hashes the chain in parallel and checks previous_hash links, skipping blocks
+        covered by the latest trusted checkpoint. See node.chain_verifier.verify_chain.
+
+        Args:
+            workers (int, optional): Worker processes; None uses all cores, 0 or 1 runs serially.
+            range_size (int, optional): Blocks per worker task.
+            full (bool): Ignore checkpoints and verify from the genesis block.
+            checkpoint_store (ChainCheckpointStore, optional): Store to use instead of the
+                                                               ledger's own per-process store.
+
+        Returns:
+            dict: The verification report, including "first_corrupted_index" and "blocks_per_second".
+        """
+        from .chain_verifier import ChainCheckpointStore, DEFAULT_RANGE_SIZE, verify_chain
+        if checkpoint_store is None:
+            if self.checkpoint_store is None:
+                self.checkpoint_store = ChainCheckpointStore()
+            checkpoint_store = self.checkpoint_store
+        return verify_chain(self, workers=workers, range_size=range_size or DEFAULT_RANGE_SIZE,
+                            checkpoint_store=checkpoint_store, full=full)
+
+    def close(self):
+        """
+        Releases any resources held by the ledger. Nothing to do for the in-memory ledger;
+        persistent backends flush and close their files here.
+        """
+        pass
 
     def display_ledger(self):
         """
@@ -143,15 +790,17 @@ class InMemoryLedger:
         if not self.chain:
             print("Ledger is empty.")
             return
-        for block in self.chain:
+        for block_index in range(len(self.chain)):
             # Using separators for a more compact pretty print
-            print(json.dumps(block, indent=2, sort_keys=True, separators=(',', ': '))) 
+            print(json.dumps(self.get_block(block_index), indent=2, sort_keys=True, separators=(',', ': ')))
         print(f"--- Total Blocks: {len(self.chain)} ---")
         print("--- End of Ledger ---\n")
 
 if __name__ == '__main__':
     # Test the ledger
     print("--- Ledger Self-Test ---")
+    from .instrumentation import ConsoleSink
+    DEFAULT_INSTRUMENTATION.add_sink(ConsoleSink()) # Show ledger events on the console
     ledger = InMemoryLedger() # Genesis block is created here
     # ledger.display_ledger() # Display after genesis
 
@@ -189,4 +838,57 @@ if __name__ == '__main__':
     retrieved_genesis = ledger.get_claim_by_id("genesis_000")
     print("\nRetrieved genesis_000:")
     print(json.dumps(retrieved_genesis, indent=2, sort_keys=True))
+
+    print(f"\nBlock index of test_002: {ledger.get_block_index('test_002')}")
+    print(f"Claims sharing test_001's content hash: {ledger.get_claim_ids_by_content_hash(test_claim_1['content_hash'])}")
+    print(f"Lookup of unknown claim: {ledger.get_claim_by_id('does_not_exist')}")
+
+    print("\n--- Batch Block and Merkle Proof (Self-Test) ---")
+    from .merkle import verify_inclusion_proof
+    batch = [
+        {
+            "claim_id": f"batch_{i:03d}",
+            "timestamp": str(datetime.datetime.utcnow().isoformat()),
+            "submitter_id": "user_gamma",
+            "content_hash": hashlib.sha256(f"batch content {i}".encode()).hexdigest(),
+            "content_type": "text/plain",
+            "metadata": {},
+            "verification_history": [],
+            "status": "pending_verification"
+        }
+        for i in range(5)
+    ]
+    batch_block = ledger.add_claims_batch(batch)
+    print(f"Location of batch_003: {ledger.get_claim_location('batch_003')}")
+    proof = ledger.get_merkle_proof("batch_003")
+    print(f"Proof path length: {len(proof['path'])}, valid: {verify_inclusion_proof(batch[3], proof)}")
+    print(f"Proof rejects a different claim: {not verify_inclusion_proof(batch[2], proof)}")
+
+    print("\n--- Verification Events (Self-Test) ---")
+    ledger.record_verification("test_001", [{"agent_id": "simple_verifier_v1", "verdict": "unverified", "confidence_score": 0.2}])
+    status = ledger.record_verification("test_001", [
+        {"agent_id": "simple_verifier_v1", "verdict": "verified_preliminary", "confidence_score": 0.8},
+        {"agent_id": "known_facts_v1", "verdict": "caution_advised", "confidence_score": 0.4}
+    ])
+    print(f"Status of test_001: {status} (read back: {ledger.get_claim_status('test_001')})")
+    print(f"Summary of test_001: {ledger.get_claim_summary('test_001')}")
+    print(f"History length of test_001: {len(ledger.get_claim_by_id('test_001')['verification_history'])}")
+    print(f"Unknown claim: {ledger.record_verification('does_not_exist', [])}")
+
+    print("\n--- Claim Queries (Self-Test) ---")
+    pending = [claim["claim_id"] for _, claim in ledger.query_claims(status="pending_verification")]
+    print(f"Pending claims: {pending}")
+    print(f"Verified claims: {[claim['claim_id'] for _, claim in ledger.query_claims(status='verified_preliminary')]}")
+    print(f"Pending text/plain claims of user_gamma: {ledger.count_claims(status='pending_verification', submitter_id='user_gamma', content_type='text/plain')}")
+    print(f"Claims since test_002 was submitted: "
+          f"{[claim['claim_id'] for _, claim in ledger.query_claims(since=test_claim_2['timestamp'])]}")
+    page = ledger.query_page(submitter_id="user_gamma", limit=2)
+    pages = [[claim["claim_id"] for claim in page["claims"]]]
+    while page["next_cursor"] is not None:
+        page = ledger.query_page(submitter_id="user_gamma", cursor=page["next_cursor"], limit=2)
+        pages.append([claim["claim_id"] for claim in page["claims"]])
+    print(f"user_gamma's claims in pages of 2: {pages}")
+
+    print("\n--- Chain Integrity (Self-Test) ---")
+    print(f"Chain verification: {ledger.verify_chain(workers=1)}")
     print("--- End of Ledger Self-Test ---")
\ No newline at end of file
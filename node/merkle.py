@@ -0,0 +1,164 @@
+# node/merkle.py
+
+import hashlib
+import json
+
+# Claim fields that change after submission (verification results and aggregate status).
+# They are left out of a claim's canonical hash so Merkle proofs stay valid after verification.
+CLAIM_MUTABLE_FIELDS = ("verification_history", "status")
+
+# Domain separation prefixes, so a leaf can never be mistaken for an interior node.
+_LEAF_PREFIX = b"\x00"
+_NODE_PREFIX = b"\x01"
+
+# Built once: json.dumps() constructs a new encoder on every call that passes options.
+_canonical_json = json.JSONEncoder(sort_keys=True, separators=(',', ':')).encode
+
+
+def canonical_claim_bytes(claim_data):
+    """
+    Returns the canonical byte encoding of a claim's immutable fields.
+
+    Args:
+        claim_data (dict): The claim.
+
+    Returns:
+        bytes: Compact, key-sorted JSON of the claim without its mutable fields.
+    """
+    immutable = {key: value for key, value in claim_data.items() if key not in CLAIM_MUTABLE_FIELDS}
+    return _canonical_json(immutable).encode()
+
+
+def claim_leaf_hash(claim_data):
+    """
+    Computes the Merkle leaf hash of a claim.
+
+    Args:
+        claim_data (dict): The claim.
+
+    Returns:
+        str: Hex SHA256 leaf hash.
+    """
+    return hashlib.sha256(_LEAF_PREFIX + canonical_claim_bytes(claim_data)).hexdigest()
+
+
+def leaf_digest(encoded_claim):
+    """
+    Computes the raw Merkle leaf hash of an already encoded claim.
+
+    Args:
+        encoded_claim (bytes): The claim's canonical encoding.
+
+    Returns:
+        bytes: 32-byte SHA256 leaf hash.
+    """
+    return hashlib.sha256(_LEAF_PREFIX + encoded_claim).digest()
+
+
+def _hash_pair(left_hex, right_hex):
+    return hashlib.sha256(_NODE_PREFIX + bytes.fromhex(left_hex) + bytes.fromhex(right_hex)).hexdigest()
+
+
+def _next_level(level):
+    # An odd node out is promoted unchanged rather than paired with a copy of itself,
+    # which avoids the duplicate-leaf ambiguity of Bitcoin-style trees.
+    next_level = [_hash_pair(level[i], level[i + 1]) for i in range(0, len(level) - 1, 2)]
+    if len(level) % 2:
+        next_level.append(level[-1])
+    return next_level
+
+
+def merkle_root(leaf_hashes):
+    """
+    Computes the Merkle root over a list of leaf hashes.
+
+    Args:
+        leaf_hashes (list): Hex leaf hashes, in leaf order.
+
+    Returns:
+        str: Hex Merkle root, or "0"*64 for an empty list.
+    """
+    if not leaf_hashes:
+        return "0" * 64
+    level = list(leaf_hashes)
+    while len(level) > 1:
+        level = _next_level(level)
+    return level[0]
+
+
+def merkle_path(leaf_hashes, leaf_index):
+    """
+    Builds the audit path proving that one leaf is part of the tree.
+
+    Args:
+        leaf_hashes (list): Hex leaf hashes of the whole tree, in leaf order.
+        leaf_index (int): Position of the leaf to prove.
+
+    Returns:
+        list: Path steps from the leaf upwards, each {"hash": sibling_hex, "position": "left"|"right"}.
+    """
+    if not 0 <= leaf_index < len(leaf_hashes):
+        raise IndexError("leaf index out of range")
+    path = []
+    level = list(leaf_hashes)
+    index = leaf_index
+    while len(level) > 1:
+        sibling = index ^ 1
+        if sibling < len(level):
+            path.append({"hash": level[sibling], "position": "left" if sibling < index else "right"})
+        level = _next_level(level)
+        index //= 2
+    return path
+
+
+def root_from_path(leaf_hash, path):
+    """
+    Folds an audit path onto a leaf hash.
+
+    Args:
+        leaf_hash (str): Hex leaf hash.
+        path (list): Path as returned by merkle_path().
+
+    Returns:
+        str: The Merkle root implied by the leaf and path.
+    """
+    current = leaf_hash
+    for step in path:
+        if step["position"] == "left":
+            current = _hash_pair(step["hash"], current)
+        else:
+            current = _hash_pair(current, step["hash"])
+    return current
+
+
+def verify_inclusion_proof(claim_data, proof):
+    """
+    Client-side check that a claim is included in a ledger block, using only the claim
+    and an inclusion proof produced by InMemoryLedger.get_merkle_proof().
+    Both the Merkle path and the block header hash are checked, so the caller only needs
+    to trust the block hash itself (e.g. from a checkpoint or another node).
+
+    Args:
+        claim_data (dict): The claim to check.
+        proof (dict): The inclusion proof.
+
+    Returns:
+        bool: True if the claim is proven to be in the block, False otherwise.
+    """
+    from .canonical import encoding_of_block # Canonical encodings build on this module
+    header = proof["block_header"]
+    encoding = encoding_of_block(header)
+    if root_from_path(encoding.claim_digest(claim_data).hex(), proof["path"]) != header["merkle_root"]:
+        return False
+    return encoding.block_hash(header) == proof["block_hash"]
+
+
+if __name__ == '__main__':
+    # Test Merkle roots and proofs for a range of tree sizes.
+    print("--- Merkle Self-Test ---")
+    for leaf_count in (1, 2, 3, 5, 8, 13):
+        leaves = [hashlib.sha256(str(i).encode()).hexdigest() for i in range(leaf_count)]
+        root = merkle_root(leaves)
+        all_ok = all(root_from_path(leaves[i], merkle_path(leaves, i)) == root for i in range(leaf_count))
+        print(f"{leaf_count:>2} leaves -> root {root[:16]}..., all proofs valid: {all_ok}")
+    print("--- End of Merkle Self-Test ---")
@@ -0,0 +1,557 @@
+# node/records.py
+
+import datetime
+import marshal
+
+# Compact in-memory records for ledger blocks, claims and verification events.
+# Records keep their fields in __slots__ and store repeated or bulky values compactly:
+#   - hex SHA256 digests as 32 raw bytes,
+#   - ISO-8601 timestamps as integer microseconds since the Unix epoch,
+#   - content types, statuses, verdicts and other repeated strings as shared interned objects,
+#   - metadata and structured agent details as marshal-encoded bytes (exact for the plain
+#     dicts, lists and scalars claims are made of, and several times cheaper to decode than JSON).
+# Every record reproduces the exact dictionary it was built from through to_dict(), so block
+# hashes, Merkle leaves and everything handed out of the ledger are unchanged. Records also
+# support read-only mapping access (record["hash"], "claims" in record) for code written
+# against the dictionary layout.
+
+_EPOCH = datetime.datetime(1970, 1, 1)
+_MICROSECOND = datetime.timedelta(microseconds=1)
+_timedelta = datetime.timedelta
+_HEX_DIGITS = frozenset("0123456789abcdef")
+
+ZERO_HASH = bytes(32) # Packed form of "0"*64, shared by every record that carries it
+
+_MISSING = object() # Marks a value that cannot be stored compactly and lives in the record's extras
+
+
+class InternTable:
+    """
+    A bounded table of canonical value instances: equal values passed through intern()
+    come back as one shared object, so a value repeated across millions of records is
+    stored once. The table is cleared (keeping its preloaded values) once it holds
+    max_entries values; objects already shared stay shared.
+    """
+    def __init__(self, name, values=(), max_entries=65536):
+        """
+        Args:
+            name (str): What the table holds, for stats.
+            values (iterable): Values that are always present, e.g. a known enumeration.
+            max_entries (int): Size at which the table is cleared.
+        """
+        self.name = name
+        self.max_entries = max_entries
+        self._preloaded = {value: value for value in values}
+        self._values = dict(self._preloaded)
+
+    def intern(self, value):
+        """
+        Returns:
+            The canonical instance equal to 'value'. Unhashable values are returned as is.
+        """
+        try:
+            canonical = self._values.get(value)
+        except TypeError:
+            return value
+        if canonical is None:
+            if len(self._values) >= self.max_entries:
+                self._values = dict(self._preloaded)
+            canonical = self._values[value] = value
+        return canonical
+
+    def __len__(self):
+        return len(self._values)
+
+    def __contains__(self, value):
+        return value in self._values
+
+
+# Interned enumerations of the values repeated in every claim and verification event.
+CONTENT_TYPES = InternTable("content_type", ("text/plain", "image/jpeg", "application/pdf", "application/json",
+                                             "video/mp4", "system/genesis"))
+STATUSES = InternTable("status", ("pending_verification", "reverification_needed", "verified_preliminary",
+                                  "unverified", "verified_immutable"))
+VERDICTS = InternTable("verdict", ("verified_preliminary", "unverified", "caution_advised",
+                                   "appears_consistent_with_known_facts", "neutral_no_strong_signal",
+                                   "error_agent_execution", "error_agent_timeout"))
+SUBMITTERS = InternTable("submitter_id", ("system_helios",))
+AGENTS = InternTable("agent") # Agent IDs and versions
+DETAILS = InternTable("details") # Agent detail strings and packed detail structures
+LAYOUTS = InternTable("layout") # Key orders of records, shared by every record with the same keys
+ENCODING_NAMES = InternTable("encoding", ("compact-v1",)) # Block encodings, see node.canonical
+
+
+def _interning(table):
+    """
+    Returns a packer that interns strings in 'table' and keeps other values as they are.
+    """
+    intern = table.intern
+
+    def pack(value):
+        return intern(value) if type(value) is str else value
+    return pack
+
+
+def _keep(value):
+    return value
+
+
+def pack_hash(value):
+    """
+    Returns the 32-byte form of a lowercase hex SHA256 digest, or 'value' unchanged if it
+    is not one (short or uppercase hashes would not survive the round trip).
+    """
+    if type(value) is str and len(value) == 64 and _HEX_DIGITS.issuperset(value):
+        return ZERO_HASH if value == "0" * 64 else bytes.fromhex(value)
+    return value
+
+
+def unpack_hash(value):
+    return value.hex() if type(value) is bytes else value
+
+
+def hash_key(value):
+    """
+    Returns the key under which a content hash is indexed: hex digests and their packed
+    form map to the same 32 bytes.
+    """
+    return value if type(value) is bytes else pack_hash(value)
+
+
+def pack_timestamp(value):
+    """
+    Returns an ISO-8601 timestamp (as produced by datetime.isoformat() without a timezone)
+    as integer microseconds since the epoch, or _MISSING if it would not survive the round trip.
+    """
+    if type(value) is not str or len(value) not in (19, 26):
+        return _MISSING
+    try:
+        moment = datetime.datetime.fromisoformat(value)
+    except ValueError:
+        return _MISSING
+    if moment.tzinfo is not None or moment.isoformat() != value:
+        return _MISSING
+    return (moment - _EPOCH) // _MICROSECOND
+
+
+def unpack_timestamp(value):
+    return (_EPOCH + _timedelta(0, 0, value)).isoformat()
+
+
+def _pack_structure(value):
+    """
+    Returns 'value' (a dict or list) marshalled to bytes, or _MISSING if it holds
+    objects marshal cannot encode.
+    """
+    try:
+        return marshal.dumps(value)
+    except ValueError:
+        return _MISSING
+
+
+_unpack_structure = marshal.loads
+
+
+def as_dict(block_or_claim):
+    """
+    Returns the dictionary form of a record; dictionaries are returned unchanged.
+    """
+    return block_or_claim if isinstance(block_or_claim, dict) else block_or_claim.to_dict()
+
+
+class _Record:
+    """
+    Read-only mapping access shared by all records. Subclasses implement keys() and
+    _view(key), which returns the dictionary form of one field.
+    """
+    __slots__ = ()
+
+    def __getitem__(self, key):
+        if key not in self.keys():
+            raise KeyError(key)
+        return self._view(key)
+
+    def __contains__(self, key):
+        return key in self.keys()
+
+    def get(self, key, default=None):
+        return self._view(key) if key in self.keys() else default
+
+    def to_dict(self):
+        """
+        Returns:
+            dict: A new dictionary equal to the one the record was built from.
+        """
+        return {key: self._view(key) for key in self.keys()}
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+
+class _FlexibleRecord(_Record):
+    """
+    A record built from a dictionary with arbitrary keys. Known fields are packed into slots;
+    unknown keys and values that cannot be packed losslessly are kept in the 'extra' dict.
+    'layout' is the interned tuple of the original keys, in their original order.
+    """
+    __slots__ = ()
+    FIELDS = ()
+    PACKERS = {} # field -> function returning the field's packed value, or _MISSING
+
+    def keys(self):
+        return self.layout
+
+    def _view(self, key):
+        extra = self.extra
+        if extra is not None and key in extra:
+            return extra[key]
+        return self._unpack(key)
+
+    def _set_layout(self, layout, extra):
+        self.layout = LAYOUTS.intern(tuple(layout))
+        self.extra = extra or None
+
+    def _store(self, source):
+        """
+        Packs every field of the 'source' dictionary.
+        """
+        extra = {}
+        present = 0
+        for field, pack in self.PACKERS.items():
+            value = source.get(field, _MISSING)
+            if value is _MISSING:
+                setattr(self, field, None)
+                continue
+            present += 1
+            packed = pack(value)
+            if packed is _MISSING:
+                extra[field] = value
+                packed = None
+            setattr(self, field, packed)
+        if len(source) > present:
+            for key, value in source.items():
+                if key not in self.PACKERS:
+                    extra[key] = value
+        self._set_layout(source, extra)
+
+
+class VerificationEvent(_FlexibleRecord):
+    """
+    One agent result in a claim's verification history.
+    """
+    __slots__ = ("agent_id", "agent_version", "timestamp", "verdict", "details", "confidence_score", "layout", "extra")
+    FIELDS = ("agent_id", "agent_version", "timestamp", "verdict", "details", "confidence_score")
+    STANDARD_LAYOUT = LAYOUTS.intern(FIELDS)
+
+    @staticmethod
+    def _pack_details(value):
+        if type(value) is str:
+            return DETAILS.intern(value)
+        if isinstance(value, (dict, list)):
+            packed = _pack_structure(value)
+            return DETAILS.intern(packed) if packed is not _MISSING else _MISSING
+        return value if type(value) is not bytes else _MISSING
+
+    @classmethod
+    def from_dict(cls, event):
+        record = cls.__new__(cls)
+        record._store(event)
+        return record
+
+    def _unpack(self, key):
+        if key == "timestamp":
+            return unpack_timestamp(self.timestamp)
+        if key == "details":
+            details = self.details
+            return _unpack_structure(details) if type(details) is bytes else details
+        return getattr(self, key)
+
+    def to_dict(self):
+        layout = self.layout
+        if self.extra is None and len(layout) == 6:
+            details = self.details
+            view = {
+                "agent_id": self.agent_id,
+                "agent_version": self.agent_version,
+                "timestamp": unpack_timestamp(self.timestamp),
+                "verdict": self.verdict,
+                "details": _unpack_structure(details) if type(details) is bytes else details,
+                "confidence_score": self.confidence_score
+            }
+            return view if layout is self.STANDARD_LAYOUT else {key: view[key] for key in layout}
+        return _Record.to_dict(self)
+
+
+VerificationEvent.PACKERS = {
+    "agent_id": _interning(AGENTS),
+    "agent_version": _interning(AGENTS),
+    "timestamp": pack_timestamp,
+    "verdict": _interning(VERDICTS),
+    "details": VerificationEvent._pack_details,
+    "confidence_score": _keep
+}
+
+
+def pack_history(verification_history):
+    """
+    Returns a verification history (list of event dicts) as a tuple of VerificationEvent
+    records, or _MISSING if it is not a list of dictionaries.
+    """
+    if type(verification_history) is not list:
+        return _MISSING
+    events = []
+    for event in verification_history:
+        if isinstance(event, VerificationEvent):
+            events.append(event)
+        elif isinstance(event, dict):
+            events.append(VerificationEvent.from_dict(event))
+        else:
+            return _MISSING
+    return tuple(events)
+
+
+class ClaimRecord(_FlexibleRecord):
+    """
+    A claim as stored in the in-memory ledger.
+    'verification_history' is a tuple of VerificationEvent records and 'metadata' is
+    marshalled bytes (None when empty); both are expanded again by to_dict().
+    'digest' caches the claim's 32-byte canonical leaf hash (see node.canonical) once it
+    has been computed.
+    """
+    __slots__ = ("claim_id", "timestamp", "submitter_id", "content_hash", "content_type", "metadata",
+                 "verification_history", "status", "layout", "extra", "digest")
+    FIELDS = ("claim_id", "timestamp", "submitter_id", "content_hash", "content_type", "metadata",
+              "verification_history", "status")
+    STANDARD_LAYOUT = LAYOUTS.intern(FIELDS)
+
+    @staticmethod
+    def _pack_content_hash(value):
+        return pack_hash(value) if type(value) is str else _MISSING
+
+    @staticmethod
+    def _pack_metadata(value):
+        if type(value) is not dict:
+            return _MISSING
+        return _pack_structure(value) if value else None
+
+    @classmethod
+    def from_dict(cls, claim_data, digest=None):
+        record = cls.__new__(cls)
+        record._store(claim_data)
+        record.digest = digest
+        return record
+
+    def claim_digest(self, encoding):
+        """
+        Returns:
+            bytes: The claim's leaf hash under 'encoding', computed at most once.
+        """
+        digest = self.digest
+        if digest is None:
+            digest = self.digest = encoding.claim_digest(self.to_dict())
+        return digest
+
+    def _unpack(self, key):
+        if key == "timestamp":
+            return unpack_timestamp(self.timestamp)
+        if key == "content_hash":
+            return unpack_hash(self.content_hash)
+        if key == "metadata":
+            return _unpack_structure(self.metadata) if self.metadata is not None else {}
+        if key == "verification_history":
+            return [event.to_dict() for event in self.verification_history]
+        return getattr(self, key)
+
+    def to_dict(self):
+        layout = self.layout
+        # Without extras, a layout of len(FIELDS) keys holds exactly the standard fields.
+        if self.extra is None and len(layout) == 8:
+            metadata = self.metadata
+            content_hash = self.content_hash
+            view = {
+                "claim_id": self.claim_id,
+                "timestamp": unpack_timestamp(self.timestamp),
+                "submitter_id": self.submitter_id,
+                "content_hash": content_hash.hex() if type(content_hash) is bytes else content_hash,
+                "content_type": self.content_type,
+                "metadata": _unpack_structure(metadata) if metadata is not None else {},
+                "verification_history": [event.to_dict() for event in self.verification_history],
+                "status": self.status
+            }
+            return view if layout is self.STANDARD_LAYOUT else {key: view[key] for key in layout}
+        return _Record.to_dict(self)
+
+
+_pack_status = _interning(STATUSES)
+_pack_encoding = _interning(ENCODING_NAMES)
+ClaimRecord.PACKERS = {
+    "claim_id": _keep,
+    "timestamp": pack_timestamp,
+    "submitter_id": _interning(SUBMITTERS),
+    "content_hash": ClaimRecord._pack_content_hash,
+    "content_type": _interning(CONTENT_TYPES),
+    "metadata": ClaimRecord._pack_metadata,
+    "verification_history": pack_history,
+    "status": _pack_status
+}
+
+
+class BlockRecord(_Record):
+    """
+    A single-claim block: "index", "timestamp", "claim_data", "previous_hash", "hash", plus
+    "encoding" after "previous_hash" for blocks hashed with a non-legacy encoding.
+    """
+    __slots__ = ("index", "timestamp", "claim_data", "previous_hash", "encoding", "hash")
+    KEYS = ("index", "timestamp", "claim_data", "previous_hash", "hash")
+    ENCODED_KEYS = ("index", "timestamp", "claim_data", "previous_hash", "encoding", "hash")
+
+    def __init__(self, index, timestamp, claim_data, previous_hash, hash, encoding=None):
+        self.index = index
+        self.timestamp = timestamp
+        self.claim_data = claim_data
+        self.previous_hash = previous_hash
+        self.encoding = encoding
+        self.hash = hash
+
+    @classmethod
+    def from_dict(cls, block, previous_hash=None, claim_digests=None):
+        """
+        Args:
+            block (dict): A block built by InMemoryLedger.add_claim().
+            previous_hash (bytes, optional): The packed hash of the preceding block; shared
+                                             instead of packing block["previous_hash"] again.
+            claim_digests (list, optional): The claims' already computed leaf hashes.
+        """
+        packed_previous = pack_hash(block["previous_hash"])
+        if previous_hash is not None and packed_previous == previous_hash:
+            packed_previous = previous_hash
+        timestamp = pack_timestamp(block["timestamp"])
+        digest = claim_digests[0] if claim_digests else None
+        return cls(block["index"], block["timestamp"] if timestamp is _MISSING else timestamp,
+                   ClaimRecord.from_dict(block["claim_data"], digest), packed_previous, pack_hash(block["hash"]),
+                   _pack_encoding(block.get("encoding")))
+
+    @property
+    def claims(self):
+        return (self.claim_data,)
+
+    def keys(self):
+        return self.KEYS if self.encoding is None else self.ENCODED_KEYS
+
+    def _view(self, key):
+        if key == "timestamp":
+            return unpack_timestamp(self.timestamp) if type(self.timestamp) is int else self.timestamp
+        if key in ("previous_hash", "hash"):
+            return unpack_hash(getattr(self, key))
+        if key == "claim_data":
+            return self.claim_data.to_dict()
+        return getattr(self, key)
+
+
+class BatchBlockRecord(_Record):
+    """
+    A batch block: "index", "timestamp", "claim_count", "merkle_root", "previous_hash",
+    "claims", "hash", plus "encoding" after "previous_hash" as for BlockRecord.
+    claim_count is derived from the stored claims.
+    """
+    __slots__ = ("index", "timestamp", "merkle_root", "previous_hash", "encoding", "claims", "hash")
+    KEYS = ("index", "timestamp", "claim_count", "merkle_root", "previous_hash", "claims", "hash")
+    ENCODED_KEYS = ("index", "timestamp", "claim_count", "merkle_root", "previous_hash", "encoding", "claims", "hash")
+
+    def __init__(self, index, timestamp, merkle_root, previous_hash, claims, hash, encoding=None):
+        self.index = index
+        self.timestamp = timestamp
+        self.merkle_root = merkle_root
+        self.previous_hash = previous_hash
+        self.encoding = encoding
+        self.claims = claims
+        self.hash = hash
+
+    @classmethod
+    def from_dict(cls, block, previous_hash=None, claim_digests=None):
+        """
+        Args:
+            block (dict): A block built by InMemoryLedger.add_claims_batch().
+            previous_hash (bytes, optional): See BlockRecord.from_dict().
+            claim_digests (list, optional): See BlockRecord.from_dict().
+        """
+        packed_previous = pack_hash(block["previous_hash"])
+        if previous_hash is not None and packed_previous == previous_hash:
+            packed_previous = previous_hash
+        timestamp = pack_timestamp(block["timestamp"])
+        if claim_digests is None:
+            claims = tuple(ClaimRecord.from_dict(claim_data) for claim_data in block["claims"])
+        else:
+            claims = tuple(ClaimRecord.from_dict(claim_data, digest)
+                           for claim_data, digest in zip(block["claims"], claim_digests))
+        return cls(block["index"], block["timestamp"] if timestamp is _MISSING else timestamp,
+                   pack_hash(block["merkle_root"]), packed_previous, claims, pack_hash(block["hash"]),
+                   _pack_encoding(block.get("encoding")))
+
+    def keys(self):
+        return self.KEYS if self.encoding is None else self.ENCODED_KEYS
+
+    def _view(self, key):
+        if key == "timestamp":
+            return unpack_timestamp(self.timestamp) if type(self.timestamp) is int else self.timestamp
+        if key in ("merkle_root", "previous_hash", "hash"):
+            return unpack_hash(getattr(self, key))
+        if key == "claim_count":
+            return len(self.claims)
+        if key == "claims":
+            return [claim.to_dict() for claim in self.claims]
+        return getattr(self, key)
+
+
+def block_record_from_dict(block, previous_hash=None, claim_digests=None):
+    """
+    Builds the record for either block layout.
+    """
+    if "claims" in block:
+        return BatchBlockRecord.from_dict(block, previous_hash, claim_digests)
+    return BlockRecord.from_dict(block, previous_hash, claim_digests)
+
+
+if __name__ == '__main__':
+    # Test that records reproduce their source dictionaries exactly.
+    import hashlib
+    import sys
+
+    print("--- Records Self-Test ---")
+    claim = {
+        "claim_id": "records_test_001",
+        "timestamp": datetime.datetime(2025, 5, 1, 12, 30, 0, 250000).isoformat(),
+        "submitter_id": "user_alpha",
+        "content_hash": hashlib.sha256(b"records").hexdigest(),
+        "content_type": "image/jpeg",
+        "metadata": {"camera_model": "Pixel 8 Pro", "iso": 100, "tags": ["a", "b"]},
+        "verification_history": [
+            {"agent_id": "simple_verifier_v1", "agent_version": "0.1.0", "timestamp": "2025-05-01T12:30:01.000001",
+             "verdict": "verified_preliminary", "details": "ok", "confidence_score": 0.6},
+            {"agent_id": "known_facts_v1", "agent_version": "0.1.0", "timestamp": "2025-05-01T12:30:01",
+             "verdict": "caution_advised", "details": {"log": ["x"], "triggered_verdicts": []}}
+        ],
+        "status": "verified_preliminary"
+    }
+    odd_claim = {"content_hash": "ABC", "claim_id": "odd", "timestamp": 1700000000, "metadata": None, "note": "kept"}
+    for source in (claim, odd_claim):
+        record = ClaimRecord.from_dict(source)
+        view = record.to_dict()
+        print(f"{source['claim_id']}: round trip exact={view == source and list(view) == list(source)}")
+
+    block = {"index": 1, "timestamp": "2025-05-01T12:30:02.123456", "claim_data": claim,
+             "previous_hash": "0" * 64, "hash": hashlib.sha256(b"block").hexdigest()}
+    block_record = block_record_from_dict(block)
+    print(f"Block round trip exact: {block_record.to_dict() == block}, hash via mapping access: {block_record['hash'] == block['hash']}")
+    encoded_block = {key: block[key] for key in ("index", "timestamp", "claim_data", "previous_hash")}
+    encoded_block.update(encoding="compact-v1", hash=block["hash"])
+    encoded_view = block_record_from_dict(encoded_block).to_dict()
+    print(f"Encoded block round trip exact: {encoded_view == encoded_block and list(encoded_view) == list(encoded_block)}")
+    event = {"agent_id": "a", "verdict": "unverified", "note": "kept"}
+    print(f"Event round trip exact: {VerificationEvent.from_dict(event).to_dict() == event}")
+
+    dict_size = sys.getsizeof(claim) + sum(sys.getsizeof(value) for value in claim.values())
+    record = ClaimRecord.from_dict(claim)
+    record_size = sys.getsizeof(record) + sum(sys.getsizeof(getattr(record, field)) for field in ("claim_id", "timestamp", "content_hash", "metadata"))
+    print(f"Shallow size: dict {dict_size} bytes, record {record_size} bytes")
+    print("--- End of Records Self-Test ---")
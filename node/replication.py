@@ -0,0 +1,538 @@
+# node/replication.py
+
+import json
+import queue
+import socket
+import socketserver
+import struct
+import threading
+import time
+
+from .chain_verifier import verify_range
+from .instrumentation import DEFAULT_INSTRUMENTATION
+
+# Wire format: every request and response is a 4-byte big-endian length followed by a JSON body.
+# Requests: {"op": "tip"}, {"op": "hashes", "indices": [...]}, {"op": "blocks", "start": s, "end": e}.
+# Block ranges are sent as a JSON array of the blocks as stored, so a segmented ledger ships
+# its on-disk JSON without re-encoding it.
+_LENGTH = struct.Struct(">I")
+MAX_BLOCKS_PER_REQUEST = 10000
+# Ledger methods replication relies on, to serve blocks and to adopt a peer's chain.
+_SERVING_METHODS = ("get_block_hash", "_export_block_range")
+_ADOPTING_METHODS = ("get_block_hash", "truncate", "append_blocks")
+
+
+def _send_message(sock, body):
+    sock.sendall(_LENGTH.pack(len(body)) + body)
+
+
+def _receive_exactly(sock, length):
+    chunks = []
+    while length:
+        chunk = sock.recv(min(length, 1 << 20))
+        if not chunk:
+            raise ConnectionError("Replication peer closed the connection.")
+        chunks.append(chunk)
+        length -= len(chunk)
+    return b"".join(chunks)
+
+
+def _receive_message(sock):
+    return _receive_exactly(sock, _LENGTH.unpack(_receive_exactly(sock, _LENGTH.size))[0])
+
+
+def _encode_blocks(exported):
+    """
+    Returns blocks from a ledger's _export_block_range() (dicts or raw JSON bytes) as one JSON array.
+    """
+    parts = [block if isinstance(block, (bytes, bytearray)) else json.dumps(block, separators=(',', ':')).encode()
+             for block in exported]
+    return b"[" + b",".join(parts) + b"]"
+
+
+def _require_methods(ledger, methods, role):
+    """
+    Raises:
+        ValueError: If 'ledger' lacks one of 'methods' (e.g. ShardedLedger, whose claims live
+                    in per-shard chains rather than one chain of blocks).
+    """
+    missing = [name for name in methods if not callable(getattr(ledger, name, None))]
+    if missing:
+        raise ValueError(f"{type(ledger).__name__} does not support replication ({role}); "
+                         f"it has no {', '.join(missing)}.")
+
+
+def ledger_tip(ledger):
+    """
+    Returns:
+        dict: {"length": number of blocks, "index": index of the last block, "hash": its hash}
+    """
+    length = len(ledger.chain)
+    return {"length": length, "index": length - 1, "hash": ledger.get_last_block_hash() if length else None}
+
+
+class LocalPeer:
+    """
+    A peer in the same process, read directly from its ledger.
+    """
+    def __init__(self, ledger):
+        _require_methods(ledger, _SERVING_METHODS, "serving blocks")
+        self.ledger = ledger
+
+    def tip(self):
+        return ledger_tip(self.ledger)
+
+    def block_hashes(self, indices):
+        """
+        Returns:
+            list: The hash of each requested block, None for indices past the peer's tip.
+        """
+        return [self.ledger.get_block_hash(index) for index in indices]
+
+    def get_blocks(self, start, end):
+        """
+        Returns:
+            list: Blocks [start, end) as dictionaries, exactly as they were hashed.
+        """
+        end = min(end, len(self.ledger.chain), start + MAX_BLOCKS_PER_REQUEST)
+        return [json.loads(block) if isinstance(block, (bytes, bytearray)) else block
+                for block in self.ledger._export_block_range(start, end)]
+
+    def close(self):
+        pass
+
+
+class RemotePeer:
+    """
+    A peer reached over TCP (see ReplicationServer). One connection is kept open and
+    requests on it are serialized.
+    """
+    def __init__(self, host, port, timeout=30.0):
+        self.address = (host, port)
+        self.timeout = timeout
+        self._socket = None
+        self._lock = threading.Lock()
+
+    def _request(self, request):
+        with self._lock:
+            if self._socket is None:
+                self._socket = socket.create_connection(self.address, timeout=self.timeout)
+                self._socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            try:
+                _send_message(self._socket, json.dumps(request).encode())
+                response = json.loads(_receive_message(self._socket))
+            except (OSError, ConnectionError):
+                self._socket.close()
+                self._socket = None
+                raise
+        if isinstance(response, dict) and "error" in response:
+            raise ValueError(f"Replication peer {self.address} rejected {request['op']}: {response['error']}")
+        return response
+
+    def tip(self):
+        return self._request({"op": "tip"})
+
+    def block_hashes(self, indices):
+        return self._request({"op": "hashes", "indices": list(indices)})
+
+    def get_blocks(self, start, end):
+        return self._request({"op": "blocks", "start": start, "end": end})
+
+    def close(self):
+        with self._lock:
+            if self._socket is not None:
+                self._socket.close()
+                self._socket = None
+
+
+class _ReplicationHandler(socketserver.BaseRequestHandler):
+    def handle(self):
+        ledger = self.server.ledger
+        self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        while True:
+            try:
+                request = json.loads(_receive_message(self.request))
+            except (ConnectionError, OSError):
+                return
+            except ValueError:
+                _send_message(self.request, b'{"error":"malformed request"}')
+                return
+            op = request.get("op")
+            try:
+                if op == "tip":
+                    body = json.dumps(ledger_tip(ledger)).encode()
+                elif op == "hashes":
+                    body = json.dumps([ledger.get_block_hash(index) for index in request["indices"]]).encode()
+                elif op == "blocks":
+                    start = max(int(request["start"]), 0)
+                    end = min(int(request["end"]), len(ledger.chain), start + MAX_BLOCKS_PER_REQUEST)
+                    body = _encode_blocks(ledger._export_block_range(start, end) if end > start else [])
+                else:
+                    body = json.dumps({"error": f"unknown op {op!r}"}).encode()
+            except (KeyError, TypeError, ValueError) as e:
+                body = json.dumps({"error": str(e)}).encode()
+            except Exception as e: # e.g. a ledger without the op's methods; answer rather than drop the connection
+                body = json.dumps({"error": f"{type(e).__name__}: {e}"}).encode()
+            try:
+                _send_message(self.request, body)
+            except OSError:
+                return
+
+
+class _ThreadingServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class ReplicationServer:
+    """
+    Serves a ledger's tip, block hashes and block ranges to RemotePeer clients, one thread
+    per connection.
+    """
+    def __init__(self, ledger, host="127.0.0.1", port=0):
+        """
+        Args:
+            ledger (InMemoryLedger): The ledger to serve (any backend).
+            host (str): Interface to listen on.
+            port (int): Port to listen on; 0 picks a free one (see 'address').
+
+        Raises:
+            ValueError: If the ledger cannot serve blocks (see _require_methods).
+        """
+        _require_methods(ledger, _SERVING_METHODS, "serving blocks")
+        self._server = _ThreadingServer((host, port), _ReplicationHandler, bind_and_activate=True)
+        self._server.ledger = ledger
+        self.address = self._server.server_address
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name="replication-server", daemon=True)
+        self._thread.start()
+        return self.address
+
+    def stop(self):
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._server.server_close()
+
+
+class LedgerReplicator:
+    """
+    Brings a ledger up to date with a peer's chain.
+    The two tips are compared first. If the peer's chain is longer, the last block the two
+    chains share (the fork point) is found with a k-ary search over block hashes, which
+    needs about log(n) / log(probes + 1) round trips, and a single one when the peer
+    simply extends the local chain. The peer's blocks are fetched in large ranges by a
+    prefetching thread while the previous range is verified (hashes, Merkle roots and
+    previous_hash links) and appended. Local blocks past the fork point are only dropped
+    once all of the peer's replacement blocks have been fetched and verified.
+    Longest chain wins: a peer whose chain is not longer is left alone.
+    """
+    def __init__(self, ledger, batch_size=2000, probes=16, prefetch=4, instrumentation=None):
+        """
+        Args:
+            ledger (InMemoryLedger): The ledger to bring up to date (any backend).
+            batch_size (int): Blocks fetched per request.
+            probes (int): Block hashes compared per round trip of the fork point search.
+            prefetch (int): Ranges fetched ahead of the one being verified.
+            instrumentation (Instrumentation, optional): Event/metrics surface.
+
+        Raises:
+            ValueError: If the ledger cannot adopt blocks (see _require_methods).
+        """
+        _require_methods(ledger, _ADOPTING_METHODS, "adopting blocks")
+        self.ledger = ledger
+        self.batch_size = max(1, min(batch_size, MAX_BLOCKS_PER_REQUEST))
+        self.probes = max(1, probes)
+        self.prefetch = max(1, prefetch)
+        self.instrumentation = instrumentation or DEFAULT_INSTRUMENTATION
+
+    def find_fork_point(self, peer, peer_length):
+        """
+        Finds the last block the local chain shares with the peer's. Chains are hash-linked,
+        so sharing a block means sharing every block before it.
+
+        Returns:
+            tuple: (index of the last shared block or -1, round trips used)
+        """
+        common = min(len(self.ledger.chain), peer_length)
+        if common == 0:
+            return -1, 0
+        local_hash = self.ledger.get_block_hash
+        if peer.block_hashes([common - 1])[0] == local_hash(common - 1):
+            return common - 1, 1
+        round_trips = 1
+        shared, differs = -1, common - 1
+        while differs - shared > 1:
+            span = differs - shared
+            indices = sorted({shared + span * step // (self.probes + 1) for step in range(1, self.probes + 1)}
+                             - {shared, differs})
+            hashes = peer.block_hashes(indices)
+            round_trips += 1
+            for index, peer_hash in zip(indices, hashes):
+                if peer_hash == local_hash(index):
+                    shared = index
+                else:
+                    differs = index
+                    break
+        return shared, round_trips
+
+    @staticmethod
+    def _offer(ranges, item, stop):
+        """
+        Puts 'item' on the prefetch queue, giving up once the consumer has stopped, since a
+        stopped consumer no longer empties the queue.
+
+        Returns:
+            bool: True if the item was queued.
+        """
+        while not stop.is_set():
+            try:
+                ranges.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _fetch_ranges(self, peer, start, end, ranges, stop):
+        try:
+            for range_start in range(start, end, self.batch_size):
+                range_end = min(range_start + self.batch_size, end)
+                blocks = []
+                while range_start + len(blocks) < range_end: # A peer may cap the range it returns
+                    fetched = peer.get_blocks(range_start + len(blocks), range_end)
+                    if not fetched:
+                        break
+                    blocks.extend(fetched)
+                if not self._offer(ranges, (range_start, blocks), stop) or len(blocks) < range_end - range_start:
+                    break
+        except Exception as e:
+            self._offer(ranges, e, stop)
+            return
+        self._offer(ranges, None, stop)
+
+    def _verified_ranges(self, peer, start, end, anchor_hash):
+        """
+        Fetches the peer's blocks [start, end) in prefetched ranges and yields each range
+        once it has been verified and found to link to the one before it, the first to
+        'anchor_hash' (the hash of local block start - 1).
+
+        Raises:
+            ValueError: If a fetched block fails verification or does not link.
+        """
+        ranges = queue.Queue(maxsize=self.prefetch)
+        stop = threading.Event()
+        fetcher = threading.Thread(target=self._fetch_ranges, args=(peer, start, end, ranges, stop),
+                                   name="replication-fetch", daemon=True)
+        fetcher.start()
+        previous_hash = anchor_hash
+        try:
+            while True:
+                item = ranges.get()
+                if item is None:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                range_start, blocks = item
+                if not blocks:
+                    break
+                _, bad_index, reason, first_previous_hash, last_hash = verify_range(range_start, blocks)
+                if bad_index is not None:
+                    raise ValueError(f"Peer block {bad_index} failed verification: {reason}.")
+                if first_previous_hash != previous_hash:
+                    raise ValueError(f"Peer block {range_start} does not link to the local chain.")
+                previous_hash = last_hash
+                yield blocks
+        finally:
+            stop.set()
+            fetcher.join()
+
+    def _catch_up(self, peer, shared, end):
+        """
+        Adopts the peer's blocks (shared, end). When local blocks past 'shared' have to be
+        dropped, the peer's blocks are all fetched and verified first and the local fork is
+        only truncated once they check out, so a rejected sync leaves the ledger untouched.
+        Otherwise each verified range is appended as it arrives.
+
+        Returns:
+            tuple: (blocks appended, local blocks rolled back)
+
+        Raises:
+            ValueError: If a fetched block fails verification or does not link.
+        """
+        anchor_hash = self.ledger.get_block_hash(shared) if shared >= 0 else "0" * 64 # Genesis links to zeros
+        local_length = len(self.ledger.chain)
+        if shared + 1 >= local_length:
+            return sum(self.ledger.append_blocks(blocks, verify=False)
+                       for blocks in self._verified_ranges(peer, shared + 1, end, anchor_hash)), 0
+        staged = list(self._verified_ranges(peer, shared + 1, end, anchor_hash))
+        if sum(len(blocks) for blocks in staged) <= local_length - (shared + 1):
+            return 0, 0 # The peer served less than it claimed; keep the local chain
+        self.instrumentation.event("replication_fork", "Fork at block {index}: dropping {blocks} local blocks to adopt the peer's chain.",
+                                   level="warning", index=shared, blocks=local_length - (shared + 1))
+        self.ledger.truncate(shared + 1)
+        return sum(self.ledger.append_blocks(blocks, verify=False) for blocks in staged), local_length - (shared + 1)
+
+    def sync_from(self, peer):
+        """
+        Adopts the peer's chain if it is longer than the local one, repeating until the
+        local ledger has caught up with the peer's tip (the peer may keep growing meanwhile).
+
+        Args:
+            peer (LocalPeer or RemotePeer): The peer to sync from.
+
+        Returns:
+            dict: Report with "fork_index" (-1 if the chains share no block, None if the peer
+                  was not ahead), "rolled_back", "blocks_fetched", "round_trips",
+                  "elapsed_seconds", "blocks_per_second" and the final "tip".
+        """
+        started = time.perf_counter()
+        fork_index, rolled_back, fetched, round_trips = None, 0, 0, 1
+        peer_tip = peer.tip()
+        while peer_tip["length"] > len(self.ledger.chain):
+            shared, search_round_trips = self.find_fork_point(peer, peer_tip["length"])
+            round_trips += search_round_trips
+            fork_index = shared if fork_index is None else min(fork_index, shared)
+            appended, dropped = self._catch_up(peer, shared, peer_tip["length"])
+            rolled_back += dropped
+            fetched += appended
+            round_trips += -(-appended // self.batch_size)
+            peer_tip = peer.tip()
+            round_trips += 1
+            if not appended:
+                break
+        elapsed = time.perf_counter() - started
+        if fetched:
+            self.instrumentation.event("replication_synced", "Replicated {blocks} blocks in {seconds:.2f}s.",
+                                       blocks=fetched, seconds=elapsed)
+        return {
+            "fork_index": fork_index,
+            "rolled_back": rolled_back,
+            "blocks_fetched": fetched,
+            "round_trips": round_trips,
+            "elapsed_seconds": round(elapsed, 6),
+            "blocks_per_second": round(fetched / elapsed, 1) if elapsed > 0 and fetched else None,
+            "tip": ledger_tip(self.ledger)
+        }
+
+    def sync_with_peers(self, peers):
+        """
+        Exchanges tips with every peer and syncs from the one with the longest chain.
+
+        Returns:
+            dict or None: The sync_from() report, or None if no peer is ahead.
+        """
+        tips = []
+        for peer in peers:
+            try:
+                tips.append((peer.tip()["length"], peer))
+            except (OSError, ConnectionError, ValueError) as e:
+                self.instrumentation.event("replication_peer_failed", "Warning: Replication peer unreachable: {error}",
+                                           level="warning", error=str(e))
+        if not tips:
+            return None
+        length, peer = max(tips, key=lambda tip: tip[0])
+        if length <= len(self.ledger.chain):
+            return None
+        return self.sync_from(peer)
+
+
+if __name__ == '__main__':
+    # Test catch-up, forks and sync over localhost.
+    from .ledger import InMemoryLedger
+
+    print("--- Replication Self-Test ---")
+
+    def claim(i, prefix="claim"):
+        return {"claim_id": f"{prefix}_{i}", "timestamp": "2025-01-01T00:00:00", "submitter_id": "user_alpha",
+                "content_hash": f"{i:064x}", "content_type": "text/plain", "metadata": {},
+                "verification_history": [], "status": "pending_verification"}
+
+    leader = InMemoryLedger()
+    for i in range(20000):
+        leader.add_claim(claim(i))
+    leader.add_claims_batch([claim(i, "batch") for i in range(100)])
+
+    follower = InMemoryLedger() # Its own genesis block: the chains share nothing yet
+    report = LedgerReplicator(follower).sync_from(LocalPeer(leader))
+    print(f"In-process catch-up: fetched {report['blocks_fetched']} blocks, fork at {report['fork_index']}, "
+          f"{report['blocks_per_second']} blocks/s, tips equal: {report['tip'] == ledger_tip(leader)}")
+
+    for i in range(20000, 20500):
+        leader.add_claim(claim(i))
+    for i in range(30):
+        follower.add_claim(claim(i, "local")) # Diverges from the leader
+    follower.record_verification("local_3", [{"agent_id": "simple_verifier_v1", "verdict": "verified_preliminary", "confidence_score": 0.9}])
+    report = LedgerReplicator(follower).sync_from(LocalPeer(leader))
+    print(f"Fork resolved: fork at {report['fork_index']}, rolled back {report['rolled_back']}, fetched "
+          f"{report['blocks_fetched']}, round trips {report['round_trips']}, tips equal: {report['tip'] == ledger_tip(leader)}")
+    print(f"Follower finds batch_7: {follower.get_claim_location('batch_7')}, local_3 dropped: {follower.get_claim_location('local_3') is None}, "
+          f"its status: {follower.get_claim_status('local_3')}, summary: {follower.get_claim_summary('local_3')}")
+
+    server = ReplicationServer(leader)
+    host, port = server.start()
+    remote = RemotePeer(host, port)
+    newcomer = InMemoryLedger()
+    report = LedgerReplicator(newcomer, batch_size=5000).sync_from(remote)
+    print(f"Over localhost: fetched {report['blocks_fetched']} blocks at {report['blocks_per_second']} blocks/s, "
+          f"chain valid: {newcomer.verify_chain(workers=1)['valid']}")
+
+    class CorruptingPeer(LocalPeer):
+        def get_blocks(self, start, end):
+            blocks = super().get_blocks(start, end)
+            for block in blocks:
+                if block["index"] == 1:
+                    block["hash"] = "0" * 64
+            return blocks
+    try: # The fetcher fills the prefetch queue while the first range is rejected; it must not hang
+        LedgerReplicator(InMemoryLedger(), batch_size=5, prefetch=2).sync_from(CorruptingPeer(leader))
+    except ValueError as e:
+        print(f"Corrupt first range rejected: {e}")
+
+    tampered = InMemoryLedger()
+    LedgerReplicator(tampered).sync_from(LocalPeer(leader))
+    class TamperingPeer(LocalPeer):
+        def get_blocks(self, start, end):
+            blocks = super().get_blocks(start, end)
+            for block in blocks:
+                if "claim_data" in block:
+                    block["claim_data"] = dict(block["claim_data"], submitter_id="mallory")
+            return blocks
+    leader.add_claim(claim(99999))
+    try:
+        LedgerReplicator(tampered).sync_from(TamperingPeer(leader))
+    except ValueError as e:
+        print(f"Tampered block rejected: {e}")
+
+    diverged = InMemoryLedger()
+    LedgerReplicator(diverged).sync_from(LocalPeer(leader))
+    for i in range(10):
+        diverged.add_claim(claim(i, "local"))
+    for i in range(100000, 100020):
+        leader.add_claim(claim(i))
+    length_before, tip_before = len(diverged.chain), diverged.get_last_block_hash()
+    try:
+        LedgerReplicator(diverged).sync_from(TamperingPeer(leader))
+    except ValueError as e:
+        print(f"Tampered fork rejected: {e}")
+    print(f"Diverged follower kept its chain: {len(diverged.chain) == length_before and diverged.get_last_block_hash() == tip_before}, "
+          f"local_3 kept: {diverged.get_claim_location('local_3') is not None}")
+
+    class ChainlessLedger: # Like ShardedLedger: no single chain of blocks to serve or adopt
+        chain = []
+    try:
+        LedgerReplicator(ChainlessLedger())
+    except ValueError as e:
+        print(f"Unsupported ledger rejected: {e}")
+    remote.close()
+    server._server.ledger = ChainlessLedger() # New connections are served a ledger that cannot answer "hashes"
+    remote = RemotePeer(host, port)
+    try:
+        remote.block_hashes([0])
+    except ValueError as e:
+        print(f"Unsupported op answered: {e}; connection still usable: {remote.tip()['length'] == 0}")
+    remote.close()
+    server.stop()
+    print("--- End of Replication Self-Test ---")
@@ -0,0 +1,948 @@
+# node/segmented_ledger.py
+
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+import zlib
+from array import array
+from collections import OrderedDict
+
+from .canonical import DEFAULT_ENCODING, encoding_of_block, get_encoding
+from .claim_index import ClaimQueryIndex
+from .claim_status import ClaimStatus
+from .instrumentation import DEFAULT_INSTRUMENTATION
+from .ledger import _LEAF_BITS, _LEAF_MASK, InMemoryLedger # Relative import
+from .ledger_snapshot import (SNAPSHOT_FILE, TABLES, LedgerSnapshot, SnapshotIndex, content_key, key_hash, merge_rows,
+                              write_snapshot)
+from .records import hash_key, pack_timestamp
+
+# Record types stored in segment files.
+RECORD_BLOCK = 1        # A full block, as produced by InMemoryLedger.add_claim or add_claims_batch
+RECORD_CLAIM_STATE = 2  # The full verification_history/status of a claim (written by older versions)
+RECORD_VERIFICATION = 3 # New verification events of a claim, plus its aggregate status after them
+
+# Fixed-size record header, followed by a key table and then the JSON payload.
+# Fields: body length, record type, CRC32 of the body, block index, raw 32-byte block hash,
+# key table length in bytes.
+# The key table holds one entry per claim in leaf order: a _KEY_ENTRY (claim_id length,
+# content_hash length) followed by the two UTF-8 strings.
+# Everything needed to rebuild the indexes lives in the header and the key table,
+# so replay never has to decode the JSON payload.
+_RECORD_HEADER = struct.Struct("<IBIQ32sI")
+_KEY_ENTRY = struct.Struct("<HH")
+MAX_KEY_BYTES = 0xFFFF # Longest claim_id or content_hash a key table entry can hold, in UTF-8 bytes
+
+_SEGMENT_PREFIX = "segment_"
+_SEGMENT_SUFFIX = ".log"
+
+# Record locations are packed as (segment_number << 40) | byte_offset into one unsigned
+# 64-bit integer so the per-block location table can live in a compact array('Q').
+_LOCATION_SHIFT = 40
+_OFFSET_MASK = (1 << _LOCATION_SHIFT) - 1
+
+
+def _pack_keys(keys):
+    parts = []
+    for claim_id, content_hash in keys:
+        claim_id_bytes = claim_id.encode() if claim_id is not None else b""
+        content_hash_bytes = content_hash.encode() if content_hash is not None else b""
+        parts.append(_KEY_ENTRY.pack(len(claim_id_bytes), len(content_hash_bytes)))
+        parts.append(claim_id_bytes)
+        parts.append(content_hash_bytes)
+    return b"".join(parts)
+
+
+def key_problem(claim_data):
+    """
+    Returns:
+        str or None: Why the claim's claim_id or content_hash does not fit a key table entry,
+                     or None if both fit.
+    """
+    for field in ("claim_id", "content_hash"):
+        value = claim_data.get(field)
+        if isinstance(value, str) and len(value) * 4 > MAX_KEY_BYTES and len(value.encode()) > MAX_KEY_BYTES:
+            return f"{field} of {len(value.encode())} bytes exceeds the {MAX_KEY_BYTES}-byte limit of the segmented ledger."
+    return None
+
+
+def _unpack_keys(buffer, start, end):
+    keys = []
+    offset = start
+    while offset < end:
+        claim_id_length, content_hash_length = _KEY_ENTRY.unpack_from(buffer, offset)
+        offset += _KEY_ENTRY.size
+        claim_id = buffer[offset:offset + claim_id_length].decode() if claim_id_length else None
+        offset += claim_id_length
+        content_hash = buffer[offset:offset + content_hash_length].decode() if content_hash_length else None
+        offset += content_hash_length
+        keys.append((claim_id, content_hash))
+    return keys
+
+
+def _iter_records(buffer, start, size, check_crc):
+    """
+    Walks the complete records of a segment buffer from offset 'start', decoding only their
+    headers and key tables. Stops at the first truncated record, or corrupted one if
+    'check_crc' is set.
+
+    Yields:
+        tuple: (offset, end offset, record type, block index, raw block hash, keys)
+    """
+    header_size = _RECORD_HEADER.size
+    unpack_header = _RECORD_HEADER.unpack_from
+    offset = start
+    with memoryview(buffer) as view:
+        while offset + header_size <= size:
+            body_length, record_type, crc, block_index, raw_hash, keys_length = unpack_header(buffer, offset)
+            body_start = offset + header_size
+            body_end = body_start + body_length
+            if body_end > size:
+                return
+            if check_crc and zlib.crc32(view[body_start:body_end]) != crc:
+                return
+            yield offset, body_end, record_type, block_index, raw_hash, _unpack_keys(buffer, body_start, body_start + keys_length)
+            offset = body_end
+
+
+class _SegmentChainView:
+    """
+    Read-only, list-like view over the blocks of a SegmentedLedger.
+    Supports len(), indexing (including negative indexes and slices) and iteration,
+    so code written against InMemoryLedger.chain keeps working.
+    Blocks are decoded from disk on every access.
+    """
+    def __init__(self, ledger):
+        self._ledger = ledger
+
+    def __len__(self):
+        return len(self._ledger._block_locations)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("block index out of range")
+        return self._ledger._read_block(index)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self._ledger._read_block(index)
+
+
+class SegmentedLedger(InMemoryLedger):
+    """
+    A durable, append-only ledger backend with the same interface as InMemoryLedger.
+    Blocks are written as length-prefixed records into rolling segment files inside
+    'data_dir'. Verification events are appended as separate records, each holding only
+    the new events, a link to the claim's previous verification record and the claim's
+    aggregate status, so nothing already on disk is ever rewritten and a status read
+    decodes a single small record.
+    Only compact indexes (claim_id -> block index, block index -> record location) are
+    held in memory; block bodies are read back from the segments on demand.
+    On startup the segments are memory-mapped and the indexes are rebuilt from the
+    record headers alone, without parsing any block JSON. The query index behind
+    query_claims() needs every claim's fields, so it is built by decoding the blocks once,
+    on the first query, and maintained from then on.
+    Startup can skip most of the replay with a snapshot (see write_snapshot()): a binary
+    file holding the indexes as of some record position. It is memory-mapped and looked up
+    in place, only the records appended after its position are replayed, and the indexes
+    hold just those in dictionaries.
+    """
+    MERKLE_CACHE_BLOCKS = 64 # Number of batch blocks whose leaf hashes are kept for proofs
+
+    def __init__(self, data_dir, segment_max_bytes=64 * 1024 * 1024, fsync_every=1000,
+                 fsync_interval=1.0, verify_checksums=False, instrumentation=None, encoding=DEFAULT_ENCODING,
+                 use_snapshot=True, snapshot_interval=None):
+        """
+        Opens (or creates) a segmented ledger in 'data_dir'.
+        A genesis block is only created when the directory holds no blocks yet.
+
+        Args:
+            data_dir (str): Directory holding the segment files. Created if missing.
+            segment_max_bytes (int): Size after which a new segment file is started.
+            fsync_every (int): Number of appended records after which the active segment is
+                               fsynced. 1 makes every append durable before returning.
+            fsync_interval (float or None): Also fsync once this many seconds have passed
+                                            since the last fsync. None disables the timer.
+            verify_checksums (bool): Check the CRC of every record during startup. By default
+                                     only the last (possibly torn) segment is checked.
+            instrumentation (Instrumentation, optional): Event/metrics surface.
+            encoding (str): Canonical encoding new blocks are hashed with. Blocks already on
+                            disk keep the encoding they were written with.
+            use_snapshot (bool): Start from the snapshot in 'data_dir' if there is a valid one.
+            snapshot_interval (float or None): Write a snapshot in a background thread every
+                                               this many seconds (when records were appended
+                                               since the last one), and once more on close().
+                                               None only writes snapshots on request.
+        """
+        # Deliberately not calling InMemoryLedger.__init__: the chain lives on disk here.
+        self.instrumentation = instrumentation or DEFAULT_INSTRUMENTATION
+        self.encoding = get_encoding(encoding)
+        self.data_dir = data_dir
+        self.segment_max_bytes = segment_max_bytes
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self.verify_checksums = verify_checksums
+
+        self.chain = _SegmentChainView(self)
+        self.checkpoint_store = None
+        self._init_indexes()
+        self._query_index = None # Built on the first query, see _claim_query_index()
+        self._merkle_leaf_cache = OrderedDict() # block index -> leaf hashes, most recently used last
+        self._block_locations = array("Q") # block index -> packed record location
+        self._state_locations = {} # claim_id -> packed location of its latest RECORD_CLAIM_STATE
+        self._event_locations = {} # claim_id -> packed location of its latest RECORD_VERIFICATION
+        self._last_block_hash = None
+        self._snapshot = None # LedgerSnapshot the indexes are layered over
+        self._snapshot_position = None # (segment, offset) covered by the latest snapshot
+        self._snapshot_lock = threading.Lock() # One snapshot is written at a time
+        self._append_lock = threading.RLock() # Keeps appends and the snapshot cut point consistent
+        self.snapshot_interval = snapshot_interval
+        self._snapshot_thread = None
+        self._snapshot_stop = threading.Event()
+
+        self._segment_mmaps = {} # sealed segment number -> read-only mmap
+        self._active_segment = None
+        self._active_size = 0
+        self._writer = None
+        self._reader = None
+        self._writer_dirty = False
+        self._records_since_fsync = 0
+        self._last_fsync = time.monotonic()
+
+        os.makedirs(self.data_dir, exist_ok=True)
+        if use_snapshot:
+            self._load_snapshot()
+        self._replay()
+        if not self._block_locations:
+            self.create_genesis_block()
+        if snapshot_interval is not None:
+            self._snapshot_thread = threading.Thread(target=self._snapshot_loop, name="ledger-snapshot", daemon=True)
+            self._snapshot_thread.start()
+
+    def _segment_path(self, segment_number):
+        return os.path.join(self.data_dir, f"{_SEGMENT_PREFIX}{segment_number:08d}{_SEGMENT_SUFFIX}")
+
+    def _list_segments(self):
+        segment_numbers = []
+        for name in os.listdir(self.data_dir):
+            if name.startswith(_SEGMENT_PREFIX) and name.endswith(_SEGMENT_SUFFIX):
+                segment_numbers.append(int(name[len(_SEGMENT_PREFIX):-len(_SEGMENT_SUFFIX)]))
+        return sorted(segment_numbers)
+
+    def _replay(self):
+        """
+        Rebuilds the in-memory indexes by walking the record headers of every segment, or
+        only of the records appended after the loaded snapshot, if there is one.
+        A truncated or corrupted record at the end of the last segment (a torn write from a
+        crash) is cut off; corruption anywhere else raises ValueError.
+        """
+        segment_numbers = self._list_segments()
+        if self._snapshot is not None: # Everything before its position is already indexed
+            start_segment, start_offset = self._snapshot.segment_number, self._snapshot.segment_offset
+        else:
+            start_segment, start_offset = -1, 0
+        for position, segment_number in enumerate(segment_numbers):
+            is_last = position == len(segment_numbers) - 1
+            path = self._segment_path(segment_number)
+            size = os.path.getsize(path)
+            valid_size = 0
+            if size:
+                with open(path, "rb") as segment_file:
+                    segment_map = mmap.mmap(segment_file.fileno(), 0, access=mmap.ACCESS_READ)
+                if segment_number < start_segment:
+                    valid_size = size
+                else:
+                    valid_size = self._replay_segment(segment_number, segment_map, size,
+                                                      check_crc=self.verify_checksums or is_last,
+                                                      start=start_offset if segment_number == start_segment else 0)
+                if is_last:
+                    segment_map.close()
+                else:
+                    self._segment_mmaps[segment_number] = segment_map
+
+            if valid_size < size:
+                if not is_last:
+                    raise ValueError(f"Segment '{path}' is corrupted at offset {valid_size}.")
+                self.instrumentation.event("segment_truncated", "Warning: Truncating torn tail of segment '{path}' at offset {offset}.",
+                                           level="warning", path=path, offset=valid_size)
+                with open(path, "r+b") as segment_file:
+                    segment_file.truncate(valid_size)
+
+        if segment_numbers:
+            self._open_active_segment(segment_numbers[-1])
+        else:
+            self._open_active_segment(0)
+
+    def _replay_segment(self, segment_number, segment_map, size, check_crc, start=0):
+        """
+        Indexes every complete record of one memory-mapped segment from offset 'start'.
+
+        Returns:
+            int: The offset just past the last valid record.
+        """
+        block_locations = self._block_locations
+        location_base = segment_number << _LOCATION_SHIFT
+        valid_size = start
+        for offset, valid_size, record_type, block_index, raw_hash, keys in _iter_records(segment_map, start, size, check_crc):
+            if record_type == RECORD_BLOCK:
+                if block_index != len(block_locations):
+                    raise ValueError(f"Segment {segment_number} holds block {block_index}, expected {len(block_locations)}.")
+                block_locations.append(location_base | offset)
+                for leaf_index, (claim_id, content_hash) in enumerate(keys):
+                    self._index_claim(claim_id, content_hash, block_index, leaf_index)
+                self._last_block_hash = raw_hash.hex()
+            elif record_type == RECORD_VERIFICATION:
+                self._event_locations[keys[0][0]] = location_base | offset
+            elif record_type == RECORD_CLAIM_STATE:
+                self._state_locations[keys[0][0]] = location_base | offset
+        return valid_size
+
+    def _snapshot_path(self):
+        return os.path.join(self.data_dir, SNAPSHOT_FILE)
+
+    def _open_snapshot(self):
+        """
+        Opens the snapshot in data_dir if it is valid and consistent with the segments: the
+        segment and offset it stops at exist, and its last block record carries its last hash.
+
+        Returns:
+            LedgerSnapshot or None
+        """
+        path = self._snapshot_path()
+        if not os.path.exists(path):
+            return None
+        try:
+            snapshot = LedgerSnapshot(path)
+        except ValueError as e:
+            self.instrumentation.event("snapshot_ignored", "Warning: Ignoring ledger snapshot: {error}",
+                                       level="warning", error=str(e))
+            return None
+        segment_path = self._segment_path(snapshot.segment_number)
+        consistent = snapshot.block_count > 0 and os.path.exists(segment_path) and \
+            os.path.getsize(segment_path) >= snapshot.segment_offset
+        if consistent:
+            last_location = int.from_bytes(snapshot.block_locations[-8:], "little")
+            last_segment = self._segment_path(last_location >> _LOCATION_SHIFT)
+            consistent = os.path.exists(last_segment)
+            if consistent:
+                with open(last_segment, "rb") as segment_file:
+                    segment_file.seek(last_location & _OFFSET_MASK)
+                    header = segment_file.read(_RECORD_HEADER.size)
+                consistent = len(header) == _RECORD_HEADER.size and \
+                    _RECORD_HEADER.unpack(header)[4].hex() == snapshot.last_block_hash
+        if not consistent:
+            self.instrumentation.event("snapshot_ignored", "Warning: Ignoring ledger snapshot: {error}", level="warning",
+                                       error=f"'{path}' does not match the segments in '{self.data_dir}'")
+            snapshot.close()
+            return None
+        return snapshot
+
+    def _load_snapshot(self):
+        """
+        Layers the indexes over the snapshot in data_dir, if there is a valid one. Only the
+        block location table is copied into memory; every other lookup reads the mapping.
+        """
+        snapshot = self._open_snapshot()
+        if snapshot is None:
+            return
+        self._snapshot = snapshot
+        self._snapshot_position = (snapshot.segment_number, snapshot.segment_offset)
+        self._block_locations.frombytes(snapshot.block_locations)
+        self._last_block_hash = snapshot.last_block_hash
+        tables = snapshot.tables
+        self._claim_index = SnapshotIndex(tables["claims"], str.encode)
+        # Claim IDs are not stored twice: content entries name the claim's location.
+        self._content_hash_index = SnapshotIndex(tables["content"], content_key, decode=self._claim_ids_at, promote=True)
+        self._event_locations = SnapshotIndex(tables["events"], str.encode)
+        self._state_locations = SnapshotIndex(tables["states"], str.encode)
+        self.instrumentation.event("snapshot_loaded", "Loaded ledger snapshot of {blocks} blocks; replaying from segment {segment} offset {offset}.",
+                                   blocks=snapshot.block_count, segment=snapshot.segment_number, offset=snapshot.segment_offset)
+
+    def _claim_ids_at(self, claim_locations):
+        """
+        Returns the claim_id at each packed claim location (a single one as a string), read
+        from the key tables of the blocks holding them.
+        """
+        claim_ids = []
+        for claim_location in claim_locations:
+            record_location = self._block_locations[claim_location >> _LEAF_BITS]
+            buffer, offset = self._record_buffer(record_location)
+            _, _, _, _, _, keys_length = _RECORD_HEADER.unpack_from(buffer, offset)
+            body_start = offset + _RECORD_HEADER.size
+            claim_ids.append(_unpack_keys(buffer, body_start, body_start + keys_length)[claim_location & _LEAF_MASK][0])
+        return claim_ids[0] if len(claim_ids) == 1 else claim_ids
+
+    def _record_buffer(self, location):
+        """
+        Returns a buffer holding the record at 'location' and the record's offset in it.
+        """
+        with self._append_lock:
+            segment_number = location >> _LOCATION_SHIFT
+            offset = location & _OFFSET_MASK
+            if segment_number != self._active_segment:
+                return self._segment_mmaps[segment_number], offset
+            if self._writer_dirty:
+                self._writer.flush()
+                self._writer_dirty = False
+            self._reader.seek(offset)
+            header = self._reader.read(_RECORD_HEADER.size)
+            return header + self._reader.read(_RECORD_HEADER.unpack(header)[0]), 0
+
+    def get_block_hash(self, block_index):
+        """
+        Returns the hash of a block from its record header, without decoding the block.
+        """
+        if not 0 <= block_index < len(self._block_locations):
+            return None
+        buffer, offset = self._record_buffer(self._block_locations[block_index])
+        return _RECORD_HEADER.unpack_from(buffer, offset)[4].hex()
+
+    def truncate(self, length):
+        """
+        Drops every block from index 'length' on by cutting the log just before that block's
+        record, then rebuilds the indexes by replaying what remains. Records written after
+        the cut, including verification records of older claims, are dropped with it, and
+        so is the snapshot.
+
+        Args:
+            length (int): Number of blocks to keep (0 drops the genesis block too).
+        """
+        if length >= len(self._block_locations):
+            return
+        cut = self._block_locations[max(length, 0)]
+        cut_segment, cut_offset = cut >> _LOCATION_SHIFT, cut & _OFFSET_MASK
+        with self._snapshot_lock, self._append_lock:
+            self.flush(fsync=True)
+            self._writer.close()
+            self._reader.close()
+            for segment_map in self._segment_mmaps.values():
+                segment_map.close()
+            self._segment_mmaps.clear()
+            if self._snapshot is not None:
+                self._snapshot.close()
+                self._snapshot = None
+            if os.path.exists(self._snapshot_path()):
+                os.remove(self._snapshot_path())
+            self._snapshot_position = None
+            for segment_number in self._list_segments():
+                if segment_number > cut_segment:
+                    os.remove(self._segment_path(segment_number))
+            with open(self._segment_path(cut_segment), "r+b") as segment_file:
+                segment_file.truncate(cut_offset)
+                os.fsync(segment_file.fileno())
+
+            self._init_indexes()
+            self._query_index = None
+            self._merkle_leaf_cache.clear()
+            self._block_locations = array("Q")
+            self._state_locations = {}
+            self._event_locations = {}
+            self._last_block_hash = None
+            self._replay()
+        self.instrumentation.event("ledger_truncated", "Ledger truncated to {length} blocks.", length=len(self._block_locations))
+
+    def write_snapshot(self):
+        """
+        Writes a snapshot of the indexes as of the current end of the log, atomically
+        replacing the previous one. Safe to call from any thread while claims are being
+        appended: appends are only held for the instant it takes to flush the active segment
+        and note its position. The snapshot is built from the segments on disk, by merging
+        the records written since the previous snapshot into that snapshot's tables, never
+        from the live indexes. The running ledger keeps the indexes it has; the new snapshot
+        is used on the next start.
+
+        Returns:
+            tuple or None: The (segment, offset) the snapshot covers, or None if nothing was
+                           appended since the previous snapshot.
+        """
+        with self._snapshot_lock:
+            with self._append_lock:
+                if self._writer is None:
+                    raise ValueError("The ledger is closed.")
+                self._writer.flush()
+                self._writer_dirty = False
+                position = (self._active_segment, self._active_size)
+            if position == self._snapshot_position:
+                return None
+            started = time.perf_counter()
+            self._build_snapshot(position)
+            self._snapshot_position = position
+            self.instrumentation.event("snapshot_written", "Ledger snapshot written up to segment {segment} offset {offset} in {seconds:.2f}s.",
+                                       segment=position[0], offset=position[1], seconds=time.perf_counter() - started)
+            return position
+
+    def _build_snapshot(self, position):
+        """
+        Merges the records between the previous snapshot's position and 'position' into
+        the previous snapshot's tables and writes the result. Reads the segments through
+        its own file handles.
+        """
+        base = self._open_snapshot()
+        try:
+            if base is not None:
+                block_locations = array("Q")
+                block_locations.frombytes(base.block_locations)
+                start_segment, start_offset = base.segment_number, base.segment_offset
+                last_hash = bytes.fromhex(base.last_block_hash)
+                base_claims = base.tables["claims"]
+            else:
+                block_locations = array("Q")
+                start_segment, start_offset, last_hash, base_claims = 0, 0, bytes(32), None
+            rows = {name: [] for name, _ in TABLES}
+            latest = {"events": {}, "states": {}}
+            added_claims = set()
+            for segment_number in self._list_segments():
+                if not start_segment <= segment_number <= position[0]:
+                    continue
+                path = self._segment_path(segment_number)
+                end = position[1] if segment_number == position[0] else os.path.getsize(path)
+                if not end:
+                    continue
+                start = start_offset if segment_number == start_segment else 0
+                location_base = segment_number << _LOCATION_SHIFT
+                with open(path, "rb") as segment_file:
+                    os.fsync(segment_file.fileno()) # Make the covered records durable before the snapshot is
+                    segment_map = mmap.mmap(segment_file.fileno(), end, access=mmap.ACCESS_READ)
+                try:
+                    for offset, _, record_type, block_index, raw_hash, keys in _iter_records(segment_map, start, end, False):
+                        if record_type == RECORD_BLOCK:
+                            block_locations.append(location_base | offset)
+                            for leaf_index, (claim_id, content_hash) in enumerate(keys):
+                                # The first claim with a given claim_id is authoritative, as in _index_claim().
+                                if claim_id is None or claim_id in added_claims or (
+                                        base_claims is not None and base_claims.get(claim_id.encode()) is not None):
+                                    continue
+                                added_claims.add(claim_id)
+                                claim_location = (block_index << _LEAF_BITS) | leaf_index
+                                key = claim_id.encode()
+                                rows["claims"].append((key_hash(key), key, claim_location))
+                                if content_hash is not None:
+                                    key = content_key(hash_key(content_hash))
+                                    rows["content"].append((key_hash(key), key, claim_location))
+                            last_hash = raw_hash
+                        elif record_type == RECORD_VERIFICATION:
+                            latest["events"][keys[0][0]] = location_base | offset
+                        elif record_type == RECORD_CLAIM_STATE:
+                            latest["states"][keys[0][0]] = location_base | offset
+                finally:
+                    segment_map.close()
+            for name, locations in latest.items():
+                rows[name] = [(key_hash(key), key, location)
+                              for key, location in ((claim_id.encode(), location) for claim_id, location in locations.items())]
+            tables = {name: merge_rows(base.tables[name] if base is not None else None, rows[name], policy)
+                      for name, policy in TABLES}
+            write_snapshot(self._snapshot_path(), position[0], position[1], last_hash, block_locations, tables)
+        finally:
+            if base is not None:
+                base.close()
+
+    def _snapshot_loop(self):
+        while not self._snapshot_stop.wait(self.snapshot_interval):
+            try:
+                self.write_snapshot()
+            except Exception as e:
+                self.instrumentation.event("snapshot_failed", "Error: Writing the ledger snapshot failed: {error}",
+                                           level="error", error=str(e))
+
+    def _open_active_segment(self, segment_number):
+        self._active_segment = segment_number
+        path = self._segment_path(segment_number)
+        self._writer = open(path, "ab")
+        self._reader = open(path, "rb")
+        self._active_size = self._writer.tell()
+        self._writer_dirty = False
+
+    def _roll_segment(self):
+        """
+        Seals the active segment (fsync + read-only mmap) and starts the next one.
+        """
+        self.flush(fsync=True)
+        sealed_segment = self._active_segment
+        self._writer.close()
+        self._reader.close()
+        if self._active_size:
+            with open(self._segment_path(sealed_segment), "rb") as segment_file:
+                self._segment_mmaps[sealed_segment] = mmap.mmap(segment_file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._open_active_segment(sealed_segment + 1)
+
+    def _write_record(self, record_type, block_index, raw_hash, keys, payload):
+        """
+        Appends one length-prefixed record to the active segment.
+
+        Args:
+            keys (list): (claim_id, content_hash) pairs for the key table, in leaf order.
+
+        Returns:
+            int: The packed location of the new record.
+        """
+        key_table = _pack_keys(keys)
+        body = key_table + payload
+        header = _RECORD_HEADER.pack(len(body), record_type, zlib.crc32(body), block_index, raw_hash, len(key_table))
+        record_length = len(header) + len(body)
+
+        with self._append_lock:
+            if self._active_size and self._active_size + record_length > self.segment_max_bytes:
+                self._roll_segment()
+
+            location = (self._active_segment << _LOCATION_SHIFT) | self._active_size
+            self._writer.write(header)
+            self._writer.write(body)
+            self._active_size += record_length
+            self._writer_dirty = True
+            self._records_since_fsync += 1
+
+            if self._records_since_fsync >= self.fsync_every or (
+                    self.fsync_interval is not None and time.monotonic() - self._last_fsync >= self.fsync_interval):
+                self.flush(fsync=True)
+        return location
+
+    def _read_record(self, location):
+        """
+        Reads one record back from its segment.
+
+        Returns:
+            tuple: (record_type, payload_bytes)
+        """
+        with self._append_lock: # Replication servers read from their own threads
+            segment_number = location >> _LOCATION_SHIFT
+            offset = location & _OFFSET_MASK
+            if segment_number == self._active_segment:
+                if self._writer_dirty:
+                    self._writer.flush()
+                    self._writer_dirty = False
+                self._reader.seek(offset)
+                header = self._reader.read(_RECORD_HEADER.size)
+                body_length, record_type, _, _, _, keys_length = _RECORD_HEADER.unpack(header)
+                self._reader.seek(keys_length, os.SEEK_CUR)
+                payload = self._reader.read(body_length - keys_length)
+            else:
+                segment_map = self._segment_mmaps[segment_number]
+                body_length, record_type, _, _, _, keys_length = _RECORD_HEADER.unpack_from(segment_map, offset)
+                body_start = offset + _RECORD_HEADER.size
+                payload = segment_map[body_start + keys_length:body_start + body_length]
+        return record_type, payload
+
+    def _read_block(self, block_index, with_events=True):
+        """
+        Decodes a block from disk and applies each claim's verification state.
+        """
+        _, payload = self._read_record(self._block_locations[block_index])
+        block = json.loads(payload)
+        if self._state_locations or self._event_locations:
+            for claim_data in self._claims_in_block(block):
+                self._apply_verification_state(claim_data, with_events)
+        return block
+
+    def get_block(self, block_index):
+        """
+        Returns a block decoded from disk with its claims' verification state applied.
+        """
+        if not 0 <= block_index < len(self._block_locations):
+            return None
+        return self._read_block(block_index)
+
+    def _apply_verification_state(self, claim_data, with_events=True):
+        """
+        Applies a claim's latest RECORD_CLAIM_STATE, then its status and, if requested,
+        events from its RECORD_VERIFICATION records.
+        """
+        claim_id = claim_data.get("claim_id")
+        state_location = self._state_locations.get(claim_id)
+        if state_location is not None:
+            _, state_payload = self._read_record(state_location)
+            claim_data.update(json.loads(state_payload))
+        event_location = self._event_locations.get(claim_id)
+        if event_location is not None:
+            if with_events:
+                claim_data["verification_history"] = (
+                    list(claim_data.get("verification_history") or []) + self.get_verification_events(claim_id))
+            claim_data["status"] = self._read_verification(event_location)["summary"]["status"]
+        return claim_data
+
+    def _read_verification(self, location):
+        _, payload = self._read_record(location)
+        return json.loads(payload)
+
+    def _export_block_range(self, start, end):
+        """
+        Returns the raw on-disk JSON of blocks [start, end), as written at append time.
+        Workers decode it themselves, and claim state records are deliberately not applied
+        because they were never part of the block hash.
+        """
+        return [self._read_record(self._block_locations[block_index])[1] for block_index in range(start, end)]
+
+    def claim_problem(self, claim_data):
+        return key_problem(claim_data)
+
+    def _append_block(self, block, claim_digests=None):
+        """
+        Persists a fully built block (single-claim or batch) as one RECORD_BLOCK and indexes it.
+        The leaf hashes of a batch block are kept in a small LRU for get_merkle_proof().
+        """
+        keys = [(claim_data.get("claim_id"), claim_data.get("content_hash"))
+                for claim_data in self._claims_in_block(block)]
+        payload = json.dumps(block, separators=(',', ':')).encode()
+        location = self._write_record(RECORD_BLOCK, block["index"], bytes.fromhex(block["hash"]), keys, payload)
+        self._block_locations.append(location)
+        for leaf_index, (claim_id, content_hash) in enumerate(keys):
+            self._index_claim(claim_id, content_hash, block["index"], leaf_index)
+        self._last_block_hash = block["hash"]
+        if self._query_index is not None:
+            self._add_to_query_index(self._query_index, block["index"], self._claims_in_block(block))
+        if claim_digests is not None and "claims" in block:
+            self._cache_leaf_hashes(block["index"], [digest.hex() for digest in claim_digests])
+
+    @staticmethod
+    def _add_to_query_index(index, block_index, claims):
+        for leaf_index, claim_data in enumerate(claims):
+            timestamp = pack_timestamp(claim_data.get("timestamp"))
+            index.add((block_index << _LEAF_BITS) | leaf_index, claim_data.get("status"), claim_data.get("submitter_id"),
+                      claim_data.get("content_type"), timestamp if type(timestamp) is int else None)
+
+    def _claim_query_index(self):
+        """
+        Returns the query index, building it on first use by decoding every block (with its
+        claims' current status) once.
+        """
+        if self._query_index is None:
+            index = ClaimQueryIndex()
+            for block_index in range(len(self._block_locations)):
+                self._add_to_query_index(index, block_index, self._claims_in_block(self._read_block(block_index, with_events=False)))
+            self._query_index = index
+        return self._query_index
+
+    def _cache_leaf_hashes(self, block_index, leaf_hashes):
+        self._merkle_leaf_cache[block_index] = leaf_hashes
+        self._merkle_leaf_cache.move_to_end(block_index)
+        while len(self._merkle_leaf_cache) > self.MERKLE_CACHE_BLOCKS:
+            self._merkle_leaf_cache.popitem(last=False)
+
+    def _leaf_hashes(self, block_index):
+        """
+        Returns a batch block's leaf hashes from the LRU, decoding and re-hashing its claims on a miss.
+        """
+        leaf_hashes = self._merkle_leaf_cache.get(block_index)
+        if leaf_hashes is None:
+            block = self._read_block(block_index)
+            claim_digest = encoding_of_block(block).claim_digest
+            leaf_hashes = [claim_digest(claim_data).hex() for claim_data in block["claims"]]
+        self._cache_leaf_hashes(block_index, leaf_hashes)
+        return leaf_hashes
+
+    def get_last_block_hash(self):
+        """
+        Returns the hash of the last block without reading it from disk.
+        Returns:
+            str: The hash of the last block, or "0"*64 if chain is empty.
+        """
+        return self._last_block_hash if self._last_block_hash else "0" * 64
+
+    def get_claim_by_id(self, claim_id, with_events=True):
+        """
+        Retrieves a claim by its 'claim_id', including its latest verification state.
+        The returned dictionary is a fresh copy decoded from disk; use record_verification()
+        to record new verification results.
+
+        Args:
+            claim_id (str): The ID of the claim to retrieve.
+            with_events (bool): See InMemoryLedger.get_claim_by_id().
+
+        Returns:
+            dict or None: The claim_data dictionary if found, otherwise None.
+        """
+        location = self.get_claim_location(claim_id)
+        if location is None:
+            return None
+        return self.get_claim_by_location(*location, with_events=with_events)
+
+    def get_claim_by_location(self, block_index, leaf_index=0, with_events=True):
+        """
+        Retrieves a claim by its position in the chain, decoded from disk.
+
+        Args:
+            block_index (int): Index of the block holding the claim.
+            leaf_index (int): Position of the claim within the block (0 for single-claim blocks).
+            with_events (bool): See InMemoryLedger.get_claim_by_id().
+
+        Returns:
+            dict or None: The claim_data dictionary if the position exists, otherwise None.
+        """
+        if not 0 <= block_index < len(self._block_locations):
+            return None
+        claims = self._claims_in_block(self._read_block(block_index, with_events))
+        return claims[leaf_index] if 0 <= leaf_index < len(claims) else None
+
+    def record_verification(self, claim_id, verification_events, weights=None):
+        """
+        Appends one RECORD_VERIFICATION holding the new events and the claim's updated
+        aggregate status. See InMemoryLedger.record_verification().
+
+        Returns:
+            str or None: The claim's new status, or None if the claim is unknown.
+        """
+        block_index = self.get_block_index(claim_id)
+        if block_index is None:
+            return None
+        previous = self._event_locations.get(claim_id)
+        if previous is not None:
+            status = ClaimStatus.from_dict(self._read_verification(previous)["summary"])
+            previous_status = status.status
+        else:
+            stored_claim = self.get_claim_by_id(claim_id, with_events=False)
+            previous_status = stored_claim.get("status")
+            status = ClaimStatus.from_history(stored_claim.get("verification_history") or ())
+        for event in verification_events:
+            status.apply(event, weights.get(event.get("agent_id"), 1.0) if weights else 1.0)
+        payload = json.dumps({"previous": previous, "events": list(verification_events), "summary": status.to_dict()},
+                             separators=(',', ':')).encode()
+        self._event_locations[claim_id] = self._write_record(
+            RECORD_VERIFICATION, block_index, b"\0" * 32, [(claim_id, None)], payload)
+        if self._query_index is not None and status.status != previous_status:
+            self._query_index.update_status(self._claim_index[claim_id], previous_status, status.status)
+        return status.status
+
+    def get_claim_status(self, claim_id):
+        """
+        Returns a claim's current status, read from its latest RECORD_VERIFICATION when it
+        has one. See InMemoryLedger.get_claim_status().
+        """
+        location = self._event_locations.get(claim_id)
+        if location is not None:
+            return self._read_verification(location)["summary"]["status"]
+        claim_data = self.get_claim_by_id(claim_id, with_events=False)
+        return claim_data.get("status") if claim_data is not None else None
+
+    def get_claim_summary(self, claim_id):
+        """
+        See InMemoryLedger.get_claim_summary().
+        """
+        location = self._event_locations.get(claim_id)
+        return self._read_verification(location)["summary"] if location is not None else None
+
+    def get_verification_events(self, claim_id):
+        """
+        Returns the events recorded for a claim, oldest first, by following the links
+        between its RECORD_VERIFICATION records.
+        """
+        batches = []
+        location = self._event_locations.get(claim_id)
+        while location is not None:
+            record = self._read_verification(location)
+            batches.append(record["events"])
+            location = record["previous"]
+        return [event for batch in reversed(batches) for event in batch]
+
+    def flush(self, fsync=True):
+        """
+        Flushes buffered records to the active segment and optionally fsyncs it.
+
+        Args:
+            fsync (bool): Also force the data to stable storage.
+        """
+        with self._append_lock:
+            if self._writer is None:
+                return
+            self._writer.flush()
+            self._writer_dirty = False
+            if fsync:
+                os.fsync(self._writer.fileno())
+                self._records_since_fsync = 0
+                self._last_fsync = time.monotonic()
+
+    def close(self):
+        """
+        Flushes and fsyncs pending records and closes all segment files and mappings.
+        With scheduled snapshots, the background thread is stopped and a final snapshot is
+        written first, so the next start replays nothing.
+        """
+        if self._writer is None:
+            return
+        if self._snapshot_thread is not None:
+            self._snapshot_stop.set()
+            self._snapshot_thread.join()
+            self._snapshot_thread = None
+            self.write_snapshot()
+        self.flush(fsync=True)
+        self._writer.close()
+        self._reader.close()
+        self._writer = None
+        self._reader = None
+        for segment_map in self._segment_mmaps.values():
+            segment_map.close()
+        self._segment_mmaps.clear()
+        if self._snapshot is not None:
+            self._snapshot.close()
+            self._snapshot = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+if __name__ == '__main__':
+    # Test the segmented ledger: write, close, reopen and read back.
+    import datetime
+    import hashlib
+    import tempfile
+
+    from .instrumentation import ConsoleSink
+    DEFAULT_INSTRUMENTATION.add_sink(ConsoleSink())
+    print("--- Segmented Ledger Self-Test ---")
+    data_dir = tempfile.mkdtemp(prefix="helios_segments_")
+    ledger = SegmentedLedger(data_dir, segment_max_bytes=1024, fsync_every=10)
+    for i in range(10):
+        ledger.add_claim({
+            "claim_id": f"seg_test_{i:03d}",
+            "timestamp": str(datetime.datetime.utcnow().isoformat()),
+            "submitter_id": "user_alpha",
+            "content_hash": hashlib.sha256(f"content {i}".encode()).hexdigest(),
+            "content_type": "text/plain",
+            "metadata": {"n": i},
+            "verification_history": [],
+            "status": "pending_verification"
+        })
+    ledger.add_claims_batch([
+        {"claim_id": f"seg_batch_{i}", "submitter_id": "user_beta", "content_hash": f"batch_hash_{i:04d}",
+         "content_type": "text/plain", "metadata": {}, "verification_history": [], "status": "pending_verification"}
+        for i in range(4)
+    ])
+    ledger.record_verification("seg_test_003", [{"agent_id": "demo", "verdict": "unverified"}])
+    ledger.record_verification("seg_test_003", [{"agent_id": "demo", "verdict": "verified_preliminary"}])
+    last_hash = ledger.get_last_block_hash()
+    ledger.close()
+    print(f"Segments written: {len(os.listdir(data_dir))}")
+
+    reopened = SegmentedLedger(data_dir)
+    print(f"Blocks after reopen: {len(reopened.chain)} (expected 12)")
+    print(f"Location of seg_batch_2: {reopened.get_claim_location('seg_batch_2')}")
+    print(f"Merkle proof for seg_batch_2 available: {reopened.get_merkle_proof('seg_batch_2') is not None}")
+    print(f"Tip hash preserved: {reopened.get_last_block_hash() == last_hash}")
+    print(f"Status of seg_test_003: {reopened.get_claim_status('seg_test_003')}, "
+          f"events: {len(reopened.get_claim_by_id('seg_test_003')['verification_history'])}")
+    print(f"Metadata of seg_test_007: {reopened.get_claim_by_id('seg_test_007')['metadata']}")
+    print(f"Verified claims: {[claim['claim_id'] for _, claim in reopened.query_claims(status='verified_preliminary')]}")
+    reopened.record_verification("seg_batch_1", [{"agent_id": "demo", "verdict": "unverified"}])
+    print(f"Pending claims of user_beta after verifying seg_batch_1: "
+          f"{[claim['claim_id'] for _, claim in reopened.query_claims(status='pending_verification', submitter_id='user_beta')]}")
+    print(f"Chain verification after reopen: valid={reopened.verify_chain(workers=2, range_size=4)['valid']}")
+    reopened.display_ledger()
+
+    print(f"Snapshot written up to (segment, offset): {reopened.write_snapshot()}")
+    reopened.add_claim({"claim_id": "seg_after_snapshot", "submitter_id": "user_alpha", "content_hash": "after_snapshot",
+                        "content_type": "text/plain", "metadata": {}, "verification_history": [], "status": "pending_verification"})
+    reopened.close()
+    from_snapshot = SegmentedLedger(data_dir)
+    print(f"Started from snapshot: {from_snapshot._snapshot is not None}, blocks: {len(from_snapshot.chain)} (expected 13)")
+    print(f"Snapshot lookup seg_test_007: {from_snapshot.get_claim_location('seg_test_007')}, "
+          f"tail lookup seg_after_snapshot: {from_snapshot.get_claim_location('seg_after_snapshot')}")
+    print(f"Status of seg_test_003 from snapshot: {from_snapshot.get_claim_status('seg_test_003')}")
+    from_snapshot.close()
+    print("--- End of Segmented Ledger Self-Test ---")
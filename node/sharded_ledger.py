@@ -0,0 +1,835 @@
+# node/sharded_ledger.py
+
+import datetime
+import hashlib
+import heapq
+import itertools
+import json
+import multiprocessing
+import os
+import threading
+import time
+
+from .canonical import DEFAULT_ENCODING
+from .instrumentation import DEFAULT_INSTRUMENTATION
+
+SHARD_KEYS = ("claim_id", "content_hash")
+COMMITS_FILE = "commits.jsonl"
+MANIFEST_FILE = "shards.json"
+QUERY_CHUNK = 256 # Claims fetched from a shard per round trip while query_claims() is iterated
+
+_commit_json = json.JSONEncoder(sort_keys=True, separators=(',', ':')).encode
+
+
+def shard_for(value, shard_count):
+    """
+    Returns the shard a routing value (claim_id or content_hash) belongs to. The hash is
+    stable across processes and restarts, unlike hash().
+
+    Args:
+        value (str): The routing value.
+        shard_count (int): Number of shards.
+
+    Returns:
+        int: Shard number in [0, shard_count).
+    """
+    digest = hashlib.blake2b(str(value).encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big") % shard_count
+
+
+def compute_commit_hash(commit):
+    """
+    Returns:
+        str: Hex SHA256 of a top-level commit block's key-sorted JSON, without its "hash" field.
+    """
+    return hashlib.sha256(_commit_json({key: value for key, value in commit.items() if key != "hash"}).encode()).hexdigest()
+
+
+# Worker side. Each shard is an ordinary InMemoryLedger or SegmentedLedger owned by one
+# process; requests are (op, args) tuples and replies ("ok", result) or ("error", exception).
+
+def _open_shard(backend, options):
+    if backend == "segmented":
+        from .segmented_ledger import SegmentedLedger
+        return SegmentedLedger(**options)
+    from .ledger import InMemoryLedger
+    return InMemoryLedger(**options)
+
+
+def _shard_tip(ledger):
+    return len(ledger.chain), ledger.get_last_block_hash()
+
+
+def _shard_add_claims(ledger, claims_data):
+    """
+    Appends each claim as its own block. Returns the indexes of the created blocks (None
+    for rejected claims) rather than the blocks, so bulk ingest does not ship them back.
+    """
+    indexes = []
+    for claim_data in claims_data:
+        block = ledger.add_claim(claim_data)
+        indexes.append(block["index"] if block else None)
+    return indexes
+
+
+def _shard_query_chunk(ledger, filters, cursor, limit, with_events):
+    return list(itertools.islice(ledger.query_claims(cursor=cursor, with_events=with_events, **filters), limit))
+
+
+def _shard_block_hashes(ledger, indices):
+    return [ledger.get_block_hash(index) for index in indices]
+
+
+_WORKER_OPS = {
+    "tip": _shard_tip,
+    "add_claims": _shard_add_claims,
+    "query_chunk": _shard_query_chunk,
+    "block_hashes": _shard_block_hashes
+}
+
+
+def _shard_main(connection, backend, options):
+    ledger = _open_shard(backend, options)
+    try:
+        while True:
+            try:
+                op, args = connection.recv()
+            except EOFError:
+                return
+            if op == "close":
+                connection.send(("ok", None))
+                return
+            try:
+                handler = _WORKER_OPS.get(op)
+                if handler is not None:
+                    reply = ("ok", handler(ledger, *args))
+                elif op.startswith("_"):
+                    raise ValueError(f"Ledger shards do not serve '{op}'.")
+                else:
+                    reply = ("ok", getattr(ledger, op)(*args))
+            except Exception as e:
+                reply = ("error", e)
+            try:
+                connection.send(reply)
+            except Exception as e: # The result or exception could not be pickled
+                connection.send(("error", RuntimeError(f"{op} failed: {e}")))
+    finally:
+        ledger.close()
+
+
+class _ShardClient:
+    """
+    The parent's end of one shard process. Requests on it are serialized by its lock.
+    """
+    def __init__(self, context, shard, backend, options):
+        self.shard = shard
+        self.connection, child_connection = context.Pipe()
+        self.process = context.Process(target=_shard_main, args=(child_connection, backend, options),
+                                       name=f"ledger-shard-{shard}", daemon=True)
+        self.process.start()
+        child_connection.close()
+        self.lock = threading.Lock()
+
+    def send(self, op, args):
+        self.connection.send((op, args))
+
+    def receive(self):
+        try:
+            status, value = self.connection.recv()
+        except EOFError:
+            raise RuntimeError(f"Ledger shard {self.shard} exited unexpectedly.") from None
+        if status == "error":
+            raise value
+        return value
+
+    def call(self, op, *args):
+        with self.lock:
+            self.send(op, args)
+            return self.receive()
+
+
+class ShardedLedger:
+    """
+    A ledger split into independent chains ("shards") that run in worker processes, so
+    appends to different shards are hashed in parallel on separate cores.
+    Each claim is routed to one shard by a stable hash of its claim_id (or of its
+    content_hash), and each shard is a complete InMemoryLedger or SegmentedLedger with its
+    own previous_hash chain, indexes and verification log. A top-level chain of commit
+    blocks ties them together: every commit records each shard's length and tip hash and
+    links to the previous commit, so the state of all shards at that commit is fixed by a
+    single hash. Commits are made every 'commit_interval' seconds while shards grow, on
+    commit() and on close(); claims appended since the last commit are stored and
+    queryable, but not yet covered by get_last_block_hash().
+    Lookups by the routing key go to one shard. Other lookups, queries and counts are sent
+    to every shard at once and merged, so callers see one ledger. "chain" is the top-level
+    commit chain; blocks and Merkle proofs of claims are relative to their shard's chain.
+    Shard requests are serialized per shard, so callers on several threads (or one caller
+    using add_claims/add_claims_batch) keep every shard busy.
+    """
+    def __init__(self, shards=None, shard_key="claim_id", backend="memory", data_dir=None, commit_interval=1.0,
+                 encoding=DEFAULT_ENCODING, shard_options=None, start_method="spawn", instrumentation=None):
+        """
+        Starts the shard processes, opening (or creating) their chains.
+
+        Args:
+            shards (int, optional): Number of shards; defaults to the number of cores. A ledger
+                                    reopened from 'data_dir' must use the count it was created with.
+            shard_key (str): Claim field claims are routed by, "claim_id" or "content_hash".
+            backend (str): Ledger backend of each shard, "memory" or "segmented".
+            data_dir (str, optional): Directory for a "segmented" ledger: each shard lives in
+                                      a shard_NNN subdirectory next to the commit chain.
+            commit_interval (float or None): Seconds between top-level commits made by a
+                                             background thread. None commits only on commit()
+                                             and close().
+            encoding (str): Canonical encoding the shards hash new blocks with.
+            shard_options (dict, optional): Further keyword arguments for each shard's ledger,
+                                            e.g. {"fsync_every": 1} for "segmented".
+            start_method (str): multiprocessing start method of the shard processes. "spawn"
+                                is safe in processes that already run threads.
+            instrumentation (Instrumentation, optional): Event/metrics surface of this process;
+                                                         the shards run without one.
+
+        Raises:
+            ValueError: For an unknown shard key or backend, a "segmented" ledger without
+                        'data_dir', or a shard count or key differing from the one on disk.
+        """
+        if shard_key not in SHARD_KEYS:
+            raise ValueError(f"Unknown shard key '{shard_key}'. Available: {list(SHARD_KEYS)}")
+        if backend not in ("memory", "segmented"):
+            raise ValueError(f"Unknown shard backend '{backend}'. Available: ['memory', 'segmented']")
+        if backend == "segmented" and not data_dir:
+            raise ValueError("A segmented sharded ledger needs a data_dir.")
+        self.instrumentation = instrumentation or DEFAULT_INSTRUMENTATION
+        self.shard_key = shard_key
+        self.backend = backend
+        self.data_dir = data_dir
+        self.commit_interval = commit_interval
+        self.chain = [] # Top-level commit blocks
+        self._commit_lock = threading.Lock()
+        self._commits_file = None
+        self._commit_thread = None
+        self._commit_stop = threading.Event()
+        self._closed = False
+
+        if data_dir:
+            os.makedirs(data_dir, exist_ok=True)
+            shards = self._check_manifest(shards or os.cpu_count() or 1)
+        self.shard_count = shards or os.cpu_count() or 1
+
+        context = multiprocessing.get_context(start_method)
+        self._shards = []
+        try:
+            for shard in range(self.shard_count):
+                options = dict(shard_options or {}, encoding=encoding)
+                if backend == "segmented":
+                    options["data_dir"] = os.path.join(data_dir, f"shard_{shard:03d}")
+                self._shards.append(_ShardClient(context, shard, backend, options))
+            if data_dir:
+                self._load_commits()
+            if not self.chain:
+                self.commit(force=True)
+        except BaseException:
+            self._stop_shards()
+            raise
+        if commit_interval is not None:
+            self._commit_thread = threading.Thread(target=self._commit_loop, name="ledger-commit", daemon=True)
+            self._commit_thread.start()
+
+    def _check_manifest(self, shards):
+        path = os.path.join(self.data_dir, MANIFEST_FILE)
+        if os.path.exists(path):
+            with open(path) as manifest_file:
+                manifest = json.load(manifest_file)
+            if manifest["shard_key"] != self.shard_key or manifest["shards"] != shards:
+                raise ValueError(f"'{self.data_dir}' holds {manifest['shards']} shards keyed by {manifest['shard_key']}, "
+                                 f"not {shards} keyed by {self.shard_key}.")
+        else:
+            with open(path, "w") as manifest_file:
+                json.dump({"shards": shards, "shard_key": self.shard_key}, manifest_file)
+        return shards
+
+    def _load_commits(self):
+        """
+        Reads the persisted commit chain, cutting off a torn last line.
+
+        Raises:
+            ValueError: If a commit's hash or previous_hash link does not check out.
+        """
+        path = os.path.join(self.data_dir, COMMITS_FILE)
+        valid_size = 0
+        if os.path.exists(path):
+            with open(path, "rb") as commits_file:
+                for line in commits_file:
+                    if not line.endswith(b"\n"):
+                        break # Torn write
+                    try:
+                        commit = json.loads(line)
+                    except ValueError:
+                        break
+                    previous_hash = self.chain[-1]["hash"] if self.chain else "0" * 64
+                    if commit.get("hash") != compute_commit_hash(commit) or commit.get("previous_hash") != previous_hash:
+                        raise ValueError(f"Commit {len(self.chain)} in '{path}' is corrupted.")
+                    self.chain.append(commit)
+                    valid_size += len(line)
+            if valid_size < os.path.getsize(path):
+                self.instrumentation.event("commits_truncated", "Warning: Truncating torn tail of '{path}' at offset {offset}.",
+                                           level="warning", path=path, offset=valid_size)
+                with open(path, "r+b") as commits_file:
+                    commits_file.truncate(valid_size)
+        self._commits_file = open(path, "ab")
+
+    # --- Shard requests ---
+
+    def _shard_of(self, value):
+        return shard_for(value, self.shard_count)
+
+    def _route(self, claim_data):
+        return self._shard_of(claim_data.get(self.shard_key))
+
+    def _call(self, shard, op, *args):
+        return self._shards[shard].call(op, *args)
+
+    def _fan_out(self, op, args_per_shard):
+        """
+        Sends one request to every shard before waiting for any reply, so the shards work
+        on them in parallel.
+
+        Args:
+            op (str): The request.
+            args_per_shard (list): The request's argument tuple for each shard.
+
+        Returns:
+            list: Each shard's result, in shard order.
+        """
+        for client in self._shards: # Always acquired in shard order
+            client.lock.acquire()
+        try:
+            for client, args in zip(self._shards, args_per_shard):
+                client.send(op, args)
+            results, error = [], None
+            for client in self._shards: # Every reply is read, even after an error, to keep the pipes in step
+                try:
+                    results.append(client.receive())
+                except Exception as e:
+                    results.append(None)
+                    error = error or e
+            if error is not None:
+                raise error
+            return results
+        finally:
+            for client in self._shards:
+                client.lock.release()
+
+    def _broadcast(self, op, *args):
+        return self._fan_out(op, [args] * self.shard_count)
+
+    def _find(self, claim_id, op, *args):
+        """
+        Runs a request about one claim on the shard holding it: the routed shard when claims
+        are keyed by claim_id, otherwise every shard, returning the first non-None result.
+        """
+        if self.shard_key == "claim_id":
+            return self._call(self._shard_of(claim_id), op, claim_id, *args)
+        return next((result for result in self._broadcast(op, claim_id, *args) if result is not None), None)
+
+    # --- Appends ---
+
+    def add_claim(self, claim_data):
+        """
+        Adds a claim as a new block of the shard it is routed to.
+
+        Args:
+            claim_data (dict): The dictionary containing all information for the claim.
+
+        Returns:
+            dict or None: The created shard block, plus the shard number under "shard", or
+                          None if the claim was rejected.
+        """
+        if not isinstance(claim_data, dict):
+            self.instrumentation.event("claim_rejected", "Error: Claim data must be a dictionary.", level="error")
+            return None
+        instrumentation = self.instrumentation
+        if instrumentation.metrics:
+            started = time.perf_counter()
+        shard = self._route(claim_data)
+        block = self._call(shard, "add_claim", claim_data)
+        if not block:
+            return None
+        if instrumentation.metrics:
+            instrumentation.observe("ledger.append", time.perf_counter() - started)
+            instrumentation.increment("ledger.blocks_added")
+            instrumentation.increment("ledger.claims_added")
+        if instrumentation.emitting:
+            instrumentation.event("claim_added", "Claim added to ledger shard {shard}. Index: {index}, Hash: {hash}",
+                                  shard=shard, index=block["index"], hash=block["hash"])
+        return dict(block, shard=shard)
+
+    def claim_problem(self, claim_data):
+        """
+        Returns:
+            str or None: Why the shards' backend cannot store the claim, or None if it can.
+        """
+        if self.backend == "segmented":
+            from .segmented_ledger import key_problem
+            return key_problem(claim_data)
+        return None
+
+    def _split(self, claims_data):
+        per_shard = [[] for _ in range(self.shard_count)]
+        for claim_data in claims_data:
+            per_shard[self._route(claim_data)].append(claim_data)
+        return per_shard
+
+    def add_claims(self, claims_data):
+        """
+        Adds each claim as its own block, like add_claim(), with one request per shard so
+        all shards append in parallel. The bulk ingest path.
+
+        Args:
+            claims_data (list): The claim dictionaries.
+
+        Returns:
+            int: The number of claims added.
+        """
+        if not claims_data or not all(isinstance(claim_data, dict) for claim_data in claims_data):
+            self.instrumentation.event("batch_rejected", "Error: Claims must be a non-empty list of dictionaries.", level="error")
+            return 0
+        instrumentation = self.instrumentation
+        if instrumentation.metrics:
+            started = time.perf_counter()
+        per_shard = self._split(claims_data)
+        results = self._fan_out("add_claims", [(claims,) for claims in per_shard])
+        added = sum(index is not None for indexes in results for index in indexes)
+        if instrumentation.metrics:
+            instrumentation.observe("ledger.append", time.perf_counter() - started)
+            instrumentation.increment("ledger.blocks_added", added)
+            instrumentation.increment("ledger.claims_added", added)
+        return added
+
+    def add_claims_batch(self, claims_data):
+        """
+        Adds claims as batch blocks: the claims routed to each shard form one block of that
+        shard, committed through a Merkle root (see InMemoryLedger.add_claims_batch). The
+        shards build their blocks in parallel.
+
+        Args:
+            claims_data (list): The claim dictionaries to add.
+
+        Returns:
+            list or None: The created shard blocks, each with its shard number under "shard",
+                          or None if the batch was rejected.
+        """
+        if not claims_data or not all(isinstance(claim_data, dict) for claim_data in claims_data):
+            self.instrumentation.event("batch_rejected", "Error: Claim batch must be a non-empty list of dictionaries.", level="error")
+            return None
+        for claim_data in claims_data: # Reject here rather than after the other shards committed their blocks
+            problem = self.claim_problem(claim_data)
+            if problem:
+                self.instrumentation.event("batch_rejected", "Error: {problem}", level="error", problem=problem)
+                return None
+        instrumentation = self.instrumentation
+        if instrumentation.metrics:
+            started = time.perf_counter()
+        per_shard = self._split(claims_data)
+        shards = [shard for shard, claims in enumerate(per_shard) if claims]
+        if len(shards) == 1:
+            blocks = [self._call(shards[0], "add_claims_batch", per_shard[shards[0]])]
+        else:
+            results = self._fan_out("add_claims_batch", [(claims,) if claims else ([],) for claims in per_shard])
+            blocks = [results[shard] for shard in shards]
+        if not all(blocks):
+            return None
+        if instrumentation.metrics:
+            instrumentation.observe("ledger.append", time.perf_counter() - started)
+            instrumentation.increment("ledger.blocks_added", len(blocks))
+            instrumentation.increment("ledger.claims_added", len(claims_data))
+        if instrumentation.emitting:
+            instrumentation.event("claim_batch_added", "Claim batch added to {shards} ledger shards. Claims: {claims}",
+                                  shards=len(blocks), claims=len(claims_data))
+        return [dict(block, shard=shard) for shard, block in zip(shards, blocks)]
+
+    # --- Top-level commits ---
+
+    def shard_tips(self):
+        """
+        Returns:
+            list: Each shard's [chain length, last block hash], in shard order.
+        """
+        return [list(tip) for tip in self._broadcast("tip")]
+
+    def commit(self, force=False):
+        """
+        Appends a top-level commit block recording every shard's tip.
+
+        Args:
+            force (bool): Commit even if no shard grew since the last commit.
+
+        Returns:
+            dict or None: The new commit block, or None if nothing changed.
+        """
+        with self._commit_lock:
+            tips = self.shard_tips()
+            if not force and self.chain and self.chain[-1]["shard_tips"] == tips:
+                return None
+            commit = {
+                "index": len(self.chain),
+                "timestamp": str(datetime.datetime.utcnow().isoformat()),
+                "shard_key": self.shard_key,
+                "shard_tips": tips,
+                "previous_hash": self.chain[-1]["hash"] if self.chain else "0" * 64
+            }
+            commit["hash"] = compute_commit_hash(commit)
+            if self._commits_file is not None:
+                self._commits_file.write(_commit_json(commit).encode() + b"\n")
+                self._commits_file.flush()
+                os.fsync(self._commits_file.fileno())
+            self.chain.append(commit)
+        if self.instrumentation.emitting:
+            self.instrumentation.event("shards_committed", "Shard tips committed. Index: {index}, Hash: {hash}",
+                                       index=commit["index"], hash=commit["hash"])
+        return commit
+
+    def _commit_loop(self):
+        while not self._commit_stop.wait(self.commit_interval):
+            try:
+                self.commit()
+            except Exception as e:
+                self.instrumentation.event("commit_failed", "Error: Committing the shard tips failed: {error}",
+                                           level="error", error=str(e))
+
+    def get_block(self, block_index):
+        """
+        Returns:
+            dict or None: A copy of the top-level commit block at 'block_index', or None.
+        """
+        if not 0 <= block_index < len(self.chain):
+            return None
+        commit = dict(self.chain[block_index])
+        commit["shard_tips"] = [list(tip) for tip in commit["shard_tips"]]
+        return commit
+
+    def get_last_block(self):
+        return self.get_block(len(self.chain) - 1)
+
+    def get_last_block_hash(self):
+        """
+        Returns:
+            str: Hash of the latest top-level commit, which covers every shard as of that commit.
+        """
+        return self.chain[-1]["hash"] if self.chain else "0" * 64
+
+    # --- Lookups ---
+
+    def get_claim_shard(self, claim_id):
+        """
+        Returns:
+            int or None: The shard holding 'claim_id', or None if the claim is unknown.
+        """
+        if self.shard_key == "claim_id":
+            shard = self._shard_of(claim_id)
+            return shard if self._call(shard, "get_claim_location", claim_id) is not None else None
+        locations = self._broadcast("get_claim_location", claim_id)
+        return next((shard for shard, location in enumerate(locations) if location is not None), None)
+
+    def get_claim_location(self, claim_id):
+        """
+        Returns:
+            tuple or None: (shard, block_index, leaf_index) within that shard's chain, or None.
+        """
+        shard = self.get_claim_shard(claim_id)
+        if shard is None:
+            return None
+        return (shard,) + tuple(self._call(shard, "get_claim_location", claim_id))
+
+    def get_claim_by_id(self, claim_id, with_events=True):
+        """
+        Retrieves a claim by its ID. See InMemoryLedger.get_claim_by_id().
+        """
+        return self._find(claim_id, "get_claim_by_id", with_events)
+
+    def record_verification(self, claim_id, verification_events, weights=None):
+        """
+        Records new verification events for a claim in its shard.
+        See InMemoryLedger.record_verification().
+        """
+        return self._find(claim_id, "record_verification", verification_events, weights)
+
+    def get_claim_status(self, claim_id):
+        return self._find(claim_id, "get_claim_status")
+
+    def get_claim_summary(self, claim_id):
+        return self._find(claim_id, "get_claim_summary")
+
+    def get_verification_events(self, claim_id):
+        return self._find(claim_id, "get_verification_events")
+
+    def get_merkle_proof(self, claim_id):
+        """
+        Produces a Merkle inclusion proof for a claim stored in a batch block of its shard.
+        See InMemoryLedger.get_merkle_proof(); the proof also names the shard.
+        """
+        shard = self.get_claim_shard(claim_id)
+        if shard is None:
+            return None
+        proof = self._call(shard, "get_merkle_proof", claim_id)
+        return dict(proof, shard=shard) if proof is not None else None
+
+    def get_claim_ids_by_content_hash(self, content_hash):
+        """
+        Returns the IDs of every claim submitted for the given content hash. Claims routed
+        by content_hash are found on one shard, in the order they were added; otherwise the
+        shards' lists are concatenated in shard order.
+        """
+        if self.shard_key == "content_hash":
+            return self._call(self._shard_of(content_hash), "get_claim_ids_by_content_hash", content_hash)
+        return [claim_id for claim_ids in self._broadcast("get_claim_ids_by_content_hash", content_hash)
+                for claim_id in claim_ids]
+
+    # --- Queries ---
+
+    def _decode_cursor(self, cursor):
+        if cursor is None:
+            return [None] * self.shard_count
+        positions = [int(part) if part else None for part in str(cursor).split(",")]
+        if len(positions) != self.shard_count:
+            raise ValueError(f"Cursor {cursor!r} does not belong to a ledger with {self.shard_count} shards.")
+        return positions
+
+    @staticmethod
+    def _encode_cursor(positions):
+        return ",".join("" if position is None else str(position) for position in positions)
+
+    @staticmethod
+    def _merge_key(item):
+        return item[2].get("timestamp") or "", item[0]
+
+    def query_claims(self, status=None, submitter_id=None, content_type=None, since=None, until=None,
+                     cursor=None, with_events=False):
+        """
+        Lazily yields the claims matching every filter across all shards. Each shard's
+        matches are fetched QUERY_CHUNK at a time and merged by claim timestamp.
+        See InMemoryLedger.query_claims() for the filters.
+
+        Args:
+            cursor (str, optional): Opaque cursor returned with an earlier result; it holds
+                                    the position reached in every shard.
+
+        Yields:
+            tuple: (cursor, claim_data)
+        """
+        filters = {"status": status, "submitter_id": submitter_id, "content_type": content_type,
+                   "since": since, "until": until}
+        positions = self._decode_cursor(cursor)
+
+        def shard_stream(shard, after):
+            while True:
+                chunk = self._call(shard, "query_chunk", filters, after, QUERY_CHUNK, with_events)
+                for location, claim_data in chunk:
+                    yield shard, location, claim_data
+                if len(chunk) < QUERY_CHUNK:
+                    return
+                after = chunk[-1][0]
+
+        streams = [shard_stream(shard, after) for shard, after in enumerate(positions)]
+        for shard, location, claim_data in heapq.merge(*streams, key=self._merge_key):
+            positions[shard] = location
+            yield self._encode_cursor(positions), claim_data
+
+    def query_page(self, status=None, submitter_id=None, content_type=None, since=None, until=None,
+                   cursor=None, limit=100, with_events=False):
+        """
+        Returns one page of query_claims() results. Every shard is asked for one more
+        match than the page holds, all at once, and their answers are merged.
+
+        Returns:
+            dict: {"claims": [claim_data, ...], "next_cursor": cursor of the next page, or
+                  None if this page holds the last matching claim}
+        """
+        filters = {"status": status, "submitter_id": submitter_id, "content_type": content_type,
+                   "since": since, "until": until}
+        positions = self._decode_cursor(cursor)
+        chunks = self._fan_out("query_chunk", [(filters, after, limit + 1, with_events) for after in positions])
+        streams = [[(shard, location, claim_data) for location, claim_data in chunk] for shard, chunk in enumerate(chunks)]
+        merged = heapq.merge(*streams, key=self._merge_key)
+        claims = []
+        for shard, location, claim_data in itertools.islice(merged, limit):
+            positions[shard] = location
+            claims.append(claim_data)
+        more = len(claims) < sum(len(chunk) for chunk in chunks)
+        return {"claims": claims, "next_cursor": self._encode_cursor(positions) if more else None}
+
+    def count_claims(self, status=None, submitter_id=None, content_type=None, since=None, until=None):
+        """
+        Counts the claims matching the filters of query_claims() on every shard.
+        """
+        return sum(self._broadcast("count_claims", status, submitter_id, content_type, since, until))
+
+    # --- Verification ---
+
+    def verify_chain(self, full=False):
+        """
+        Verifies every shard's chain (all shards at once, each serially in its own process)
+        and the top-level commit chain: each commit's hash and previous_hash link, and that
+        every shard tip it records is still the hash of that shard block.
+
+        Args:
+            full (bool): Ignore the shards' checkpoints and verify them from their genesis blocks.
+
+        Returns:
+            dict: {"valid", "first_corrupted_index" (top-level commit), "reason", "blocks_verified"
+                  (shard blocks), "elapsed_seconds", "blocks_per_second", "shards": per-shard reports}
+        """
+        started = time.perf_counter()
+        with self._commit_lock:
+            commits = list(self.chain)
+        shard_reports = self._broadcast("verify_chain", 0, None, full)
+
+        wanted = [sorted({commit["shard_tips"][shard][0] - 1 for commit in commits}) for shard in range(self.shard_count)]
+        hashes = self._fan_out("block_hashes", [(indices,) for indices in wanted])
+        tip_hashes = [dict(zip(indices, shard_hashes)) for indices, shard_hashes in zip(wanted, hashes)]
+        first_bad_index, reason = None, None
+        previous_hash = "0" * 64
+        for commit in commits:
+            if commit["hash"] != compute_commit_hash(commit):
+                reason = "hash does not match contents"
+            elif commit["previous_hash"] != previous_hash:
+                reason = "previous_hash does not link to the preceding commit"
+            elif any(tip_hashes[shard][length - 1] != tip_hash for shard, (length, tip_hash) in enumerate(commit["shard_tips"])):
+                reason = "a committed shard tip no longer matches the shard's chain"
+            if reason is not None:
+                first_bad_index = commit["index"]
+                break
+            previous_hash = commit["hash"]
+        for shard, report in enumerate(shard_reports):
+            if not report["valid"] and reason is None:
+                reason = f"shard {shard} block {report['first_corrupted_index']}: {report['reason']}"
+
+        elapsed = time.perf_counter() - started
+        blocks_verified = sum(report["blocks_verified"] for report in shard_reports)
+        return {
+            "valid": reason is None,
+            "first_corrupted_index": first_bad_index,
+            "reason": reason,
+            "blocks_verified": blocks_verified,
+            "elapsed_seconds": round(elapsed, 6),
+            "blocks_per_second": round(blocks_verified / elapsed, 1) if elapsed > 0 else None,
+            "shards": shard_reports
+        }
+
+    # --- Lifecycle ---
+
+    def _stop_shards(self):
+        for client in self._shards:
+            try:
+                client.call("close")
+            except (OSError, RuntimeError):
+                pass
+        for client in self._shards:
+            client.process.join(timeout=10)
+            if client.process.is_alive():
+                client.process.terminate()
+            client.connection.close()
+        self._shards = []
+
+    def close(self):
+        """
+        Commits the shard tips a last time, then closes every shard and waits for its process.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        if self._commit_thread is not None:
+            self._commit_stop.set()
+            self._commit_thread.join()
+            self._commit_thread = None
+        try:
+            self.commit()
+        finally:
+            self._stop_shards()
+            if self._commits_file is not None:
+                self._commits_file.close()
+                self._commits_file = None
+
+    def display_ledger(self):
+        """
+        Prints the top-level commit chain and the current shard tips to the console.
+        """
+        print("\n--- Helios Sharded Ledger State ---")
+        for block_index in range(len(self.chain)):
+            print(json.dumps(self.get_block(block_index), indent=2, sort_keys=True, separators=(',', ': ')))
+        tips = self.shard_tips()
+        print(f"--- Shards: {self.shard_count} (keyed by {self.shard_key}), shard blocks: {sum(length for length, _ in tips)}, "
+              f"commits: {len(self.chain)} ---")
+        print("--- End of Ledger ---\n")
+
+if __name__ == '__main__':
+    # Test routing, fan-out lookups and queries, commits and ingest scaling.
+    import shutil
+    import tempfile
+
+    print("--- Sharded Ledger Self-Test ---")
+
+    def make_claim(n, prefix="claim"):
+        return {"claim_id": f"{prefix}_{n:07d}", "timestamp": f"2025-01-01T00:{n // 60 % 60:02d}:{n % 60:02d}",
+                "submitter_id": f"user_{n % 7}", "content_hash": hashlib.sha256(f"content {n % 500}".encode()).hexdigest(),
+                "content_type": "text/plain" if n % 3 else "image/jpeg", "metadata": {}, "verification_history": [],
+                "status": "pending_verification"}
+
+    ledger = ShardedLedger(shards=4, commit_interval=None)
+    for n in range(200):
+        ledger.add_claim(make_claim(n))
+    ledger.add_claims([make_claim(n) for n in range(200, 2000)])
+    blocks = ledger.add_claims_batch([make_claim(n, "batch") for n in range(100)])
+    print(f"Shard tips: {[length for length, _ in ledger.shard_tips()]}; batch split into {len(blocks)} shard blocks")
+    print(f"Lookup of claim_0001234: {ledger.get_claim_by_id('claim_0001234')['claim_id']} "
+          f"at {ledger.get_claim_location('claim_0001234')}")
+    print(f"Merkle proof names its shard: {ledger.get_merkle_proof('batch_0000042')['shard']}")
+    print(f"Claims sharing one content hash (fan-out): {len(ledger.get_claim_ids_by_content_hash(make_claim(17)['content_hash']))}")
+    print(f"Status after verification: "
+          f"{ledger.record_verification('claim_0000042', [{'agent_id': 'a', 'verdict': 'verified_preliminary'}])}")
+
+    commit = ledger.commit()
+    print(f"Top-level commit {commit['index']} covers {sum(length for length, _ in commit['shard_tips'])} shard blocks")
+
+    expected = [f"claim_{n:07d}" for n in range(2000) if n % 7 == 3] + [f"batch_{n:07d}" for n in range(100) if n % 7 == 3]
+    collected, cursor, pages = [], None, 0
+    while True:
+        page = ledger.query_page(submitter_id="user_3", cursor=cursor, limit=50)
+        collected.extend(claim["claim_id"] for claim in page["claims"])
+        pages += 1
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    lazy = [claim["claim_id"] for _, claim in ledger.query_claims(submitter_id="user_3")]
+    print(f"Paged {len(collected)} claims of user_3 in {pages} pages; complete: {sorted(collected) == sorted(expected)}, "
+          f"matches lazy query: {collected == lazy}, count: {ledger.count_claims(submitter_id='user_3')}")
+    print(f"Verified: {ledger.verify_chain()['valid']}")
+    ledger.close()
+
+    data_dir = tempfile.mkdtemp(prefix="helios_sharded_")
+    try:
+        ledger = ShardedLedger(shards=3, shard_key="content_hash", backend="segmented", data_dir=data_dir,
+                               commit_interval=None)
+        ledger.add_claims([make_claim(n) for n in range(900)])
+        last_hash = ledger.commit()["hash"]
+        ledger.close()
+        ledger = ShardedLedger(shards=3, shard_key="content_hash", backend="segmented", data_dir=data_dir,
+                               commit_interval=None)
+        print(f"Reopened keyed by content_hash: commit chain intact: {ledger.get_last_block_hash() == last_hash}, "
+              f"claim found by fan-out: {ledger.get_claim_by_id('claim_0000123') is not None}, "
+              f"verified: {ledger.verify_chain()['valid']}")
+        ledger.close()
+    finally:
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+    claims = [make_claim(n, "scale") for n in range(40000)]
+    cores = os.cpu_count() or 1
+    for shard_count in sorted({1, min(cores, 4)} | ({cores} if cores <= 8 else set())):
+        ledger = ShardedLedger(shards=shard_count, commit_interval=None)
+        started = time.perf_counter()
+        for position in range(0, len(claims), 5000):
+            ledger.add_claims(claims[position:position + 5000])
+        elapsed = time.perf_counter() - started
+        ledger.close()
+        print(f"Bulk ingest with {shard_count} shard(s) on {cores} core(s): {len(claims) / elapsed:.0f} claims/s")
+    print("--- End of Sharded Ledger Self-Test ---")
@@ -0,0 +1,225 @@
+# node/verification_pipeline.py
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+
+class PipelineClosedError(RuntimeError):
+    """Raised when a claim is submitted to a pipeline that is not accepting work."""
+
+
+class VerificationPipeline:
+    """
+    An asyncio worker pool that keeps a HeliosCoreNode saturated with verification work.
+    Pending claims go into the node's VerificationScheduler, which orders them by priority
+    and shares the workers fairly between submitters; worker coroutines take the next
+    claim from it, run the claim's agents off the event loop and commit the results back
+    to the ledger on the event loop thread, so ledger writes never race each other.
+    Every enqueued claim gets an asyncio.Future that resolves to its verification outcome.
+
+    All methods must be called from the event loop the pipeline was started on.
+    """
+    def __init__(self, node, workers=4, queue_size=1024, stop_when_settled=False):
+        """
+        Args:
+            node (HeliosCoreNode): The node whose claims are verified.
+            workers (int): Number of claims verified concurrently.
+            queue_size (int): Maximum number of pending claims; submitters wait when it is reached.
+            stop_when_settled (bool): Passed on to the node's agent runner for every claim.
+        """
+        self.node = node
+        self.workers = workers
+        self.queue_size = queue_size
+        self.stop_when_settled = stop_when_settled
+        self._scheduler = None
+        self._worker_tasks = []
+        self._executor = None
+        self._accepting = False
+        self._stopping = False
+        self._in_flight = 0
+        self._wakeup = None # Set when claims arrive or the pipeline stops
+        self._space = None # Set when a claim leaves the scheduler
+        self._idle = None # Set when nothing is pending or being verified
+
+    @property
+    def running(self):
+        return self._accepting
+
+    def pending_count(self):
+        """
+        Returns:
+            int: Number of claims waiting in the scheduler (including rate-limited ones).
+        """
+        return len(self._scheduler) if self._scheduler is not None else 0
+
+    async def start(self):
+        """
+        Starts the worker coroutines on the node's scheduler.
+        """
+        if self._accepting:
+            return
+        self._scheduler = self.node.verification_scheduler
+        self._wakeup = asyncio.Event()
+        self._space = asyncio.Event()
+        self._idle = asyncio.Event()
+        if not len(self._scheduler):
+            self._idle.set()
+        self._stopping = False
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix=f"{self.node.node_id}-pipeline")
+        self._worker_tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        self._accepting = True
+        self.node.instrumentation.event("pipeline_started", "Verification pipeline started on Node '{node_id}' with {workers} workers (queue size {queue_size}).",
+                                        node_id=self.node.node_id, workers=self.workers, queue_size=self.queue_size)
+
+    def _schedule(self, claim_id, claim_data, urgency):
+        if claim_data is None:
+            claim_data = self.node.ledger.get_claim_by_id(claim_id, with_events=False) or {"claim_id": claim_id}
+        future = asyncio.get_running_loop().create_future()
+        if not self._scheduler.push(claim_data, urgency, future):
+            return None
+        self._idle.clear()
+        self._wakeup.set()
+        return future
+
+    async def enqueue(self, claim_id, claim_data=None, urgency=None):
+        """
+        Schedules a claim for verification, waiting while 'queue_size' claims are pending
+        (backpressure).
+
+        Args:
+            claim_id (str): The claim to verify.
+            claim_data (dict, optional): The claim, if the caller has it; otherwise it is read
+                                         from the ledger to decide its priority.
+            urgency (str, optional): Priority level overriding the scheduler's policy.
+
+        Returns:
+            asyncio.Future: Resolves to {"claim_id", "status", "verification_results"},
+                            or to None if the claim had nothing to verify.
+
+        Raises:
+            ValueError: If 'urgency' is not a priority level.
+        """
+        while True:
+            if not self._accepting:
+                raise PipelineClosedError(f"Verification pipeline on Node '{self.node.node_id}' is not accepting claims.")
+            if len(self._scheduler) < self.queue_size:
+                future = self._schedule(claim_id, claim_data, urgency)
+                if future is not None:
+                    return future
+            self._space.clear()
+            await self._space.wait()
+
+    def enqueue_nowait(self, claim_id, claim_data=None, urgency=None):
+        """
+        Schedules a claim without waiting. See enqueue() for the arguments.
+
+        Returns:
+            asyncio.Future or None: The claim's future, or None if the pipeline is full or closed.
+                                    A claim that could not be scheduled stays pending in the ledger.
+        """
+        if not self._accepting or len(self._scheduler) >= self.queue_size:
+            return None
+        return self._schedule(claim_id, claim_data, urgency)
+
+    async def _verify(self, claim_id):
+        prepared = self.node._prepare_verification(claim_id)
+        if prepared is None:
+            return None
+        claim_data, agents_to_run = prepared
+        loop = asyncio.get_running_loop()
+        results = await loop.run_in_executor(
+            self._executor, self.node._run_agents, claim_data, agents_to_run, self.stop_when_settled)
+        status = self.node._commit_verification(claim_id, results)
+        return {"claim_id": claim_id, "status": status, "verification_results": results}
+
+    async def _worker(self):
+        scheduler = self._scheduler
+        while True:
+            popped = scheduler.pop()
+            if popped is None:
+                if self._stopping:
+                    return
+                self._wakeup.clear()
+                try: # Sleep until claims arrive or a rate-limited claim becomes ready
+                    await asyncio.wait_for(self._wakeup.wait(), scheduler.next_ready_in())
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            self._space.set()
+            claim_id, future = popped # future is None for claims scheduled outside the pipeline
+            self._in_flight += 1
+            try:
+                outcome = await self._verify(claim_id)
+                if future is not None and not future.done():
+                    future.set_result(outcome)
+            except Exception as e:
+                self.node.instrumentation.event("pipeline_error", "Error verifying claim '{claim_id}' in pipeline: {error}",
+                                                level="error", claim_id=claim_id, error=e)
+                if future is not None and not future.done():
+                    future.set_exception(e)
+            finally:
+                self._in_flight -= 1
+                if not self._in_flight and not len(scheduler):
+                    self._idle.set()
+
+    async def stop(self, drain=True):
+        """
+        Stops accepting claims and shuts the workers down.
+
+        Args:
+            drain (bool): Verify everything already pending (rate-limited claims included)
+                          before stopping. Otherwise pending claims are dropped (their futures
+                          are cancelled and they stay pending in the ledger).
+        """
+        if not self._accepting:
+            return
+        self._accepting = False
+        self._space.set() # Wake blocked enqueue() calls so they see the pipeline closed
+        if drain:
+            await self._idle.wait()
+        else:
+            for future in self._scheduler.drain():
+                if future is not None:
+                    future.cancel()
+        self._stopping = True
+        self._wakeup.set()
+        await asyncio.gather(*self._worker_tasks)
+        self._worker_tasks = []
+        self._executor.shutdown(wait=True)
+        self.node.instrumentation.event("pipeline_stopped", "Verification pipeline on Node '{node_id}' stopped.", node_id=self.node.node_id)
+
+
+if __name__ == '__main__':
+    # Test the pipeline end-to-end through HeliosCoreNode.
+    import time
+    from .core_node import HeliosCoreNode
+
+    async def _self_test():
+        node = HeliosCoreNode(node_id="pipeline_test_node")
+        await node.start_verification_pipeline(workers=4, queue_size=8)
+        started = time.perf_counter()
+        futures = []
+        for i in range(50):
+            _, future = await node.submit_claim_for_verification(
+                content_hash=f"pipeline_hash_{i:010d}", content_type="text/plain", submitter_id=f"user_{i % 5}")
+            futures.append(future)
+        outcomes = await asyncio.gather(*futures)
+        elapsed = time.perf_counter() - started
+        statuses = sorted({outcome["status"] for outcome in outcomes})
+        print(f"Verified {len(outcomes)} claims in {elapsed:.3f}s, statuses: {statuses}")
+
+        completed = []
+        for i in range(40):
+            _, future = await node.submit_claim_for_verification(f"pipeline_bulk_{i:010d}", "text/plain", "bulk_uploader")
+            future.add_done_callback(lambda _: completed.append("bulk"))
+        waiting = node.verification_pipeline.pending_count()
+        _, future = await node.submit_claim_for_verification("pipeline_urgent_0001", "text/plain", "newsroom", urgency="urgent")
+        future.add_done_callback(lambda _: completed.append("urgent"))
+        await node.stop_verification_pipeline()
+        print(f"Urgent claim queued behind {waiting} waiting bulk claims finished before "
+              f"{len(completed) - completed.index('urgent') - 1} of them")
+        node.close()
+
+    print("--- Verification Pipeline Self-Test ---")
+    asyncio.run(_self_test())
+    print("--- End of Verification Pipeline Self-Test ---")
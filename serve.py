@@ -0,0 +1,78 @@
+# serve.py
+
+import argparse
+import asyncio
+
+from node.api_server import HeliosApiServer
+from node.blob_store import BlobStore
+from node.core_node import HeliosCoreNode
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Run a Helios node behind its HTTP/1.1 JSON API.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--node-id", default="helios_api_node")
+    parser.add_argument("--backend", choices=sorted(HeliosCoreNode.LEDGER_BACKENDS), default="memory")
+    parser.add_argument("--data-dir", help="Ledger directory for the segmented backend (or segmented shards).")
+    parser.add_argument("--shards", type=int, help="Shard count for the sharded backend (default: one per core).")
+    parser.add_argument("--blob-dir", help="Content-addressed store for content posted to /content, read by content agents.")
+    parser.add_argument("--duplicate-policy", choices=HeliosCoreNode.DUPLICATE_POLICIES, default="reuse",
+                        help="Handling of claims for content the ledger already holds.")
+    parser.add_argument("--max-connections", type=int, default=1024)
+    parser.add_argument("--max-concurrency", type=int, default=256,
+                        help="Verification and bulk ingest requests in progress before new ones get 503.")
+    parser.add_argument("--verification-workers", type=int, default=4)
+    parser.add_argument("--verification-queue-size", type=int, default=1024)
+    parser.add_argument("--rate-limit", type=float,
+                        help="Claims per second each submitter gets verified before its claims are held back.")
+    parser.add_argument("--rate-burst", type=int, default=10, help="Claims a submitter may have verified at once past its rate limit.")
+    parser.add_argument("--priority-aging", type=float,
+                        help="Seconds a waiting claim spends at a priority level before it moves up one.")
+    parser.add_argument("--ingest-batch-size", type=int, default=1000)
+    parser.add_argument("--keep-alive-timeout", type=float, default=15.0)
+    return parser
+
+
+def _ledger_options(args):
+    if args.backend == "segmented":
+        if not args.data_dir:
+            raise SystemExit("--data-dir is required for the segmented backend.")
+        return {"data_dir": args.data_dir}
+    if args.backend == "sharded":
+        options = {"shards": args.shards}
+        if args.data_dir:
+            options.update(backend="segmented", data_dir=args.data_dir)
+        return options
+    return None
+
+
+async def serve(args):
+    node = HeliosCoreNode(node_id=args.node_id, ledger_backend=args.backend, ledger_options=_ledger_options(args),
+                          blob_store=BlobStore(args.blob_dir) if args.blob_dir else None,
+                          duplicate_policy=args.duplicate_policy,
+                          scheduler_options={"rate_limit": args.rate_limit, "burst": args.rate_burst,
+                                             "aging_interval": args.priority_aging})
+    server = HeliosApiServer(node, host=args.host, port=args.port, max_connections=args.max_connections,
+                             max_concurrency=args.max_concurrency, ingest_batch_size=args.ingest_batch_size,
+                             keep_alive_timeout=args.keep_alive_timeout, verification_workers=args.verification_workers,
+                             verification_queue_size=args.verification_queue_size)
+    try:
+        host, port = await server.start()
+        print(f"Helios node '{node.node_id}' serving on http://{host}:{port} (backend: {args.backend}). Press Ctrl+C to stop.")
+        await server.serve_forever()
+    finally:
+        await server.stop()
+        node.close()
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        print("\nHelios API server stopped.")
+
+
+if __name__ == "__main__":
+    main()